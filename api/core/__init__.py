@@ -1,6 +1,6 @@
 """Core modules per API."""
 
 from .config import settings
-from .dependencies import get_redis_client, get_scraper
+from .dependencies import get_async_redis_client, get_redis_client, get_scraper
 
-__all__ = ['settings', 'get_redis_client', 'get_scraper']
+__all__ = ['settings', 'get_async_redis_client', 'get_redis_client', 'get_scraper']
@@ -1,7 +1,7 @@
 """Configurazione API."""
 
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import Dict, List
 import os
 
 
@@ -28,6 +28,10 @@ class Settings(BaseSettings):
     PORT: int = 8000
     DEBUG: bool = False
     RELOAD: bool = False
+    # Avvio di produzione (python -m api.server)
+    SERVER_WORKERS: int = 1  # Processi worker (0 = uno per core); con più worker lo stato è condiviso
+    SERVER_PRELOAD: bool = True  # Prepara le segnalazioni (schema, migrazione) nel processo principale prima dei worker
+    SERVER_GRACEFUL_TIMEOUT: int = 30  # Secondi per completare le richieste in corso alla chiusura
 
     # Redis
     REDIS_HOST: str = "localhost"
@@ -35,16 +39,65 @@ class Settings(BaseSettings):
     REDIS_DB: int = 0
     REDIS_PASSWORD: str = ""
     REDIS_DECODE_RESPONSES: bool = True
-    REDIS_MAX_CONNECTIONS: int = 10
+    REDIS_MAX_CONNECTIONS: int = 50  # Per worker, pool condiviso dalle richieste
+    REDIS_POOL_TIMEOUT: float = 2.0  # Attesa massima di una connessione libera
+    REDIS_CONNECT_TIMEOUT: float = 5.0
+    REDIS_SOCKET_TIMEOUT: float = 5.0
+    REDIS_HEALTH_CHECK_INTERVAL: int = 30  # PING delle connessioni inattive da più secondi
+    REDIS_COMMAND_RETRIES: int = 1  # Retry dei comandi su errori di rete transitori
+    REDIS_RECONNECT_BASE_DELAY: float = 1.0  # Prima attesa dopo un errore, poi raddoppia
+    REDIS_RECONNECT_MAX_DELAY: float = 30.0
 
     # Cache TTL (Time To Live)
     CACHE_TTL_SEARCH: int = 3600  # 1 ora
     CACHE_TTL_LISTING: int = 7200  # 2 ore
+    CACHE_TTL_LISTING_INDEX: int = 604800  # 7 giorni, indice ID -> URL
+
+    # Popolarità ricerche e pre-riscaldamento cache
+    POPULARITY_HALF_LIFE: float = 21600.0  # Emivita contatori (6 ore)
+    POPULARITY_MAX_KEYS: int = 10000  # Ricerche tracciate al massimo
+    CACHE_WARMER_ENABLED: bool = True
+    CACHE_WARMER_TOP_K: int = 50  # Ricerche più popolari da mantenere calde
+    CACHE_WARMER_MIN_SCORE: float = 2.0  # Punteggio minimo per il riscaldamento
+    CACHE_WARMER_LEAD_TIME: int = 300  # Secondi prima della scadenza di CACHE_TTL_SEARCH
+    CACHE_WARMER_INTERVAL: float = 60.0  # Secondi tra cicli
+    CACHE_WARMER_RATE_SHARE: float = 0.25  # Quota del budget richieste in uscita
 
     # Rate Limiting
     RATE_LIMIT_ENABLED: bool = True
     RATE_LIMIT_REQUESTS: int = 10  # Richieste
     RATE_LIMIT_PERIOD: int = 60  # Per periodo in secondi (10 richieste/minuto)
+    RATE_LIMIT_BACKEND: str = "memory"  # "memory" (per worker) o "redis" (condiviso, sempre con più worker)
+    # Costo delle ricerche in unità di rate limit (una richiesta semplice = 1)
+    RATE_LIMIT_COST_PER_PAGE: float = 1.0  # Per pagina di risultati scaricata
+    RATE_LIMIT_COST_PER_DETAIL: float = 0.2  # Per pagina di dettaglio (details=true)
+    # Budget per client (IP -> unità per periodo), es. {"10.0.0.5": 100}
+    RATE_LIMIT_CLIENT_BUDGETS: Dict[str, int] = {}
+
+    # Metriche Prometheus (GET /metrics)
+    METRICS_ENABLED: bool = True
+    SERVER_TIMING_ENABLED: bool = True  # Header Server-Timing sulle ricerche
+    METRICS_MULTIPROC_DIR: str = ""  # Metriche dei worker con SERVER_WORKERS > 1 (vuoto = directory temporanea)
+
+    # Amministrazione (endpoint /admin/*, header X-Admin-Token; vuoto = disabilitati)
+    ADMIN_TOKEN: str = ""
+
+    # Profiling dei worker
+    PROFILER_INTERVAL_MS: float = 10.0  # Intervallo di campionamento (100 Hz)
+    PROFILER_MAX_SECONDS: int = 60  # Durata massima di GET /admin/profile
+    PROFILER_SIGNAL_ENABLED: bool = False  # Profilo su SIGUSR1
+    PROFILER_SIGNAL_SECONDS: int = 30
+    PROFILER_OUTPUT_DIR: str = "logs/profiles"
+    PROFILER_SLOW_REQUEST_MS: float = 0  # cProfile delle richieste più lente (0 = disattivato)
+    PROFILER_SLOW_SAMPLE_RATE: float = 1.0  # Frazione di richieste profilate
+    PROFILER_SLOW_KEEP: int = 20  # Profili conservati in memoria
+
+    # Tracing OpenTelemetry (richiede opentelemetry-sdk)
+    TRACING_ENABLED: bool = False
+    TRACING_EXPORTER: str = "otlp"  # "otlp", "console" o "file"
+    TRACING_OTLP_ENDPOINT: str = "http://localhost:4318/v1/traces"
+    TRACING_FILE: str = "logs/traces.jsonl"  # Uno span JSON per riga
+    TRACING_SERVICE_NAME: str = "subito-scraper-api"
 
     # Scraper - Parametri aumentati per evitare blocchi da Subito.it
     SCRAPER_REQUESTS_PER_SECOND: float = 0.2  # 1 richiesta ogni 5 secondi
@@ -52,6 +105,31 @@ class Settings(BaseSettings):
     SCRAPER_MAX_DELAY: float = 15.0  # Massimo 15 secondi tra richieste
     SCRAPER_MAX_RETRIES: int = 3
     SCRAPER_TIMEOUT: int = 30
+    SCRAPER_PARSER: str = "html.parser"  # "html.parser", "lxml" o "html5lib"
+    SCRAPER_CIRCUIT_FAILURES: int = 5  # Download falliti consecutivi che aprono il circuito per host
+    SCRAPER_CIRCUIT_RECOVERY: float = 60.0  # Secondi prima della richiesta di prova
+    SCRAPER_SUBITO_BASE_URL: str = "https://www.subito.it"
+    SCRAPER_EBAY_BASE_URL: str = "https://www.ebay.it"
+
+    # Arricchimento dettagli annunci (details=true)
+    ENRICH_CONCURRENCY: int = 4  # Download paralleli di default
+    ENRICH_MAX_CONCURRENCY: int = 16
+    ENRICH_MAX_LISTINGS: int = 50  # Annunci arricchiti al massimo per ricerca
+    ENRICH_LOCK_TTL: float = 60.0  # Durata del lock tra worker sul download di un annuncio
+    ENRICH_FAILURE_TTL: int = 300  # Secondi in cache dei dati di base dopo un download fallito
+
+    # Deduplicazione annunci (MinHash + LSH)
+    DEDUP_NUM_PERM: int = 64  # Funzioni hash della firma MinHash
+    DEDUP_BANDS: int = 16  # Bande LSH (soglia implicita ~ (1/16)^(1/4) = 0.5)
+    DEDUP_THRESHOLD: float = 0.6  # Similarità minima tra titoli
+    DEDUP_PRICE_TOLERANCE: float = 0.15  # Differenza relativa massima tra prezzi
+    DEDUP_MAX_PHOTO_SHARE: int = 5  # Foto condivise da più annunci = stock, ignorate
+
+    # Statistiche di prezzo per ricerca e categoria (sketch di quantili)
+    PRICE_STATS_ENABLED: bool = True
+    PRICE_STATS_WINDOW_DAYS: int = 7  # Giorni considerati
+    PRICE_STATS_RELATIVE_ACCURACY: float = 0.02  # Errore relativo dei quantili (non cambiare con dati salvati)
+    PRICE_STATS_MIN_COUNT: int = 30  # Prezzi minimi per usarle nel punteggio di rischio
 
     # CORS
     CORS_ENABLED: bool = True
@@ -60,11 +138,45 @@ class Settings(BaseSettings):
     CORS_ALLOW_METHODS: List[str] = ["*"]
     CORS_ALLOW_HEADERS: List[str] = ["*"]
 
-    # Database per segnalazioni (file JSON per semplicità)
+    # Database per segnalazioni
+    REPORTS_BACKEND: str = "sqlite"  # "sqlite" (WAL) o "journal" (JSONL append-only)
+    REPORTS_SQLITE_PATH: str = "data/reports.db"
+    REPORTS_DB_TIMEOUT: float = 5.0  # Attesa massima del lock di scrittura (secondi)
+    REPORTS_JOURNAL_DIR: str = "data/reports_journal"
+    REPORTS_JOURNAL_FSYNC: bool = True  # fsync (raggruppate) prima di confermare
+    REPORTS_JOURNAL_COMPACT_BYTES: int = 8 * 1024 * 1024  # Compatta oltre 8 MB
+    # Vecchio file JSON, importato in SQLite al primo avvio
     REPORTS_DB_PATH: str = "data/reports.json"
 
-    # Logging
+    # Scheduler ricerche salvate
+    SCHEDULER_ENABLED: bool = True
+    SCHEDULER_DB_PATH: str = "data/saved_searches.json"
+    SCHEDULER_DEFAULT_INTERVAL: int = 3600  # Secondi tra esecuzioni
+    SCHEDULER_MIN_INTERVAL: int = 300  # Intervallo minimo consentito
+    SCHEDULER_MAX_SEARCHES: int = 10000
+    SCHEDULER_POLL_INTERVAL: float = 30.0  # Attesa massima quando la coda è vuota
+    SCHEDULER_SAVE_INTERVAL: float = 60.0  # Frequenza salvataggio su file
+
+    # Health check (/health/ready)
+    HEALTH_CACHE_SECONDS: float = 1.0  # Riuso dell'esito tra due probe
+    HEALTH_PROBE_TIMEOUT: float = 1.0  # Timeout del PING a Redis
+    HEALTH_REDIS_MAX_LATENCY_MS: float = 50.0  # Oltre: degraded
+    HEALTH_REQUIRE_REDIS: bool = False  # Se True, Redis non raggiungibile = non pronto
+    HEALTH_MAX_INFLIGHT: int = 64  # Richieste in corso oltre cui il worker è saturo
+    HEALTH_MAX_LOOP_LAG_MS: float = 500.0  # Ritardo dell'event loop oltre cui il worker è saturo
+    HEALTH_MAX_QUEUE_DEPTH: int = 100  # Ricerche salvate in attesa oltre: degraded
+
+    # Logging (scritto da un thread dedicato, vedi src/utils/logger.py)
     LOG_LEVEL: str = "INFO"
+    LOG_FILE: str = "api.log"  # Vuoto = solo console
+    LOG_JSON: bool = False  # Un oggetto JSON per riga
+    LOG_ROTATION: str = "size"  # "size", "time" o "none"
+    LOG_MAX_BYTES: int = 10 * 1024 * 1024
+    LOG_BACKUP_COUNT: int = 5
+    LOG_ROTATION_WHEN: str = "midnight"  # Intervallo con LOG_ROTATION=time
+    # Frazione di messaggi conservati per logger (ERROR sempre conservati),
+    # es. {"src.scraper": 0.1}
+    LOG_SAMPLING: Dict[str, float] = {}
 
     class Config:
         """Configurazione Pydantic Settings."""
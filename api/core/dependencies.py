@@ -1,78 +1,307 @@
 """Dipendenze FastAPI."""
 
+import asyncio
+import random
 import redis
-from typing import Generator
-from fastapi import Depends
+import redis.asyncio as aioredis
+import secrets
+import time
+from typing import Any, Dict, Generator, Optional
+from fastapi import Depends, Header, HTTPException, status
+from redis.asyncio.retry import Retry as AsyncRetry
+from redis.backoff import ExponentialBackoff
 import logging
 
 from .config import settings
+from api.models.requests import PlatformEnum
+from src.scraper.base_scraper import BaseScraper
 from src.scraper.subito_scraper import SubitoScraper
+from src.scraper.ebay_scraper import EbayScraper
 from src.config.settings import ScraperConfig
 
 
 logger = logging.getLogger(__name__)
 
-# Redis client globale
+
+class _ReconnectBackoff:
+    """
+    Attesa esponenziale tra i tentativi di connessione a Redis.
+
+    Finché l'attesa non è trascorsa Redis viene considerato non
+    disponibile senza tentare la connessione, così le richieste non
+    pagano il timeout di connessione a ogni chiamata.
+    """
+
+    def __init__(self):
+        """Inizializza lo stato (nessun errore)."""
+        self.failures = 0
+        self.retry_at = 0.0
+
+    @property
+    def down(self) -> bool:
+        """True se l'ultimo tentativo è fallito."""
+        return self.failures > 0
+
+    def ready(self) -> bool:
+        """True se si può tentare (di nuovo) la connessione."""
+        return time.monotonic() >= self.retry_at
+
+    def failed(self) -> float:
+        """
+        Registra un tentativo fallito.
+
+        Returns:
+            Secondi di attesa prima del prossimo tentativo
+        """
+        self.failures += 1
+        delay = min(
+            settings.REDIS_RECONNECT_MAX_DELAY,
+            settings.REDIS_RECONNECT_BASE_DELAY * 2 ** (self.failures - 1)
+        )
+        # Jitter: i worker non riprovano tutti nello stesso istante
+        delay *= random.uniform(0.5, 1.0)
+        self.retry_at = time.monotonic() + delay
+        return delay
+
+    def reset(self):
+        """Registra una connessione riuscita."""
+        self.failures = 0
+        self.retry_at = 0.0
+
+
+def _redis_options() -> Dict[str, Any]:
+    """Parametri di connessione comuni ai client sincrono e asincrono."""
+    return dict(
+        host=settings.REDIS_HOST,
+        port=settings.REDIS_PORT,
+        db=settings.REDIS_DB,
+        password=settings.REDIS_PASSWORD if settings.REDIS_PASSWORD else None,
+        decode_responses=settings.REDIS_DECODE_RESPONSES,
+        socket_connect_timeout=settings.REDIS_CONNECT_TIMEOUT,
+        socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+        health_check_interval=settings.REDIS_HEALTH_CHECK_INTERVAL
+    )
+
+
+# Redis client globale (sincrono: scheduler, warmer, rate limit, scraping nei thread)
 _redis_client = None
+_redis_backoff = _ReconnectBackoff()
 
 
 def get_redis_client() -> redis.Redis:
     """
     Dependency per ottenere Redis client.
 
+    Se Redis non è raggiungibile restituisce None e ritenta la
+    connessione solo dopo un'attesa crescente (vedi _ReconnectBackoff).
+
     Returns:
         Redis client instance
     """
     global _redis_client
 
-    if _redis_client is None:
+    if _redis_client is None and _redis_backoff.ready():
         try:
             _redis_client = redis.Redis(
-                host=settings.REDIS_HOST,
-                port=settings.REDIS_PORT,
-                db=settings.REDIS_DB,
-                password=settings.REDIS_PASSWORD if settings.REDIS_PASSWORD else None,
-                decode_responses=settings.REDIS_DECODE_RESPONSES,
                 max_connections=settings.REDIS_MAX_CONNECTIONS,
-                socket_connect_timeout=5,
-                socket_timeout=5
+                **_redis_options()
             )
             # Test connessione
             _redis_client.ping()
+            _redis_backoff.reset()
             logger.info("Redis connesso con successo")
         except redis.ConnectionError as e:
-            logger.warning(f"Redis non disponibile: {e}. Cache disabilitata.")
+            delay = _redis_backoff.failed()
+            logger.warning("Redis non disponibile: %s. Cache disabilitata, nuovo tentativo tra %.1fs", e, delay)
             _redis_client = None
         except Exception as e:
-            logger.error(f"Errore connessione Redis: {e}")
+            delay = _redis_backoff.failed()
+            logger.error("Errore connessione Redis: %s. Nuovo tentativo tra %.1fs", e, delay)
             _redis_client = None
 
     return _redis_client
 
 
-def get_scraper() -> Generator[SubitoScraper, None, None]:
+# Redis client asincrono globale (cache delle route), con pool creato all'avvio
+_async_redis_client: Optional[aioredis.Redis] = None
+_async_redis_backoff = _ReconnectBackoff()
+_async_redis_lock: Optional[asyncio.Lock] = None
+
+
+async def _ping_async_redis(client: aioredis.Redis) -> bool:
+    """PING al client asincrono, aggiornando lo stato di backoff."""
+    try:
+        await client.ping()
+    except Exception as e:
+        delay = _async_redis_backoff.failed()
+        logger.warning("Redis non disponibile: %s. Cache disabilitata, nuovo tentativo tra %.1fs", e, delay)
+        return False
+
+    if _async_redis_backoff.down:
+        logger.info("Redis di nuovo raggiungibile")
+    else:
+        logger.info("Redis (asincrono) connesso con successo")
+    _async_redis_backoff.reset()
+    return True
+
+
+async def init_async_redis() -> Optional[aioredis.Redis]:
     """
-    Dependency per ottenere scraper instance.
+    Crea il pool di connessioni asincrono e verifica la connessione.
 
-    Yields:
-        SubitoScraper instance
+    Il pool (REDIS_MAX_CONNECTIONS connessioni per worker) è condiviso da
+    tutte le richieste; se è esaurito una richiesta attende fino a
+    REDIS_POOL_TIMEOUT secondi che si liberi una connessione. I comandi
+    falliti per errori di rete sono ritentati con backoff esponenziale.
+
+    Returns:
+        Client asincrono, o None se Redis non è raggiungibile
+    """
+    global _async_redis_client
+
+    if _async_redis_client is None:
+        pool = aioredis.BlockingConnectionPool(
+            max_connections=settings.REDIS_MAX_CONNECTIONS,
+            timeout=settings.REDIS_POOL_TIMEOUT,
+            **_redis_options()
+        )
+        _async_redis_client = aioredis.Redis(
+            connection_pool=pool,
+            # Attese brevi: i retry coprono solo errori transitori (es. una
+            # connessione inattiva chiusa dal server), non Redis spento
+            retry=AsyncRetry(ExponentialBackoff(cap=0.5, base=0.05), retries=settings.REDIS_COMMAND_RETRIES)
+        )
+
+    if await _ping_async_redis(_async_redis_client):
+        return _async_redis_client
+    return None
+
+
+async def get_async_redis_client() -> Optional[aioredis.Redis]:
+    """
+    Dependency per ottenere il Redis client asincrono.
+
+    Mentre Redis è segnato come non disponibile restituisce None senza
+    tentare la connessione; trascorsa l'attesa una sola richiesta per
+    volta verifica con un PING se Redis è tornato raggiungibile.
+
+    Returns:
+        Client asincrono, o None se Redis non è disponibile
+    """
+    global _async_redis_lock
+
+    if _async_redis_client is not None and not _async_redis_backoff.down:
+        return _async_redis_client
+
+    if not _async_redis_backoff.ready():
+        return None
+
+    if _async_redis_lock is None:
+        _async_redis_lock = asyncio.Lock()
+
+    async with _async_redis_lock:
+        # Un'altra richiesta potrebbe aver già ritentato
+        if _async_redis_client is None or (_async_redis_backoff.down and _async_redis_backoff.ready()):
+            return await init_async_redis()
+
+    return None if _async_redis_backoff.down else _async_redis_client
+
+
+def mark_async_redis_unavailable(error: Exception):
     """
-    config = ScraperConfig(
+    Segna Redis come non disponibile dopo un errore di connessione.
+
+    Chiamata dalla cache asincrona: le richieste successive proseguono
+    senza cache fino al prossimo tentativo, invece di attendere ognuna
+    il timeout di connessione. Vale anche per il pool esaurito oltre
+    REDIS_POOL_TIMEOUT (Redis non riesce a servire il carico).
+
+    Args:
+        error: Errore ricevuto da Redis
+    """
+    if not _async_redis_backoff.down:
+        delay = _async_redis_backoff.failed()
+        logger.warning("Errore di connessione Redis: %s. Cache disabilitata per %.1fs", error, delay)
+
+
+def get_scraper_config() -> ScraperConfig:
+    """
+    Crea la configurazione scraper a partire dalle impostazioni API.
+
+    Returns:
+        ScraperConfig instance
+    """
+    return ScraperConfig(
         requests_per_second=settings.SCRAPER_REQUESTS_PER_SECOND,
         min_delay=settings.SCRAPER_MIN_DELAY,
         max_delay=settings.SCRAPER_MAX_DELAY,
         max_retries=settings.SCRAPER_MAX_RETRIES,
         request_timeout=settings.SCRAPER_TIMEOUT,
+        parser=settings.SCRAPER_PARSER,
+        circuit_failure_threshold=settings.SCRAPER_CIRCUIT_FAILURES,
+        circuit_recovery_timeout=settings.SCRAPER_CIRCUIT_RECOVERY,
+        subito_base_url=settings.SCRAPER_SUBITO_BASE_URL,
+        ebay_base_url=settings.SCRAPER_EBAY_BASE_URL,
         log_level=settings.LOG_LEVEL
     )
 
-    scraper = SubitoScraper(config)
+
+def create_scraper(platform: PlatformEnum) -> BaseScraper:
+    """
+    Crea l'istanza dello scraper corretto in base alla piattaforma.
+
+    Args:
+        platform: Piattaforma richiesta
+
+    Returns:
+        Scraper instance (SubitoScraper o EbayScraper)
+    """
+    if platform == PlatformEnum.EBAY:
+        return EbayScraper(get_scraper_config())
+    else:  # Default: Subito
+        return SubitoScraper(get_scraper_config())
+
+
+def get_scraper() -> Generator[SubitoScraper, None, None]:
+    """
+    Dependency per ottenere scraper instance.
+
+    Yields:
+        SubitoScraper instance
+    """
+    scraper = SubitoScraper(get_scraper_config())
     try:
         yield scraper
     finally:
         scraper.close()
 
 
+def require_admin(x_admin_token: str = Header(None)):
+    """
+    Dependency per gli endpoint di amministrazione.
+
+    Gli endpoint sono disabilitati finché ADMIN_TOKEN non è impostato;
+    il token va inviato nell'header X-Admin-Token.
+
+    Args:
+        x_admin_token: Valore dell'header X-Admin-Token
+
+    Raises:
+        HTTPException: 403 se gli endpoint sono disabilitati o il token non è valido
+    """
+    if not settings.ADMIN_TOKEN:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail={"error": "AdminDisabled", "message": "Endpoint di amministrazione disabilitati"}
+        )
+
+    if not x_admin_token or not secrets.compare_digest(x_admin_token, settings.ADMIN_TOKEN):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail={"error": "Forbidden", "message": "Token di amministrazione non valido"}
+        )
+
+
 def close_redis():
     """Chiude la connessione Redis."""
     global _redis_client
@@ -81,6 +310,22 @@ def close_redis():
             _redis_client.close()
             logger.info("Connessione Redis chiusa")
         except Exception as e:
-            logger.error(f"Errore chiusura Redis: {e}")
+            logger.error("Errore chiusura Redis: %s", e)
         finally:
             _redis_client = None
+
+
+async def close_async_redis():
+    """Chiude il pool di connessioni asincrono."""
+    global _async_redis_client, _async_redis_lock
+    if _async_redis_client is not None:
+        try:
+            await _async_redis_client.aclose()
+            logger.info("Pool Redis asincrono chiuso")
+        except Exception as e:
+            logger.error("Errore chiusura pool Redis: %s", e)
+        finally:
+            _async_redis_client = None
+            # Il lock è legato all'event loop corrente
+            _async_redis_lock = None
+            _async_redis_backoff.reset()
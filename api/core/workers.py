@@ -0,0 +1,58 @@
+"""Identità del worker nell'avvio multi-processo (vedi api/server.py)."""
+
+import os
+from pathlib import Path
+from typing import Optional
+
+from .config import settings
+
+
+# Variabile d'ambiente con l'indice del worker, impostata da api.server
+WORKER_ID_ENV = "API_WORKER_ID"
+
+
+def worker_id() -> Optional[int]:
+    """
+    Indice del worker corrente.
+
+    Returns:
+        Indice (0..SERVER_WORKERS-1), o None se il processo non è stato
+        avviato da api.server (es. uvicorn diretto)
+    """
+    value = os.environ.get(WORKER_ID_ENV)
+    return int(value) if value is not None else None
+
+
+def is_multi_worker() -> bool:
+    """True se l'API gira su più processi e lo stato deve essere condiviso."""
+    return settings.SERVER_WORKERS > 1
+
+
+def is_primary_worker() -> bool:
+    """
+    True se il processo esegue i job in background.
+
+    Con più worker scheduler e cache warmer girano solo nel worker 0,
+    così ogni ricerca salvata viene eseguita una volta sola.
+    """
+    return worker_id() in (None, 0)
+
+
+def worker_log_file(path: str) -> str:
+    """
+    File di log del worker corrente.
+
+    La rotazione dei file non è sicura tra processi: con più worker
+    ognuno scrive sul proprio file (``api.log`` -> ``api.1.log``).
+
+    Args:
+        path: File di log configurato
+
+    Returns:
+        Path del file di log per questo processo
+    """
+    index = worker_id()
+    if index is None or not is_multi_worker():
+        return path
+    log_path = Path(path)
+    return str(log_path.with_name(f"{log_path.stem}.{index}{log_path.suffix}"))
@@ -11,24 +11,49 @@ from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.exceptions import RequestValidationError
 from pydantic import ValidationError
+import asyncio
 import logging
+import signal
 from datetime import datetime
 
 from api.core.config import settings
-from api.core.dependencies import close_redis
+from api.core.dependencies import close_async_redis, close_redis, get_redis_client, init_async_redis
+from api.core.workers import is_multi_worker, is_primary_worker, worker_id, worker_log_file
+from api.middleware.inflight import InFlightMiddleware
+from api.middleware.metrics import MetricsMiddleware
+from api.middleware.profiling import SlowRequestProfilerMiddleware
 from api.middleware.rate_limit import RateLimitMiddleware
-from api.routers import search_router, reports_router, health_router
+from api.routers import (
+    search_router, reports_router, health_router, saved_searches_router, admin_router
+)
 from api.models.responses import ErrorResponse
-from src.utils.logger import setup_logger
-
-
-# Setup logging
-logger = setup_logger(
-    name='api',
+from api.services.health import get_health_service
+from api.services.popularity import CacheWarmer
+from api.services.profiling import install_signal_handler
+from api.services.scheduler import get_scheduler
+from src.utils import tracing
+from src.utils.logger import configure_logging
+from src.utils.rate_limiter import use_shared_backend
+
+
+# Setup logging: API e scraper scrivono su una coda, un thread scrive su console e file
+configure_logging(
+    names=('api', 'src'),
     level=settings.LOG_LEVEL,
-    log_file='api.log',
-    log_to_console=True
+    log_file=worker_log_file(settings.LOG_FILE) if settings.LOG_FILE else None,
+    log_to_console=True,
+    json_format=settings.LOG_JSON,
+    rotation=None if settings.LOG_ROTATION == "none" else settings.LOG_ROTATION,
+    max_bytes=settings.LOG_MAX_BYTES,
+    backup_count=settings.LOG_BACKUP_COUNT,
+    when=settings.LOG_ROTATION_WHEN,
+    sampling=settings.LOG_SAMPLING
 )
+logger = logging.getLogger('api')
+
+
+# Task in background (scheduler ricerche salvate, cache warmer)
+_background_tasks = []
 
 
 # Crea applicazione FastAPI
@@ -50,20 +75,35 @@ if settings.CORS_ENABLED:
         allow_credentials=settings.CORS_ALLOW_CREDENTIALS,
         allow_methods=settings.CORS_ALLOW_METHODS,
         allow_headers=settings.CORS_ALLOW_HEADERS,
+        expose_headers=["X-Next-Cursor", "Server-Timing"],
     )
     logger.info("CORS abilitato")
 
 
+# Richieste in corso (saturazione del worker per /health/ready)
+app.add_middleware(InFlightMiddleware)
+
+
 # Rate Limiting Middleware
 app.add_middleware(RateLimitMiddleware)
 
 
+# Profiling delle richieste lente (solo se attivato)
+if settings.PROFILER_SLOW_REQUEST_MS > 0:
+    app.add_middleware(SlowRequestProfilerMiddleware)
+
+
+# Metriche (più esterno: misura anche le richieste respinte dal rate limiting)
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
+
 # Exception Handlers
 
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
     """Handler per errori di validazione Pydantic."""
-    logger.warning(f"Errore validazione: {exc.errors()}")
+    logger.warning("Errore validazione: %s", exc.errors())
 
     errors = []
     for error in exc.errors():
@@ -86,7 +126,7 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
 @app.exception_handler(ValueError)
 async def value_error_handler(request: Request, exc: ValueError):
     """Handler per ValueError."""
-    logger.warning(f"ValueError: {str(exc)}")
+    logger.warning("ValueError: %s", exc)
 
     error_response = ErrorResponse(
         error="ValueError",
@@ -104,7 +144,7 @@ async def value_error_handler(request: Request, exc: ValueError):
 @app.exception_handler(Exception)
 async def general_exception_handler(request: Request, exc: Exception):
     """Handler per errori generici."""
-    logger.error(f"Errore non gestito: {str(exc)}", exc_info=True)
+    logger.error("Errore non gestito: %s", exc, exc_info=True)
 
     error_response = ErrorResponse(
         error="InternalServerError",
@@ -125,13 +165,64 @@ async def general_exception_handler(request: Request, exc: Exception):
 async def startup_event():
     """Evento di avvio applicazione."""
     logger.info("="*60)
-    logger.info(f"{settings.API_TITLE} v{settings.API_VERSION}")
+    logger.info("%s v%s", settings.API_TITLE, settings.API_VERSION)
     logger.info("="*60)
-    logger.info(f"Environment: {'DEBUG' if settings.DEBUG else 'PRODUCTION'}")
-    logger.info(f"Redis: {settings.REDIS_HOST}:{settings.REDIS_PORT}")
-    logger.info(f"Rate Limiting: {'Enabled' if settings.RATE_LIMIT_ENABLED else 'Disabled'}")
-    logger.info(f"CORS: {'Enabled' if settings.CORS_ENABLED else 'Disabled'}")
+    logger.info("Environment: %s", 'DEBUG' if settings.DEBUG else 'PRODUCTION')
+    logger.info("Redis: %s:%s", settings.REDIS_HOST, settings.REDIS_PORT)
+    logger.info("Rate Limiting: %s", 'Enabled' if settings.RATE_LIMIT_ENABLED else 'Disabled')
+    logger.info("CORS: %s", 'Enabled' if settings.CORS_ENABLED else 'Disabled')
+    logger.info("Scheduler: %s", 'Enabled' if settings.SCHEDULER_ENABLED else 'Disabled')
+    logger.info("Cache Warmer: %s", 'Enabled' if settings.CACHE_WARMER_ENABLED else 'Disabled')
+    if is_multi_worker():
+        logger.info("Worker: %s di %s (stato condiviso)", worker_id(), settings.SERVER_WORKERS)
     logger.info("="*60)
+
+    if settings.TRACING_ENABLED:
+        tracing.configure_tracing(
+            settings.TRACING_SERVICE_NAME,
+            exporter=settings.TRACING_EXPORTER,
+            otlp_endpoint=settings.TRACING_OTLP_ENDPOINT,
+            file_path=settings.TRACING_FILE
+        )
+
+    if settings.PROFILER_SIGNAL_ENABLED and hasattr(signal, "SIGUSR1"):
+        install_signal_handler(
+            signal.SIGUSR1, settings.PROFILER_SIGNAL_SECONDS, settings.PROFILER_OUTPUT_DIR
+        )
+
+    # Pool Redis asincrono per la cache delle route
+    await init_async_redis()
+
+    # Con più worker il budget verso ogni sito è unico per tutti i processi
+    if is_multi_worker():
+        redis_client = get_redis_client()
+        if redis_client is not None:
+            use_shared_backend(redis_client)
+        else:
+            logger.warning("Redis non disponibile: rate limit per host per singolo worker")
+
+    # Ritardo dell'event loop per il controllo di saturazione di /health/ready
+    _background_tasks.append(asyncio.create_task(get_health_service().monitor_loop_lag()))
+
+    # Lo scheduler legge il file delle ricerche salvate: creato qui, in un
+    # thread, e non alla prima ricerca sull'event loop
+    await asyncio.to_thread(get_scheduler)
+
+    # Con più worker le ricerche salvate vengono eseguite solo dal worker 0
+    if settings.SCHEDULER_ENABLED:
+        if is_primary_worker():
+            _background_tasks.append(asyncio.create_task(get_scheduler().run_forever()))
+        else:
+            _background_tasks.append(asyncio.create_task(get_scheduler().sync_forever()))
+
+    if settings.CACHE_WARMER_ENABLED and is_primary_worker():
+        redis_client = get_redis_client()
+        if redis_client is not None:
+            warmer = CacheWarmer(redis_client)
+            _background_tasks.append(asyncio.create_task(warmer.run_forever()))
+        else:
+            logger.warning("Cache warmer disabilitato: Redis non disponibile")
+
     logger.info("Applicazione avviata con successo!")
 
 
@@ -139,7 +230,18 @@ async def startup_event():
 async def shutdown_event():
     """Evento di chiusura applicazione."""
     logger.info("Chiusura applicazione...")
+
+    for task in _background_tasks:
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+    _background_tasks.clear()
+
+    await close_async_redis()
     close_redis()
+    tracing.shutdown_tracing()
     logger.info("Applicazione chiusa")
 
 
@@ -147,18 +249,12 @@ async def shutdown_event():
 app.include_router(health_router)
 app.include_router(search_router)
 app.include_router(reports_router)
+app.include_router(saved_searches_router)
+app.include_router(admin_router)
 
 
-# Main (per esecuzione diretta)
+# Main (per esecuzione diretta, vedi api/server.py)
 if __name__ == "__main__":
-    import uvicorn
+    from api.server import main
 
-    logger.info(f"Avvio server su {settings.HOST}:{settings.PORT}")
-
-    uvicorn.run(
-        "main:app",
-        host=settings.HOST,
-        port=settings.PORT,
-        reload=settings.RELOAD,
-        log_level=settings.LOG_LEVEL.lower()
-    )
+    main()
@@ -1,5 +1,8 @@
 """Middleware per API."""
 
+from .inflight import InFlightMiddleware
+from .metrics import MetricsMiddleware
+from .profiling import SlowRequestProfilerMiddleware
 from .rate_limit import RateLimitMiddleware
 
-__all__ = ['RateLimitMiddleware']
+__all__ = ['InFlightMiddleware', 'MetricsMiddleware', 'RateLimitMiddleware', 'SlowRequestProfilerMiddleware']
@@ -0,0 +1,43 @@
+"""Middleware che conta le richieste in corso nel worker."""
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from api.services.health import get_health_service
+
+
+class InFlightMiddleware:
+    """
+    Middleware ASGI che conta le richieste HTTP in corso.
+
+    Il conteggio alimenta il controllo di saturazione di /health/ready;
+    le probe di health non sono contate.
+    """
+
+    def __init__(self, app: ASGIApp):
+        """
+        Inizializza il middleware.
+
+        Args:
+            app: Applicazione ASGI
+        """
+        self.app = app
+        self.health = get_health_service()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        """
+        Processa la richiesta aggiornando il numero di richieste in corso.
+
+        Args:
+            scope: Scope ASGI
+            receive: Callable receive ASGI
+            send: Callable send ASGI
+        """
+        if scope["type"] != "http" or scope["path"].startswith("/health"):
+            await self.app(scope, receive, send)
+            return
+
+        self.health.request_started()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.health.request_finished()
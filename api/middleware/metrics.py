@@ -0,0 +1,62 @@
+"""Middleware per le metriche delle richieste API."""
+
+import time
+import logging
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.utils import metrics
+
+
+logger = logging.getLogger(__name__)
+
+
+class MetricsMiddleware:
+    """
+    Middleware ASGI che misura la durata delle richieste.
+
+    L'etichetta route è il template del path (es. /api/v1/listing/{listing_id}),
+    non il path effettivo, così il numero di serie resta limitato; le
+    richieste che non corrispondono a nessuna route usano "unmatched".
+    """
+
+    def __init__(self, app: ASGIApp):
+        """
+        Inizializza il middleware.
+
+        Args:
+            app: Applicazione ASGI
+        """
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        """
+        Processa la richiesta misurandone la durata.
+
+        Args:
+            scope: Scope ASGI
+            receive: Callable receive ASGI
+            send: Callable send ASGI
+        """
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_with_status(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = scope.get("route")
+            metrics.API_REQUEST_SECONDS.labels(
+                scope["method"],
+                getattr(route, "path", "unmatched"),
+                str(status_code)
+            ).observe(time.perf_counter() - started)
@@ -0,0 +1,61 @@
+"""Middleware per il profiling delle richieste lente."""
+
+import time
+import logging
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from api.services.profiling import get_slow_request_log
+
+
+logger = logging.getLogger(__name__)
+
+
+class SlowRequestProfilerMiddleware:
+    """
+    Middleware ASGI che profila le richieste con cProfile.
+
+    Il profilo si avvia all'inizio della richiesta (non si può sapere
+    prima se sarà lenta) ed è conservato solo se la durata supera
+    PROFILER_SLOW_REQUEST_MS. Da attivare solo quando serve: cProfile
+    rallenta il codice Python della richiesta profilata.
+    """
+
+    def __init__(self, app: ASGIApp):
+        """
+        Inizializza il middleware.
+
+        Args:
+            app: Applicazione ASGI
+        """
+        self.app = app
+        self.log = get_slow_request_log()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        """
+        Processa la richiesta, profilandola se possibile.
+
+        Args:
+            scope: Scope ASGI
+            receive: Callable receive ASGI
+            send: Callable send ASGI
+        """
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        profile = self.log.try_start()
+        if profile is None:
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.log.finish(
+                profile,
+                scope["method"],
+                scope["path"],
+                (time.perf_counter() - started) * 1000
+            )
@@ -1,209 +1,191 @@
 """Middleware per rate limiting."""
 
-import time
-from fastapi import Request, HTTPException, status
-from starlette.middleware.base import BaseHTTPMiddleware
-from collections import defaultdict
-from typing import Dict, Tuple
+import json
+import math
+from typing import Dict, Iterable, List, Tuple
 import logging
 
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
 from api.core.config import settings
+from api.services.rate_limit import (
+    GCRALimiter, RateLimitResult, RedisGCRALimiter, create_rate_limiter,
+    rate_limit_exceeded_body, rate_limit_headers
+)
 
 
 logger = logging.getLogger(__name__)
 
+# Endpoint esclusi dal rate limiting (health check, metriche e documentazione)
+EXEMPT_PATHS = (
+    "/health", "/health/live", "/health/ready", "/metrics", "/docs", "/redoc", "/openapi.json"
+)
+
+_FORWARDED_FOR = b"x-forwarded-for"
+_RATE_LIMIT_LIMIT = b"x-ratelimit-limit"
+
+
+class RateLimitMiddleware:
+    """
+    Middleware ASGI per limitare le richieste per IP.
 
-class RateLimitMiddleware(BaseHTTPMiddleware):
-    """Middleware per limitare le richieste per IP."""
+    Ogni richiesta costa 1 unità. Limiter e IP vengono salvati in
+    ``request.state`` (``rate_limiter``, ``rate_limit_client``) così gli
+    endpoint costosi possono addebitare il resto con charge_request.
 
-    def __init__(self, app, requests: int = None, period: int = None):
+    Middleware ASGI puro: non crea task né avvolge gli stream della
+    risposta come BaseHTTPMiddleware, quindi costa solo il controllo del
+    limite e funziona anche con risposte in streaming. Le richieste oltre
+    il limite ricevono direttamente una risposta 429; alle altre vengono
+    aggiunti gli header X-RateLimit-* sul messaggio http.response.start.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        requests: int = None,
+        period: int = None,
+        exempt_paths: Iterable[str] = EXEMPT_PATHS
+    ):
         """
         Inizializza il middleware.
 
         Args:
-            app: FastAPI app
+            app: Applicazione ASGI
             requests: Numero massimo di richieste
             period: Periodo in secondi
+            exempt_paths: Path esclusi dal rate limiting
         """
-        super().__init__(app)
+        self.app = app
         self.requests = requests or settings.RATE_LIMIT_REQUESTS
         self.period = period or settings.RATE_LIMIT_PERIOD
         self.enabled = settings.RATE_LIMIT_ENABLED
+        self.exempt_paths = frozenset(exempt_paths)
 
-        # Dizionario per tracciare richieste per IP
-        # Struttura: {ip: [(timestamp1, timestamp2, ...)]}
-        self.request_log: Dict[str, list] = defaultdict(list)
+        # Stato O(1) per IP (GCRA), in memoria o in Redis (pool asincrono
+        # creato all'avvio dell'app: qui non viene aperta nessuna connessione)
+        self.limiter: GCRALimiter = create_rate_limiter(self.requests, self.period)
 
         logger.info(
-            f"Rate limiting {'abilitato' if self.enabled else 'disabilitato'}: "
-            f"{self.requests} richieste/{self.period}s"
+            "Rate limiting %s: %s richieste/%ss",
+            'abilitato' if self.enabled else 'disabilitato', self.requests, self.period
         )
 
-    def _get_client_ip(self, request: Request) -> str:
+    @staticmethod
+    def _get_client_ip(scope: Scope) -> str:
         """
         Estrae l'IP del client dalla richiesta.
 
         Args:
-            request: Request object
+            scope: Scope ASGI
 
         Returns:
             IP del client
         """
         # Controlla header X-Forwarded-For (per proxy/load balancers)
-        forwarded = request.headers.get("X-Forwarded-For")
-        if forwarded:
-            return forwarded.split(",")[0].strip()
+        for name, value in scope.get("headers", ()):
+            if name == _FORWARDED_FOR:
+                return value.decode("latin-1").split(",")[0].strip()
 
         # Altrimenti usa l'IP del client diretto
-        return request.client.host if request.client else "unknown"
-
-    def _clean_old_requests(self, ip: str, current_time: float):
-        """
-        Rimuove richieste vecchie dal log.
-
-        Args:
-            ip: IP del client
-            current_time: Timestamp corrente
-        """
-        cutoff_time = current_time - self.period
-        self.request_log[ip] = [
-            timestamp for timestamp in self.request_log[ip]
-            if timestamp > cutoff_time
+        client = scope.get("client")
+        return client[0] if client else "unknown"
+
+    @staticmethod
+    def _headers(result: RateLimitResult) -> List[Tuple[bytes, bytes]]:
+        """Header X-RateLimit-* (e Retry-After) da aggiungere alla risposta."""
+        return [
+            (name.lower().encode("latin-1"), value.encode("latin-1"))
+            for name, value in rate_limit_headers(result).items()
         ]
 
-    def _is_rate_limited(self, ip: str) -> Tuple[bool, int]:
+    async def _reject(self, send: Send, client_ip: str, result: RateLimitResult):
         """
-        Verifica se l'IP ha superato il rate limit.
+        Invia la risposta 429.
 
         Args:
-            ip: IP del client
-
-        Returns:
-            Tupla (is_limited, remaining_requests)
+            send: Callable send ASGI
+            client_ip: IP del client
+            result: Esito del controllo
         """
-        current_time = time.time()
-
-        # Pulisci richieste vecchie
-        self._clean_old_requests(ip, current_time)
-
-        # Conta richieste nel periodo
-        request_count = len(self.request_log[ip])
-
-        # Calcola richieste rimanenti
-        remaining = max(0, self.requests - request_count)
-
-        # Verifica limite
-        is_limited = request_count >= self.requests
+        logger.warning(
+            "Rate limit superato per IP %s. Retry dopo %ss", client_ip, math.ceil(result.retry_after)
+        )
 
-        return is_limited, remaining
+        body = json.dumps(rate_limit_exceeded_body(
+            result, self.period, "Troppe richieste. Riprova tra {retry_after} secondi."
+        )).encode("utf-8")
 
-    def _log_request(self, ip: str):
-        """
-        Registra una richiesta per l'IP.
+        headers = self._headers(result)
+        headers += [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode("latin-1"))
+        ]
 
-        Args:
-            ip: IP del client
-        """
-        current_time = time.time()
-        self.request_log[ip].append(current_time)
+        await send({"type": "http.response.start", "status": 429, "headers": headers})
+        await send({"type": "http.response.body", "body": body})
 
-    def _get_retry_after(self, ip: str) -> int:
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
         """
-        Calcola quando l'IP potrà fare la prossima richiesta.
+        Processa la richiesta con rate limiting.
 
         Args:
-            ip: IP del client
+            scope: Scope ASGI
+            receive: Callable receive ASGI
+            send: Callable send ASGI
+        """
+        # Escludi lifespan/websocket, endpoint esenti e rate limiting disabilitato
+        if (
+            scope["type"] != "http"
+            or not self.enabled
+            or scope["path"] in self.exempt_paths
+        ):
+            await self.app(scope, receive, send)
+            return
 
-        Returns:
-            Secondi da attendere
-        """
-        if not self.request_log[ip]:
-            return 0
+        # Ottieni IP del client
+        client_ip = self._get_client_ip(scope)
 
-        oldest_request = min(self.request_log[ip])
-        wait_until = oldest_request + self.period
-        retry_after = max(0, int(wait_until - time.time()))
+        # Verifica e registra la richiesta (un'unica operazione atomica)
+        result = await self.limiter.hit(client_ip)
 
-        return retry_after
+        if not result.allowed:
+            await self._reject(send, client_ip, result)
+            return
 
-    async def dispatch(self, request: Request, call_next):
-        """
-        Processa la richiesta con rate limiting.
+        state = scope.setdefault("state", {})
+        state["rate_limiter"] = self.limiter
+        state["rate_limit_client"] = client_ip
 
-        Args:
-            request: Request object
-            call_next: Prossimo middleware/handler
+        extra_headers = self._headers(result)
 
-        Returns:
-            Response
-        """
-        # Escludi endpoint di health check dal rate limiting
-        if request.url.path in ["/health", "/docs", "/redoc", "/openapi.json"]:
-            return await call_next(request)
+        async def send_with_headers(message: Message):
+            # Aggiunge gli header rate limit alla risposta, salvo quelli già
+            # impostati dall'endpoint (es. 429 per la quota di ricerca)
+            if message["type"] == "http.response.start":
+                headers = message.setdefault("headers", [])
+                if not any(name.lower() == _RATE_LIMIT_LIMIT for name, _ in headers):
+                    if isinstance(headers, list):
+                        headers.extend(extra_headers)
+                    else:
+                        message["headers"] = [*headers, *extra_headers]
+            await send(message)
 
-        # Se rate limiting disabilitato, passa oltre
-        if not self.enabled:
-            return await call_next(request)
+        await self.app(scope, receive, send_with_headers)
 
-        # Ottieni IP del client
-        client_ip = self._get_client_ip(request)
-
-        # Verifica rate limit
-        is_limited, remaining = self._is_rate_limited(client_ip)
-
-        if is_limited:
-            retry_after = self._get_retry_after(client_ip)
-
-            logger.warning(
-                f"Rate limit superato per IP {client_ip}. "
-                f"Retry dopo {retry_after}s"
-            )
-
-            raise HTTPException(
-                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                detail={
-                    "error": "RateLimitExceeded",
-                    "message": f"Troppe richieste. Riprova tra {retry_after} secondi.",
-                    "retry_after": retry_after,
-                    "limit": self.requests,
-                    "period": self.period
-                },
-                headers={
-                    "Retry-After": str(retry_after),
-                    "X-RateLimit-Limit": str(self.requests),
-                    "X-RateLimit-Remaining": "0",
-                    "X-RateLimit-Reset": str(int(time.time()) + retry_after)
-                }
-            )
-
-        # Registra richiesta
-        self._log_request(client_ip)
-
-        # Processa richiesta
-        response = await call_next(request)
-
-        # Aggiungi header rate limit alla risposta
-        _, remaining = self._is_rate_limited(client_ip)
-        response.headers["X-RateLimit-Limit"] = str(self.requests)
-        response.headers["X-RateLimit-Remaining"] = str(remaining)
-        response.headers["X-RateLimit-Reset"] = str(int(time.time() + self.period))
-
-        return response
-
-    def clear_ip(self, ip: str):
+    async def clear_ip(self, ip: str):
         """
-        Pulisce il log per un IP specifico.
+        Pulisce lo stato per un IP specifico.
 
         Args:
             ip: IP da pulire
         """
-        if ip in self.request_log:
-            del self.request_log[ip]
-            logger.info(f"Log pulito per IP: {ip}")
+        await self.limiter.clear(ip)
+        logger.info("Log pulito per IP: %s", ip)
 
-    def clear_all(self):
-        """Pulisce tutti i log."""
-        self.request_log.clear()
+    async def clear_all(self):
+        """Pulisce lo stato di tutti gli IP."""
+        await self.limiter.clear()
         logger.info("Tutti i log rate limit puliti")
 
     def get_stats(self) -> Dict:
@@ -216,6 +198,6 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
         return {
             "enabled": self.enabled,
             "limit": f"{self.requests} requests/{self.period}s",
-            "tracked_ips": len(self.request_log),
-            "total_recent_requests": sum(len(reqs) for reqs in self.request_log.values())
+            "backend": "redis" if isinstance(self.limiter, RedisGCRALimiter) else "memory",
+            "tracked_ips": self.limiter.tracked_clients()
         }
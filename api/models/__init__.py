@@ -1,20 +1,25 @@
 """Modelli Pydantic per validazione API."""
 
-from .requests import SearchRequest, ReportScamRequest
+from .requests import SearchRequest, ReportScamRequest, SavedSearchRequest
 from .responses import (
     SearchResponse,
     ListingResponse,
     ReportScamResponse,
     ErrorResponse,
-    HealthResponse
+    HealthResponse,
+    ReadinessResponse,
+    SavedSearchResponse
 )
 
 __all__ = [
     'SearchRequest',
     'ReportScamRequest',
+    'SavedSearchRequest',
     'SearchResponse',
     'ListingResponse',
     'ReportScamResponse',
     'ErrorResponse',
-    'HealthResponse'
+    'HealthResponse',
+    'ReadinessResponse',
+    'SavedSearchResponse'
 ]
@@ -77,6 +77,24 @@ class SearchRequest(BaseModel):
         example=2
     )
 
+    details: bool = Field(
+        False,
+        description="Scarica le pagine di dettaglio (descrizione, venditore, foto) dei risultati",
+        example=False
+    )
+
+    dedup: bool = Field(
+        True,
+        description="Raggruppa gli annunci duplicati (stesso articolo su più piattaforme o ripubblicato)",
+        example=True
+    )
+
+    timings: bool = Field(
+        False,
+        description="Include nella risposta il tempo per fase (rate limit, download, parsing, ...)",
+        example=False
+    )
+
     @validator('query')
     def validate_query(cls, v):
         """Valida che la query non contenga caratteri speciali pericolosi."""
@@ -191,3 +209,74 @@ class ReportScamRequest(BaseModel):
                 "additional_info": "L'annuncio ha foto rubate da altri siti"
             }
         }
+
+
+class SavedSearchRequest(BaseModel):
+    """Modello per creare una ricerca salvata monitorata dallo scheduler."""
+
+    query: str = Field(
+        ...,
+        min_length=2,
+        max_length=100,
+        description="Query di ricerca",
+        example="iphone 13"
+    )
+
+    platform: PlatformEnum = Field(
+        PlatformEnum.SUBITO,
+        description="Piattaforma di ricerca (subito/ebay/all)",
+        example="subito"
+    )
+
+    categoria: Optional[CategoryEnum] = Field(
+        None,
+        description="Categoria di ricerca",
+        example="telefonia"
+    )
+
+    regione: Optional[str] = Field(
+        None,
+        min_length=3,
+        max_length=50,
+        description="Regione di ricerca (solo per Subito.it)",
+        example="lazio"
+    )
+
+    prezzo_max: Optional[float] = Field(
+        None,
+        gt=0,
+        le=1000000,
+        description="Prezzo massimo in euro",
+        example=500.0
+    )
+
+    max_pages: int = Field(
+        1,
+        ge=1,
+        le=5,
+        description="Numero massimo di pagine da scansionare (max 5)",
+        example=1
+    )
+
+    interval_seconds: Optional[int] = Field(
+        None,
+        ge=60,
+        le=7 * 24 * 3600,
+        description="Intervallo tra esecuzioni in secondi (default da configurazione)",
+        example=3600
+    )
+
+    _validate_query = validator('query', allow_reuse=True)(SearchRequest.validate_query.__func__)
+    _validate_regione = validator('regione', allow_reuse=True)(SearchRequest.validate_regione.__func__)
+
+    class Config:
+        """Configurazione Pydantic."""
+        schema_extra = {
+            "example": {
+                "query": "iphone 13",
+                "platform": "subito",
+                "categoria": "telefonia",
+                "regione": "lazio",
+                "interval_seconds": 3600
+            }
+        }
@@ -24,6 +24,14 @@ class ListingResponse(BaseModel):
     condition: Optional[str] = Field(None, description="Condizione articolo (nuovo/usato)")
     shipping: Optional[str] = Field(None, description="Info spedizione")
     scraped_at: datetime = Field(..., description="Timestamp scraping")
+    cluster_id: Optional[str] = Field(None, description="ID del gruppo di annunci duplicati")
+    duplicate_count: int = Field(0, description="Numero di duplicati raggruppati in questo annuncio")
+    duplicate_links: List[str] = Field(default_factory=list, description="URL degli annunci duplicati")
+    duplicate_ids: List[str] = Field(default_factory=list, description="ID degli annunci duplicati")
+    scam_score: Optional[float] = Field(None, description="Punteggio di rischio truffa (0-100)")
+    risk_level: Optional[str] = Field(None, description="Livello di rischio (low/medium/high)")
+    risk_reasons: List[str] = Field(default_factory=list, description="Motivi del punteggio di rischio")
+    reported_count: int = Field(0, description="Segnalazioni ricevute per l'annuncio")
 
     class Config:
         """Configurazione Pydantic."""
@@ -54,10 +62,15 @@ class SearchResponse(BaseModel):
     categoria: Optional[str] = Field(None, description="Categoria ricercata")
     platform: str = Field(default="subito", description="Piattaforma cercata (subito/ebay/all)")
     total_results: int = Field(..., description="Numero totale di risultati")
+    duplicates_removed: int = Field(0, description="Annunci duplicati raggruppati")
     results: List[ListingResponse] = Field(..., description="Lista annunci trovati")
     cached: bool = Field(False, description="Se i risultati provengono da cache")
     scraped_at: datetime = Field(..., description="Timestamp della ricerca")
     execution_time_ms: float = Field(..., description="Tempo di esecuzione in millisecondi")
+    timings: Optional[Dict[str, float]] = Field(
+        None,
+        description="Tempo per fase in millisecondi (solo con timings=true)"
+    )
 
     class Config:
         """Configurazione Pydantic."""
@@ -117,6 +130,16 @@ class ErrorResponse(BaseModel):
         }
 
 
+class ReadinessResponse(BaseModel):
+    """Modello per la readiness del worker."""
+
+    status: str = Field(..., description="ready, degraded o not_ready")
+    ready: bool = Field(..., description="True se il worker può ricevere traffico")
+    checks: Dict[str, Dict[str, Any]] = Field(..., description="Esito di ogni controllo (ok, degraded, fail)")
+    checked_at: datetime = Field(..., description="Momento della probe")
+    cached: bool = Field(..., description="True se l'esito è quello della probe precedente")
+
+
 class HealthResponse(BaseModel):
     """Modello per health check."""
 
@@ -137,3 +160,47 @@ class HealthResponse(BaseModel):
                 "timestamp": "2025-11-17T10:00:00"
             }
         }
+
+
+class SavedSearchResponse(BaseModel):
+    """Modello per una ricerca salvata."""
+
+    search_id: str = Field(..., description="ID univoco della ricerca salvata")
+    query: str = Field(..., description="Query di ricerca")
+    platform: str = Field(..., description="Piattaforma (subito/ebay/all)")
+    categoria: Optional[str] = Field(None, description="Categoria")
+    regione: Optional[str] = Field(None, description="Regione")
+    prezzo_max: Optional[float] = Field(None, description="Prezzo massimo")
+    max_pages: int = Field(..., description="Pagine scansionate per esecuzione")
+    interval_seconds: int = Field(..., description="Intervallo tra esecuzioni")
+    priority: float = Field(..., description="Priorità corrente (staleness x popolarità)")
+    hits: int = Field(..., description="Ricerche API corrispondenti")
+    runs: int = Field(..., description="Esecuzioni completate")
+    failures: int = Field(..., description="Fallimenti consecutivi")
+    last_result_count: Optional[int] = Field(None, description="Risultati dell'ultima esecuzione")
+    last_run_at: Optional[datetime] = Field(None, description="Ultima esecuzione")
+    next_run_at: datetime = Field(..., description="Prossima esecuzione prevista")
+    created_at: datetime = Field(..., description="Timestamp di creazione")
+
+    class Config:
+        """Configurazione Pydantic."""
+        schema_extra = {
+            "example": {
+                "search_id": "ss_1a2b3c4d5e6f",
+                "query": "iphone 13",
+                "platform": "subito",
+                "categoria": "telefonia",
+                "regione": "lazio",
+                "prezzo_max": None,
+                "max_pages": 1,
+                "interval_seconds": 3600,
+                "priority": 1.7,
+                "hits": 3,
+                "runs": 12,
+                "failures": 0,
+                "last_result_count": 25,
+                "last_run_at": "2025-11-17T10:00:00",
+                "next_run_at": "2025-11-17T11:00:00",
+                "created_at": "2025-11-16T09:00:00"
+            }
+        }
@@ -3,5 +3,7 @@
 from .search import router as search_router
 from .reports import router as reports_router
 from .health import router as health_router
+from .saved_searches import router as saved_searches_router
+from .admin import router as admin_router
 
-__all__ = ['search_router', 'reports_router', 'health_router']
+__all__ = ['search_router', 'reports_router', 'health_router', 'saved_searches_router', 'admin_router']
@@ -0,0 +1,108 @@
+"""Router per endpoint di amministrazione (profiling dei worker)."""
+
+import asyncio
+import os
+from datetime import datetime
+import logging
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import PlainTextResponse
+
+from api.core.config import settings
+from api.core.dependencies import require_admin
+from api.services.profiling import (
+    ProfilerBusyError,
+    get_sampling_profiler,
+    get_slow_request_log
+)
+
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/admin", tags=["admin"], dependencies=[Depends(require_admin)])
+
+
+@router.get(
+    "/profile",
+    response_class=PlainTextResponse,
+    summary="Profilo a campionamento del worker",
+    description="""
+    Campiona per `seconds` secondi lo stack di tutti i thread del worker che
+    riceve la richiesta e restituisce il risultato in formato collapsed
+    stack (flamegraph.pl, speedscope, inferno).
+
+    **Note:**
+    - Richiede l'header `X-Admin-Token` (ADMIN_TOKEN)
+    - Un solo profilo per volta per worker (409 se già in corso)
+    - Con più worker il profilo riguarda solo il worker che risponde
+    """
+)
+async def profile_worker(
+    seconds: float = Query(10.0, gt=0, description="Durata del profilo in secondi")
+):
+    """Endpoint profilo a campionamento."""
+    if seconds > settings.PROFILER_MAX_SECONDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={
+                "error": "InvalidDuration",
+                "message": f"Durata massima: {settings.PROFILER_MAX_SECONDS} secondi"
+            }
+        )
+
+    profiler = get_sampling_profiler()
+    logger.info("Profilo a campionamento avviato: %ss", seconds)
+
+    try:
+        # Il campionamento gira in un thread: l'event loop continua a servire
+        # le altre richieste e compare nel profilo
+        counts = await asyncio.to_thread(profiler.profile, seconds)
+    except ProfilerBusyError:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail={"error": "ProfilerBusy", "message": "Un profilo è già in corso"}
+        )
+
+    filename = f"profile-{os.getpid()}-{datetime.now():%Y%m%d-%H%M%S}.folded"
+    return PlainTextResponse(
+        profiler.collapse(counts),
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+
+@router.get(
+    "/slow-requests",
+    summary="Profili delle richieste lente",
+    description="""
+    Elenca i profili cProfile catturati per le richieste più lente di
+    PROFILER_SLOW_REQUEST_MS (solo il worker che risponde).
+    """
+)
+async def list_slow_requests():
+    """Endpoint lista profili richieste lente."""
+    return {
+        "threshold_ms": settings.PROFILER_SLOW_REQUEST_MS,
+        "enabled": settings.PROFILER_SLOW_REQUEST_MS > 0,
+        "profiles": get_slow_request_log().list()
+    }
+
+
+@router.get(
+    "/slow-requests/{profile_id}",
+    response_class=PlainTextResponse,
+    summary="Statistiche cProfile di una richiesta lenta"
+)
+async def get_slow_request(profile_id: str):
+    """Endpoint statistiche cProfile (ordinate per tempo cumulativo)."""
+    entry = get_slow_request_log().get(profile_id)
+    if entry is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail={"error": "NotFound", "message": f"Profilo non trovato: {profile_id}"}
+        )
+
+    header = (
+        f"# {entry['method']} {entry['path']} - {entry['duration_ms']}ms "
+        f"({entry['captured_at']})\n"
+    )
+    return PlainTextResponse(header + entry["stats"])
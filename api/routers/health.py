@@ -4,12 +4,13 @@ import time
 from datetime import datetime
 import logging
 
-from fastapi import APIRouter, Depends
-import redis
+from fastapi import APIRouter, HTTPException, Response
+from fastapi.responses import JSONResponse
 
-from api.models.responses import HealthResponse
-from api.core.dependencies import get_redis_client
+from api.models.responses import HealthResponse, ReadinessResponse
 from api.core.config import settings
+from api.services.health import get_health_service
+from src.utils import metrics
 
 
 logger = logging.getLogger(__name__)
@@ -29,7 +30,7 @@ _start_time = time.time()
     Endpoint per verificare lo stato di salute dell'API.
 
     **Restituisce:**
-    - Status del servizio (healthy/unhealthy)
+    - Status del servizio (healthy/unhealthy, dall'esito di /health/ready)
     - Versione API
     - Stato connessione Redis
     - Uptime del servizio
@@ -37,31 +38,20 @@ _start_time = time.time()
 
     **Note:**
     - Questo endpoint NON è soggetto a rate limiting
-    - Utile per monitoring e load balancers
+    - Per i load balancer usare /health/live e /health/ready
     """
 )
-async def health_check(redis_client: redis.Redis = Depends(get_redis_client)):
+async def health_check():
     """Health check endpoint."""
-
-    # Verifica Redis
-    redis_connected = False
-    if redis_client:
-        try:
-            redis_connected = redis_client.ping()
-        except Exception as e:
-            logger.warning(f"Redis health check fallito: {e}")
-            redis_connected = False
+    readiness = await get_health_service().readiness()
 
     # Calcola uptime
     uptime = time.time() - _start_time
 
-    # Determina status generale
-    status_value = "healthy" if True else "unhealthy"  # Potresti aggiungere più controlli
-
     response = HealthResponse(
-        status=status_value,
+        status="healthy" if readiness["ready"] else "unhealthy",
         version=settings.API_VERSION,
-        redis_connected=redis_connected,
+        redis_connected=readiness["checks"]["redis"]["status"] == "ok",
         uptime_seconds=uptime,
         timestamp=datetime.now()
     )
@@ -69,6 +59,82 @@ async def health_check(redis_client: redis.Redis = Depends(get_redis_client)):
     return response
 
 
+@router.get(
+    "/health/live",
+    summary="Liveness probe",
+    description="""
+    Verifica che il processo risponda (event loop attivo).
+
+    Non controlla le dipendenze: un errore di Redis o dei siti non deve
+    far riavviare il worker. Da usare come liveness probe.
+    """
+)
+async def liveness():
+    """Liveness probe."""
+    return {"status": "alive", "uptime_seconds": round(time.time() - _start_time, 1)}
+
+
+@router.get(
+    "/health/ready",
+    response_model=ReadinessResponse,
+    summary="Readiness probe",
+    description="""
+    Verifica che il worker possa ricevere traffico.
+
+    **Controlli** (ok, degraded, fail):
+    - `redis`: latenza del PING (fail solo con HEALTH_REQUIRE_REDIS)
+    - `circuit_breakers`: circuiti aperti verso i siti (al massimo degraded)
+    - `queue`: ricerche salvate in attesa nello scheduler
+    - `saturation`: richieste in corso e ritardo dell'event loop
+    - `threadpool`: thread occupati per il codice sincrono
+
+    **Risposta:** 200 se pronto (anche degraded), 503 se almeno un
+    controllo è fail: il load balancer smette di inviare traffico al
+    worker finché non torna pronto. L'esito è riusato per
+    HEALTH_CACHE_SECONDS.
+    """,
+    responses={503: {"description": "Worker non pronto"}}
+)
+async def readiness():
+    """Readiness probe."""
+    result = await get_health_service().readiness()
+    return JSONResponse(content=result, status_code=200 if result["ready"] else 503)
+
+
+@router.get(
+    "/metrics",
+    summary="Metriche Prometheus",
+    description="""
+    Espone le metriche nel formato testuale di Prometheus.
+
+    **Metriche:**
+    - `scraper_fetch_seconds`: durata dei download per host e status HTTP
+    - `scraper_parse_seconds`, `scraper_listings_per_page`: parsing delle pagine
+    - `scraper_rate_limit_wait_seconds`: attesa del rate limiter per host
+    - `scraper_retries_total`, `scraper_backoff_seconds_total`: retry e backoff
+    - `cache_requests_total`: hit/miss della cache per namespace
+    - `api_request_seconds`: durata delle richieste API per route
+
+    **Note:**
+    - Questo endpoint NON è soggetto a rate limiting
+    - Con più worker (api.server) le metriche sono sommate su tutti i worker
+    """
+)
+async def get_metrics():
+    """Endpoint metriche Prometheus."""
+    if not settings.METRICS_ENABLED or not metrics.METRICS_AVAILABLE:
+        raise HTTPException(
+            status_code=503,
+            detail={
+                "error": "MetricsUnavailable",
+                "message": "Metriche disabilitate o prometheus_client non installato"
+            }
+        )
+
+    content, content_type = metrics.render_metrics()
+    return Response(content=content, media_type=content_type)
+
+
 @router.get(
     "/",
     summary="Root endpoint",
@@ -82,6 +148,9 @@ async def root():
         "description": "API per web scraping di annunci da Subito.it",
         "documentation": "/docs",
         "health": "/health",
+        "liveness": "/health/live",
+        "readiness": "/health/ready",
+        "metrics": "/metrics",
         "endpoints": {
             "search": "POST /api/v1/search",
             "get_results": "GET /api/v1/results/{search_id}",
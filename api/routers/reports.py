@@ -1,14 +1,14 @@
 """Router per segnalazioni annunci sospetti."""
 
+import asyncio
 from datetime import datetime
 import logging
 
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException, Response, status
 
 from api.models.requests import ReportScamRequest
 from api.models.responses import ReportScamResponse
-from api.services.reports import ReportService
-from api.core.config import settings
+from api.services.reports import get_report_service
 
 
 logger = logging.getLogger(__name__)
@@ -16,7 +16,7 @@ logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/v1", tags=["reports"])
 
 # Istanza globale del servizio segnalazioni
-report_service = ReportService(settings.REPORTS_DB_PATH)
+report_service = get_report_service()
 
 
 @router.post(
@@ -49,23 +49,26 @@ report_service = ReportService(settings.REPORTS_DB_PATH)
 )
 async def report_scam(request: ReportScamRequest):
     """Endpoint per segnalare annunci sospetti."""
-    logger.info(
-        f"Nuova segnalazione ricevuta per listing_id: {request.listing_id}"
-    )
+    logger.info("Nuova segnalazione ricevuta per listing_id: %s", request.listing_id)
 
     try:
         # Verifica se l'annuncio è già stato segnalato
-        existing_reports = report_service.get_reports_by_listing(request.listing_id)
+        existing_reports = report_service.get_reported_counts(
+            [(request.listing_id, str(request.listing_url))]
+        )[0]
 
-        if len(existing_reports) >= 5:
+        if existing_reports >= 5:
             logger.warning(
-                f"Listing {request.listing_id} già segnalato {len(existing_reports)} volte"
+                "Listing %s già segnalato %s volte",
+                request.listing_id, existing_reports
             )
             # Permettiamo comunque la segnalazione ma informiamo l'utente
             # In produzione, potresti voler limitare o bloccare
 
-        # Crea la segnalazione
-        report = report_service.create_report(
+        # Crea la segnalazione (in un thread: l'attesa della fsync non blocca
+        # il server e le segnalazioni concorrenti condividono la stessa fsync)
+        report = await asyncio.to_thread(
+            report_service.create_report,
             listing_id=request.listing_id,
             listing_url=str(request.listing_url),
             reason=request.reason,
@@ -73,7 +76,7 @@ async def report_scam(request: ReportScamRequest):
             additional_info=request.additional_info
         )
 
-        logger.info(f"Segnalazione creata con successo: {report['report_id']}")
+        logger.info("Segnalazione creata con successo: %s", report['report_id'])
 
         # Prepara risposta
         response = ReportScamResponse(
@@ -87,7 +90,7 @@ async def report_scam(request: ReportScamRequest):
         return response
 
     except Exception as e:
-        logger.error(f"Errore creazione segnalazione: {e}", exc_info=True)
+        logger.error("Errore creazione segnalazione: %s", e, exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail={
@@ -98,6 +101,29 @@ async def report_scam(request: ReportScamRequest):
         )
 
 
+# Dichiarato prima di /reports/{report_id}, che altrimenti catturerebbe "stats"
+@router.get(
+    "/reports/stats",
+    response_model=dict,
+    status_code=status.HTTP_200_OK,
+    summary="Ottieni statistiche segnalazioni",
+    description="""
+    Restituisce statistiche aggregate sulle segnalazioni.
+
+    **Restituisce:**
+    - Numero totale di segnalazioni
+    - Distribuzione per status
+    """
+)
+async def get_reports_stats():
+    """Endpoint per statistiche segnalazioni."""
+    logger.info("Richiesta statistiche segnalazioni")
+
+    stats = report_service.get_stats()
+
+    return stats
+
+
 @router.get(
     "/reports/{report_id}",
     response_model=dict,
@@ -115,12 +141,12 @@ async def report_scam(request: ReportScamRequest):
 )
 async def get_report(report_id: str):
     """Endpoint per recuperare una segnalazione."""
-    logger.info(f"Richiesta dettagli segnalazione: {report_id}")
+    logger.info("Richiesta dettagli segnalazione: %s", report_id)
 
     report = report_service.get_report(report_id)
 
     if not report:
-        logger.warning(f"Segnalazione non trovata: {report_id}")
+        logger.warning("Segnalazione non trovata: %s", report_id)
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail={
@@ -149,11 +175,11 @@ async def get_report(report_id: str):
 )
 async def get_reports_by_listing(listing_id: str):
     """Endpoint per recuperare segnalazioni per un annuncio."""
-    logger.info(f"Richiesta segnalazioni per listing: {listing_id}")
+    logger.info("Richiesta segnalazioni per listing: %s", listing_id)
 
     reports = report_service.get_reports_by_listing(listing_id)
 
-    logger.info(f"Trovate {len(reports)} segnalazioni per listing {listing_id}")
+    logger.info("Trovate %s segnalazioni per listing %s", len(reports), listing_id)
 
     return reports
 
@@ -169,48 +195,52 @@ async def get_reports_by_listing(listing_id: str):
     **Query Parameters:**
     - **status**: Filtra per status (opzionale)
     - **limit**: Numero massimo di risultati (default: 100, max: 500)
+    - **cursor**: Cursore della pagina successiva (opzionale)
+
+    **Paginazione:**
+    - Se ci sono altre segnalazioni, l'header `X-Next-Cursor` contiene il
+      cursore da passare come `cursor` per la pagina successiva
+    - Il cursore indica la posizione (data, ID) dell'ultima segnalazione
+      restituita: ogni pagina costa come la prima, a qualsiasi profondità
 
     **Note:**
     - Le segnalazioni sono ordinate per data (più recenti prima)
     """
 )
 async def get_all_reports(
+    response: Response,
     status_filter: str = None,
-    limit: int = 100
+    limit: int = 100,
+    cursor: str = None
 ):
     """Endpoint per recuperare tutte le segnalazioni."""
     if limit > 500:
         limit = 500
 
-    logger.info(f"Richiesta tutte le segnalazioni (status={status_filter}, limit={limit})")
-
-    reports = report_service.get_all_reports(
-        status=status_filter,
-        limit=limit
+    logger.info(
+        "Richiesta tutte le segnalazioni (status=%s, limit=%s, cursor=%s)",
+        status_filter, limit, cursor
     )
 
-    logger.info(f"Trovate {len(reports)} segnalazioni")
-
-    return reports
-
-
-@router.get(
-    "/reports/stats",
-    response_model=dict,
-    status_code=status.HTTP_200_OK,
-    summary="Ottieni statistiche segnalazioni",
-    description="""
-    Restituisce statistiche aggregate sulle segnalazioni.
+    try:
+        reports, next_cursor = report_service.get_reports_page(
+            status=status_filter,
+            limit=limit,
+            cursor=cursor
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={
+                "error": "InvalidCursor",
+                "message": "Cursore di paginazione non valido",
+                "detail": str(e)
+            }
+        )
 
-    **Restituisce:**
-    - Numero totale di segnalazioni
-    - Distribuzione per status
-    """
-)
-async def get_reports_stats():
-    """Endpoint per statistiche segnalazioni."""
-    logger.info("Richiesta statistiche segnalazioni")
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
 
-    stats = report_service.get_stats()
+    logger.info("Trovate %s segnalazioni", len(reports))
 
-    return stats
+    return reports
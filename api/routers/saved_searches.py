@@ -0,0 +1,165 @@
+"""Router per ricerche salvate monitorate dallo scheduler."""
+
+import time
+from datetime import datetime
+import logging
+
+from fastapi import APIRouter, HTTPException, status
+from starlette.concurrency import run_in_threadpool
+
+from api.models.requests import SavedSearchRequest
+from api.models.responses import SavedSearchResponse
+from api.services.cache import CacheService
+from api.services.scheduler import SavedSearch, get_scheduler
+from api.services.search import SearchService
+
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api/v1", tags=["saved-searches"])
+
+
+def _to_response(saved: SavedSearch) -> SavedSearchResponse:
+    """
+    Converte SavedSearch in SavedSearchResponse.
+
+    Args:
+        saved: Ricerca salvata
+
+    Returns:
+        SavedSearchResponse object
+    """
+    return SavedSearchResponse(
+        search_id=saved.search_id,
+        query=saved.query,
+        platform=saved.platform,
+        categoria=saved.categoria,
+        regione=saved.regione,
+        prezzo_max=saved.prezzo_max,
+        max_pages=saved.max_pages,
+        interval_seconds=saved.interval_seconds,
+        priority=saved.priority(time.time()),
+        hits=saved.hits,
+        runs=saved.runs,
+        failures=saved.failures,
+        last_result_count=saved.last_result_count,
+        last_run_at=datetime.fromtimestamp(saved.last_run_at) if saved.last_run_at else None,
+        next_run_at=datetime.fromtimestamp(saved.next_run_at),
+        created_at=datetime.fromtimestamp(saved.created_at)
+    )
+
+
+@router.post(
+    "/saved-searches",
+    response_model=SavedSearchResponse,
+    status_code=status.HTTP_201_CREATED,
+    summary="Crea una ricerca salvata",
+    description="""
+    Registra una ricerca da rieseguire periodicamente in background.
+
+    Lo scheduler esegue le ricerche in ordine di priorità (quanto sono
+    scadute rispetto al loro intervallo e quante volte vengono cercate
+    dagli utenti) rispettando i rate limit per host. I risultati vengono
+    salvati nella stessa cache di POST /api/v1/search.
+
+    **Parametri:**
+    - **query**: Parola chiave di ricerca (obbligatorio)
+    - **platform**: Piattaforma (subito/ebay/all) - default: subito
+    - **categoria**, **regione**, **prezzo_max**, **max_pages**: come in /search
+    - **interval_seconds**: Intervallo tra esecuzioni (opzionale)
+    """
+)
+async def create_saved_search(request: SavedSearchRequest):
+    """Endpoint per creare una ricerca salvata."""
+    categoria = request.categoria.value if request.categoria else None
+    cache_key = CacheService.get_search_key(**SearchService.get_cache_params(request))
+
+    # Con più worker add() prende il lock del file condiviso: fuori dall'event loop
+    saved = await run_in_threadpool(
+        get_scheduler().add,
+        query=request.query,
+        cache_key=cache_key,
+        platform=request.platform.value,
+        categoria=categoria,
+        regione=request.regione,
+        prezzo_max=request.prezzo_max,
+        max_pages=request.max_pages,
+        interval_seconds=request.interval_seconds
+    )
+
+    return _to_response(saved)
+
+
+@router.get(
+    "/saved-searches",
+    response_model=list,
+    status_code=status.HTTP_200_OK,
+    summary="Elenca le ricerche salvate",
+    description="""
+    Elenca le ricerche salvate ordinate per priorità corrente.
+
+    **Query Parameters:**
+    - **limit**: Numero massimo di risultati (default: 100, max: 1000)
+    """
+)
+async def list_saved_searches(limit: int = 100):
+    """Endpoint per elencare le ricerche salvate."""
+    if limit > 1000:
+        limit = 1000
+
+    searches = await run_in_threadpool(get_scheduler().list_searches, limit=limit)
+
+    return [_to_response(saved).dict() for saved in searches]
+
+
+@router.get(
+    "/saved-searches/stats",
+    response_model=dict,
+    status_code=status.HTTP_200_OK,
+    summary="Statistiche dello scheduler",
+    description="Restituisce numero di ricerche salvate, scadute ed esecuzioni totali."
+)
+async def get_scheduler_stats():
+    """Endpoint per statistiche dello scheduler."""
+    return await run_in_threadpool(get_scheduler().get_stats)
+
+
+@router.get(
+    "/saved-searches/{search_id}",
+    response_model=SavedSearchResponse,
+    status_code=status.HTTP_200_OK,
+    summary="Recupera una ricerca salvata per ID"
+)
+async def get_saved_search(search_id: str):
+    """Endpoint per recuperare una ricerca salvata."""
+    saved = await run_in_threadpool(get_scheduler().get, search_id)
+
+    if not saved:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail={
+                "error": "NotFound",
+                "message": f"Ricerca salvata non trovata: {search_id}"
+            }
+        )
+
+    return _to_response(saved)
+
+
+@router.delete(
+    "/saved-searches/{search_id}",
+    status_code=status.HTTP_204_NO_CONTENT,
+    summary="Elimina una ricerca salvata"
+)
+async def delete_saved_search(search_id: str):
+    """Endpoint per eliminare una ricerca salvata."""
+    if not await run_in_threadpool(get_scheduler().remove, search_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail={
+                "error": "NotFound",
+                "message": f"Ricerca salvata non trovata: {search_id}"
+            }
+        )
+
+    logger.info("Ricerca salvata eliminata: %s", search_id)
@@ -1,23 +1,31 @@
 """Router per endpoint di ricerca."""
 
+import math
 import time
-import uuid
-from datetime import datetime
-from typing import List
+from typing import Dict, Optional
 import logging
 
-from fastapi import APIRouter, Depends, HTTPException, status
-import redis
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import JSONResponse
+from starlette.concurrency import run_in_threadpool
+import redis.asyncio as aioredis
 
-from api.models.requests import SearchRequest, PlatformEnum
+from api.models.requests import CategoryEnum, PlatformEnum, SearchRequest
 from api.models.responses import SearchResponse, ListingResponse
-from api.core.dependencies import get_redis_client
 from api.core.config import settings
-from api.services.cache import CacheService
-from src.scraper.subito_scraper import SubitoScraper
-from src.scraper.ebay_scraper import EbayScraper
-from src.config.settings import ScraperConfig
-from src.models.listing import Listing
+from api.core.dependencies import get_async_redis_client, get_redis_client
+from api.services.cache import AsyncCacheService, CacheService
+from api.services.enrichment import get_detail_fetcher
+from api.services.popularity import get_async_popularity_service
+from api.services.price_stats import AsyncPriceStatsService, get_async_price_stats_service
+from api.services.rate_limit import (
+    charge_request, estimate_search_cost, rate_limit_exceeded_body, rate_limit_headers, refund_request
+)
+from api.services.reports import get_report_service
+from api.services.scheduler import get_scheduler
+from api.services.search import SearchService
+from src.utils import metrics, timing, tracing
+from src.utils.timing import RequestTimings
 
 
 logger = logging.getLogger(__name__)
@@ -25,82 +33,45 @@ logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/v1", tags=["search"])
 
 
-def _create_scraper(platform: PlatformEnum):
+def _timed_response(
+    data: Dict,
+    timings: RequestTimings,
+    response: Response,
+    include_timings: bool
+) -> SearchResponse:
     """
-    Crea l'istanza dello scraper corretto in base alla piattaforma.
+    Costruisce la SearchResponse e pubblica i tempi per fase.
 
     Args:
-        platform: Piattaforma richiesta
+        data: Dati della risposta
+        timings: Tempi raccolti durante la richiesta
+        response: Response FastAPI (per l'header Server-Timing)
+        include_timings: Se aggiungere i tempi al corpo della risposta
 
     Returns:
-        Scraper instance (SubitoScraper o EbayScraper)
+        SearchResponse
     """
-    config = ScraperConfig(
-        requests_per_second=settings.SCRAPER_REQUESTS_PER_SECOND,
-        min_delay=settings.SCRAPER_MIN_DELAY,
-        max_delay=settings.SCRAPER_MAX_DELAY,
-        max_retries=settings.SCRAPER_MAX_RETRIES,
-        request_timeout=settings.SCRAPER_TIMEOUT,
-        log_level=settings.LOG_LEVEL
-    )
-
-    if platform == PlatformEnum.EBAY:
-        return EbayScraper(config)
-    else:  # Default: Subito
-        return SubitoScraper(config)
+    with timing.span('convert'):
+        search_response = SearchResponse(**data)
 
+    timings.observe(metrics.SEARCH_PHASE_SECONDS)
+    if settings.SERVER_TIMING_ENABLED:
+        response.headers["Server-Timing"] = timings.server_timing()
+    if include_timings:
+        search_response.timings = timings.as_dict()
 
-def _filter_by_price(listings: List[Listing], max_price: float) -> List[Listing]:
-    """
-    Filtra annunci per prezzo massimo.
+    return search_response
 
-    Args:
-        listings: Lista annunci
-        max_price: Prezzo massimo
 
-    Returns:
-        Lista filtrata
+def _execute_search(request: SearchRequest) -> Dict:
     """
-    filtered = []
-    for listing in listings:
-        if listing.price is not None:
-            if listing.price <= max_price:
-                filtered.append(listing)
-        else:
-            # Include annunci senza prezzo (es. "Gratis", "Contattami")
-            filtered.append(listing)
+    Esegue lo scraping in un thread del pool.
 
-    return filtered
-
-
-def _convert_listing_to_response(listing: Listing) -> ListingResponse:
+    Scraper, statistiche di prezzo e scrittura in cache sono sincroni:
+    nel thread non bloccano l'event loop, che intanto serve le altre
+    richieste (comprese le letture dalla cache).
     """
-    Converte Listing model in ListingResponse.
-
-    Args:
-        listing: Listing object
-
-    Returns:
-        ListingResponse object
-    """
-    return ListingResponse(
-        listing_id=listing.listing_id,
-        title=listing.title,
-        price=listing.price,
-        price_text=listing.price_text,
-        description=listing.description,
-        link=listing.link,
-        photos=listing.photos,
-        location=listing.location,
-        category=listing.category,
-        posted_date=listing.posted_date,
-        seller_name=listing.seller_name,
-        seller_type=listing.seller_type,
-        source=listing.source,
-        condition=listing.condition,
-        shipping=listing.shipping,
-        scraped_at=listing.scraped_at
-    )
+    return SearchService(CacheService(get_redis_client())).execute(request)
 
 
 @router.post(
@@ -123,143 +94,119 @@ def _convert_listing_to_response(listing: Listing) -> ListingResponse:
     - **max_pages**: Numero di pagine da scansionare, max 5 (default: 1)
 
     **Note:**
-    - Il rate limiting limita le richieste a 10 al minuto per IP
+    - Il rate limiting addebita una unità per pagina scaricata (10 unità al
+      minuto per IP); le risposte dalla cache costano una sola unità
     - platform='all' cerca su Subito.it ed eBay contemporaneamente
     - I risultati sono ordinati per piattaforma e poi per prezzo
+    - L'header Server-Timing riporta il tempo per fase (con timings=true
+      anche nel campo `timings` della risposta)
     """
 )
 async def search_listings(
     request: SearchRequest,
-    redis_client: redis.Redis = Depends(get_redis_client)
+    http_request: Request,
+    response: Response,
+    redis_client: Optional[aioredis.Redis] = Depends(get_async_redis_client)
 ):
     """Endpoint per cercare annunci multi-piattaforma."""
+    with tracing.span('api.search', **{
+        'search.query': request.query,
+        'search.platform': request.platform.value,
+        'search.max_pages': request.max_pages
+    }) as search_span:
+        return await _search_listings(request, http_request, response, redis_client, search_span)
+
+
+async def _search_listings(
+    request: SearchRequest,
+    http_request: Request,
+    response: Response,
+    redis_client: Optional[aioredis.Redis],
+    search_span
+) -> SearchResponse:
+    """Esegue la ricerca (cache o scraping) all'interno dello span api.search."""
     start_time = time.time()
+    timings = timing.start_timings()
 
     logger.info(
-        f"Ricerca richiesta: query='{request.query}', platform={request.platform}, "
-        f"categoria={request.categoria}, prezzo_max={request.prezzo_max}"
+        "Ricerca richiesta: query='%s', platform=%s, categoria=%s, prezzo_max=%s",
+        request.query, request.platform, request.categoria, request.prezzo_max
+    )
+
+    # Addebita il costo atteso dello scraping prima di leggere la cache, così
+    # richieste concorrenti non superano la quota; restituito se c'è la cache
+    cost = estimate_search_cost(
+        platforms=2 if request.platform == PlatformEnum.ALL else 1,
+        max_pages=request.max_pages,
+        details=request.details
     )
+    quota = await charge_request(http_request, cost)
+    charged = quota is not None and quota.allowed
 
     # Inizializza cache service
-    cache = CacheService(redis_client)
+    cache = AsyncCacheService(redis_client)
 
     # Prova a recuperare da cache (include platform nella chiave)
-    cache_key_params = {
-        "query": request.query,
-        "categoria": request.categoria.value if request.categoria else None,
-        "prezzo_max": request.prezzo_max,
-        "regione": request.regione,
-        "platform": request.platform.value
-    }
+    cache_key_params = SearchService.get_cache_params(request)
+
+    # Aggiorna la popolarità (ricerche salvate e pre-riscaldamento cache)
+    cache_key = cache.get_search_key(**cache_key_params)
+    get_scheduler().record_hit(cache_key)
+    await get_async_popularity_service(redis_client).record(
+        cache_key, cache_key_params, max_pages=request.max_pages
+    )
 
-    cached_results = cache.get_search_results(**cache_key_params)
+    with timing.span('cache_read'):
+        cached_results = await cache.get_search_results(**cache_key_params)
 
     if cached_results:
-        logger.info(f"Risultati recuperati da cache per platform={request.platform}")
+        logger.info("Risultati recuperati da cache per platform=%s", request.platform)
+        search_span.set_attribute('search.cached', True)
+        if charged:
+            await refund_request(http_request, cost)
         execution_time = (time.time() - start_time) * 1000
 
         # Marca come cached
         cached_results['cached'] = True
         cached_results['execution_time_ms'] = execution_time
+        with timing.span('annotate'):
+            await run_in_threadpool(get_report_service().annotate_listings, cached_results['results'])
 
-        return SearchResponse(**cached_results)
+        return _timed_response(cached_results, timings, response, request.timings)
 
-    # Non in cache, esegui scraping
-    all_listings = []
-
-    try:
-        logger.info(f"Esecuzione scraping su platform={request.platform}...")
-
-        # Determina su quali piattaforme cercare
-        platforms_to_search = []
-        if request.platform == PlatformEnum.ALL:
-            platforms_to_search = [PlatformEnum.SUBITO, PlatformEnum.EBAY]
-        else:
-            platforms_to_search = [request.platform]
-
-        # Esegui ricerca su ogni piattaforma
-        for platform in platforms_to_search:
-            logger.info(f"Scraping {platform.value}...")
-
-            scraper = _create_scraper(platform)
-
-            try:
-                if platform == PlatformEnum.SUBITO:
-                    # Subito.it - usa categoria e regione
-                    platform_listings = scraper.search(
-                        query=request.query,
-                        category=request.categoria.value if request.categoria else None,
-                        region=request.regione,
-                        max_pages=request.max_pages
-                    )
-                else:  # eBay
-                    # eBay - ignora regione (non supportata)
-                    platform_listings = scraper.search(
-                        query=request.query,
-                        max_pages=request.max_pages
-                    )
-
-                all_listings.extend(platform_listings)
-                logger.info(f"Trovati {len(platform_listings)} annunci su {platform.value}")
-
-            finally:
-                scraper.close()
-
-        logger.info(f"Totale annunci trovati: {len(all_listings)}")
-
-        # Filtra per prezzo se richiesto
-        if request.prezzo_max is not None:
-            original_count = len(all_listings)
-            all_listings = _filter_by_price(all_listings, request.prezzo_max)
-            logger.info(
-                f"Filtrati per prezzo: {original_count} -> {len(all_listings)} annunci"
-            )
-
-        # Ordina risultati: prima per piattaforma, poi per prezzo
-        all_listings.sort(key=lambda x: (x.source, x.price if x.price else float('inf')))
-
-        # Converti in response model
-        listing_responses = [
-            _convert_listing_to_response(listing)
-            for listing in all_listings
-        ]
-
-        # Genera ID univoco per la ricerca
-        search_id = str(uuid.uuid4())
-
-        # Prepara risposta
-        response_data = {
-            "search_id": search_id,
-            "query": request.query,
-            "categoria": request.categoria.value if request.categoria else None,
-            "total_results": len(listing_responses),
-            "results": [resp.dict() for resp in listing_responses],
-            "cached": False,
-            "scraped_at": datetime.now(),
-            "execution_time_ms": (time.time() - start_time) * 1000,
-            "platform": request.platform.value
-        }
-
-        # Salva in cache con platform nella chiave
-        cache.set_search_results(
-            results=response_data,
-            **cache_key_params
+    # Non in cache: lo scraping richiede la quota (stessa risposta 429 del middleware)
+    if quota is not None and not quota.allowed:
+        logger.warning(
+            "Quota di scraping superata (costo %g). Retry dopo %ss", cost, math.ceil(quota.retry_after)
+        )
+        return JSONResponse(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            content=rate_limit_exceeded_body(
+                quota,
+                http_request.state.rate_limiter.period,
+                "Quota di ricerca esaurita. Riprova tra {retry_after} secondi."
+            ),
+            headers=rate_limit_headers(quota)
         )
 
-        # Salva anche i singoli listing in cache
-        for listing in all_listings:
-            if listing.listing_id:
-                cache.set_listing(
-                    listing_id=listing.listing_id,
-                    listing_data=listing.to_dict()
-                )
+    # Non in cache, esegui scraping
+    search_span.set_attribute('search.cached', False)
+    try:
+        response_data = await run_in_threadpool(_execute_search, request)
+        # Le segnalazioni cambiano più spesso della cache: contate a ogni risposta
+        with timing.span('annotate'):
+            await run_in_threadpool(get_report_service().annotate_listings, response_data['results'])
+        response_data['execution_time_ms'] = (time.time() - start_time) * 1000
 
-        logger.info(f"Ricerca completata in {response_data['execution_time_ms']:.2f}ms")
+        logger.info("Ricerca completata in %.2fms", response_data['execution_time_ms'])
 
-        return SearchResponse(**response_data)
+        return _timed_response(response_data, timings, response, request.timings)
 
     except Exception as e:
-        logger.error(f"Errore durante scraping: {e}", exc_info=True)
+        logger.error("Errore durante scraping: %s", e, exc_info=True)
+        # Nessun risultato: il costo addebitato per lo scraping viene restituito
+        if charged:
+            await refund_request(http_request, cost)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail={
@@ -288,24 +235,25 @@ async def search_listings(
 )
 async def get_search_results(
     search_id: str,
-    redis_client: redis.Redis = Depends(get_redis_client)
+    redis_client: Optional[aioredis.Redis] = Depends(get_async_redis_client)
 ):
     """Endpoint per recuperare risultati ricerca per ID."""
-    logger.info(f"Richiesta risultati per search_id: {search_id}")
+    logger.info("Richiesta risultati per search_id: %s", search_id)
 
-    cache = CacheService(redis_client)
+    cache = AsyncCacheService(redis_client)
 
     # Cerca in cache con chiave specifica
     key = f"search_result:{search_id}"
-    cached_data = cache.get(key)
+    cached_data = await cache.get(key)
 
     if cached_data:
-        logger.info(f"Risultati trovati per search_id: {search_id}")
+        logger.info("Risultati trovati per search_id: %s", search_id)
         cached_data['cached'] = True
+        await run_in_threadpool(get_report_service().annotate_listings, cached_data['results'])
         return SearchResponse(**cached_data)
 
     # Non trovato
-    logger.warning(f"Risultati non trovati per search_id: {search_id}")
+    logger.warning("Risultati non trovati per search_id: %s", search_id)
     raise HTTPException(
         status_code=status.HTTP_404_NOT_FOUND,
         detail={
@@ -329,34 +277,62 @@ async def get_search_results(
 
     **Note:**
     - I dettagli sono disponibili in cache per 2 ore
-    - Se non in cache, viene eseguito scraping real-time (più lento)
+    - Se non in cache, la pagina dell'annuncio viene scaricata in tempo reale
+      usando l'URL memorizzato durante le ricerche (indice valido 7 giorni)
+    - Richieste contemporanee per lo stesso annuncio condividono un solo download
     """
 )
 async def get_listing_details(
     listing_id: str,
-    redis_client: redis.Redis = Depends(get_redis_client),
-    scraper: SubitoScraper = Depends(get_scraper)
+    redis_client: Optional[aioredis.Redis] = Depends(get_async_redis_client)
 ):
     """Endpoint per recuperare dettagli annuncio."""
-    logger.info(f"Richiesta dettagli per listing_id: {listing_id}")
+    logger.info("Richiesta dettagli per listing_id: %s", listing_id)
 
-    cache = CacheService(redis_client)
+    cache = AsyncCacheService(redis_client)
 
-    # Prova cache
-    cached_listing = cache.get_listing(listing_id)
+    listing_data = await get_detail_fetcher().get(listing_id, cache)
 
-    if cached_listing:
-        logger.info(f"Listing trovato in cache: {listing_id}")
-        return ListingResponse(**cached_listing)
+    if listing_data:
+        await run_in_threadpool(get_report_service().annotate_listings, [listing_data])
+        return ListingResponse(**listing_data)
 
-    # Non in cache, bisognerebbe fare scraping della singola pagina
-    # Per ora ritorniamo 404
-    logger.warning(f"Listing non trovato in cache: {listing_id}")
+    logger.warning("Listing non trovato in cache né nell'indice: %s", listing_id)
     raise HTTPException(
         status_code=status.HTTP_404_NOT_FOUND,
         detail={
             "error": "NotFound",
             "message": f"Annuncio non trovato: {listing_id}",
-            "detail": "Esegui prima una ricerca per popolare la cache"
+            "detail": "Esegui prima una ricerca che includa l'annuncio"
         }
     )
+
+
+@router.get(
+    "/price-stats",
+    response_model=dict,
+    status_code=status.HTTP_200_OK,
+    summary="Prezzi tipici per ricerca e categoria",
+    description="""
+    Restituisce la distribuzione dei prezzi osservati negli ultimi giorni
+    per una ricerca (e categoria), aggiornata a ogni scraping.
+
+    **Query Parameters:**
+    - **query**: Query di ricerca (normalizzata come nelle ricerche)
+    - **categoria**: Categoria (opzionale)
+
+    **Note:**
+    - I quantili (p10, p25, p50, p75, p90) sono stimati da uno sketch con
+      errore relativo massimo `relative_accuracy`
+    - `count` è 0 se la ricerca non è mai stata eseguita nella finestra
+    """
+)
+async def get_price_stats(
+    query: str = Query(..., min_length=2, max_length=100),
+    categoria: Optional[CategoryEnum] = None,
+    price_stats: AsyncPriceStatsService = Depends(get_async_price_stats_service)
+):
+    """Endpoint per le statistiche di prezzo."""
+    logger.info("Richiesta statistiche prezzo: query='%s', categoria=%s", query, categoria)
+
+    return await price_stats.get_summary(query, categoria.value if categoria else None)
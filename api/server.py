@@ -0,0 +1,267 @@
+"""
+Avvio di produzione dell'API su più processi worker.
+
+Il processo principale apre il socket, prepara i dati su disco
+(preload) e avvia SERVER_WORKERS worker uvicorn, ognuno con il proprio
+indice (API_WORKER_ID). Con più worker lo stato che sarebbe per
+processo è condiviso:
+- rate limiting API e rate limit per host in Redis
+- download dei dettagli coordinati da lock Redis (single-flight)
+- metriche Prometheus sommate tra i worker (modalità multiprocess)
+- ricerche salvate nel file JSON, eseguite solo dal worker 0
+
+Un worker terminato in modo anomalo viene riavviato con lo stesso indice.
+SIGINT/SIGTERM chiudono i worker in modo ordinato: le richieste in corso
+hanno SERVER_GRACEFUL_TIMEOUT secondi per completare.
+
+Uso:
+    python -m api.server --workers 4
+    python -m api.server --workers 0   # Un worker per core
+"""
+
+import argparse
+import multiprocessing
+import os
+import signal
+import socket
+import sys
+import tempfile
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional
+import logging
+
+# Aggiungi root al path per importare src
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import uvicorn
+
+from api.core.config import settings
+from api.core.workers import WORKER_ID_ENV
+
+
+logger = logging.getLogger('api.server')
+
+APP = "api.main:app"
+
+# Attesa tra due controlli dei worker (e prima di riavviarne uno)
+_MONITOR_INTERVAL = 1.0
+
+
+def resolve_workers(workers: int) -> int:
+    """
+    Numero effettivo di worker.
+
+    Args:
+        workers: Worker richiesti (0 = uno per core)
+
+    Returns:
+        Numero di worker (almeno 1)
+    """
+    if workers > 0:
+        return workers
+    return os.cpu_count() or 1
+
+
+def _prepare_metrics_dir() -> str:
+    """
+    Prepara la directory delle metriche condivise dai worker.
+
+    prometheus_client legge la variabile d'ambiente all'import, quindi va
+    impostata prima di avviare (e di importare l'app in) qualunque worker.
+    Vengono rimossi solo i file di metriche di un avvio precedente.
+
+    Returns:
+        Path della directory
+    """
+    from src.utils.metrics import MULTIPROC_DIR_ENV
+
+    path = settings.METRICS_MULTIPROC_DIR or tempfile.mkdtemp(prefix="api-metrics-")
+    Path(path).mkdir(parents=True, exist_ok=True)
+    for stale in Path(path).glob("*.db"):
+        stale.unlink()
+    os.environ[MULTIPROC_DIR_ENV] = path
+    return path
+
+
+def _preload():
+    """
+    Inizializza i dati su disco una volta sola, prima dei worker.
+
+    Creazione dello schema e migrazione delle segnalazioni non vengono
+    eseguite in concorrenza da tutti i worker al primo avvio. L'app non
+    viene importata: i worker sono avviati con spawn e non ereditano
+    nulla dal processo principale, e l'import configurerebbe un altro
+    scrittore sul file di log dei worker.
+    """
+    from api.services.reports import get_report_service
+
+    get_report_service()
+    logger.info("Preload completato")
+
+
+def _serve(config: uvicorn.Config, sock: socket.socket, index: int):
+    """Entry point di un worker (processo avviato con spawn)."""
+    os.environ[WORKER_ID_ENV] = str(index)
+    config.configure_logging()
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+class WorkerSupervisor:
+    """
+    Avvia e sorveglia i processi worker.
+
+    I worker sono avviati con ``spawn`` (come uvicorn --workers) e
+    condividono il socket in ascolto aperto dal processo principale.
+    """
+
+    def __init__(self, config: uvicorn.Config, sock: socket.socket, workers: int):
+        """
+        Inizializza il supervisore.
+
+        Args:
+            config: Configurazione uvicorn dei worker
+            sock: Socket in ascolto condiviso
+            workers: Numero di worker
+        """
+        self.config = config
+        self.sock = sock
+        self.workers = workers
+        self._context = multiprocessing.get_context("spawn")
+        self._processes: Dict[int, multiprocessing.Process] = {}
+        self._should_exit = threading.Event()
+
+    def _start(self, index: int):
+        """Avvia il worker con l'indice dato."""
+        process = self._context.Process(
+            target=_serve,
+            args=(self.config, self.sock, index),
+            name=f"api-worker-{index}"
+        )
+        process.start()
+        self._processes[index] = process
+        logger.info("Worker %s avviato (pid %s)", index, process.pid)
+
+    def _handle_signal(self, signum, frame):
+        """SIGINT/SIGTERM: chiusura ordinata."""
+        logger.info("Ricevuto segnale %s, chiusura dei worker...", signal.Signals(signum).name)
+        self._should_exit.set()
+
+    def _restart_dead(self):
+        """Riavvia i worker terminati (stesso indice)."""
+        from src.utils.metrics import mark_process_dead
+
+        for index, process in list(self._processes.items()):
+            if process.is_alive():
+                continue
+            logger.warning(
+                "Worker %s (pid %s) terminato con codice %s, riavvio", index, process.pid, process.exitcode
+            )
+            mark_process_dead(process.pid)
+            self._start(index)
+
+    def _stop(self):
+        """Chiude i worker attendendo la fine delle richieste in corso."""
+        for process in self._processes.values():
+            if process.is_alive():
+                # Su Windows terminate() non è un segnale gestibile: chiusura immediata
+                process.terminate()
+
+        timeout = settings.SERVER_GRACEFUL_TIMEOUT + 5
+        for index, process in self._processes.items():
+            process.join(timeout)
+            if process.is_alive():
+                logger.warning("Worker %s non chiuso entro %ss, kill", index, timeout)
+                process.kill()
+                process.join()
+
+    def run(self):
+        """Avvia i worker e li sorveglia fino a SIGINT/SIGTERM."""
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, self._handle_signal)
+
+        for index in range(self.workers):
+            self._start(index)
+
+        try:
+            while not self._should_exit.wait(_MONITOR_INTERVAL):
+                self._restart_dead()
+        finally:
+            self._stop()
+            logger.info("Server chiuso")
+
+
+def run(
+    workers: Optional[int] = None,
+    host: Optional[str] = None,
+    port: Optional[int] = None,
+    preload: Optional[bool] = None
+):
+    """
+    Avvia l'API.
+
+    Args:
+        workers: Worker (default SERVER_WORKERS, 0 = uno per core)
+        host: Indirizzo di ascolto (default HOST)
+        port: Porta (default PORT)
+        preload: Preload nel processo principale (default SERVER_PRELOAD)
+    """
+    workers = resolve_workers(settings.SERVER_WORKERS if workers is None else workers)
+    preload = settings.SERVER_PRELOAD if preload is None else preload
+
+    # I worker leggono il numero effettivo dall'ambiente (vedi api.core.workers)
+    os.environ["SERVER_WORKERS"] = str(workers)
+    settings.SERVER_WORKERS = workers
+
+    config = uvicorn.Config(
+        APP,
+        host=host or settings.HOST,
+        port=port or settings.PORT,
+        log_level=settings.LOG_LEVEL.lower(),
+        timeout_graceful_shutdown=settings.SERVER_GRACEFUL_TIMEOUT
+    )
+
+    if workers == 1:
+        if settings.RELOAD:
+            uvicorn.run(APP, host=config.host, port=config.port, reload=True, log_level=config.log_level)
+        else:
+            uvicorn.Server(config).run()
+        return
+
+    if settings.RELOAD:
+        logger.warning("RELOAD ignorato con più worker")
+
+    metrics_dir = _prepare_metrics_dir()
+    if preload:
+        _preload()
+
+    logger.info(
+        "Avvio di %s worker su %s:%s (metriche in %s)", workers, config.host, config.port, metrics_dir
+    )
+    sock = config.bind_socket()
+    try:
+        WorkerSupervisor(config, sock, workers).run()
+    finally:
+        sock.close()
+
+
+def main(argv: Optional[List[str]] = None):
+    """Entry point da riga di comando."""
+    parser = argparse.ArgumentParser(description="Avvio di produzione dell'API")
+    parser.add_argument("--workers", type=int, default=None, help="Worker (default SERVER_WORKERS, 0 = uno per core)")
+    parser.add_argument("--host", default=None, help="Indirizzo di ascolto (default HOST)")
+    parser.add_argument("--port", type=int, default=None, help="Porta (default PORT)")
+    parser.add_argument("--no-preload", action="store_true", help="Non inizializzare le segnalazioni prima dei worker")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=settings.LOG_LEVEL, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    run(
+        workers=args.workers,
+        host=args.host,
+        port=args.port,
+        preload=False if args.no_preload else None
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,8 @@
 """Services per API."""
 
-from .cache import CacheService
-from .reports import ReportService
+from .cache import AsyncCacheService, CacheService
+from .reports import ReportService, get_report_service
+from .search import SearchService
+from .scheduler import SearchScheduler
 
-__all__ = ['CacheService', 'ReportService']
+__all__ = ['AsyncCacheService', 'CacheService', 'ReportService', 'SearchService', 'SearchScheduler', 'get_report_service']
@@ -3,32 +3,48 @@
 import json
 import hashlib
 import logging
-from typing import Optional, Any, Dict
+from typing import Optional, Any, Dict, List
 import redis
+import redis.asyncio as aioredis
+from redis.asyncio.lock import Lock as AsyncLock
+from redis.exceptions import LockError
 
 from api.core.config import settings
+from api.core.dependencies import mark_async_redis_unavailable
+from src.utils import metrics, tracing
 
 
 logger = logging.getLogger(__name__)
 
 
-class CacheService:
-    """Gestisce il caching con Redis."""
+class _CacheBase:
+    """
+    Chiavi e formato dei valori condivisi da CacheService e AsyncCacheService.
 
-    def __init__(self, redis_client: Optional[redis.Redis] = None):
+    Le due classi sono sorelle (i metodi della seconda vanno attesi con
+    await, quindi non è sostituibile alla prima): qui restano solo le
+    parti senza I/O.
+    """
+
+    # Campi salvati nell'indice ID -> URL (sufficienti a ricostruire il listing)
+    LISTING_INDEX_FIELDS = ('link', 'source', 'title', 'price', 'price_text', 'location')
+
+    def __init__(self, redis_client=None):
         """
         Inizializza il servizio cache.
 
         Args:
-            redis_client: Client Redis (opzionale)
+            redis_client: Client Redis, sincrono o asincrono (opzionale)
         """
         self.redis = redis_client
         self.enabled = redis_client is not None
 
+        # L'indisponibilità di Redis è già segnalata (una volta per tentativo) da api.core.dependencies
         if not self.enabled:
-            logger.warning("Cache Redis non disponibile, funzionerà senza cache")
+            logger.debug("Cache Redis non disponibile, funzionerà senza cache")
 
-    def _generate_key(self, prefix: str, **kwargs) -> str:
+    @staticmethod
+    def _generate_key(prefix: str, **kwargs) -> str:
         """
         Genera chiave cache univoca.
 
@@ -45,6 +61,123 @@ class CacheService:
         params_hash = hashlib.md5(params_str.encode()).hexdigest()
         return f"{prefix}:{params_hash}"
 
+    @staticmethod
+    def _namespace(key: str) -> str:
+        """Namespace = prefisso della chiave (search, listing, listing_index, ...)."""
+        return key.split(':', 1)[0]
+
+    @staticmethod
+    def _decode(key: str, value: Optional[str]) -> Optional[Any]:
+        """Deserializza un valore letto e conta hit o miss."""
+        namespace = _CacheBase._namespace(key)
+        if value:
+            logger.debug("Cache HIT: %s", key)
+            metrics.CACHE_REQUESTS.labels(namespace, 'hit').inc()
+            return json.loads(value)
+        logger.debug("Cache MISS: %s", key)
+        metrics.CACHE_REQUESTS.labels(namespace, 'miss').inc()
+        return None
+
+    @staticmethod
+    def _decode_listings(listing_ids: List[str], values: List[Optional[str]]) -> Dict[str, Dict]:
+        """Deserializza il risultato di un MGET di listing e conta hit e miss."""
+        found = {
+            listing_id: json.loads(value)
+            for listing_id, value in zip(listing_ids, values)
+            if value
+        }
+        metrics.CACHE_REQUESTS.labels('listing', 'hit').inc(len(found))
+        metrics.CACHE_REQUESTS.labels('listing', 'miss').inc(len(listing_ids) - len(found))
+        return found
+
+    @classmethod
+    def _listing_index_entry(cls, listing_data: Dict) -> str:
+        """Voce serializzata dell'indice ID -> URL di un listing."""
+        return json.dumps({name: listing_data.get(name) for name in cls.LISTING_INDEX_FIELDS})
+
+    @classmethod
+    def _queue_listings(cls, pipe, listings_data: Dict[str, Dict]):
+        """
+        Accoda su una pipeline i listing e le voci dell'indice ID -> URL.
+
+        Args:
+            pipe: Pipeline Redis (sincrona o asincrona)
+            listings_data: Dict {listing_id: dati listing}
+        """
+        for listing_id, listing_data in listings_data.items():
+            pipe.setex(
+                f"listing:{listing_id}",
+                settings.CACHE_TTL_LISTING,
+                json.dumps(listing_data, default=str)
+            )
+            if listing_data.get('link'):
+                pipe.setex(
+                    f"listing_index:{listing_id}",
+                    settings.CACHE_TTL_LISTING_INDEX,
+                    cls._listing_index_entry(listing_data)
+                )
+
+    @staticmethod
+    def _stats(info: Dict, keys: int) -> Dict[str, Any]:
+        """Statistiche cache da INFO e DBSIZE."""
+        return {
+            "enabled": True,
+            "connected": True,
+            "keys": keys,
+            "used_memory_human": info.get('used_memory_human', 'N/A'),
+            "uptime_seconds": info.get('uptime_in_seconds', 0)
+        }
+
+    @staticmethod
+    def get_search_key(query: str, categoria: Optional[str] = None,
+                       prezzo_max: Optional[float] = None,
+                       regione: Optional[str] = None,
+                       platform: str = "subito",
+                       details: bool = False,
+                       dedup: bool = True) -> str:
+        """
+        Calcola la chiave cache di una ricerca.
+
+        Args:
+            query: Query di ricerca
+            categoria: Categoria
+            prezzo_max: Prezzo massimo
+            regione: Regione
+            platform: Piattaforma (subito/ebay/all)
+            details: Risultati con dettagli degli annunci
+            dedup: Risultati con duplicati raggruppati
+
+        Returns:
+            Chiave cache della ricerca
+        """
+        params = dict(
+            query=query,
+            categoria=categoria,
+            prezzo_max=prezzo_max,
+            regione=regione,
+            platform=platform
+        )
+        # Con le opzioni di default la chiave resta quella originale
+        if details:
+            params["details"] = True
+        if not dedup:
+            params["dedup"] = False
+
+        return _CacheBase._generate_key("search", **params)
+
+
+class CacheService(_CacheBase):
+    """Gestisce il caching con Redis."""
+
+    def __init__(self, redis_client: Optional[redis.Redis] = None):
+        """
+        Inizializza il servizio cache.
+
+        Args:
+            redis_client: Client Redis (opzionale)
+        """
+        super().__init__(redis_client)
+
     def get(self, key: str) -> Optional[Any]:
         """
         Recupera valore dalla cache.
@@ -58,16 +191,16 @@ class CacheService:
         if not self.enabled:
             return None
 
+        namespace = self._namespace(key)
+
         try:
-            value = self.redis.get(key)
-            if value:
-                logger.debug(f"Cache HIT: {key}")
-                return json.loads(value)
-            else:
-                logger.debug(f"Cache MISS: {key}")
-                return None
+            with tracing.span('cache.get', **{'cache.namespace': namespace}) as cache_span:
+                value = self.redis.get(key)
+                cache_span.set_attribute('cache.hit', bool(value))
+            return self._decode(key, value)
         except Exception as e:
-            logger.error(f"Errore recupero cache: {e}")
+            logger.error("Errore recupero cache: %s", e)
+            metrics.CACHE_REQUESTS.labels(namespace, 'error').inc()
             return None
 
     def set(self, key: str, value: Any, ttl: int = None) -> bool:
@@ -87,15 +220,16 @@ class CacheService:
 
         try:
             serialized = json.dumps(value, default=str)
-            if ttl:
-                self.redis.setex(key, ttl, serialized)
-            else:
-                self.redis.set(key, serialized)
+            with tracing.span('cache.set', **{'cache.namespace': self._namespace(key)}):
+                if ttl:
+                    self.redis.setex(key, ttl, serialized)
+                else:
+                    self.redis.set(key, serialized)
 
-            logger.debug(f"Cache SET: {key} (TTL: {ttl}s)")
+            logger.debug("Cache SET: %s (TTL: %ss)", key, ttl)
             return True
         except Exception as e:
-            logger.error(f"Errore salvataggio cache: {e}")
+            logger.error("Errore salvataggio cache: %s", e)
             return False
 
     def delete(self, key: str) -> bool:
@@ -113,10 +247,10 @@ class CacheService:
 
         try:
             self.redis.delete(key)
-            logger.debug(f"Cache DELETE: {key}")
+            logger.debug("Cache DELETE: %s", key)
             return True
         except Exception as e:
-            logger.error(f"Errore eliminazione cache: {e}")
+            logger.error("Errore eliminazione cache: %s", e)
             return False
 
     def clear_pattern(self, pattern: str) -> int:
@@ -136,16 +270,19 @@ class CacheService:
             keys = self.redis.keys(pattern)
             if keys:
                 deleted = self.redis.delete(*keys)
-                logger.info(f"Cache CLEAR: {deleted} chiavi eliminate per pattern '{pattern}'")
+                logger.info("Cache CLEAR: %s chiavi eliminate per pattern '%s'", deleted, pattern)
                 return deleted
             return 0
         except Exception as e:
-            logger.error(f"Errore pulizia cache: {e}")
+            logger.error("Errore pulizia cache: %s", e)
             return 0
 
     def get_search_results(self, query: str, categoria: Optional[str] = None,
                           prezzo_max: Optional[float] = None,
-                          regione: Optional[str] = None) -> Optional[Dict]:
+                          regione: Optional[str] = None,
+                          platform: str = "subito",
+                          details: bool = False,
+                          dedup: bool = True) -> Optional[Dict]:
         """
         Recupera risultati ricerca dalla cache.
 
@@ -154,23 +291,31 @@ class CacheService:
             categoria: Categoria
             prezzo_max: Prezzo massimo
             regione: Regione
+            platform: Piattaforma (subito/ebay/all)
+            details: Risultati con dettagli degli annunci
+            dedup: Risultati con duplicati raggruppati
 
         Returns:
             Risultati cached o None
         """
-        key = self._generate_key(
-            "search",
+        key = self.get_search_key(
             query=query,
             categoria=categoria,
             prezzo_max=prezzo_max,
-            regione=regione
+            regione=regione,
+            platform=platform,
+            details=details,
+            dedup=dedup
         )
         return self.get(key)
 
     def set_search_results(self, results: Dict, query: str,
                           categoria: Optional[str] = None,
                           prezzo_max: Optional[float] = None,
-                          regione: Optional[str] = None) -> bool:
+                          regione: Optional[str] = None,
+                          platform: str = "subito",
+                          details: bool = False,
+                          dedup: bool = True) -> bool:
         """
         Salva risultati ricerca in cache.
 
@@ -180,16 +325,21 @@ class CacheService:
             categoria: Categoria
             prezzo_max: Prezzo massimo
             regione: Regione
+            platform: Piattaforma (subito/ebay/all)
+            details: Risultati con dettagli degli annunci
+            dedup: Risultati con duplicati raggruppati
 
         Returns:
             True se salvato con successo
         """
-        key = self._generate_key(
-            "search",
+        key = self.get_search_key(
             query=query,
             categoria=categoria,
             prezzo_max=prezzo_max,
-            regione=regione
+            regione=regione,
+            platform=platform,
+            details=details,
+            dedup=dedup
         )
         return self.set(key, results, ttl=settings.CACHE_TTL_SEARCH)
 
@@ -220,6 +370,68 @@ class CacheService:
         key = f"listing:{listing_id}"
         return self.set(key, listing_data, ttl=settings.CACHE_TTL_LISTING)
 
+    def get_listings(self, listing_ids: List[str]) -> Dict[str, Dict]:
+        """
+        Recupera più listing dalla cache con una sola richiesta (MGET).
+
+        Args:
+            listing_ids: Lista di ID listing
+
+        Returns:
+            Dict {listing_id: dati} con i soli listing presenti in cache
+        """
+        if not self.enabled or not listing_ids:
+            return {}
+
+        try:
+            with tracing.span('cache.mget', **{'cache.namespace': 'listing', 'cache.keys': len(listing_ids)}):
+                values = self.redis.mget([f"listing:{listing_id}" for listing_id in listing_ids])
+            return self._decode_listings(listing_ids, values)
+        except Exception as e:
+            logger.error("Errore recupero listing multipli: %s", e)
+            metrics.CACHE_REQUESTS.labels('listing', 'error').inc()
+            return {}
+
+    def set_listings(self, listings_data: Dict[str, Dict]) -> bool:
+        """
+        Salva più listing in cache con una sola pipeline.
+
+        Oltre ai dati completi (listing:{id}) aggiorna l'indice ID -> URL
+        (listing_index:{id}), che sopravvive più a lungo e permette di
+        scaricare i dettagli su richiesta dopo la scadenza del listing.
+
+        Args:
+            listings_data: Dict {listing_id: dati listing}
+
+        Returns:
+            True se salvati con successo
+        """
+        if not self.enabled or not listings_data:
+            return False
+
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            self._queue_listings(pipe, listings_data)
+            with tracing.span('cache.set_listings', **{'cache.keys': len(listings_data)}):
+                pipe.execute()
+            logger.debug("Cache SET: %s listing", len(listings_data))
+            return True
+        except Exception as e:
+            logger.error("Errore salvataggio listing multipli: %s", e)
+            return False
+
+    def get_listing_index(self, listing_id: str) -> Optional[Dict]:
+        """
+        Recupera la voce dell'indice ID -> URL di un listing.
+
+        Args:
+            listing_id: ID listing
+
+        Returns:
+            Dict con link, piattaforma e dati minimi del listing, o None
+        """
+        return self.get(f"listing_index:{listing_id}")
+
     def ping(self) -> bool:
         """
         Verifica connessione Redis.
@@ -233,7 +445,7 @@ class CacheService:
         try:
             return self.redis.ping()
         except Exception as e:
-            logger.error(f"Redis ping fallito: {e}")
+            logger.error("Redis ping fallito: %s", e)
             return False
 
     def get_stats(self) -> Dict[str, Any]:
@@ -250,16 +462,349 @@ class CacheService:
             }
 
         try:
-            info = self.redis.info()
+            return self._stats(self.redis.info(), self.redis.dbsize())
+        except Exception as e:
+            logger.error("Errore recupero stats: %s", e)
             return {
                 "enabled": True,
-                "connected": True,
-                "keys": self.redis.dbsize(),
-                "used_memory_human": info.get('used_memory_human', 'N/A'),
-                "uptime_seconds": info.get('uptime_in_seconds', 0)
+                "connected": False,
+                "error": str(e)
             }
+
+
+class AsyncCacheService(_CacheBase):
+    """
+    Cache Redis per le route asincrone (redis.asyncio).
+
+    Stesse chiavi e stesso formato di CacheService, ma ogni operazione va
+    attesa con await: l'I/O verso Redis non blocca l'event loop e si
+    sovrappone alle altre richieste. Un errore di connessione segna Redis
+    come non disponibile (vedi mark_async_redis_unavailable).
+    """
+
+    def __init__(self, redis_client: Optional[aioredis.Redis] = None):
+        """
+        Inizializza il servizio cache.
+
+        Args:
+            redis_client: Client Redis asincrono (opzionale)
+        """
+        super().__init__(redis_client)
+
+    @staticmethod
+    def _on_error(error: Exception):
+        """Segna Redis come non disponibile se l'errore è di connessione."""
+        if isinstance(error, (redis.ConnectionError, redis.TimeoutError)):
+            mark_async_redis_unavailable(error)
+
+    async def get(self, key: str) -> Optional[Any]:
+        """
+        Recupera valore dalla cache.
+
+        Args:
+            key: Chiave cache
+
+        Returns:
+            Valore deserializzato o None
+        """
+        if not self.enabled:
+            return None
+
+        namespace = self._namespace(key)
+
+        try:
+            with tracing.span('cache.get', **{'cache.namespace': namespace}) as cache_span:
+                value = await self.redis.get(key)
+                cache_span.set_attribute('cache.hit', bool(value))
+            return self._decode(key, value)
+        except Exception as e:
+            logger.error("Errore recupero cache: %s", e)
+            metrics.CACHE_REQUESTS.labels(namespace, 'error').inc()
+            self._on_error(e)
+            return None
+
+    async def set(self, key: str, value: Any, ttl: int = None) -> bool:
+        """
+        Salva valore in cache.
+
+        Args:
+            key: Chiave cache
+            value: Valore da salvare
+            ttl: Time to live in secondi
+
+        Returns:
+            True se salvato con successo
+        """
+        if not self.enabled:
+            return False
+
+        try:
+            serialized = json.dumps(value, default=str)
+            with tracing.span('cache.set', **{'cache.namespace': self._namespace(key)}):
+                if ttl:
+                    await self.redis.setex(key, ttl, serialized)
+                else:
+                    await self.redis.set(key, serialized)
+
+            logger.debug("Cache SET: %s (TTL: %ss)", key, ttl)
+            return True
+        except Exception as e:
+            logger.error("Errore salvataggio cache: %s", e)
+            self._on_error(e)
+            return False
+
+    async def delete(self, key: str) -> bool:
+        """
+        Elimina valore dalla cache.
+
+        Args:
+            key: Chiave cache
+
+        Returns:
+            True se eliminato con successo
+        """
+        if not self.enabled:
+            return False
+
+        try:
+            await self.redis.delete(key)
+            logger.debug("Cache DELETE: %s", key)
+            return True
+        except Exception as e:
+            logger.error("Errore eliminazione cache: %s", e)
+            self._on_error(e)
+            return False
+
+    async def clear_pattern(self, pattern: str) -> int:
+        """
+        Elimina tutte le chiavi che matchano un pattern.
+
+        Args:
+            pattern: Pattern da matchare (es. "search:*")
+
+        Returns:
+            Numero di chiavi eliminate
+        """
+        if not self.enabled:
+            return 0
+
+        try:
+            # SCAN invece di KEYS: non blocca Redis sulle altre richieste
+            keys = [key async for key in self.redis.scan_iter(match=pattern, count=500)]
+            if keys:
+                deleted = await self.redis.delete(*keys)
+                logger.info("Cache CLEAR: %s chiavi eliminate per pattern '%s'", deleted, pattern)
+                return deleted
+            return 0
+        except Exception as e:
+            logger.error("Errore pulizia cache: %s", e)
+            self._on_error(e)
+            return 0
+
+    async def get_search_results(self, **params) -> Optional[Dict]:
+        """
+        Recupera risultati ricerca dalla cache.
+
+        Args:
+            **params: Parametri della ricerca (vedi get_search_key)
+
+        Returns:
+            Risultati cached o None
+        """
+        return await self.get(self.get_search_key(**params))
+
+    async def set_search_results(self, results: Dict, **params) -> bool:
+        """
+        Salva risultati ricerca in cache.
+
+        Args:
+            results: Risultati da salvare
+            **params: Parametri della ricerca (vedi get_search_key)
+
+        Returns:
+            True se salvato con successo
+        """
+        return await self.set(self.get_search_key(**params), results, ttl=settings.CACHE_TTL_SEARCH)
+
+    async def get_listing(self, listing_id: str) -> Optional[Dict]:
+        """
+        Recupera dettagli listing dalla cache.
+
+        Args:
+            listing_id: ID listing
+
+        Returns:
+            Listing cached o None
+        """
+        return await self.get(f"listing:{listing_id}")
+
+    async def set_listing(self, listing_id: str, listing_data: Dict) -> bool:
+        """
+        Salva dettagli listing in cache.
+
+        Args:
+            listing_id: ID listing
+            listing_data: Dati listing
+
+        Returns:
+            True se salvato con successo
+        """
+        return await self.set(f"listing:{listing_id}", listing_data, ttl=settings.CACHE_TTL_LISTING)
+
+    async def get_listings(self, listing_ids: List[str]) -> Dict[str, Dict]:
+        """
+        Recupera più listing dalla cache con una sola richiesta (MGET).
+
+        Args:
+            listing_ids: Lista di ID listing
+
+        Returns:
+            Dict {listing_id: dati} con i soli listing presenti in cache
+        """
+        if not self.enabled or not listing_ids:
+            return {}
+
+        try:
+            with tracing.span('cache.mget', **{'cache.namespace': 'listing', 'cache.keys': len(listing_ids)}):
+                values = await self.redis.mget([f"listing:{listing_id}" for listing_id in listing_ids])
+            return self._decode_listings(listing_ids, values)
+        except Exception as e:
+            logger.error("Errore recupero listing multipli: %s", e)
+            metrics.CACHE_REQUESTS.labels('listing', 'error').inc()
+            self._on_error(e)
+            return {}
+
+    async def set_listings(self, listings_data: Dict[str, Dict]) -> bool:
+        """
+        Salva più listing (e l'indice ID -> URL) con una sola pipeline.
+
+        Args:
+            listings_data: Dict {listing_id: dati listing}
+
+        Returns:
+            True se salvati con successo
+        """
+        if not self.enabled or not listings_data:
+            return False
+
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            self._queue_listings(pipe, listings_data)
+            with tracing.span('cache.set_listings', **{'cache.keys': len(listings_data)}):
+                await pipe.execute()
+            logger.debug("Cache SET: %s listing", len(listings_data))
+            return True
+        except Exception as e:
+            logger.error("Errore salvataggio listing multipli: %s", e)
+            self._on_error(e)
+            return False
+
+    async def get_listing_index(self, listing_id: str) -> Optional[Dict]:
+        """
+        Recupera la voce dell'indice ID -> URL di un listing.
+
+        Args:
+            listing_id: ID listing
+
+        Returns:
+            Dict con link, piattaforma e dati minimi del listing, o None
+        """
+        return await self.get(f"listing_index:{listing_id}")
+
+    async def acquire_lock(self, name: str, ttl: float) -> Optional[AsyncLock]:
+        """
+        Acquisisce un lock condiviso tra worker, senza attendere.
+
+        Args:
+            name: Nome del lock
+            ttl: Scadenza in secondi (il lock si libera anche se il worker muore)
+
+        Returns:
+            Lock acquisito, o None se lo detiene un altro worker o Redis
+            non è disponibile
+        """
+        if not self.enabled:
+            return None
+
+        lock = self.redis.lock(f"lock:{name}", timeout=ttl, blocking=False)
+        try:
+            return lock if await lock.acquire() else None
+        except Exception as e:
+            logger.error("Errore acquisizione lock %s: %s", name, e)
+            self._on_error(e)
+            return None
+
+    async def is_locked(self, name: str) -> bool:
+        """
+        Verifica se un lock condiviso è detenuto da qualche worker.
+
+        Args:
+            name: Nome del lock
+
+        Returns:
+            True se il lock esiste (False anche se Redis non è disponibile)
+        """
+        if not self.enabled:
+            return False
+
+        try:
+            return bool(await self.redis.exists(f"lock:{name}"))
+        except Exception as e:
+            logger.error("Errore verifica lock %s: %s", name, e)
+            self._on_error(e)
+            return False
+
+    async def release_lock(self, lock: AsyncLock):
+        """
+        Rilascia un lock acquisito con acquire_lock.
+
+        Args:
+            lock: Lock da rilasciare
+        """
+        try:
+            await lock.release()
+        except LockError:
+            # Scaduto e magari riacquisito da un altro worker: non è più nostro
+            logger.debug("Lock %s già scaduto", lock.name)
+        except Exception as e:
+            logger.error("Errore rilascio lock %s: %s", lock.name, e)
+            self._on_error(e)
+
+    async def ping(self) -> bool:
+        """
+        Verifica connessione Redis.
+
+        Returns:
+            True se connesso
+        """
+        if not self.enabled:
+            return False
+
+        try:
+            return await self.redis.ping()
+        except Exception as e:
+            logger.error("Redis ping fallito: %s", e)
+            self._on_error(e)
+            return False
+
+    async def get_stats(self) -> Dict[str, Any]:
+        """
+        Ottiene statistiche cache.
+
+        Returns:
+            Dict con statistiche
+        """
+        if not self.enabled:
+            return {
+                "enabled": False,
+                "connected": False
+            }
+
+        try:
+            return self._stats(await self.redis.info(), await self.redis.dbsize())
         except Exception as e:
-            logger.error(f"Errore recupero stats: {e}")
+            logger.error("Errore recupero stats: %s", e)
+            self._on_error(e)
             return {
                 "enabled": True,
                 "connected": False,
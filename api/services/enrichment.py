@@ -0,0 +1,407 @@
+"""Arricchimento concorrente degli annunci con i dati della pagina di dettaglio."""
+
+import asyncio
+import contextvars
+import copy
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Sequence
+import logging
+
+from api.core.config import settings
+from api.models.requests import PlatformEnum
+from api.core.dependencies import create_scraper
+from api.core.workers import is_multi_worker
+from api.services.cache import AsyncCacheService, CacheService
+from src.models.listing import Listing
+
+
+logger = logging.getLogger(__name__)
+
+# Campi ottenibili solo dalla pagina di dettaglio
+DETAIL_FIELDS = (
+    'description',
+    'photos',
+    'seller_name',
+    'seller_type',
+    'category',
+    'posted_date'
+)
+
+# Chiave in Listing.metadata che marca un annuncio già arricchito
+DETAILS_MARKER = 'details_fetched_at'
+
+
+def has_details(listing_data: Dict) -> bool:
+    """
+    Verifica se un listing (dict da cache) contiene già i dettagli.
+
+    Args:
+        listing_data: Dati del listing
+
+    Returns:
+        True se i dettagli sono già stati estratti
+    """
+    return bool((listing_data.get('metadata') or {}).get(DETAILS_MARKER))
+
+
+def _copy_fields(source: Dict, listing: Listing, fields: Sequence[str]):
+    """Copia i campi di dettaglio non vuoti da un dict su un Listing."""
+    for name in fields:
+        value = source.get(name)
+        if value:
+            setattr(listing, name, value)
+    listing.metadata[DETAILS_MARKER] = (source.get('metadata') or {}).get(DETAILS_MARKER)
+
+
+def apply_cached_details(
+    listings: List[Listing],
+    cache: CacheService,
+    fields: Sequence[str] = DETAIL_FIELDS
+) -> List[Listing]:
+    """
+    Applica i dettagli già presenti in cache (listing:{id}) con un solo MGET.
+
+    Args:
+        listings: Annunci da completare (modificati in place)
+        cache: Servizio cache
+        fields: Campi di dettaglio da applicare
+
+    Returns:
+        Annunci per cui i dettagli non sono in cache
+    """
+    ids = [listing.listing_id for listing in listings if listing.listing_id]
+    cached = cache.get_listings(ids)
+
+    missing = []
+    for listing in listings:
+        data = cached.get(listing.listing_id) if listing.listing_id else None
+        if data and has_details(data):
+            _copy_fields(data, listing, fields)
+        else:
+            missing.append(listing)
+
+    return missing
+
+
+class _ScraperPool:
+    """Uno scraper per thread e piattaforma (le sessioni requests non sono thread-safe)."""
+
+    def __init__(self):
+        self._local = threading.local()
+        self._created = []
+        self._lock = threading.Lock()
+
+    def get(self, source: str):
+        """Restituisce lo scraper del thread corrente per la piattaforma."""
+        scrapers = getattr(self._local, 'scrapers', None)
+        if scrapers is None:
+            scrapers = self._local.scrapers = {}
+
+        scraper = scrapers.get(source)
+        if scraper is None:
+            platform = PlatformEnum.EBAY if source == 'ebay' else PlatformEnum.SUBITO
+            scraper = scrapers[source] = create_scraper(platform)
+            with self._lock:
+                self._created.append(scraper)
+
+        return scraper
+
+    def close(self):
+        """Chiude tutte le sessioni create."""
+        with self._lock:
+            for scraper in self._created:
+                scraper.close()
+            self._created.clear()
+
+
+def _fetch_details(pool: _ScraperPool, listing: Listing) -> Optional[Listing]:
+    """
+    Scarica la pagina di dettaglio di un annuncio.
+
+    Args:
+        pool: Pool di scraper
+        listing: Annuncio da arricchire (non modificato)
+
+    Returns:
+        Copia del listing con tutti i dettagli, o None se il download fallisce
+    """
+    scraper = pool.get(listing.source)
+    failed_before = scraper.stats['failed']
+
+    # Lo scraper modifica il listing in place: lavora su una copia
+    detailed = scraper.scrape_listing_details(copy.deepcopy(listing))
+
+    if scraper.stats['failed'] != failed_before:
+        return None
+
+    detailed.metadata[DETAILS_MARKER] = datetime.now().isoformat()
+    return detailed
+
+
+def enrich_listings(
+    listings: Iterable[Listing],
+    fields: Optional[Sequence[str]] = None,
+    concurrency: Optional[int] = None,
+    cache: Optional[CacheService] = None
+) -> List[Listing]:
+    """
+    Arricchisce gli annunci con i dati delle pagine di dettaglio.
+
+    Gli annunci con dettagli già in cache non vengono riscaricati; gli
+    altri vengono scaricati in parallelo da ``concurrency`` thread. Ogni
+    richiesta passa dal rate limiter condiviso del proprio host, quindi la
+    concorrenza sovrappone le attese di rete (e host diversi) senza superare
+    i limiti per sito. La funzione termina quando tutti i download sono
+    conclusi (la risposta della ricerca viene costruita dopo).
+
+    Args:
+        listings: Annunci da arricchire (modificati in place)
+        fields: Campi di dettaglio da applicare (default: tutti)
+        concurrency: Numero di download paralleli
+        cache: Servizio cache per saltare e salvare i dettagli (opzionale)
+
+    Returns:
+        Gli stessi annunci, arricchiti in place (invariati se il download fallisce)
+    """
+    fields = tuple(fields) if fields else DETAIL_FIELDS
+    unknown = set(fields) - set(DETAIL_FIELDS)
+    if unknown:
+        raise ValueError(f"Campi di dettaglio non validi: {', '.join(sorted(unknown))}")
+
+    concurrency = max(1, min(
+        concurrency or settings.ENRICH_CONCURRENCY,
+        settings.ENRICH_MAX_CONCURRENCY
+    ))
+
+    listings = list(listings)
+
+    # 1. Dettagli già in cache: nessuna richiesta
+    if cache is not None and cache.enabled:
+        missing = apply_cached_details(listings, cache, fields)
+    else:
+        missing = listings
+
+    to_fetch = [listing for listing in missing if listing.link]
+    if not to_fetch:
+        return listings
+
+    logger.info(
+        "Arricchimento dettagli: %s annunci da scaricare (%s già disponibili), concorrenza %s",
+        len(to_fetch), len(listings) - len(to_fetch), concurrency
+    )
+
+    # 2. Download concorrente delle pagine di dettaglio
+    pool = _ScraperPool()
+    executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='enrich')
+
+    try:
+        futures = {
+            # Ogni task eredita il contesto (tempi per fase della richiesta)
+            executor.submit(contextvars.copy_context().run, _fetch_details, pool, listing): listing
+            for listing in to_fetch
+        }
+
+        for future in as_completed(futures):
+            listing = futures[future]
+            try:
+                detailed = future.result()
+            except Exception as e:
+                logger.warning("Errore arricchimento %s: %s", listing.link, e)
+                detailed = None
+
+            if detailed is not None:
+                detailed_data = detailed.to_dict()
+                _copy_fields(detailed_data, listing, fields)
+
+                # In cache vanno tutti i dettagli, non solo i campi richiesti
+                if cache is not None and listing.listing_id:
+                    cache.set_listing(listing.listing_id, detailed_data)
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+        pool.close()
+
+    return listings
+
+
+class ListingDetailFetcher:
+    """
+    Scarica su richiesta i dettagli di singoli annunci.
+
+    Un listing in cache viene restituito così com'è, anche senza dettagli
+    (es. salvato da una ricerca senza details). Se è scaduto, l'URL viene
+    risolto dall'indice ID -> URL scritto durante le ricerche e la pagina
+    viene scaricata. Le richieste concorrenti per lo stesso annuncio
+    condividono un unico download (single-flight) e il risultato viene
+    riscritto in cache; dopo un download fallito vengono messi in cache i
+    dati di base per ENRICH_FAILURE_TTL secondi, così i tentativi
+    successivi non scaricano di nuovo la pagina. Con più worker il download è
+    coordinato da un lock Redis: gli altri worker attendono il risultato
+    in cache invece di scaricare di nuovo la stessa pagina.
+    """
+
+    # Intervallo di controllo della cache mentre un altro worker scarica
+    POLL_INTERVAL = 0.2
+
+    def __init__(self):
+        """Inizializza il fetcher."""
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.stats = {
+            'fetched': 0,
+            'deduplicated': 0,
+            'failed': 0
+        }
+
+    async def get(self, listing_id: str, cache: AsyncCacheService) -> Optional[Dict]:
+        """
+        Restituisce un annuncio dalla cache, scaricandone i dettagli se
+        è presente solo nell'indice.
+
+        Args:
+            listing_id: ID listing
+            cache: Servizio cache asincrono
+
+        Returns:
+            Dati del listing, o None se l'annuncio non è mai stato visto
+        """
+        cached = await cache.get_listing(listing_id)
+        if cached:
+            return cached
+
+        future = self._inflight.get(listing_id)
+        if future is None:
+            base = await cache.get_listing_index(listing_id)
+            if not base or not base.get('link'):
+                return None
+            # Durante la lettura dell'indice un'altra richiesta può aver avviato il download
+            future = self._inflight.get(listing_id)
+
+        if future is None:
+            future = asyncio.ensure_future(self._fetch(listing_id, base, cache))
+            self._inflight[listing_id] = future
+            future.add_done_callback(lambda _: self._inflight.pop(listing_id, None))
+        else:
+            self.stats['deduplicated'] += 1
+
+        # shield: la cancellazione di un client non interrompe il download condiviso
+        return await asyncio.shield(future)
+
+    async def _fetch(self, listing_id: str, base: Dict, cache: AsyncCacheService) -> Dict:
+        """
+        Scarica la pagina di dettaglio e aggiorna la cache.
+
+        Args:
+            listing_id: ID listing
+            base: Voce dell'indice ID -> URL
+            cache: Servizio cache asincrono
+
+        Returns:
+            Dati del listing con dettagli, o i dati di base se il download fallisce
+        """
+        if not is_multi_worker():
+            return await self._download(listing_id, base, cache)
+
+        lock_name = f"listing_detail:{listing_id}"
+        lock = await cache.acquire_lock(lock_name, settings.ENRICH_LOCK_TTL)
+        if lock is None and await cache.is_locked(lock_name):
+            shared = await self._wait_for_worker(listing_id, lock_name, cache)
+            if shared is not None:
+                self.stats['deduplicated'] += 1
+                return shared
+
+        try:
+            return await self._download(listing_id, base, cache)
+        finally:
+            if lock is not None:
+                await cache.release_lock(lock)
+
+    async def _wait_for_worker(
+        self,
+        listing_id: str,
+        lock_name: str,
+        cache: AsyncCacheService
+    ) -> Optional[Dict]:
+        """
+        Attende che il worker con il lock scriva il risultato in cache.
+
+        Args:
+            listing_id: ID listing
+            lock_name: Nome del lock del download
+            cache: Servizio cache asincrono
+
+        Returns:
+            Dati del listing (con dettagli, o di base se il download è
+            fallito), o None se il lock si è liberato (o è scaduto) senza
+            risultato
+        """
+        deadline = time.monotonic() + settings.ENRICH_LOCK_TTL
+        while time.monotonic() < deadline:
+            await asyncio.sleep(self.POLL_INTERVAL)
+            cached = await cache.get_listing(listing_id)
+            if cached:
+                return cached
+            if not await cache.is_locked(lock_name):
+                break
+
+        # Il lock può essersi liberato subito dopo la scrittura in cache
+        return await cache.get_listing(listing_id)
+
+    async def _download(self, listing_id: str, base: Dict, cache: AsyncCacheService) -> Dict:
+        """Scarica i dettagli in un thread e li scrive in cache."""
+        listing = Listing.from_dict({**base, 'listing_id': listing_id})
+
+        try:
+            detailed = await asyncio.to_thread(self._fetch_sync, listing)
+        except Exception as e:
+            logger.warning("Errore download dettagli %s: %s", listing.link, e)
+            detailed = None
+
+        if detailed is None:
+            self.stats['failed'] += 1
+            base_data = listing.to_dict()
+            await cache.set(f"listing:{listing_id}", base_data, ttl=settings.ENRICH_FAILURE_TTL)
+            return base_data
+
+        self.stats['fetched'] += 1
+        detailed_data = detailed.to_dict()
+        await cache.set_listing(listing_id, detailed_data)
+        return detailed_data
+
+    @staticmethod
+    def _fetch_sync(listing: Listing) -> Optional[Listing]:
+        """Scarica i dettagli con uno scraper dedicato (bloccante)."""
+        pool = _ScraperPool()
+        try:
+            return _fetch_details(pool, listing)
+        finally:
+            pool.close()
+
+    def get_stats(self) -> Dict:
+        """
+        Ottiene statistiche del fetcher.
+
+        Returns:
+            Dict con statistiche
+        """
+        return {**self.stats, 'inflight': len(self._inflight)}
+
+
+# Istanza globale (un processo = un insieme di download in corso)
+_detail_fetcher: Optional[ListingDetailFetcher] = None
+
+
+def get_detail_fetcher() -> ListingDetailFetcher:
+    """
+    Restituisce il fetcher globale dei dettagli (creato alla prima chiamata).
+
+    Returns:
+        ListingDetailFetcher instance
+    """
+    global _detail_fetcher
+
+    if _detail_fetcher is None:
+        _detail_fetcher = ListingDetailFetcher()
+
+    return _detail_fetcher
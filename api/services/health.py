@@ -0,0 +1,235 @@
+"""Probe di liveness e readiness del worker."""
+
+import asyncio
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional
+import logging
+
+import anyio
+
+from api.core.config import settings
+from api.core.dependencies import get_async_redis_client
+from src.utils.circuit_breaker import CircuitBreaker, get_circuit_breakers
+
+
+logger = logging.getLogger(__name__)
+
+OK = "ok"
+DEGRADED = "degraded"
+FAIL = "fail"
+
+
+class HealthService:
+    """
+    Stato del worker per i load balancer.
+
+    La readiness combina più controlli, ognuno con esito ok, degraded o
+    fail: il worker è pronto se nessun controllo è fail. Il risultato è
+    riusato per HEALTH_CACHE_SECONDS, così il polling del load balancer
+    non aggiunge carico (una sola probe alla volta, le altre richieste
+    attendono quella in corso).
+
+    Controlli:
+    - redis: latenza del PING
+    - circuit_breakers: stato del circuit breaker per host di destinazione (mai fail)
+    - queue: ricerche salvate scadute in attesa nello scheduler
+    - saturation: richieste in corso e ritardo dell'event loop
+    - threadpool: thread occupati nel pool per il codice sincrono
+    """
+
+    def __init__(self):
+        """Inizializza lo stato del worker."""
+        self.inflight = 0
+        self.loop_lag = 0.0  # Secondi, ultimo campione
+        self.loop_lag_max = 0.0  # Massimo dall'ultima probe
+        self._cached: Optional[Dict[str, Any]] = None
+        self._cached_at = 0.0
+        self._lock: Optional[asyncio.Lock] = None
+
+    # ------------------------------------------------------------------
+    # Carico del worker
+    # ------------------------------------------------------------------
+
+    def request_started(self):
+        """Registra l'inizio di una richiesta."""
+        self.inflight += 1
+
+    def request_finished(self):
+        """Registra la fine di una richiesta."""
+        self.inflight -= 1
+
+    async def monitor_loop_lag(self, interval: float = 0.5):
+        """
+        Misura periodicamente il ritardo dell'event loop.
+
+        Un ritardo alto indica codice sincrono che blocca il loop: il
+        worker non riesce a servire altre richieste anche se ne ha poche
+        in corso.
+
+        Args:
+            interval: Secondi tra due campioni
+        """
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(interval)
+            self.loop_lag = max(0.0, time.perf_counter() - started - interval)
+            self.loop_lag_max = max(self.loop_lag_max, self.loop_lag)
+
+    # ------------------------------------------------------------------
+    # Controlli
+    # ------------------------------------------------------------------
+
+    async def _check_redis(self) -> Dict[str, Any]:
+        """PING a Redis con il client asincrono, con timeout."""
+        missing = FAIL if settings.HEALTH_REQUIRE_REDIS else DEGRADED
+        timeout = settings.HEALTH_PROBE_TIMEOUT
+
+        client = await get_async_redis_client()
+        if client is None:
+            return {"status": missing, "error": "Redis non disponibile"}
+
+        try:
+            started = time.perf_counter()
+            await asyncio.wait_for(client.ping(), timeout=timeout)
+            latency = time.perf_counter() - started
+        except asyncio.TimeoutError:
+            return {"status": missing, "error": f"Timeout dopo {timeout}s"}
+        except Exception as e:
+            return {"status": missing, "error": str(e)}
+
+        latency_ms = round(latency * 1000, 2)
+        status = OK if latency_ms <= settings.HEALTH_REDIS_MAX_LATENCY_MS else DEGRADED
+        return {"status": status, "latency_ms": latency_ms}
+
+    @staticmethod
+    def _check_circuit_breakers() -> Dict[str, Any]:
+        """
+        Circuiti aperti verso i siti: le ricerche su quell'host falliscono subito.
+
+        Al massimo degraded: il sito è lo stesso per tutti i worker, togliere
+        questo dal bilanciamento non aiuterebbe e bloccherebbe anche le
+        letture dalla cache.
+        """
+        hosts = {host: breaker.snapshot() for host, breaker in get_circuit_breakers().items()}
+        open_hosts = [host for host, state in hosts.items() if state["state"] == CircuitBreaker.OPEN]
+
+        return {"status": DEGRADED if open_hosts else OK, "open": open_hosts, "hosts": hosts}
+
+    @staticmethod
+    def _check_queue() -> Dict[str, Any]:
+        """Ricerche salvate scadute e non ancora eseguite."""
+        if not settings.SCHEDULER_ENABLED:
+            return {"status": OK, "depth": 0, "enabled": False}
+
+        from api.services.scheduler import get_scheduler
+
+        # Stato in memoria: la probe non legge il file condiviso dall'event loop
+        stats = get_scheduler().get_stats(reload=False)
+        depth = stats["due"]
+        status = OK if depth <= settings.HEALTH_MAX_QUEUE_DEPTH else DEGRADED
+        return {"status": status, "depth": depth, "running": stats["running"] is not None}
+
+    def _check_saturation(self) -> Dict[str, Any]:
+        """Richieste in corso e ritardo dell'event loop."""
+        lag_ms = round(max(self.loop_lag, self.loop_lag_max) * 1000, 1)
+        self.loop_lag_max = 0.0
+
+        utilization = self.inflight / settings.HEALTH_MAX_INFLIGHT
+        saturated = utilization >= 1.0 or lag_ms > settings.HEALTH_MAX_LOOP_LAG_MS
+
+        if saturated:
+            status = FAIL
+        elif utilization >= 0.8 or lag_ms > settings.HEALTH_MAX_LOOP_LAG_MS / 2:
+            status = DEGRADED
+        else:
+            status = OK
+
+        return {
+            "status": status,
+            "inflight": self.inflight,
+            "max_inflight": settings.HEALTH_MAX_INFLIGHT,
+            "loop_lag_ms": lag_ms
+        }
+
+    @staticmethod
+    def _check_threadpool() -> Dict[str, Any]:
+        """Thread occupati nel pool di anyio (dipendenze e route sincrone)."""
+        limiter = anyio.to_thread.current_default_thread_limiter()
+        busy = limiter.borrowed_tokens
+        total = limiter.total_tokens
+
+        if busy >= total:
+            status = FAIL
+        elif busy >= total * 0.8:
+            status = DEGRADED
+        else:
+            status = OK
+
+        return {"status": status, "busy": busy, "size": total}
+
+    # ------------------------------------------------------------------
+    # API pubblica
+    # ------------------------------------------------------------------
+
+    async def _probe(self) -> Dict[str, Any]:
+        checks = {
+            "redis": await self._check_redis(),
+            "circuit_breakers": self._check_circuit_breakers(),
+            "queue": self._check_queue(),
+            "saturation": self._check_saturation(),
+            "threadpool": self._check_threadpool()
+        }
+        statuses = {check["status"] for check in checks.values()}
+
+        if FAIL in statuses:
+            status = "not_ready"
+        elif DEGRADED in statuses:
+            status = "degraded"
+        else:
+            status = "ready"
+
+        return {
+            "status": status,
+            "ready": status != "not_ready",
+            "checks": checks,
+            "checked_at": datetime.now().isoformat()
+        }
+
+    async def readiness(self) -> Dict[str, Any]:
+        """
+        Esito della readiness, riusato per HEALTH_CACHE_SECONDS.
+
+        Returns:
+            Dict con status (ready, degraded, not_ready), ready, checks e cached
+        """
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+
+        async with self._lock:
+            if self._cached is None or time.monotonic() - self._cached_at >= settings.HEALTH_CACHE_SECONDS:
+                self._cached = await self._probe()
+                self._cached_at = time.monotonic()
+                if not self._cached["ready"]:
+                    failed = [name for name, check in self._cached["checks"].items() if check["status"] == FAIL]
+                    logger.warning("Worker non pronto: %s", ", ".join(failed))
+                return {**self._cached, "cached": False}
+
+        return {**self._cached, "cached": True}
+
+
+# Istanza globale del worker
+_health_service: Optional[HealthService] = None
+
+
+def get_health_service() -> HealthService:
+    """
+    Restituisce lo stato di salute del worker.
+
+    Returns:
+        HealthService instance
+    """
+    global _health_service
+    if _health_service is None:
+        _health_service = HealthService()
+    return _health_service
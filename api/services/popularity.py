@@ -0,0 +1,404 @@
+"""Statistiche di popolarità delle ricerche e pre-riscaldamento della cache."""
+
+import asyncio
+import json
+import math
+import time
+from typing import Dict, List, Optional, Tuple
+import logging
+import redis
+import redis.asyncio as aioredis
+
+from api.core.config import settings
+from api.core.dependencies import mark_async_redis_unavailable
+from api.services.rate_limit import expected_downloads
+from src.utils.rate_limiter import TokenBucket
+
+
+logger = logging.getLogger(__name__)
+
+# Chiavi Redis
+POPULARITY_ZSET_KEY = "popularity:searches"
+POPULARITY_PARAMS_KEY = "popularity:params"
+POPULARITY_LANDMARK_KEY = "popularity:landmark"
+WARMER_LOCK_KEY = "popularity:warmer:lock"
+
+# Pagine per piattaforma al massimo (limite di SearchRequest.max_pages)
+_MAX_PAGES = 5
+
+# Oltre questo esponente i punteggi vengono riscalati per evitare overflow
+_MAX_EXPONENT = 50.0
+
+# Contatori con decadimento esponenziale ("forward decay"): invece di
+# ridurre periodicamente tutti i punteggi, ogni incremento vale
+# exp(lambda * (now - landmark)). L'ordinamento è identico a quello dei
+# contatori decaduti e il punteggio corrente si ottiene dividendo per
+# exp(lambda * (now - landmark)). Lo script rende atomici incremento,
+# riscalatura del landmark e salvataggio dei parametri.
+_RECORD_SCRIPT = """
+local now = tonumber(ARGV[1])
+local lambda = tonumber(ARGV[2])
+local max_exp = tonumber(ARGV[3])
+local landmark = tonumber(redis.call('GET', KEYS[3]))
+if not landmark then
+    landmark = now
+    redis.call('SET', KEYS[3], tostring(now))
+end
+local exponent = lambda * (now - landmark)
+if exponent > max_exp then
+    redis.call('ZUNIONSTORE', KEYS[1], 1, KEYS[1], 'WEIGHTS', tostring(math.exp(-exponent)))
+    redis.call('SET', KEYS[3], tostring(now))
+    exponent = 0
+end
+redis.call('ZINCRBY', KEYS[1], math.exp(exponent), ARGV[4])
+redis.call('HSET', KEYS[2], ARGV[4], ARGV[5])
+return 1
+"""
+
+
+class _QueryPopularityBase:
+    """
+    Script e argomenti condivisi da QueryPopularityService e
+    AsyncQueryPopularityService.
+
+    Le due classi sono sorelle: qui restano solo le parti senza I/O.
+    """
+
+    def __init__(self, redis_client=None):
+        """
+        Inizializza il servizio.
+
+        Args:
+            redis_client: Client Redis, sincrono o asincrono (opzionale)
+        """
+        self.redis = redis_client
+        self.enabled = redis_client is not None
+        self.decay_rate = math.log(2) / settings.POPULARITY_HALF_LIFE
+        self._record_script = (
+            self.redis.register_script(_RECORD_SCRIPT) if self.enabled else None
+        )
+
+    def _record_call(self, cache_key: str, params: Dict, max_pages: int) -> Dict:
+        """Chiavi e argomenti dello script di registrazione."""
+        return dict(
+            keys=[POPULARITY_ZSET_KEY, POPULARITY_PARAMS_KEY, POPULARITY_LANDMARK_KEY],
+            args=[
+                time.time(),
+                self.decay_rate,
+                _MAX_EXPONENT,
+                cache_key,
+                json.dumps({**params, "max_pages": max_pages})
+            ]
+        )
+
+
+class QueryPopularityService(_QueryPopularityBase):
+    """Registra la frequenza delle ricerche come contatori decaduti in Redis."""
+
+    def __init__(self, redis_client: Optional[redis.Redis] = None):
+        """
+        Inizializza il servizio.
+
+        Args:
+            redis_client: Client Redis (opzionale)
+        """
+        super().__init__(redis_client)
+
+    def record(self, cache_key: str, params: Dict, max_pages: int = 1) -> bool:
+        """
+        Registra una ricerca.
+
+        Args:
+            cache_key: Chiave cache normalizzata della ricerca
+            params: Parametri normalizzati della ricerca (vedi SearchService)
+            max_pages: Pagine richieste, usate per rieseguire la ricerca
+
+        Returns:
+            True se registrata con successo
+        """
+        if not self.enabled:
+            return False
+
+        try:
+            self._record_script(**self._record_call(cache_key, params, max_pages))
+            return True
+        except Exception as e:
+            logger.error("Errore registrazione popolarità: %s", e)
+            return False
+
+    def top(self, k: int) -> List[Tuple[str, float, Dict]]:
+        """
+        Restituisce le k ricerche più popolari.
+
+        Args:
+            k: Numero di ricerche
+
+        Returns:
+            Lista di tuple (cache_key, punteggio decaduto, parametri)
+        """
+        if not self.enabled or k <= 0:
+            return []
+
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            pipe.zrevrange(POPULARITY_ZSET_KEY, 0, k - 1, withscores=True)
+            pipe.get(POPULARITY_LANDMARK_KEY)
+            entries, landmark = pipe.execute()
+
+            if not entries:
+                return []
+
+            scale = math.exp(-self.decay_rate * (time.time() - float(landmark or time.time())))
+            keys = [key for key, _ in entries]
+            raw_params = self.redis.hmget(POPULARITY_PARAMS_KEY, keys)
+
+            results = []
+            for (key, score), params in zip(entries, raw_params):
+                if params:
+                    results.append((key, score * scale, json.loads(params)))
+            return results
+        except Exception as e:
+            logger.error("Errore lettura popolarità: %s", e)
+            return []
+
+    def trim(self, max_keys: int) -> int:
+        """
+        Elimina le ricerche meno popolari oltre max_keys.
+
+        Args:
+            max_keys: Numero massimo di ricerche tracciate
+
+        Returns:
+            Numero di ricerche eliminate
+        """
+        if not self.enabled:
+            return 0
+
+        try:
+            stale = self.redis.zrange(POPULARITY_ZSET_KEY, 0, -(max_keys + 1))
+            if not stale:
+                return 0
+
+            pipe = self.redis.pipeline()
+            pipe.zrem(POPULARITY_ZSET_KEY, *stale)
+            pipe.hdel(POPULARITY_PARAMS_KEY, *stale)
+            pipe.execute()
+            return len(stale)
+        except Exception as e:
+            logger.error("Errore pulizia popolarità: %s", e)
+            return 0
+
+
+class AsyncQueryPopularityService(_QueryPopularityBase):
+    """
+    Registrazione della popolarità per le route asincrone (redis.asyncio).
+
+    Usata a ogni ricerca: lo script Lua viene eseguito sul pool asincrono
+    senza occupare un thread. Va creata una volta per client (vedi
+    get_async_popularity_service), così lo script è registrato una volta.
+    """
+
+    def __init__(self, redis_client: Optional[aioredis.Redis] = None):
+        """
+        Inizializza il servizio.
+
+        Args:
+            redis_client: Client Redis asincrono (opzionale)
+        """
+        super().__init__(redis_client)
+
+    async def record(self, cache_key: str, params: Dict, max_pages: int = 1) -> bool:
+        """
+        Registra una ricerca.
+
+        Args:
+            cache_key: Chiave cache normalizzata della ricerca
+            params: Parametri normalizzati della ricerca (vedi SearchService)
+            max_pages: Pagine richieste, usate per rieseguire la ricerca
+
+        Returns:
+            True se registrata con successo
+        """
+        if not self.enabled:
+            return False
+
+        try:
+            await self._record_script(**self._record_call(cache_key, params, max_pages))
+            return True
+        except Exception as e:
+            logger.error("Errore registrazione popolarità: %s", e)
+            if isinstance(e, (redis.ConnectionError, redis.TimeoutError)):
+                mark_async_redis_unavailable(e)
+            return False
+
+
+class CacheWarmer:
+    """
+    Riesegue le ricerche più popolari poco prima della scadenza della cache.
+
+    Il warmer usa al massimo una quota (CACHE_WARMER_RATE_SHARE) del budget
+    di richieste in uscita: ogni ricerca costa le pagine che scarica (vedi
+    expected_downloads), scalate da un token bucket. Il bucket contiene
+    almeno il costo della ricerca più cara, che altrimenti non verrebbe
+    mai riscaldata.
+    """
+
+    def __init__(self, redis_client: Optional[redis.Redis] = None):
+        """
+        Inizializza il warmer.
+
+        Args:
+            redis_client: Client Redis (opzionale)
+        """
+        self.redis = redis_client
+        self.popularity = QueryPopularityService(redis_client)
+
+        rate = settings.SCRAPER_REQUESTS_PER_SECOND * settings.CACHE_WARMER_RATE_SHARE
+        max_cost = self._estimate_cost({"platform": "all", "max_pages": _MAX_PAGES, "details": True})
+        self.budget = TokenBucket(
+            rate=rate,
+            capacity=max(rate * settings.CACHE_WARMER_INTERVAL, max_cost)
+        )
+
+        self.stats = {
+            'cycles': 0,
+            'warmed': 0,
+            'skipped_budget': 0,
+            'failed': 0
+        }
+
+    @staticmethod
+    def _estimate_cost(params: Dict) -> int:
+        """Stima le richieste in uscita necessarie per una ricerca (dettagli compresi)."""
+        return sum(expected_downloads(
+            platforms=2 if params.get("platform") == "all" else 1,
+            max_pages=int(params.get("max_pages", 1)),
+            details=bool(params.get("details", False))
+        ))
+
+    def _find_candidates(self) -> List[Tuple[str, float, Dict]]:
+        """
+        Seleziona le ricerche popolari la cui cache sta per scadere.
+
+        Returns:
+            Lista di tuple (cache_key, punteggio, parametri)
+        """
+        top = self.popularity.top(settings.CACHE_WARMER_TOP_K)
+        top = [item for item in top if item[1] >= settings.CACHE_WARMER_MIN_SCORE]
+        if not top:
+            return []
+
+        pipe = self.redis.pipeline(transaction=False)
+        for key, _, _ in top:
+            pipe.ttl(key)
+        ttls = pipe.execute()
+
+        # TTL -2 = chiave assente (già scaduta): va riscaldata comunque
+        return [
+            item for item, ttl in zip(top, ttls)
+            if ttl == -2 or 0 <= ttl <= settings.CACHE_WARMER_LEAD_TIME
+        ]
+
+    def _warm(self, params: Dict) -> int:
+        """
+        Riesegue una ricerca e aggiorna la cache (bloccante).
+
+        Args:
+            params: Parametri normalizzati della ricerca
+
+        Returns:
+            Numero di risultati
+        """
+        # Import locale per evitare import circolari con i modelli API
+        from api.models.requests import SearchRequest
+        from api.services.cache import CacheService
+        from api.services.search import SearchService
+
+        request = SearchRequest(**params)
+        response_data = SearchService(CacheService(self.redis)).execute(request)
+        return response_data['total_results']
+
+    async def run_once(self) -> int:
+        """
+        Esegue un ciclo di riscaldamento.
+
+        Returns:
+            Numero di ricerche riscaldate
+        """
+        self.stats['cycles'] += 1
+
+        # Un solo worker per ciclo riscalda la cache
+        acquired = await asyncio.to_thread(
+            self.redis.set, WARMER_LOCK_KEY, "1",
+            nx=True, ex=max(int(settings.CACHE_WARMER_INTERVAL), 1)
+        )
+        if not acquired:
+            return 0
+
+        candidates = await asyncio.to_thread(self._find_candidates)
+        warmed = 0
+
+        for key, score, params in candidates:
+            if not self.budget.try_consume(self._estimate_cost(params)):
+                self.stats['skipped_budget'] += 1
+                logger.debug("Budget warmer esaurito, salto %s", key)
+                continue
+
+            try:
+                logger.info("Pre-riscaldamento cache: '%s' (score %.1f)", params.get('query'), score)
+                await asyncio.to_thread(self._warm, params)
+                warmed += 1
+                self.stats['warmed'] += 1
+            except Exception as e:
+                self.stats['failed'] += 1
+                logger.error("Errore pre-riscaldamento %s: %s", key, e)
+
+        await asyncio.to_thread(self.popularity.trim, settings.POPULARITY_MAX_KEYS)
+        return warmed
+
+    async def run_forever(self):
+        """Loop principale del warmer."""
+        logger.info("Cache warmer avviato")
+
+        try:
+            while True:
+                try:
+                    await self.run_once()
+                except Exception as e:
+                    logger.error("Errore ciclo cache warmer: %s", e)
+                await asyncio.sleep(settings.CACHE_WARMER_INTERVAL)
+        except asyncio.CancelledError:
+            logger.info("Cache warmer fermato")
+            raise
+
+    def get_stats(self) -> Dict:
+        """
+        Ottiene statistiche del warmer.
+
+        Returns:
+            Dict con statistiche
+        """
+        return {
+            **self.stats,
+            "budget_available": round(self.budget.available(), 2)
+        }
+
+
+# Servizio asincrono del processo (ricreato solo se cambia il client)
+_async_popularity: Optional[AsyncQueryPopularityService] = None
+
+
+def get_async_popularity_service(redis_client: Optional[aioredis.Redis]) -> AsyncQueryPopularityService:
+    """
+    Servizio popolarità per le route asincrone.
+
+    Args:
+        redis_client: Client Redis asincrono (None se non disponibile)
+
+    Returns:
+        AsyncQueryPopularityService (lo stesso finché il client non cambia)
+    """
+    global _async_popularity
+    if _async_popularity is None or _async_popularity.redis is not redis_client:
+        _async_popularity = AsyncQueryPopularityService(redis_client)
+    return _async_popularity
@@ -0,0 +1,338 @@
+"""Statistiche di prezzo per ricerca e categoria (sketch di quantili in Redis)."""
+
+import time
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Sequence
+import logging
+import redis
+import redis.asyncio as aioredis
+from fastapi import Depends
+
+from api.core.config import settings
+from api.core.dependencies import get_async_redis_client, mark_async_redis_unavailable
+from src.analysis.dedup import normalize_title
+from src.analysis.price_sketch import PriceSketch
+from src.analysis.scam import PriceStats
+
+
+logger = logging.getLogger(__name__)
+
+# Chiavi Redis: un hash bucket -> contatore per ricerca, categoria e giorno
+PRICE_STATS_KEY_PREFIX = "price_stats"
+
+# Quantili esposti dall'endpoint
+SUMMARY_QUANTILES = {
+    "p10": 0.10,
+    "p25": 0.25,
+    "p50": 0.50,
+    "p75": 0.75,
+    "p90": 0.90
+}
+
+_DAY = 86400
+
+# Registra i prezzi degli articoli non ancora contati nel giorno: il set
+# KEYS[2] contiene gli articoli già visti, così gli scraping ripetuti
+# (warmer, ricerche salvate) non pesano una ricerca per la sua frequenza
+_RECORD_SCRIPT = """
+local ttl = tonumber(ARGV[1])
+local recorded = 0
+for i = 2, #ARGV, 2 do
+    if redis.call('SADD', KEYS[2], ARGV[i]) == 1 then
+        redis.call('HINCRBY', KEYS[1], ARGV[i + 1], 1)
+        recorded = recorded + 1
+    end
+end
+if recorded > 0 then
+    redis.call('EXPIRE', KEYS[1], ttl)
+end
+redis.call('EXPIRE', KEYS[2], ttl)
+return recorded
+"""
+
+
+class _PriceStatsBase:
+    """
+    Chiavi e sketch condivisi da PriceStatsService e AsyncPriceStatsService.
+
+    Le due classi sono sorelle: qui restano solo le parti senza I/O.
+    """
+
+    def __init__(self, redis_client=None):
+        """
+        Inizializza il servizio.
+
+        Args:
+            redis_client: Client Redis, sincrono o asincrono (opzionale)
+        """
+        self.redis = redis_client
+        self.enabled = redis_client is not None and settings.PRICE_STATS_ENABLED
+        self.window_days = settings.PRICE_STATS_WINDOW_DAYS
+
+    @staticmethod
+    def _new_sketch() -> PriceSketch:
+        """Sketch con i parametri condivisi da tutti i worker."""
+        return PriceSketch(relative_accuracy=settings.PRICE_STATS_RELATIVE_ACCURACY)
+
+    @staticmethod
+    def stats_key(query: str, categoria: Optional[str] = None) -> str:
+        """
+        Chiave normalizzata di ricerca e categoria.
+
+        Args:
+            query: Query di ricerca
+            categoria: Categoria (opzionale)
+
+        Returns:
+            Chiave (es. "iphone 13|telefonia")
+        """
+        normalized = normalize_title(query) or query.strip().lower()
+        return f"{normalized}|{categoria or 'all'}"
+
+    def _day_keys(self, key: str, now: Optional[float] = None) -> List[str]:
+        """Chiavi Redis dei giorni nella finestra (il più recente per primo)."""
+        today = int((now or time.time()) // _DAY)
+        return [
+            f"{PRICE_STATS_KEY_PREFIX}:{key}:{day}"
+            for day in range(today, today - self.window_days, -1)
+        ]
+
+    def _queue_window(self, pipe, query: str, categoria: Optional[str]):
+        """Accoda su una pipeline la lettura degli hash dei giorni nella finestra."""
+        for day_key in self._day_keys(self.stats_key(query, categoria)):
+            pipe.hgetall(day_key)
+
+    def _summary(self, query: str, categoria: Optional[str], sketch: PriceSketch) -> Dict:
+        """Riepilogo (numero di prezzi e quantili) di uno sketch."""
+        values = sketch.quantiles(SUMMARY_QUANTILES.values())
+
+        return {
+            "query": query,
+            "categoria": categoria,
+            "count": sketch.count,
+            "window_days": self.window_days,
+            "relative_accuracy": sketch.relative_accuracy,
+            "quantiles": {
+                name: round(value, 2) if value is not None else None
+                for name, value in zip(SUMMARY_QUANTILES, values)
+            }
+        }
+
+
+class PriceStatsService(_PriceStatsBase):
+    """
+    Mantiene la distribuzione dei prezzi osservati per ricerca e categoria.
+
+    I prezzi di ogni scraping incrementano i bucket di uno sketch DDSketch
+    salvato come hash Redis giornaliero (HINCRBY, atomico e condiviso tra
+    worker). Le statistiche sono la somma degli ultimi
+    PRICE_STATS_WINDOW_DAYS giorni; i giorni più vecchi scadono da soli,
+    quindi la memoria resta limitata a pochi bucket per chiave e giorno.
+    """
+
+    def __init__(self, redis_client: Optional[redis.Redis] = None):
+        """
+        Inizializza il servizio.
+
+        Args:
+            redis_client: Client Redis (opzionale)
+        """
+        super().__init__(redis_client)
+        self._record_script = (
+            self.redis.register_script(_RECORD_SCRIPT) if self.enabled else None
+        )
+
+    def record(
+        self,
+        query: str,
+        categoria: Optional[str],
+        prices: Iterable[Optional[float]],
+        item_ids: Optional[Sequence[str]] = None
+    ) -> int:
+        """
+        Aggiunge i prezzi di uno scraping alle statistiche.
+
+        Con ``item_ids`` ogni articolo viene contato al massimo una volta
+        al giorno: riscraping della stessa ricerca non ripetono i prezzi.
+
+        Args:
+            query: Query di ricerca
+            categoria: Categoria (opzionale)
+            prices: Prezzi estratti (None e valori non positivi ignorati)
+            item_ids: Identificativi degli articoli, nello stesso ordine
+                dei prezzi (opzionale)
+
+        Returns:
+            Numero di prezzi registrati
+        """
+        if not self.enabled:
+            return 0
+
+        sketch = self._new_sketch()
+        day_key = self._day_keys(self.stats_key(query, categoria))[0]
+
+        if item_ids is not None:
+            args = [(self.window_days + 1) * _DAY]
+            for item_id, price in zip(item_ids, prices):
+                if price and price > 0:
+                    args.extend((item_id, sketch.bucket(price)))
+            if len(args) == 1:
+                return 0
+            try:
+                return int(self._record_script(keys=[day_key, f"{day_key}:seen"], args=args))
+            except Exception as e:
+                logger.error("Errore aggiornamento statistiche prezzo: %s", e)
+                return 0
+
+        buckets = Counter(sketch.bucket(p) for p in prices if p and p > 0)
+        if not buckets:
+            return 0
+
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            for index, count in buckets.items():
+                pipe.hincrby(day_key, index, count)
+            pipe.expire(day_key, (self.window_days + 1) * _DAY)
+            pipe.execute()
+            return sum(buckets.values())
+        except Exception as e:
+            logger.error("Errore aggiornamento statistiche prezzo: %s", e)
+            return 0
+
+    def get_sketch(self, query: str, categoria: Optional[str] = None) -> PriceSketch:
+        """
+        Restituisce lo sketch dei prezzi nella finestra.
+
+        Args:
+            query: Query di ricerca
+            categoria: Categoria (opzionale)
+
+        Returns:
+            PriceSketch (vuoto se non ci sono dati)
+        """
+        sketch = self._new_sketch()
+        if not self.enabled:
+            return sketch
+
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            self._queue_window(pipe, query, categoria)
+            for bins in pipe.execute():
+                sketch.merge_bins(bins)
+        except Exception as e:
+            logger.error("Errore lettura statistiche prezzo: %s", e)
+
+        return sketch
+
+    def get_summary(self, query: str, categoria: Optional[str] = None) -> Dict:
+        """
+        Riepilogo dei prezzi tipici di una ricerca.
+
+        Args:
+            query: Query di ricerca
+            categoria: Categoria (opzionale)
+
+        Returns:
+            Dict con numero di prezzi e quantili
+        """
+        return self._summary(query, categoria, self.get_sketch(query, categoria))
+
+    def get_reference(self, query: str, categoria: Optional[str] = None) -> Optional[PriceStats]:
+        """
+        Prezzo tipico della ricerca per il punteggio di rischio.
+
+        La MAD è stimata come metà dello scarto interquartile.
+
+        Args:
+            query: Query di ricerca
+            categoria: Categoria (opzionale)
+
+        Returns:
+            PriceStats, o None se i prezzi osservati sono troppo pochi
+        """
+        return self._reference(self.get_sketch(query, categoria))
+
+    @staticmethod
+    def _reference(sketch: PriceSketch) -> Optional[PriceStats]:
+        """Mediana e MAD stimate da uno sketch (None se troppo pochi prezzi)."""
+        if sketch.count < settings.PRICE_STATS_MIN_COUNT:
+            return None
+
+        p25, p50, p75 = sketch.quantiles([0.25, 0.5, 0.75])
+        mad = (p75 - p25) / 2
+        if mad <= 0:
+            return None
+
+        return PriceStats(median=p50, mad=mad)
+
+
+class AsyncPriceStatsService(_PriceStatsBase):
+    """
+    Lettura delle statistiche di prezzo per le route asincrone (redis.asyncio).
+
+    Stesse chiavi di PriceStatsService, ma i metodi vanno attesi con await:
+    la pipeline con gli hash dei giorni della finestra non blocca l'event
+    loop. La registrazione dei prezzi resta sincrona, nel thread dello
+    scraping (PriceStatsService.record).
+    """
+
+    def __init__(self, redis_client: Optional[aioredis.Redis] = None):
+        """
+        Inizializza il servizio.
+
+        Args:
+            redis_client: Client Redis asincrono (opzionale)
+        """
+        super().__init__(redis_client)
+
+    async def get_sketch(self, query: str, categoria: Optional[str] = None) -> PriceSketch:
+        """
+        Restituisce lo sketch dei prezzi nella finestra.
+
+        Args:
+            query: Query di ricerca
+            categoria: Categoria (opzionale)
+
+        Returns:
+            PriceSketch (vuoto se non ci sono dati)
+        """
+        sketch = self._new_sketch()
+        if not self.enabled:
+            return sketch
+
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            self._queue_window(pipe, query, categoria)
+            for bins in await pipe.execute():
+                sketch.merge_bins(bins)
+        except Exception as e:
+            logger.error("Errore lettura statistiche prezzo: %s", e)
+            if isinstance(e, (redis.ConnectionError, redis.TimeoutError)):
+                mark_async_redis_unavailable(e)
+
+        return sketch
+
+    async def get_summary(self, query: str, categoria: Optional[str] = None) -> Dict:
+        """
+        Riepilogo dei prezzi tipici di una ricerca.
+
+        Args:
+            query: Query di ricerca
+            categoria: Categoria (opzionale)
+
+        Returns:
+            Dict con numero di prezzi e quantili
+        """
+        return self._summary(query, categoria, await self.get_sketch(query, categoria))
+
+
+def get_async_price_stats_service(
+    redis_client: Optional[aioredis.Redis] = Depends(get_async_redis_client)
+) -> AsyncPriceStatsService:
+    """
+    Dependency per ottenere il servizio statistiche di prezzo asincrono.
+
+    Returns:
+        AsyncPriceStatsService instance
+    """
+    return AsyncPriceStatsService(redis_client)
@@ -0,0 +1,309 @@
+"""Profiling dei worker in produzione (campionamento e cProfile)."""
+
+import cProfile
+import io
+import os
+import pstats
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, deque
+from datetime import datetime
+from pathlib import Path
+from typing import Deque, Dict, List, Optional
+import logging
+
+from api.core.config import settings
+
+
+logger = logging.getLogger(__name__)
+
+
+class ProfilerBusyError(RuntimeError):
+    """Un profilo è già in corso nel worker."""
+
+
+class SamplingProfiler:
+    """
+    Profiler a campionamento dell'intero processo.
+
+    Un thread di servizio legge a intervalli regolari lo stack di tutti
+    gli altri thread (sys._current_frames) e conta gli stack uguali. Non
+    usa hook di tracing, quindi il costo per il worker è solo quello del
+    campionamento (circa 1% a 100 Hz) e può girare in produzione.
+    Il risultato è nel formato "collapsed stack" di flamegraph.pl,
+    speedscope e inferno: una riga "frame;frame;frame conteggio".
+    """
+
+    def __init__(self, interval: float = 0.01):
+        """
+        Inizializza il profiler.
+
+        Args:
+            interval: Secondi tra due campioni
+        """
+        self.interval = interval
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _frame_label(frame) -> str:
+        """Etichetta di un frame: funzione (file:riga di definizione)."""
+        code = frame.f_code
+        return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+    def _sample(self, counts: Counter, thread_names: Dict[int, str], own_ident: int):
+        """Aggiunge un campione dello stack di ogni thread."""
+        for ident, frame in sys._current_frames().items():
+            if ident == own_ident:
+                continue
+
+            stack = []
+            while frame is not None:
+                stack.append(self._frame_label(frame))
+                frame = frame.f_back
+            stack.append(thread_names.get(ident, f"thread-{ident}"))
+            stack.reverse()
+
+            counts[";".join(stack)] += 1
+
+    def profile(self, seconds: float) -> Counter:
+        """
+        Campiona il processo per la durata indicata (bloccante).
+
+        Args:
+            seconds: Durata del profilo
+
+        Returns:
+            Counter stack collassato -> numero di campioni
+
+        Raises:
+            ProfilerBusyError: Se un altro profilo è in corso
+        """
+        if not self._lock.acquire(blocking=False):
+            raise ProfilerBusyError("Profilo già in corso")
+
+        try:
+            counts: Counter = Counter()
+            own_ident = threading.get_ident()
+            deadline = time.monotonic() + seconds
+            next_names_refresh = 0.0
+            thread_names: Dict[int, str] = {}
+
+            while True:
+                now = time.monotonic()
+                if now >= deadline:
+                    break
+                # I nomi dei thread cambiano di rado: aggiornati una volta al secondo
+                if now >= next_names_refresh:
+                    thread_names = {t.ident: t.name for t in threading.enumerate()}
+                    next_names_refresh = now + 1.0
+
+                self._sample(counts, thread_names, own_ident)
+                time.sleep(self.interval)
+
+            return counts
+        finally:
+            self._lock.release()
+
+    def is_running(self) -> bool:
+        """True se un profilo è in corso."""
+        return self._lock.locked()
+
+    @staticmethod
+    def collapse(counts: Counter) -> str:
+        """
+        Serializza i campioni in formato collapsed stack.
+
+        Args:
+            counts: Risultato di profile()
+
+        Returns:
+            Testo con una riga "stack conteggio" per stack
+        """
+        return "".join(f"{stack} {count}\n" for stack, count in counts.most_common())
+
+    def profile_to_file(self, seconds: float, output_dir: str) -> Optional[Path]:
+        """
+        Esegue un profilo e lo salva su file.
+
+        Args:
+            seconds: Durata del profilo
+            output_dir: Directory di destinazione
+
+        Returns:
+            Path del file, o None se un profilo era già in corso
+        """
+        try:
+            counts = self.profile(seconds)
+        except ProfilerBusyError:
+            logger.warning("Profilo richiesto via segnale ignorato: profilo già in corso")
+            return None
+
+        path = Path(output_dir)
+        path.mkdir(parents=True, exist_ok=True)
+        filename = path / f"profile-{os.getpid()}-{datetime.now():%Y%m%d-%H%M%S}.folded"
+        filename.write_text(self.collapse(counts), encoding="utf-8")
+
+        logger.info("Profilo salvato: %s (%s campioni)", filename, sum(counts.values()))
+        return filename
+
+
+class SlowRequestLog:
+    """
+    Ultimi profili cProfile delle richieste lente.
+
+    Un solo profilo cProfile per volta è attivo nel worker (gli hook di
+    profiling sono per thread e si sostituiscono), quindi le richieste
+    concorrenti a quella profilata non vengono misurate. Nel profilo
+    compaiono anche le altre coroutine eseguite nel frattempo dallo
+    stesso event loop.
+    """
+
+    def __init__(self, threshold_ms: float, sample_rate: float = 1.0, keep: int = 20):
+        """
+        Inizializza il registro.
+
+        Args:
+            threshold_ms: Durata minima per salvare il profilo
+            sample_rate: Frazione di richieste profilate (0-1)
+            keep: Profili conservati in memoria
+        """
+        self.threshold_ms = threshold_ms
+        self.sample_rate = sample_rate
+        self._entries: Deque[Dict] = deque(maxlen=keep)
+        self._active = threading.Lock()
+
+    def try_start(self) -> Optional[cProfile.Profile]:
+        """
+        Avvia cProfile per una richiesta, se nessun altro profilo è attivo.
+
+        Returns:
+            Profile avviato, o None se la richiesta non va profilata
+        """
+        if self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+            return None
+        if not self._active.acquire(blocking=False):
+            return None
+
+        profile = cProfile.Profile()
+        profile.enable()
+        return profile
+
+    def finish(self, profile: cProfile.Profile, method: str, path: str, duration_ms: float):
+        """
+        Ferma cProfile e conserva le statistiche se la richiesta è lenta.
+
+        Args:
+            profile: Profile avviato con try_start
+            method: Metodo HTTP
+            path: Path della richiesta
+            duration_ms: Durata della richiesta
+        """
+        profile.disable()
+        self._active.release()
+
+        if duration_ms < self.threshold_ms:
+            return
+
+        stream = io.StringIO()
+        stats = pstats.Stats(profile, stream=stream)
+        stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(40)
+
+        entry = {
+            "profile_id": uuid.uuid4().hex[:12],
+            "method": method,
+            "path": path,
+            "duration_ms": round(duration_ms, 2),
+            "captured_at": datetime.now().isoformat(),
+            "stats": stream.getvalue()
+        }
+        self._entries.append(entry)
+
+        logger.warning(
+            "Richiesta lenta %s %s: %.0fms (profilo %s)",
+            method, path, duration_ms, entry['profile_id']
+        )
+
+    def list(self) -> List[Dict]:
+        """Profili conservati, il più recente per primo (senza statistiche)."""
+        return [
+            {key: value for key, value in entry.items() if key != "stats"}
+            for entry in reversed(self._entries)
+        ]
+
+    def get(self, profile_id: str) -> Optional[Dict]:
+        """Profilo con le statistiche cProfile, o None se non presente."""
+        for entry in self._entries:
+            if entry["profile_id"] == profile_id:
+                return entry
+        return None
+
+
+# Istanze globali del worker
+_sampling_profiler: Optional[SamplingProfiler] = None
+_slow_request_log: Optional[SlowRequestLog] = None
+
+
+def get_sampling_profiler() -> SamplingProfiler:
+    """
+    Restituisce il profiler a campionamento del worker.
+
+    Returns:
+        SamplingProfiler instance
+    """
+    global _sampling_profiler
+    if _sampling_profiler is None:
+        _sampling_profiler = SamplingProfiler(interval=settings.PROFILER_INTERVAL_MS / 1000)
+    return _sampling_profiler
+
+
+def get_slow_request_log() -> SlowRequestLog:
+    """
+    Restituisce il registro dei profili delle richieste lente.
+
+    Returns:
+        SlowRequestLog instance
+    """
+    global _slow_request_log
+    if _slow_request_log is None:
+        _slow_request_log = SlowRequestLog(
+            threshold_ms=settings.PROFILER_SLOW_REQUEST_MS,
+            sample_rate=settings.PROFILER_SLOW_SAMPLE_RATE,
+            keep=settings.PROFILER_SLOW_KEEP
+        )
+    return _slow_request_log
+
+
+def install_signal_handler(signum: int, seconds: float, output_dir: str):
+    """
+    Avvia un profilo a campionamento alla ricezione di un segnale.
+
+    Il profilo gira in un thread separato e viene salvato in output_dir
+    (es. kill -USR1 <pid> su un worker bloccato o lento).
+
+    Args:
+        signum: Segnale (es. signal.SIGUSR1)
+        seconds: Durata del profilo
+        output_dir: Directory dei file .folded
+    """
+    import signal
+
+    def _handler(received, frame):
+        logger.info("Segnale %s ricevuto: profilo di %ss", received, seconds)
+        threading.Thread(
+            target=get_sampling_profiler().profile_to_file,
+            args=(seconds, output_dir),
+            name="signal-profiler",
+            daemon=True
+        ).start()
+
+    try:
+        signal.signal(signum, _handler)
+    except ValueError:
+        # signal.signal funziona solo nel thread principale
+        logger.warning("Profiling su segnale non attivato: avvio fuori dal thread principale")
+        return
+
+    logger.info("Profiling su segnale %s attivo (output: %s)", signum, output_dir)
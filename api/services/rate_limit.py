@@ -0,0 +1,505 @@
+"""Rate limiting delle richieste API con GCRA (in memoria o in Redis)."""
+
+import math
+import threading
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+import logging
+import redis.asyncio as aioredis
+from fastapi import Request
+
+from api.core.config import settings
+from api.core.dependencies import get_async_redis_client
+from api.core.workers import is_multi_worker
+
+
+logger = logging.getLogger(__name__)
+
+# Prefisso delle chiavi Redis (una chiave per client, scade da sola)
+RATE_LIMIT_KEY_PREFIX = "ratelimit"
+
+# Margine (secondi) nel confronto GCRA: (now + period) - period può superare
+# now per un arrotondamento e rifiutare una richiesta che usa esattamente
+# tutto il budget
+_GCRA_TOLERANCE = 1e-6
+
+# GCRA atomico: legge il TAT del client, decide e salva il nuovo TAT con
+# scadenza pari al tempo necessario a tornare "a riposo"
+_GCRA_SCRIPT = """
+local now = tonumber(ARGV[1])
+local interval = tonumber(ARGV[2])
+local period = tonumber(ARGV[3])
+local cost = tonumber(ARGV[4])
+local tat = tonumber(redis.call('GET', KEYS[1])) or now
+if tat < now then
+    tat = now
+end
+local new_tat = tat + cost * interval
+-- Attesa calcolata relativa a now (tolleranza come _GCRA_TOLERANCE)
+local wait = (tat - now) + cost * interval - period
+if wait > 1e-6 then
+    return {0, tostring(wait), tostring(tat - now)}
+end
+redis.call('SET', KEYS[1], tostring(new_tat), 'PX', math.ceil((new_tat - now) * 1000))
+return {1, '0', tostring(new_tat - now)}
+"""
+
+# Restituisce unità già consumate (es. risposta servita dalla cache)
+_REFUND_SCRIPT = """
+local now = tonumber(ARGV[1])
+local amount = tonumber(ARGV[2])
+local tat = tonumber(redis.call('GET', KEYS[1]))
+if not tat then
+    return 0
+end
+local new_tat = tat - amount
+if new_tat <= now then
+    redis.call('DEL', KEYS[1])
+else
+    redis.call('SET', KEYS[1], tostring(new_tat), 'PX', math.ceil((new_tat - now) * 1000))
+end
+return 1
+"""
+
+
+@dataclass
+class RateLimitResult:
+    """Esito di un controllo di rate limit."""
+
+    allowed: bool
+    limit: int
+    remaining: int
+    retry_after: float  # Secondi prima che la richiesta sia accettata (0 se accettata)
+    reset_after: float  # Secondi prima che il client torni al limite pieno
+
+
+def rate_limit_headers(result: RateLimitResult) -> Dict[str, str]:
+    """
+    Header X-RateLimit-* di un esito (con Retry-After se rifiutato).
+
+    Args:
+        result: Esito del controllo
+
+    Returns:
+        Dict nome -> valore
+    """
+    headers = {
+        "X-RateLimit-Limit": str(result.limit),
+        "X-RateLimit-Remaining": str(result.remaining if result.allowed else 0),
+        "X-RateLimit-Reset": str(int(time.time() + math.ceil(result.reset_after)))
+    }
+    if not result.allowed:
+        headers["Retry-After"] = str(math.ceil(result.retry_after))
+    return headers
+
+
+def rate_limit_exceeded_body(result: RateLimitResult, period: float, message: str) -> Dict:
+    """
+    Corpo della risposta 429, uguale per middleware ed endpoint.
+
+    Args:
+        result: Esito del controllo (rifiutato)
+        period: Periodo del limite in secondi
+        message: Messaggio; ``{retry_after}`` viene sostituito con i secondi di attesa
+
+    Returns:
+        Dict da serializzare in JSON
+    """
+    retry_after = math.ceil(result.retry_after)
+    return {
+        "error": "RateLimitExceeded",
+        "message": message.format(retry_after=retry_after),
+        "retry_after": retry_after,
+        "limit": result.limit,
+        "period": period
+    }
+
+
+class GCRALimiter:
+    """
+    Rate limiter GCRA (Generic Cell Rate Algorithm) in memoria.
+
+    Equivale a una finestra scorrevole di ``requests`` unità in
+    ``period`` secondi, ma per ogni client conserva un solo numero: il
+    TAT (theoretical arrival time), cioè l'istante in cui il client
+    tornerebbe a riposo. Controllo e aggiornamento sono O(1); i client
+    con TAT nel passato sono indistinguibili da client nuovi e vengono
+    rimossi periodicamente.
+
+    Una richiesta può consumare più unità (``cost``) e le unità non usate
+    possono essere restituite (``refund``). Singoli client possono avere
+    un budget diverso da quello predefinito.
+
+    hit, refund e clear sono coroutine (come in RedisGCRALimiter), ma
+    in memoria non attendono nulla: il controllo resta sull'event loop.
+    """
+
+    def __init__(
+        self,
+        requests: int,
+        period: float,
+        budgets: Optional[Dict[str, int]] = None
+    ):
+        """
+        Inizializza il limiter.
+
+        Args:
+            requests: Unità consentite nel periodo (anche a raffica)
+            period: Periodo in secondi
+            budgets: Budget per client, in unità per periodo (opzionale)
+        """
+        self.requests = requests
+        self.period = float(period)
+        self.budgets = dict(budgets or {})
+        self._tat: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._next_sweep = time.monotonic() + self.period
+
+    def limit_for(self, key: str) -> int:
+        """Budget del client in unità per periodo."""
+        return self.budgets.get(key, self.requests)
+
+    def _result(
+        self,
+        key: str,
+        allowed: bool,
+        tat_after: float,
+        now: float,
+        retry_after: float
+    ) -> RateLimitResult:
+        """Costruisce l'esito a partire dal TAT risultante."""
+        limit = self.limit_for(key)
+        reset_after = max(0.0, tat_after - now)
+        remaining = int((self.period - reset_after) * limit / self.period + 1e-9)
+        return RateLimitResult(
+            allowed=allowed,
+            limit=limit,
+            remaining=max(0, min(limit, remaining)),
+            retry_after=retry_after,
+            reset_after=reset_after
+        )
+
+    def _sweep(self, now: float):
+        """Rimuove i client tornati a riposo (chiamato al massimo una volta per periodo)."""
+        idle = [key for key, tat in self._tat.items() if tat <= now]
+        for key in idle:
+            del self._tat[key]
+        self._next_sweep = now + self.period
+
+    async def hit(self, key: str, cost: float = 1) -> RateLimitResult:
+        """
+        Registra una richiesta se il client è entro il limite.
+
+        Args:
+            key: Identificativo del client
+            cost: Unità consumate dalla richiesta
+
+        Returns:
+            RateLimitResult
+        """
+        return self._hit_local(key, cost)
+
+    async def refund(self, key: str, cost: float):
+        """
+        Restituisce unità consumate da una richiesta.
+
+        Args:
+            key: Identificativo del client
+            cost: Unità da restituire
+        """
+        self._refund_local(key, cost)
+
+    async def clear(self, key: Optional[str] = None):
+        """
+        Azzera lo stato di un client (o di tutti).
+
+        Args:
+            key: Identificativo del client (None = tutti)
+        """
+        self._clear_local(key)
+
+    def _hit_local(self, key: str, cost: float) -> RateLimitResult:
+        """Controllo GCRA sullo stato in memoria."""
+        now = time.monotonic()
+
+        with self._lock:
+            if now >= self._next_sweep:
+                self._sweep(now)
+
+            tat = max(self._tat.get(key, now), now)
+            increment = cost * self.period / self.limit_for(key)
+            new_tat = tat + increment
+            wait = (tat - now) + increment - self.period
+
+            if wait > _GCRA_TOLERANCE:
+                return self._result(key, False, tat, now, wait)
+
+            self._tat[key] = new_tat
+            return self._result(key, True, new_tat, now, 0.0)
+
+    def _refund_local(self, key: str, cost: float):
+        """Restituzione di unità sullo stato in memoria."""
+        now = time.monotonic()
+
+        with self._lock:
+            tat = self._tat.get(key)
+            if tat is None:
+                return
+            new_tat = tat - cost * self.period / self.limit_for(key)
+            if new_tat <= now:
+                del self._tat[key]
+            else:
+                self._tat[key] = new_tat
+
+    def _clear_local(self, key: Optional[str]):
+        """Azzera lo stato in memoria di un client (o di tutti)."""
+        with self._lock:
+            if key is None:
+                self._tat.clear()
+            else:
+                self._tat.pop(key, None)
+
+    def tracked_clients(self) -> int:
+        """Numero di client con stato in memoria."""
+        return len(self._tat)
+
+
+class RedisGCRALimiter(GCRALimiter):
+    """
+    GCRA con stato in Redis, condiviso da tutti i worker.
+
+    Ogni client è una chiave con il proprio TAT e scadenza automatica;
+    lettura, decisione e scrittura avvengono in uno script Lua atomico,
+    eseguito sul pool Redis asincrono (vedi init_async_redis) senza
+    bloccare l'event loop. Gli script sono registrati una volta sola.
+    Se Redis non è disponibile si usa lo stato in memoria del worker.
+    """
+
+    def __init__(
+        self,
+        get_client: Callable[[], Awaitable[Optional[aioredis.Redis]]],
+        requests: int,
+        period: float,
+        budgets: Optional[Dict[str, int]] = None
+    ):
+        """
+        Inizializza il limiter (senza connettersi a Redis).
+
+        Args:
+            get_client: Coroutine che restituisce il client Redis asincrono
+                (o None se Redis non è disponibile)
+            requests: Unità consentite nel periodo
+            period: Periodo in secondi
+            budgets: Budget per client, in unità per periodo (opzionale)
+        """
+        super().__init__(requests, period, budgets)
+        self.get_client = get_client
+        self._script = None
+        self._refund_script = None
+
+    async def _client(self) -> Optional[aioredis.Redis]:
+        """Client Redis asincrono, registrando gli script al primo utilizzo."""
+        client = await self.get_client()
+        if client is not None and self._script is None:
+            # register_script non contatta Redis: SHA calcolato in locale
+            self._script = client.register_script(_GCRA_SCRIPT)
+            self._refund_script = client.register_script(_REFUND_SCRIPT)
+        return client
+
+    async def hit(self, key: str, cost: float = 1) -> RateLimitResult:
+        """
+        Registra una richiesta se il client è entro il limite.
+
+        Args:
+            key: Identificativo del client
+            cost: Unità consumate dalla richiesta
+
+        Returns:
+            RateLimitResult
+        """
+        # Tempo reale (non monotonic): deve essere confrontabile tra worker
+        now = time.time()
+
+        try:
+            client = await self._client()
+            if client is None:
+                return self._hit_local(key, cost)
+            allowed, retry_after, reset_after = await self._script(
+                keys=[f"{RATE_LIMIT_KEY_PREFIX}:{key}"],
+                args=[now, self.period / self.limit_for(key), self.period, cost],
+                client=client
+            )
+        except Exception as e:
+            logger.warning("Rate limit Redis non disponibile, uso memoria locale: %s", e)
+            return self._hit_local(key, cost)
+
+        return self._result(
+            key, bool(int(allowed)), now + float(reset_after), now, float(retry_after)
+        )
+
+    async def refund(self, key: str, cost: float):
+        """
+        Restituisce unità consumate da una richiesta.
+
+        Args:
+            key: Identificativo del client
+            cost: Unità da restituire
+        """
+        try:
+            client = await self._client()
+            if client is None:
+                self._refund_local(key, cost)
+                return
+            await self._refund_script(
+                keys=[f"{RATE_LIMIT_KEY_PREFIX}:{key}"],
+                args=[time.time(), cost * self.period / self.limit_for(key)],
+                client=client
+            )
+        except Exception as e:
+            logger.warning("Rate limit Redis non disponibile, uso memoria locale: %s", e)
+            self._refund_local(key, cost)
+
+    async def clear(self, key: Optional[str] = None):
+        """
+        Azzera lo stato di un client (o di tutti).
+
+        Args:
+            key: Identificativo del client (None = tutti)
+        """
+        self._clear_local(key)
+        try:
+            client = await self._client()
+            if client is None:
+                return
+            if key is not None:
+                await client.delete(f"{RATE_LIMIT_KEY_PREFIX}:{key}")
+            else:
+                async for redis_key in client.scan_iter(f"{RATE_LIMIT_KEY_PREFIX}:*"):
+                    await client.delete(redis_key)
+        except Exception as e:
+            logger.error("Errore pulizia rate limit Redis: %s", e)
+
+
+def create_rate_limiter(requests: int, period: float) -> GCRALimiter:
+    """
+    Crea il rate limiter configurato con RATE_LIMIT_BACKEND.
+
+    Con più worker (SERVER_WORKERS > 1) lo stato è sempre in Redis:
+    limiti in memoria varrebbero per ogni worker, moltiplicando il
+    limite effettivo per il numero di processi. Non apre connessioni:
+    il limiter Redis usa il pool asincrono creato all'avvio.
+
+    Args:
+        requests: Unità consentite nel periodo
+        period: Periodo in secondi
+
+    Returns:
+        GCRALimiter (in memoria) o RedisGCRALimiter
+    """
+    budgets = settings.RATE_LIMIT_CLIENT_BUDGETS
+
+    if settings.RATE_LIMIT_BACKEND == "redis" or is_multi_worker():
+        logger.info("Rate limiting condiviso tra worker (Redis)")
+        return RedisGCRALimiter(get_async_redis_client, requests, period, budgets)
+
+    return GCRALimiter(requests, period, budgets)
+
+
+def expected_downloads(
+    platforms: int,
+    max_pages: int,
+    details: bool = False
+) -> Tuple[int, int]:
+    """
+    Pagine scaricate dai siti, al massimo, da una ricerca.
+
+    Args:
+        platforms: Piattaforme interrogate
+        max_pages: Pagine per piattaforma
+        details: Se vengono scaricate anche le pagine di dettaglio
+
+    Returns:
+        Tupla (pagine di risultati, pagine di dettaglio)
+    """
+    return platforms * max_pages, settings.ENRICH_MAX_LISTINGS if details else 0
+
+
+def estimate_search_cost(
+    platforms: int,
+    max_pages: int,
+    details: bool = False
+) -> float:
+    """
+    Stima il costo di una ricerca in unità di rate limit.
+
+    Il costo è il numero atteso di pagine scaricate dai siti: una ricerca
+    su una piattaforma e una pagina costa quanto una richiesta semplice,
+    una su tutte le piattaforme con 5 pagine dieci volte tanto.
+
+    Args:
+        platforms: Piattaforme interrogate
+        max_pages: Pagine per piattaforma
+        details: Se vengono scaricate anche le pagine di dettaglio
+
+    Returns:
+        Unità da addebitare (almeno 1)
+    """
+    pages, detail_pages = expected_downloads(platforms, max_pages, details)
+    cost = (
+        pages * settings.RATE_LIMIT_COST_PER_PAGE
+        + detail_pages * settings.RATE_LIMIT_COST_PER_DETAIL
+    )
+    return max(1.0, cost)
+
+
+def _extra_cost(limiter: GCRALimiter, client: str, cost: float) -> float:
+    """
+    Unità da addebitare oltre a quella del middleware.
+
+    Il costo è limitato al budget del client: una richiesta che costa più
+    dell'intero budget non verrebbe mai ammessa da GCRA (e il suo
+    Retry-After non potrebbe mai essere rispettato).
+    """
+    return min(cost, limiter.limit_for(client)) - 1
+
+
+async def charge_request(request: Request, cost: float) -> Optional[RateLimitResult]:
+    """
+    Addebita unità aggiuntive al client di una richiesta.
+
+    Il middleware ha già addebitato 1 unità: qui si addebita la
+    differenza tra ``cost`` (al massimo il budget del client) e 1.
+
+    Args:
+        request: Request FastAPI
+        cost: Costo totale della richiesta
+
+    Returns:
+        RateLimitResult, o None se il rate limiting non è attivo
+    """
+    limiter = getattr(request.state, 'rate_limiter', None)
+    if limiter is None:
+        return None
+    client = request.state.rate_limit_client
+    extra = _extra_cost(limiter, client, cost)
+    if extra <= 0:
+        return None
+    return await limiter.hit(client, extra)
+
+
+async def refund_request(request: Request, cost: float):
+    """
+    Restituisce le unità aggiuntive addebitate con charge_request.
+
+    Args:
+        request: Request FastAPI
+        cost: Costo totale addebitato
+    """
+    limiter = getattr(request.state, 'rate_limiter', None)
+    if limiter is None:
+        return
+    client = request.state.rate_limit_client
+    extra = _extra_cost(limiter, client, cost)
+    if extra > 0:
+        await limiter.refund(client, extra)
@@ -0,0 +1,976 @@
+"""Archivi persistenti per le segnalazioni (SQLite e journal append-only)."""
+
+import bisect
+import json
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+from pathlib import Path
+from urllib.parse import urlsplit
+import logging
+
+try:
+    import fcntl
+except ImportError:  # Windows: lock tra processi non disponibile
+    fcntl = None
+
+from api.core.config import settings
+from src.utils.bloom import BloomFilter
+
+
+logger = logging.getLogger(__name__)
+
+# Campi di una segnalazione, nell'ordine delle colonne SQLite
+REPORT_FIELDS = (
+    "report_id",
+    "listing_id",
+    "listing_url",
+    "reason",
+    "reporter_email",
+    "additional_info",
+    "status",
+    "created_at",
+    "updated_at"
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS reports (
+    report_id TEXT PRIMARY KEY,
+    listing_id TEXT NOT NULL,
+    listing_url TEXT,
+    reason TEXT,
+    reporter_email TEXT,
+    additional_info TEXT,
+    status TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    seq INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_reports_listing ON reports (listing_id);
+CREATE INDEX IF NOT EXISTS idx_reports_created ON reports (created_at, report_id);
+CREATE INDEX IF NOT EXISTS idx_reports_status_created ON reports (status, created_at, report_id);
+CREATE TABLE IF NOT EXISTS migrations (
+    name TEXT PRIMARY KEY,
+    applied_at TEXT NOT NULL
+);
+"""
+
+# Creato dopo l'eventuale aggiunta della colonna seq ai database esistenti
+_SEQ_INDEX = "CREATE INDEX IF NOT EXISTS idx_reports_seq ON reports (seq)"
+
+# Nome della migrazione dal vecchio file JSON
+_JSON_MIGRATION = "import_reports_json"
+
+
+# Chiave di ordinamento temporale di una segnalazione
+ReportKey = Tuple[str, str]  # (created_at, report_id)
+
+
+def _insert_sorted(keys: List[ReportKey], key: ReportKey):
+    """Inserisce una chiave mantenendo l'ordine (append nel caso comune)."""
+    if not keys or key >= keys[-1]:
+        keys.append(key)
+    else:
+        bisect.insort(keys, key)
+
+
+def _remove_sorted(keys: List[ReportKey], key: ReportKey):
+    """Rimuove una chiave da una lista ordinata (ricerca binaria)."""
+    i = bisect.bisect_left(keys, key)
+    if i < len(keys) and keys[i] == key:
+        del keys[i]
+
+
+def normalize_listing_url(url: Optional[str]) -> Optional[str]:
+    """
+    Normalizza l'URL di un annuncio (host minuscolo, senza query né frammento).
+
+    Args:
+        url: URL dell'annuncio
+
+    Returns:
+        URL normalizzato o None
+    """
+    if not url:
+        return None
+    parts = urlsplit(url.strip())
+    if not parts.netloc:
+        return None
+    host = parts.netloc.lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    return f"{host}{parts.path.rstrip('/')}"
+
+
+class ReportedListings:
+    """
+    Annunci segnalati, per ID e per URL.
+
+    Un bloom filter scarta con pochi byte per elemento gli annunci mai
+    segnalati (la quasi totalità dei risultati di una ricerca); solo i
+    positivi consultano i contatori esatti, che eliminano i falsi positivi.
+    Quando gli elementi superano la capacità il filtro viene ricostruito
+    dai contatori con capacità doppia (costo ammortizzato O(1)).
+    """
+
+    def __init__(self, capacity: int = 1024, error_rate: float = 0.01):
+        """
+        Inizializza l'insieme.
+
+        Args:
+            capacity: Capacità iniziale del bloom filter
+            error_rate: Probabilità di falso positivo del bloom filter
+        """
+        self._error_rate = error_rate
+        self._bloom = BloomFilter(capacity, error_rate)
+        self._counts: Dict[str, int] = {}
+
+    def _add_key(self, key: str):
+        """Incrementa il contatore di una chiave."""
+        if key not in self._counts:
+            self._counts[key] = 0
+            self._bloom.add(key)
+            if self._bloom.is_full():
+                self._rebuild()
+        self._counts[key] += 1
+
+    def _rebuild(self):
+        """Ricostruisce il bloom filter con capacità doppia."""
+        self._bloom = BloomFilter(self._bloom.capacity * 2, self._error_rate)
+        for key in self._counts:
+            self._bloom.add(key)
+
+    def add(self, listing_id: Optional[str], listing_url: Optional[str]):
+        """
+        Registra una segnalazione.
+
+        Args:
+            listing_id: ID dell'annuncio
+            listing_url: URL dell'annuncio
+        """
+        if listing_id:
+            self._add_key(f"id:{listing_id}")
+        url = normalize_listing_url(listing_url)
+        if url:
+            self._add_key(f"url:{url}")
+
+    def _lookup(self, key: str) -> int:
+        """Contatore di una chiave (0 senza toccare il dict se il filtro la esclude)."""
+        if key not in self._bloom:
+            return 0
+        return self._counts.get(key, 0)
+
+    def count(self, listing_id: Optional[str], listing_url: Optional[str] = None) -> int:
+        """
+        Numero di segnalazioni di un annuncio.
+
+        Le segnalazioni fatte con l'ID e quelle fatte con l'URL sono
+        spesso le stesse: si restituisce il maggiore dei due conteggi.
+
+        Args:
+            listing_id: ID dell'annuncio
+            listing_url: URL dell'annuncio (opzionale)
+
+        Returns:
+            Numero di segnalazioni
+        """
+        by_id = self._lookup(f"id:{listing_id}") if listing_id else 0
+        url = normalize_listing_url(listing_url)
+        by_url = self._lookup(f"url:{url}") if url else 0
+        return max(by_id, by_url)
+
+
+class ReportIndex:
+    """
+    Indici secondari in memoria e contatori delle segnalazioni.
+
+    Mantiene una lista ordinata per (created_at, report_id), una per ogni
+    status, le segnalazioni per annuncio, i conteggi per status e gli
+    annunci segnalati (ReportedListings), tutti aggiornati a ogni creazione
+    o cambio di status: le statistiche sono O(1) e le ultime k
+    segnalazioni (anche per status) O(k).
+    """
+
+    def __init__(self):
+        self._meta: Dict[str, Tuple[str, str]] = {}  # report_id -> (created_at, status)
+        self._timeline: List[ReportKey] = []
+        self._by_status: Dict[str, List[ReportKey]] = {}
+        self._by_listing: Dict[str, List[str]] = {}
+        self._counts: Dict[str, int] = {}
+        self.reported = ReportedListings()
+
+    def __len__(self) -> int:
+        return len(self._meta)
+
+    def __contains__(self, report_id: str) -> bool:
+        return report_id in self._meta
+
+    def add(self, report: Dict):
+        """
+        Indicizza una segnalazione (o ne aggiorna lo status se già presente).
+
+        Args:
+            report: Segnalazione con almeno report_id, listing_id, status e created_at
+        """
+        report_id = report['report_id']
+        status = report.get('status') or 'unknown'
+
+        if report_id in self._meta:
+            self.set_status(report_id, status)
+            return
+
+        key = (report.get('created_at') or '', report_id)
+        self._meta[report_id] = (key[0], status)
+        _insert_sorted(self._timeline, key)
+        _insert_sorted(self._by_status.setdefault(status, []), key)
+        self._by_listing.setdefault(report['listing_id'], []).append(report_id)
+        self._counts[status] = self._counts.get(status, 0) + 1
+        self.reported.add(report['listing_id'], report.get('listing_url'))
+
+    def set_status(self, report_id: str, status: str):
+        """
+        Sposta una segnalazione nell'indice di un altro status.
+
+        Args:
+            report_id: ID della segnalazione
+            status: Nuovo status
+        """
+        meta = self._meta.get(report_id)
+        if meta is None or meta[1] == status:
+            return
+
+        created_at, old_status = meta
+        key = (created_at, report_id)
+        _remove_sorted(self._by_status[old_status], key)
+        _insert_sorted(self._by_status.setdefault(status, []), key)
+        self._meta[report_id] = (created_at, status)
+
+        self._counts[old_status] -= 1
+        if not self._counts[old_status]:
+            del self._counts[old_status]
+        self._counts[status] = self._counts.get(status, 0) + 1
+
+    def page(
+        self,
+        status: Optional[str],
+        limit: int,
+        before: Optional[ReportKey] = None
+    ) -> Tuple[List[str], Optional[ReportKey]]:
+        """
+        Restituisce una pagina di ID, dalle segnalazioni più recenti.
+
+        Paginazione keyset: la pagina parte dalla prima chiave strettamente
+        precedente a ``before``, trovata con una ricerca binaria, quindi
+        ogni pagina costa O(log N + k) indipendentemente dalla profondità.
+
+        Args:
+            status: Filtra per status (opzionale)
+            limit: Numero massimo di risultati
+            before: Chiave dell'ultima segnalazione della pagina precedente
+
+        Returns:
+            Tupla (ID più recenti prima, chiave per la pagina successiva o None)
+        """
+        keys = self._by_status.get(status, []) if status else self._timeline
+        end = bisect.bisect_left(keys, before) if before is not None else len(keys)
+        start = max(end - limit, 0) if limit > 0 else end
+
+        page = keys[start:end]
+        page.reverse()
+        next_key = page[-1] if page and start > 0 else None
+        return [report_id for _, report_id in page], next_key
+
+    def by_listing(self, listing_id: str) -> List[str]:
+        """ID delle segnalazioni di un annuncio, in ordine di creazione."""
+        return list(self._by_listing.get(listing_id, []))
+
+    def counts(self) -> Dict[str, int]:
+        """Conteggi per status."""
+        return dict(self._counts)
+
+
+@contextmanager
+def _write_transaction(conn: sqlite3.Connection):
+    """
+    Transazione di scrittura su una connessione in autocommit.
+
+    BEGIN IMMEDIATE acquisisce subito il lock di scrittura, evitando
+    deadlock tra worker che leggono e poi scrivono.
+    """
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield conn
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    conn.execute("COMMIT")
+
+
+class SQLiteReportStore:
+    """
+    Segnalazioni in SQLite in modalità WAL.
+
+    Letture e scritture usano gli indici (O(log N)) invece di ricaricare
+    tutto il file, e più worker possono leggere mentre uno scrive. Al
+    primo avvio le segnalazioni del vecchio file JSON vengono importate.
+
+    Conteggi per status e liste per data usano un ReportIndex in memoria.
+    Ogni scrittura assegna alla riga un numero di sequenza crescente (seq):
+    quando PRAGMA data_version indica una modifica da un'altra connessione
+    (altro thread o worker), vengono lette solo le righe con seq maggiore
+    dell'ultimo visto.
+    """
+
+    def __init__(self, db_path: str, legacy_json_path: Optional[str] = None):
+        """
+        Inizializza l'archivio.
+
+        Args:
+            db_path: Path al database SQLite delle segnalazioni
+            legacy_json_path: Path al vecchio file JSON da importare (opzionale)
+        """
+        self.db_path = Path(db_path)
+        self.legacy_json_path = Path(legacy_json_path) if legacy_json_path else None
+        self._local = threading.local()
+        self._index = ReportIndex()
+        self._index_lock = threading.Lock()
+        self._last_seq = 0
+        self._ensure_db_exists()
+        self._migrate_from_json()
+        self._refresh(force=True)
+
+    def _connect(self) -> sqlite3.Connection:
+        """
+        Restituisce la connessione del thread corrente (creata alla prima chiamata).
+
+        Returns:
+            Connessione SQLite
+        """
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(
+                str(self.db_path),
+                timeout=settings.REPORTS_DB_TIMEOUT,
+                isolation_level=None  # autocommit, transazioni esplicite
+            )
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _ensure_db_exists(self):
+        """Crea database, tabella e indici se non esistono."""
+        try:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = self._connect()
+            conn.executescript(_SCHEMA)
+
+            # Database creati prima della colonna seq
+            columns = {row['name'] for row in conn.execute("PRAGMA table_info(reports)")}
+            if 'seq' not in columns:
+                with _write_transaction(conn):
+                    conn.execute("ALTER TABLE reports ADD COLUMN seq INTEGER NOT NULL DEFAULT 0")
+                    conn.execute("UPDATE reports SET seq = rowid")
+            conn.execute(_SEQ_INDEX)
+        except Exception as e:
+            logger.error("Errore creazione database segnalazioni: %s", e)
+            raise
+
+    def _migrate_from_json(self):
+        """Importa una sola volta le segnalazioni dal vecchio file JSON."""
+        path = self.legacy_json_path
+        if path is None or path.suffix != '.json' or not path.exists():
+            return
+
+        conn = self._connect()
+        if conn.execute("SELECT 1 FROM migrations WHERE name = ?", (_JSON_MIGRATION,)).fetchone():
+            return
+
+        try:
+            reports = json.loads(path.read_text(encoding='utf-8'))
+        except Exception as e:
+            logger.error("Errore lettura segnalazioni da migrare (%s): %s", path, e)
+            return
+
+        with _write_transaction(conn):
+            # Il lock di scrittura serializza i worker: solo il primo importa
+            if conn.execute(
+                "SELECT 1 FROM migrations WHERE name = ?", (_JSON_MIGRATION,)
+            ).fetchone():
+                return
+
+            first_seq = self._next_seq(conn)
+            conn.executemany(
+                f"INSERT OR IGNORE INTO reports ({', '.join(REPORT_FIELDS)}, seq) "
+                f"VALUES ({', '.join('?' * (len(REPORT_FIELDS) + 1))})",
+                [
+                    self._to_row(report) + (first_seq + i,)
+                    for i, report in enumerate(r for r in reports if r.get('report_id'))
+                ]
+            )
+            conn.execute(
+                "INSERT INTO migrations (name, applied_at) VALUES (?, ?)",
+                (_JSON_MIGRATION, datetime.now().isoformat())
+            )
+
+        logger.info("Migrate %s segnalazioni da %s a %s", len(reports), path, self.db_path)
+
+    @staticmethod
+    def _next_seq(conn: sqlite3.Connection) -> int:
+        """Prossimo numero di sequenza (da chiamare dentro una transazione di scrittura)."""
+        return conn.execute("SELECT COALESCE(MAX(seq), 0) + 1 FROM reports").fetchone()[0]
+
+    def _refresh(self, force: bool = False):
+        """
+        Aggiorna l'indice in memoria con le righe scritte da altre connessioni.
+
+        Args:
+            force: Interroga il database anche se data_version non è cambiato
+        """
+        conn = self._connect()
+        data_version = conn.execute("PRAGMA data_version").fetchone()[0]
+        if not force and data_version == getattr(self._local, 'data_version', None):
+            return
+        self._local.data_version = data_version
+
+        with self._index_lock:
+            rows = conn.execute(
+                "SELECT report_id, listing_id, listing_url, status, created_at, seq FROM reports "
+                "WHERE seq > ? ORDER BY seq",
+                (self._last_seq,)
+            ).fetchall()
+
+            for row in rows:
+                self._index.add(dict(row))
+                self._last_seq = max(self._last_seq, row['seq'])
+
+    def _get_many(self, report_ids: List[str]) -> List[Dict]:
+        """Recupera più segnalazioni per ID mantenendo l'ordine richiesto."""
+        if not report_ids:
+            return []
+
+        rows = self._connect().execute(
+            f"SELECT * FROM reports WHERE report_id IN ({', '.join('?' * len(report_ids))})",
+            report_ids
+        ).fetchall()
+        by_id = {row['report_id']: self._to_dict(row) for row in rows}
+        return [by_id[report_id] for report_id in report_ids if report_id in by_id]
+
+    @staticmethod
+    def _to_row(report: Dict) -> tuple:
+        """Converte una segnalazione nei valori delle colonne."""
+        return tuple(report.get(name) for name in REPORT_FIELDS)
+
+    @staticmethod
+    def _to_dict(row: sqlite3.Row) -> Dict:
+        """Converte una riga nel dict della segnalazione."""
+        return {name: row[name] for name in REPORT_FIELDS}
+
+    def insert(self, report: Dict):
+        """
+        Salva una nuova segnalazione.
+
+        Args:
+            report: Segnalazione completa
+        """
+        conn = self._connect()
+
+        with _write_transaction(conn):
+            conn.execute(
+                f"INSERT INTO reports ({', '.join(REPORT_FIELDS)}, seq) "
+                f"VALUES ({', '.join('?' * (len(REPORT_FIELDS) + 1))})",
+                self._to_row(report) + (self._next_seq(conn),)
+            )
+
+        self._refresh(force=True)
+
+    def get(self, report_id: str) -> Optional[Dict]:
+        """
+        Recupera una segnalazione per ID.
+
+        Args:
+            report_id: ID della segnalazione
+
+        Returns:
+            Dict con la segnalazione o None
+        """
+        row = self._connect().execute(
+            "SELECT * FROM reports WHERE report_id = ?", (report_id,)
+        ).fetchone()
+        return self._to_dict(row) if row else None
+
+    def by_listing(self, listing_id: str) -> List[Dict]:
+        """
+        Recupera le segnalazioni di un annuncio (dalla più vecchia).
+
+        Args:
+            listing_id: ID dell'annuncio
+
+        Returns:
+            Lista di segnalazioni
+        """
+        rows = self._connect().execute(
+            "SELECT * FROM reports WHERE listing_id = ? ORDER BY created_at, report_id",
+            (listing_id,)
+        ).fetchall()
+        return [self._to_dict(row) for row in rows]
+
+    def page(
+        self,
+        status: Optional[str],
+        limit: int,
+        before: Optional[ReportKey] = None
+    ) -> Tuple[List[Dict], Optional[ReportKey]]:
+        """
+        Recupera una pagina di segnalazioni, dalle più recenti.
+
+        Args:
+            status: Filtra per status (opzionale)
+            limit: Numero massimo di risultati
+            before: Chiave dell'ultima segnalazione della pagina precedente
+
+        Returns:
+            Tupla (segnalazioni, chiave per la pagina successiva o None)
+        """
+        self._refresh()
+        with self._index_lock:
+            report_ids, next_key = self._index.page(status, limit, before)
+        return self._get_many(report_ids), next_key
+
+    def update_status(self, report_id: str, status: str, updated_at: str) -> Optional[Dict]:
+        """
+        Aggiorna lo status di una segnalazione.
+
+        Args:
+            report_id: ID della segnalazione
+            status: Nuovo status
+            updated_at: Timestamp dell'aggiornamento
+
+        Returns:
+            Segnalazione aggiornata o None se non esiste
+        """
+        conn = self._connect()
+
+        with _write_transaction(conn):
+            cursor = conn.execute(
+                "UPDATE reports SET status = ?, updated_at = ?, seq = ? WHERE report_id = ?",
+                (status, updated_at, self._next_seq(conn), report_id)
+            )
+            if cursor.rowcount == 0:
+                return None
+            row = conn.execute(
+                "SELECT * FROM reports WHERE report_id = ?", (report_id,)
+            ).fetchone()
+
+        self._refresh(force=True)
+        return self._to_dict(row)
+
+    def count_by_status(self) -> Dict[str, int]:
+        """
+        Conta le segnalazioni per status.
+
+        Returns:
+            Dict {status: numero}
+        """
+        self._refresh()
+        with self._index_lock:
+            return self._index.counts()
+
+    def reported_counts(self, listings: List[Tuple[Optional[str], Optional[str]]]) -> List[int]:
+        """
+        Conta le segnalazioni di più annunci dall'indice in memoria.
+
+        Args:
+            listings: Coppie (listing_id, listing_url)
+
+        Returns:
+            Numero di segnalazioni per annuncio, nello stesso ordine
+        """
+        self._refresh()
+        with self._index_lock:
+            return [self._index.reported.count(lid, url) for lid, url in listings]
+
+
+@contextmanager
+def _file_lock(fd: int, exclusive: bool):
+    """
+    Lock tra processi sul file di lock del journal (no-op senza fcntl).
+
+    Le scritture prendono il lock condiviso (append concorrenti con
+    O_APPEND), la compattazione quello esclusivo.
+    """
+    if fcntl is None:
+        yield
+        return
+
+    fcntl.flock(fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+    try:
+        yield
+    finally:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+
+
+class JournalReportStore:
+    """
+    Segnalazioni in un journal append-only (JSONL) con snapshot periodico.
+
+    Ogni creazione o aggiornamento aggiunge una riga al journal (O(1)),
+    senza riscrivere le segnalazioni esistenti. Le fsync di scritture
+    concorrenti vengono raggruppate (group commit): il primo thread in
+    attesa sincronizza il file per tutti. Quando il journal supera
+    REPORTS_JOURNAL_COMPACT_BYTES viene compattato in uno snapshot
+    (scrittura su file temporaneo + rename atomico).
+
+    L'indice in memoria viene ricostruito all'avvio da snapshot + journal
+    e aggiornato leggendo le nuove righe, incluse quelle scritte da altri
+    worker. Una riga troncata da un crash viene scartata.
+    """
+
+    SNAPSHOT_FILE = "snapshot.jsonl"
+    JOURNAL_FILE = "journal.jsonl"
+    LOCK_FILE = "journal.lock"
+
+    def __init__(
+        self,
+        directory: str,
+        legacy_json_path: Optional[str] = None,
+        fsync: bool = True,
+        compact_bytes: Optional[int] = None
+    ):
+        """
+        Inizializza l'archivio.
+
+        Args:
+            directory: Directory di snapshot e journal
+            legacy_json_path: Path al vecchio file JSON da importare (opzionale)
+            fsync: Sincronizza su disco prima di confermare una scrittura
+            compact_bytes: Dimensione del journal oltre cui compattare
+        """
+        self.directory = Path(directory)
+        self.snapshot_path = self.directory / self.SNAPSHOT_FILE
+        self.journal_path = self.directory / self.JOURNAL_FILE
+        self.fsync = fsync
+        self.compact_bytes = compact_bytes or settings.REPORTS_JOURNAL_COMPACT_BYTES
+
+        self._lock = threading.RLock()  # Indice in memoria e descrittore del journal
+        self._sync_cond = threading.Condition()
+        self._written = 0
+        self._synced = 0
+        self._syncing = False
+
+        self._reports: Dict[str, Dict] = {}
+        self._index = ReportIndex()
+        self._fd: Optional[int] = None
+        self._inode: Optional[int] = None
+        self._offset = 0
+
+        self.stats = {'appends': 0, 'fsyncs': 0, 'compactions': 0}
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._lock_fd = os.open(self.directory / self.LOCK_FILE, os.O_RDWR | os.O_CREAT, 0o644)
+
+        with self._lock, _file_lock(self._lock_fd, exclusive=True):
+            if not self.snapshot_path.exists():
+                self._write_snapshot(self._load_legacy(legacy_json_path))
+            self._repair_journal()
+            self._reload()
+
+    # --- Lettura da disco ---
+
+    @staticmethod
+    def _load_legacy(path: Optional[str]) -> List[Dict]:
+        """Legge le segnalazioni dal vecchio file JSON, se presente."""
+        if not path or not Path(path).exists():
+            return []
+
+        try:
+            reports = json.loads(Path(path).read_text(encoding='utf-8'))
+            logger.info("Importate %s segnalazioni da %s", len(reports), path)
+            return [r for r in reports if r.get('report_id')]
+        except Exception as e:
+            logger.error("Errore lettura segnalazioni da migrare (%s): %s", path, e)
+            return []
+
+    def _repair_journal(self):
+        """Elimina una riga finale incompleta (scrittura interrotta da un crash)."""
+        if not self.journal_path.exists():
+            return
+
+        with open(self.journal_path, 'rb+') as f:
+            data = f.read()
+            end = data.rfind(b'\n') + 1
+            if end < len(data):
+                logger.warning(
+                    "Journal segnalazioni: scartati %s byte di una riga incompleta",
+                    len(data) - end
+                )
+                f.truncate(end)
+                os.fsync(f.fileno())
+
+    def _open_journal(self):
+        """Apre il journal corrente in append e azzera la posizione di lettura."""
+        if self._fd is not None:
+            os.close(self._fd)
+        self._fd = os.open(self.journal_path, os.O_RDWR | os.O_APPEND | os.O_CREAT, 0o644)
+        self._inode = os.fstat(self._fd).st_ino
+        self._offset = 0
+
+    def _reload(self):
+        """Ricostruisce l'indice da snapshot + journal (con il lock dei file)."""
+        self._reports = {}
+        self._index = ReportIndex()
+
+        with open(self.snapshot_path, 'rb') as f:
+            for line in f:
+                if line.strip():
+                    self._apply({'op': 'create', 'report': json.loads(line)})
+
+        self._open_journal()
+        self._read_new_entries()
+
+    def _read_new_entries(self):
+        """Applica le righe aggiunte al journal dopo l'ultima lettura."""
+        size = os.fstat(self._fd).st_size
+        if size <= self._offset:
+            return
+
+        os.lseek(self._fd, self._offset, os.SEEK_SET)
+        data = os.read(self._fd, size - self._offset)
+        # Solo righe complete: una scrittura in corso verrà letta dopo
+        end = data.rfind(b'\n') + 1
+        for line in data[:end].splitlines():
+            if not line.strip():
+                continue
+            try:
+                self._apply(json.loads(line))
+            except (ValueError, KeyError) as e:
+                logger.warning("Journal segnalazioni: riga non valida ignorata (%s)", e)
+        self._offset += end
+
+    def _catch_up(self):
+        """Allinea l'indice al journal, anche dopo una compattazione di un altro worker."""
+        try:
+            inode = os.stat(self.journal_path).st_ino
+        except FileNotFoundError:
+            inode = None
+
+        if inode != self._inode:
+            with _file_lock(self._lock_fd, exclusive=False):
+                self._reload()
+        else:
+            self._read_new_entries()
+
+    def _apply(self, entry: Dict):
+        """Applica una voce del journal all'indice in memoria."""
+        if entry['op'] == 'create':
+            report = entry['report']
+            self._reports[report['report_id']] = report
+            self._index.add(report)
+        elif entry['op'] == 'update':
+            report = self._reports.get(entry['report_id'])
+            if report is not None:
+                report.update(entry['fields'])
+                if 'status' in entry['fields']:
+                    self._index.set_status(entry['report_id'], entry['fields']['status'])
+
+    # --- Scrittura ---
+
+    def _append(self, entry: Dict):
+        """
+        Aggiunge una voce al journal e la applica all'indice.
+
+        Args:
+            entry: Voce del journal
+        """
+        line = (json.dumps(entry, default=str, separators=(',', ':')) + '\n').encode('utf-8')
+
+        with self._lock:
+            with _file_lock(self._lock_fd, exclusive=False):
+                self._catch_up()
+                # O_APPEND: la riga è scritta in un'unica write atomica
+                os.write(self._fd, line)
+                self._read_new_entries()
+                self._written += 1
+                seq = self._written
+                self.stats['appends'] += 1
+            size = self._offset
+
+        if self.fsync:
+            self._sync(seq)
+
+        if size > self.compact_bytes:
+            self.compact()
+
+    def _sync(self, seq: int):
+        """
+        Attende che la scrittura seq sia su disco (group commit).
+
+        Args:
+            seq: Numero progressivo della scrittura
+        """
+        with self._sync_cond:
+            while self._synced < seq:
+                if self._syncing:
+                    self._sync_cond.wait()
+                    continue
+
+                # Questo thread sincronizza per tutte le scritture fatte finora
+                self._syncing = True
+                target = self._written
+                fd = self._fd
+                self._sync_cond.release()
+                try:
+                    os.fsync(fd)
+                    self.stats['fsyncs'] += 1
+                except OSError:
+                    pass  # Journal sostituito da una compattazione, già su disco
+                finally:
+                    self._sync_cond.acquire()
+                    self._syncing = False
+                self._synced = max(self._synced, target)
+                self._sync_cond.notify_all()
+
+    def _write_snapshot(self, reports: Iterable[Dict]):
+        """Scrive lo snapshot su file temporaneo e lo sostituisce atomicamente."""
+        tmp_path = self.snapshot_path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            for report in reports:
+                f.write(json.dumps(report, default=str, separators=(',', ':')) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.snapshot_path)
+
+    def compact(self):
+        """Compatta il journal in un nuovo snapshot e riparte da un journal vuoto."""
+        with self._lock, _file_lock(self._lock_fd, exclusive=True):
+            self._catch_up()
+            # Un altro worker potrebbe aver già compattato
+            if self._offset <= self.compact_bytes:
+                return
+
+            self._write_snapshot(self._reports.values())
+
+            # Journal vuoto al posto del vecchio: gli altri worker vedono
+            # il nuovo inode e ricaricano lo snapshot
+            tmp_path = self.journal_path.with_suffix('.tmp')
+            with open(tmp_path, 'wb') as f:
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.journal_path)
+            self._open_journal()
+
+            self.stats['compactions'] += 1
+            logger.info("Journal segnalazioni compattato: %s segnalazioni", len(self._reports))
+
+    # --- Interfaccia dell'archivio ---
+
+    def insert(self, report: Dict):
+        """
+        Salva una nuova segnalazione.
+
+        Args:
+            report: Segnalazione completa
+        """
+        self._append({'op': 'create', 'report': report})
+
+    def get(self, report_id: str) -> Optional[Dict]:
+        """
+        Recupera una segnalazione per ID.
+
+        Args:
+            report_id: ID della segnalazione
+
+        Returns:
+            Dict con la segnalazione o None
+        """
+        with self._lock:
+            self._catch_up()
+            report = self._reports.get(report_id)
+            return dict(report) if report else None
+
+    def by_listing(self, listing_id: str) -> List[Dict]:
+        """
+        Recupera le segnalazioni di un annuncio (in ordine di creazione).
+
+        Args:
+            listing_id: ID dell'annuncio
+
+        Returns:
+            Lista di segnalazioni
+        """
+        with self._lock:
+            self._catch_up()
+            return [dict(self._reports[rid]) for rid in self._index.by_listing(listing_id)]
+
+    def page(
+        self,
+        status: Optional[str],
+        limit: int,
+        before: Optional[ReportKey] = None
+    ) -> Tuple[List[Dict], Optional[ReportKey]]:
+        """
+        Recupera una pagina di segnalazioni, dalle più recenti.
+
+        Args:
+            status: Filtra per status (opzionale)
+            limit: Numero massimo di risultati
+            before: Chiave dell'ultima segnalazione della pagina precedente
+
+        Returns:
+            Tupla (segnalazioni, chiave per la pagina successiva o None)
+        """
+        with self._lock:
+            self._catch_up()
+            report_ids, next_key = self._index.page(status, limit, before)
+            return [dict(self._reports[rid]) for rid in report_ids], next_key
+
+    def update_status(self, report_id: str, status: str, updated_at: str) -> Optional[Dict]:
+        """
+        Aggiorna lo status di una segnalazione.
+
+        Args:
+            report_id: ID della segnalazione
+            status: Nuovo status
+            updated_at: Timestamp dell'aggiornamento
+
+        Returns:
+            Segnalazione aggiornata o None se non esiste
+        """
+        with self._lock:
+            self._catch_up()
+            if report_id not in self._reports:
+                return None
+            self._append({
+                'op': 'update',
+                'report_id': report_id,
+                'fields': {'status': status, 'updated_at': updated_at}
+            })
+            return dict(self._reports[report_id])
+
+    def count_by_status(self) -> Dict[str, int]:
+        """
+        Conta le segnalazioni per status.
+
+        Returns:
+            Dict {status: numero}
+        """
+        with self._lock:
+            self._catch_up()
+            return self._index.counts()
+
+    def reported_counts(self, listings: List[Tuple[Optional[str], Optional[str]]]) -> List[int]:
+        """
+        Conta le segnalazioni di più annunci dall'indice in memoria.
+
+        Args:
+            listings: Coppie (listing_id, listing_url)
+
+        Returns:
+            Numero di segnalazioni per annuncio, nello stesso ordine
+        """
+        with self._lock:
+            self._catch_up()
+            return [self._index.reported.count(lid, url) for lid, url in listings]
@@ -1,79 +1,61 @@
 """Servizio per gestione segnalazioni."""
 
+import base64
 import json
 import uuid
 from datetime import datetime
-from typing import Dict, List, Optional
-from pathlib import Path
+from typing import Dict, List, Optional, Tuple
 import logging
-from threading import Lock
 
 from api.core.config import settings
+from api.services.report_store import JournalReportStore, ReportKey, SQLiteReportStore
 
 
 logger = logging.getLogger(__name__)
 
 
 class ReportService:
-    """Gestisce le segnalazioni di annunci sospetti."""
+    """
+    Gestisce le segnalazioni di annunci sospetti.
 
-    def __init__(self, db_path: str = None):
+    Le segnalazioni sono salvate nell'archivio scelto con REPORTS_BACKEND:
+    "sqlite" (database SQLite in modalità WAL) o "journal" (journal
+    append-only JSONL con snapshot, senza database).
+    """
+
+    def __init__(
+        self,
+        db_path: str = None,
+        legacy_json_path: str = None,
+        backend: str = None
+    ):
         """
         Inizializza il servizio segnalazioni.
 
         Args:
-            db_path: Path al file JSON per le segnalazioni
-        """
-        self.db_path = Path(db_path or settings.REPORTS_DB_PATH)
-        self._lock = Lock()
-        self._ensure_db_exists()
-
-    def _ensure_db_exists(self):
-        """Crea il file database se non esiste."""
-        try:
-            self.db_path.parent.mkdir(parents=True, exist_ok=True)
-
-            if not self.db_path.exists():
-                self.db_path.write_text(json.dumps([], indent=2), encoding='utf-8')
-                logger.info(f"Database segnalazioni creato: {self.db_path}")
-        except Exception as e:
-            logger.error(f"Errore creazione database segnalazioni: {e}")
-
-    def _load_reports(self) -> List[Dict]:
+            db_path: Database SQLite o directory del journal (default da settings)
+            legacy_json_path: Path al vecchio file JSON da importare (opzionale)
+            backend: Archivio da usare, "sqlite" o "journal" (default da settings)
         """
-        Carica tutte le segnalazioni.
+        backend = backend or settings.REPORTS_BACKEND
+        legacy_json_path = legacy_json_path or settings.REPORTS_DB_PATH
 
-        Returns:
-            Lista di segnalazioni
-        """
-        try:
-            if self.db_path.exists():
-                data = self.db_path.read_text(encoding='utf-8')
-                return json.loads(data)
-            return []
-        except Exception as e:
-            logger.error(f"Errore caricamento segnalazioni: {e}")
-            return []
-
-    def _save_reports(self, reports: List[Dict]) -> bool:
-        """
-        Salva le segnalazioni su file.
-
-        Args:
-            reports: Lista di segnalazioni
-
-        Returns:
-            True se salvato con successo
-        """
-        try:
-            self.db_path.write_text(
-                json.dumps(reports, indent=2, default=str),
-                encoding='utf-8'
+        if backend == "sqlite":
+            self.store = SQLiteReportStore(
+                db_path or settings.REPORTS_SQLITE_PATH,
+                legacy_json_path
             )
-            return True
-        except Exception as e:
-            logger.error(f"Errore salvataggio segnalazioni: {e}")
-            return False
+        elif backend == "journal":
+            self.store = JournalReportStore(
+                db_path or settings.REPORTS_JOURNAL_DIR,
+                legacy_json_path,
+                fsync=settings.REPORTS_JOURNAL_FSYNC
+            )
+        else:
+            raise ValueError(f"Backend segnalazioni non valido: {backend}")
+
+        self.backend = backend
+        logger.info("Archivio segnalazioni: %s", backend)
 
     def create_report(
         self,
@@ -96,33 +78,31 @@ class ReportService:
         Returns:
             Dict con i dati della segnalazione creata
         """
-        with self._lock:
-            reports = self._load_reports()
-
-            # Genera ID univoco
-            report_id = f"rep_{uuid.uuid4().hex[:12]}"
-
-            # Crea segnalazione
-            report = {
-                "report_id": report_id,
-                "listing_id": listing_id,
-                "listing_url": listing_url,
-                "reason": reason,
-                "reporter_email": reporter_email,
-                "additional_info": additional_info,
-                "status": "received",
-                "created_at": datetime.now().isoformat(),
-                "updated_at": datetime.now().isoformat()
-            }
-
-            reports.append(report)
-
-            # Salva
-            if self._save_reports(reports):
-                logger.info(f"Segnalazione creata: {report_id} per listing {listing_id}")
-                return report
-            else:
-                raise Exception("Impossibile salvare la segnalazione")
+        # Genera ID univoco
+        report_id = f"rep_{uuid.uuid4().hex[:12]}"
+        now = datetime.now().isoformat()
+
+        # Crea segnalazione
+        report = {
+            "report_id": report_id,
+            "listing_id": listing_id,
+            "listing_url": listing_url,
+            "reason": reason,
+            "reporter_email": reporter_email,
+            "additional_info": additional_info,
+            "status": "received",
+            "created_at": now,
+            "updated_at": now
+        }
+
+        try:
+            self.store.insert(report)
+        except Exception as e:
+            logger.error("Errore salvataggio segnalazione: %s", e)
+            raise Exception("Impossibile salvare la segnalazione") from e
+
+        logger.info("Segnalazione creata: %s per listing %s", report_id, listing_id)
+        return report
 
     def get_report(self, report_id: str) -> Optional[Dict]:
         """
@@ -134,11 +114,7 @@ class ReportService:
         Returns:
             Dict con la segnalazione o None
         """
-        reports = self._load_reports()
-        for report in reports:
-            if report.get('report_id') == report_id:
-                return report
-        return None
+        return self.store.get(report_id)
 
     def get_reports_by_listing(self, listing_id: str) -> List[Dict]:
         """
@@ -150,8 +126,7 @@ class ReportService:
         Returns:
             Lista di segnalazioni
         """
-        reports = self._load_reports()
-        return [r for r in reports if r.get('listing_id') == listing_id]
+        return self.store.by_listing(listing_id)
 
     def get_all_reports(
         self,
@@ -166,20 +141,70 @@ class ReportService:
             limit: Numero massimo di risultati
 
         Returns:
-            Lista di segnalazioni
+            Lista di segnalazioni (più recenti prima)
         """
-        reports = self._load_reports()
+        return self.store.page(status, limit)[0]
 
-        if status:
-            reports = [r for r in reports if r.get('status') == status]
+    def get_reports_page(
+        self,
+        status: Optional[str] = None,
+        limit: int = 100,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[Dict], Optional[str]]:
+        """
+        Recupera una pagina di segnalazioni (più recenti prima).
 
-        # Ordina per data (più recenti prima)
-        reports.sort(
-            key=lambda x: x.get('created_at', ''),
-            reverse=True
-        )
+        Args:
+            status: Filtra per status (opzionale)
+            limit: Numero massimo di risultati
+            cursor: Cursore restituito dalla pagina precedente (opzionale)
 
-        return reports[:limit]
+        Returns:
+            Tupla (segnalazioni, cursore della pagina successiva o None)
+
+        Raises:
+            ValueError: Se il cursore non è valido
+        """
+        before = self.decode_cursor(cursor) if cursor else None
+        reports, next_key = self.store.page(status, limit, before)
+        return reports, self.encode_cursor(next_key) if next_key else None
+
+    @staticmethod
+    def encode_cursor(key: ReportKey) -> str:
+        """
+        Codifica la posizione (created_at, report_id) in un cursore opaco.
+
+        Args:
+            key: Chiave dell'ultima segnalazione restituita
+
+        Returns:
+            Cursore base64 URL-safe
+        """
+        raw = json.dumps(list(key), separators=(',', ':')).encode('utf-8')
+        return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+    @staticmethod
+    def decode_cursor(cursor: str) -> ReportKey:
+        """
+        Decodifica un cursore prodotto da encode_cursor.
+
+        Args:
+            cursor: Cursore opaco
+
+        Returns:
+            Chiave (created_at, report_id)
+
+        Raises:
+            ValueError: Se il cursore non è valido
+        """
+        try:
+            raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+            created_at, report_id = json.loads(raw)
+            if not isinstance(created_at, str) or not isinstance(report_id, str):
+                raise TypeError
+            return created_at, report_id
+        except (ValueError, TypeError) as e:
+            raise ValueError("Cursore non valido") from e
 
     def update_report_status(
         self,
@@ -196,20 +221,61 @@ class ReportService:
         Returns:
             Segnalazione aggiornata o None
         """
-        with self._lock:
-            reports = self._load_reports()
+        report = self.store.update_status(report_id, new_status, datetime.now().isoformat())
 
-            for report in reports:
-                if report.get('report_id') == report_id:
-                    report['status'] = new_status
-                    report['updated_at'] = datetime.now().isoformat()
+        if report:
+            logger.info("Segnalazione %s aggiornata: %s", report_id, new_status)
 
-                    if self._save_reports(reports):
-                        logger.info(f"Segnalazione {report_id} aggiornata: {new_status}")
-                        return report
-                    break
+        return report
 
-            return None
+    def get_reported_counts(
+        self,
+        listings: List[Tuple[Optional[str], Optional[str]]]
+    ) -> List[int]:
+        """
+        Conta le segnalazioni di più annunci senza interrogare l'archivio.
+
+        Args:
+            listings: Coppie (listing_id, listing_url)
+
+        Returns:
+            Numero di segnalazioni per annuncio, nello stesso ordine
+        """
+        return self.store.reported_counts(listings)
+
+    def annotate_listings(self, listings: List[Dict]) -> List[Dict]:
+        """
+        Aggiunge reported_count ai listing di una risposta.
+
+        Per un gruppo di duplicati il conteggio è il massimo tra il
+        rappresentante e gli annunci raggruppati: un annuncio segnalato
+        non viene nascosto dietro un duplicato senza segnalazioni.
+
+        Args:
+            listings: Listing serializzati (modificati in place)
+
+        Returns:
+            Gli stessi listing
+        """
+        keys = []
+        owners = []
+        for pos, listing in enumerate(listings):
+            keys.append((listing.get('listing_id'), listing.get('link')))
+            owners.append(pos)
+            for duplicate_id in listing.get('duplicate_ids') or ():
+                keys.append((duplicate_id, None))
+                owners.append(pos)
+            for duplicate_link in listing.get('duplicate_links') or ():
+                keys.append((None, duplicate_link))
+                owners.append(pos)
+
+        counts = [0] * len(listings)
+        for pos, count in zip(owners, self.get_reported_counts(keys)):
+            counts[pos] = max(counts[pos], count)
+
+        for listing, count in zip(listings, counts):
+            listing['reported_count'] = count
+        return listings
 
     def get_stats(self) -> Dict:
         """
@@ -218,16 +284,28 @@ class ReportService:
         Returns:
             Dict con statistiche
         """
-        reports = self._load_reports()
+        by_status = self.store.count_by_status()
 
-        stats = {
-            "total": len(reports),
-            "by_status": {}
+        return {
+            "total": sum(by_status.values()),
+            "by_status": by_status
         }
 
-        # Conta per status
-        for report in reports:
-            status = report.get('status', 'unknown')
-            stats['by_status'][status] = stats['by_status'].get(status, 0) + 1
 
-        return stats
+# Istanza globale (indici in memoria condivisi da tutti i router)
+_report_service: Optional[ReportService] = None
+
+
+def get_report_service() -> ReportService:
+    """
+    Restituisce il servizio segnalazioni globale (creato alla prima chiamata).
+
+    Returns:
+        ReportService instance
+    """
+    global _report_service
+
+    if _report_service is None:
+        _report_service = ReportService()
+
+    return _report_service
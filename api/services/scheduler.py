@@ -0,0 +1,653 @@
+"""Scheduler per il monitoraggio periodico delle ricerche salvate."""
+
+import asyncio
+import heapq
+import json
+import math
+import os
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass, field, asdict
+from pathlib import Path
+from threading import Lock
+from typing import Callable, Dict, List, Optional, Tuple
+import logging
+
+try:
+    import fcntl
+except ImportError:  # Windows: lock tra processi non disponibile
+    fcntl = None
+
+from api.core.config import settings
+from api.core.dependencies import get_redis_client
+from api.core.workers import is_multi_worker
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class SavedSearch:
+    """Ricerca salvata da rieseguire periodicamente."""
+
+    search_id: str
+    query: str
+    platform: str = "subito"
+    categoria: Optional[str] = None
+    regione: Optional[str] = None
+    prezzo_max: Optional[float] = None
+    max_pages: int = 1
+    interval_seconds: int = 3600
+    cache_key: str = ""
+    created_at: float = field(default_factory=time.time)
+    last_run_at: Optional[float] = None
+    next_run_at: float = field(default_factory=time.time)
+    hits: int = 0  # Ricerche API che corrispondono a questa ricerca salvata
+    runs: int = 0
+    failures: int = 0
+    last_result_count: Optional[int] = None
+
+    def staleness(self, now: float) -> float:
+        """
+        Calcola quanto è "vecchia" la ricerca rispetto al suo intervallo.
+
+        Args:
+            now: Timestamp corrente
+
+        Returns:
+            Rapporto tra tempo dall'ultima esecuzione e intervallo
+            (>= 1 quando la ricerca è scaduta)
+        """
+        if self.last_run_at is None:
+            # Mai eseguita: trattala come molto vecchia
+            return (now - self.created_at) / self.interval_seconds + 10.0
+        return (now - self.last_run_at) / self.interval_seconds
+
+    def priority(self, now: float) -> float:
+        """
+        Calcola la priorità combinando staleness e popolarità.
+
+        Args:
+            now: Timestamp corrente
+
+        Returns:
+            Priorità (più alta = da eseguire prima)
+        """
+        return self.staleness(now) * (1.0 + math.log1p(self.hits))
+
+
+def run_saved_search(saved: SavedSearch) -> int:
+    """
+    Esegue una ricerca salvata e aggiorna la cache delle ricerche API.
+
+    Args:
+        saved: Ricerca salvata da eseguire
+
+    Returns:
+        Numero di risultati trovati
+    """
+    # Import locale per evitare import circolari con i modelli API
+    from api.models.requests import SearchRequest
+    from api.services.cache import CacheService
+    from api.services.search import SearchService
+
+    request = SearchRequest(
+        query=saved.query,
+        platform=saved.platform,
+        categoria=saved.categoria,
+        regione=saved.regione,
+        prezzo_max=saved.prezzo_max,
+        max_pages=saved.max_pages
+    )
+
+    service = SearchService(CacheService(get_redis_client()))
+    response_data = service.execute(request)
+    return response_data['total_results']
+
+
+class SearchScheduler:
+    """
+    Gestisce migliaia di ricerche salvate con una coda di priorità.
+
+    Le ricerche sono indicizzate in due heap:
+    - ``_due``: ordinato per ``next_run_at``, per trovare in O(log n)
+      le ricerche scadute senza scansionare tutto;
+    - ``_ready``: le ricerche scadute, ordinate per priorità
+      (staleness x popolarità).
+
+    Le voci obsolete degli heap vengono scartate in modo lazy tramite
+    un numero di versione per ricerca.
+
+    Con ``shared=True`` (più worker) il file JSON è lo stato condiviso:
+    ogni modifica ricarica il file se un altro worker l'ha riscritto e lo
+    salva subito, sotto un lock tra processi. Gli hit delle ricerche API
+    vengono solo accumulati in memoria e scritti a ogni sync().
+
+    Metodi che leggono o scrivono il file (add, remove, get, list_searches,
+    get_stats, sync) sono bloccanti: dalle route vanno chiamati in un
+    thread. record_hit non fa I/O e si può chiamare dall'event loop.
+    """
+
+    def __init__(
+        self,
+        db_path: str = None,
+        runner: Optional[Callable[[SavedSearch], int]] = None,
+        shared: bool = False
+    ):
+        """
+        Inizializza lo scheduler.
+
+        Args:
+            db_path: Path al file JSON con le ricerche salvate
+            runner: Funzione che esegue una ricerca salvata e restituisce
+                il numero di risultati (bloccante, eseguita in un thread)
+            shared: Stato condiviso con altri processi tramite il file
+        """
+        self.db_path = Path(db_path or settings.SCHEDULER_DB_PATH)
+        self.runner = runner or run_saved_search
+        self.shared = shared
+        self._lock = Lock()
+        self._searches: Dict[str, SavedSearch] = {}
+        self._by_cache_key: Dict[str, List[str]] = {}
+        self._versions: Dict[str, int] = {}
+        self._due: List[Tuple[float, int, str]] = []
+        self._ready: List[Tuple[float, int, str]] = []
+        self._dirty = False
+        self._running_id: Optional[str] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+        # Modalità condivisa: versione del file letta e hit da scrivere
+        self._file_version: Optional[Tuple[int, int, int]] = None
+        self._pending_hits: Dict[str, int] = {}
+        self._lock_fd: Optional[int] = None
+        if shared:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            lock_path = self.db_path.with_suffix(self.db_path.suffix + '.lock')
+            self._lock_fd = os.open(lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+
+        self._load()
+
+    # ------------------------------------------------------------------
+    # Persistenza
+    # ------------------------------------------------------------------
+
+    def _read_file_version(self) -> Optional[Tuple[int, int, int]]:
+        """Identifica il contenuto del file (cambia a ogni salvataggio atomico)."""
+        try:
+            stat = self.db_path.stat()
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+    def _load(self):
+        """Carica le ricerche salvate dal file."""
+        try:
+            self._file_version = self._read_file_version()
+            if self._file_version is None:
+                return
+
+            data = json.loads(self.db_path.read_text(encoding='utf-8'))
+            with self._lock:
+                for item in data:
+                    saved = SavedSearch(**item)
+                    self._index(saved)
+
+            logger.info("Caricate %s ricerche salvate da %s", len(self._searches), self.db_path)
+        except Exception as e:
+            logger.error("Errore caricamento ricerche salvate: %s", e)
+
+    def _reload_if_changed(self):
+        """Ricarica le ricerche se un altro worker ha riscritto il file (solo shared)."""
+        if not self.shared or self._read_file_version() == self._file_version:
+            return
+
+        with self._lock:
+            self._searches.clear()
+            self._by_cache_key.clear()
+            self._versions.clear()
+            self._due.clear()
+            self._ready.clear()
+        self._load()
+
+    @contextmanager
+    def _shared_update(self):
+        """
+        Modifica atomica dello stato condiviso (no-op senza shared).
+
+        Prende il lock tra processi, ricarica il file se è cambiato e, al
+        termine, scrive le modifiche e gli hit accumulati.
+        """
+        if not self.shared:
+            yield
+            return
+
+        if fcntl is not None:
+            fcntl.flock(self._lock_fd, fcntl.LOCK_EX)
+        try:
+            self._reload_if_changed()
+            yield
+            self._flush_hits()
+            self.save()
+        finally:
+            if fcntl is not None:
+                fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+
+    def _flush_hits(self):
+        """Applica gli hit accumulati in modalità condivisa (le chiavi senza ricerche sono scartate)."""
+        with self._lock:
+            for cache_key, count in self._pending_hits.items():
+                for search_id in self._by_cache_key.get(cache_key, ()):
+                    self._searches[search_id].hits += count
+                    self._dirty = True
+            self._pending_hits.clear()
+
+    def save(self) -> bool:
+        """
+        Salva le ricerche su file (scrittura atomica).
+
+        Returns:
+            True se salvato con successo
+        """
+        with self._lock:
+            if not self._dirty:
+                return True
+            data = [asdict(s) for s in self._searches.values()]
+            self._dirty = False
+
+        try:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.db_path.with_suffix(self.db_path.suffix + '.tmp')
+            tmp_path.write_text(json.dumps(data), encoding='utf-8')
+            tmp_path.replace(self.db_path)
+            self._file_version = self._read_file_version()
+            return True
+        except Exception as e:
+            logger.error("Errore salvataggio ricerche salvate: %s", e)
+            with self._lock:
+                self._dirty = True
+            return False
+
+    # ------------------------------------------------------------------
+    # Gestione code (chiamare con self._lock acquisito)
+    # ------------------------------------------------------------------
+
+    def _index(self, saved: SavedSearch):
+        """Registra una ricerca negli indici e nella coda."""
+        self._searches[saved.search_id] = saved
+        if saved.cache_key:
+            self._by_cache_key.setdefault(saved.cache_key, []).append(saved.search_id)
+        self._push_due(saved)
+
+    def _bump_version(self, search_id: str) -> int:
+        """Invalida le voci esistenti negli heap per una ricerca."""
+        version = self._versions.get(search_id, 0) + 1
+        self._versions[search_id] = version
+        return version
+
+    def _push_due(self, saved: SavedSearch):
+        """Inserisce la ricerca nella coda delle scadenze."""
+        version = self._bump_version(saved.search_id)
+        heapq.heappush(self._due, (saved.next_run_at, version, saved.search_id))
+
+    def _push_ready(self, saved: SavedSearch, now: float):
+        """Inserisce la ricerca nella coda di esecuzione per priorità."""
+        version = self._bump_version(saved.search_id)
+        heapq.heappush(self._ready, (-saved.priority(now), version, saved.search_id))
+
+    def _is_current(self, version: int, search_id: str) -> bool:
+        """Verifica che una voce di heap non sia obsoleta."""
+        return search_id in self._searches and self._versions.get(search_id) == version
+
+    def _promote_due(self, now: float):
+        """Sposta le ricerche scadute dalla coda scadenze a quella pronta."""
+        while self._due and self._due[0][0] <= now:
+            _, version, search_id = heapq.heappop(self._due)
+            if self._is_current(version, search_id):
+                self._push_ready(self._searches[search_id], now)
+
+    def _pop_ready(self, now: float) -> Optional[SavedSearch]:
+        """Estrae la ricerca pronta con priorità più alta."""
+        self._promote_due(now)
+
+        while self._ready:
+            _, version, search_id = heapq.heappop(self._ready)
+            if self._is_current(version, search_id):
+                # Invalida altre voci finché il job è in esecuzione
+                self._bump_version(search_id)
+                return self._searches[search_id]
+
+        return None
+
+    def _next_due_in(self, now: float) -> Optional[float]:
+        """Secondi alla prossima scadenza (None se la coda è vuota)."""
+        while self._due and not self._is_current(self._due[0][1], self._due[0][2]):
+            heapq.heappop(self._due)
+        if not self._due:
+            return None
+        return max(0.0, self._due[0][0] - now)
+
+    # ------------------------------------------------------------------
+    # API pubblica
+    # ------------------------------------------------------------------
+
+    def add(
+        self,
+        query: str,
+        cache_key: str,
+        platform: str = "subito",
+        categoria: Optional[str] = None,
+        regione: Optional[str] = None,
+        prezzo_max: Optional[float] = None,
+        max_pages: int = 1,
+        interval_seconds: Optional[int] = None
+    ) -> SavedSearch:
+        """
+        Aggiunge una ricerca salvata.
+
+        Args:
+            query: Query di ricerca
+            cache_key: Chiave cache dei risultati (vedi CacheService)
+            platform: Piattaforma (subito/ebay/all)
+            categoria: Categoria
+            regione: Regione
+            prezzo_max: Prezzo massimo
+            max_pages: Pagine da scansionare
+            interval_seconds: Intervallo tra esecuzioni
+
+        Returns:
+            La ricerca salvata creata
+        """
+        interval = max(
+            interval_seconds or settings.SCHEDULER_DEFAULT_INTERVAL,
+            settings.SCHEDULER_MIN_INTERVAL
+        )
+
+        with self._shared_update(), self._lock:
+            if len(self._searches) >= settings.SCHEDULER_MAX_SEARCHES:
+                raise ValueError(
+                    f"Numero massimo di ricerche salvate raggiunto "
+                    f"({settings.SCHEDULER_MAX_SEARCHES})"
+                )
+
+            saved = SavedSearch(
+                search_id=f"ss_{uuid.uuid4().hex[:12]}",
+                query=query,
+                platform=platform,
+                categoria=categoria,
+                regione=regione,
+                prezzo_max=prezzo_max,
+                max_pages=max_pages,
+                interval_seconds=interval,
+                cache_key=cache_key
+            )
+            self._index(saved)
+            self._dirty = True
+
+        logger.info("Ricerca salvata creata: %s ('%s', ogni %ss)", saved.search_id, query, interval)
+        self._notify()
+        return saved
+
+    def remove(self, search_id: str) -> bool:
+        """
+        Rimuove una ricerca salvata.
+
+        Args:
+            search_id: ID della ricerca salvata
+
+        Returns:
+            True se rimossa
+        """
+        with self._shared_update(), self._lock:
+            saved = self._searches.pop(search_id, None)
+            if saved is None:
+                return False
+
+            self._versions.pop(search_id, None)
+            ids = self._by_cache_key.get(saved.cache_key)
+            if ids:
+                ids.remove(search_id)
+                if not ids:
+                    del self._by_cache_key[saved.cache_key]
+            self._dirty = True
+
+        logger.info("Ricerca salvata rimossa: %s", search_id)
+        return True
+
+    def get(self, search_id: str) -> Optional[SavedSearch]:
+        """
+        Recupera una ricerca salvata per ID.
+
+        Args:
+            search_id: ID della ricerca salvata
+
+        Returns:
+            SavedSearch o None
+        """
+        self._reload_if_changed()
+        return self._searches.get(search_id)
+
+    def list_searches(self, limit: int = 100) -> List[SavedSearch]:
+        """
+        Elenca le ricerche salvate ordinate per priorità corrente.
+
+        Args:
+            limit: Numero massimo di risultati
+
+        Returns:
+            Lista di ricerche salvate
+        """
+        self._reload_if_changed()
+        now = time.time()
+        with self._lock:
+            searches = list(self._searches.values())
+        return heapq.nlargest(limit, searches, key=lambda s: s.priority(now))
+
+    def record_hit(self, cache_key: str):
+        """
+        Registra una ricerca API che corrisponde a ricerche salvate.
+
+        Aumenta la popolarità delle ricerche salvate con la stessa chiave
+        cache, così da dar loro precedenza nella coda. Chiamata a ogni
+        ricerca API: non legge il file neanche in modalità condivisa, dove
+        l'hit viene solo accumulato fino al prossimo sync(). Le chiavi
+        senza ricerche salvate note (es. salvate da un altro worker e non
+        ancora ricaricate) vengono accumulate solo fino a
+        SCHEDULER_MAX_SEARCHES chiavi: le ricerche ad hoc non fanno
+        crescere il buffer senza limite.
+
+        Args:
+            cache_key: Chiave cache della ricerca eseguita
+        """
+        with self._lock:
+            if self.shared:
+                known = cache_key in self._by_cache_key or cache_key in self._pending_hits
+                if known or len(self._pending_hits) < settings.SCHEDULER_MAX_SEARCHES:
+                    self._pending_hits[cache_key] = self._pending_hits.get(cache_key, 0) + 1
+                return
+            for search_id in self._by_cache_key.get(cache_key, ()):
+                self._searches[search_id].hits += 1
+                self._dirty = True
+
+    def get_stats(self, reload: bool = True) -> Dict:
+        """
+        Ottiene statistiche dello scheduler.
+
+        Args:
+            reload: Ricarica il file se un altro worker l'ha modificato
+                (False: stato in memoria, senza I/O)
+
+        Returns:
+            Dict con statistiche
+        """
+        if reload:
+            self._reload_if_changed()
+        now = time.time()
+        with self._lock:
+            searches = list(self._searches.values())
+            running = self._running_id
+
+        return {
+            "enabled": settings.SCHEDULER_ENABLED,
+            "saved_searches": len(searches),
+            "due": sum(1 for s in searches if s.next_run_at <= now),
+            "running": running,
+            "total_runs": sum(s.runs for s in searches),
+            "total_failures": sum(s.failures for s in searches)
+        }
+
+    # ------------------------------------------------------------------
+    # Esecuzione
+    # ------------------------------------------------------------------
+
+    def _notify(self):
+        """Risveglia il loop di esecuzione (es. dopo una nuova ricerca, anche da un thread)."""
+        if self._wakeup is not None:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    def _complete(self, saved: SavedSearch, result_count: Optional[int]):
+        """Aggiorna lo stato di una ricerca dopo l'esecuzione e la rischedula."""
+        now = time.time()
+
+        with self._shared_update(), self._lock:
+            # In modalità condivisa il file può essere stato ricaricato
+            saved = self._searches.get(saved.search_id)
+            if saved is None:
+                return  # Rimossa durante l'esecuzione
+
+            saved.runs += 1
+            saved.last_run_at = now
+            if result_count is None:
+                saved.failures += 1
+                # Backoff sui fallimenti per non sprecare budget
+                delay = saved.interval_seconds * min(2 ** saved.failures, 8)
+            else:
+                saved.failures = 0
+                saved.last_result_count = result_count
+                delay = saved.interval_seconds
+
+            saved.next_run_at = now + delay
+            self._push_due(saved)
+            self._dirty = True
+
+    async def run_once(self) -> Optional[SavedSearch]:
+        """
+        Esegue la ricerca pronta con priorità più alta, se presente.
+
+        Returns:
+            La ricerca eseguita o None
+        """
+        # Lettura del file (solo shared) fuori dall'event loop
+        await asyncio.to_thread(self._reload_if_changed)
+        with self._lock:
+            saved = self._pop_ready(time.time())
+            if saved is not None:
+                self._running_id = saved.search_id
+
+        if saved is None:
+            return None
+
+        logger.info("Esecuzione ricerca salvata %s: '%s'", saved.search_id, saved.query)
+
+        result_count = None
+        try:
+            # Lo scraping è bloccante: eseguilo in un thread.
+            # I rate limiter per host sono condivisi con le richieste API,
+            # quindi lo scheduler rispetta lo stesso budget globale.
+            result_count = await asyncio.to_thread(self.runner, saved)
+        except Exception as e:
+            logger.error("Errore esecuzione ricerca salvata %s: %s", saved.search_id, e)
+        finally:
+            with self._lock:
+                self._running_id = None
+            await asyncio.to_thread(self._complete, saved, result_count)
+
+        return saved
+
+    async def run_forever(self):
+        """Loop principale: esegue le ricerche in ordine di priorità."""
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        last_save = time.time()
+
+        logger.info("Scheduler ricerche salvate avviato")
+
+        try:
+            while True:
+                saved = await self.run_once()
+
+                if time.time() - last_save >= settings.SCHEDULER_SAVE_INTERVAL:
+                    await asyncio.to_thread(self.sync)
+                    last_save = time.time()
+
+                if saved is not None:
+                    continue
+
+                # Nessuna ricerca pronta: attendi la prossima scadenza
+                with self._lock:
+                    wait = self._next_due_in(time.time())
+                if wait is None:
+                    wait = settings.SCHEDULER_POLL_INTERVAL
+                wait = min(wait, settings.SCHEDULER_POLL_INTERVAL)
+
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=wait)
+                except asyncio.TimeoutError:
+                    pass
+        except asyncio.CancelledError:
+            logger.info("Scheduler ricerche salvate fermato")
+            raise
+        finally:
+            self.sync()
+
+    def sync(self) -> bool:
+        """
+        Salva le modifiche; in modalità condivisa scrive anche gli hit
+        accumulati e ricarica le modifiche degli altri worker.
+
+        Returns:
+            True se salvato con successo
+        """
+        if not self.shared:
+            return self.save()
+
+        try:
+            with self._shared_update():
+                pass
+            return True
+        except Exception as e:
+            logger.error("Errore sincronizzazione ricerche salvate: %s", e)
+            return False
+
+    async def sync_forever(self):
+        """
+        Loop dei worker che non eseguono le ricerche (modalità condivisa):
+        scrive periodicamente gli hit registrati dalle ricerche API.
+        """
+        try:
+            while True:
+                await asyncio.sleep(settings.SCHEDULER_SAVE_INTERVAL)
+                await asyncio.to_thread(self.sync)
+        finally:
+            self.sync()
+
+
+# Istanza globale dello scheduler
+_scheduler: Optional[SearchScheduler] = None
+
+
+def get_scheduler() -> SearchScheduler:
+    """
+    Restituisce lo scheduler globale (creato alla prima chiamata).
+
+    Returns:
+        SearchScheduler instance
+    """
+    global _scheduler
+
+    if _scheduler is None:
+        _scheduler = SearchScheduler(settings.SCHEDULER_DB_PATH, shared=is_multi_worker())
+
+    return _scheduler
@@ -0,0 +1,351 @@
+"""Servizio di ricerca annunci multi-piattaforma."""
+
+import time
+import uuid
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, List, Optional
+import logging
+
+from api.models.requests import SearchRequest, PlatformEnum
+from api.models.responses import ListingResponse
+from api.core.config import settings
+from api.core.dependencies import create_scraper
+from api.services.cache import CacheService
+from api.services.enrichment import apply_cached_details, enrich_listings
+from api.services.price_stats import PriceStatsService
+from src.analysis.dedup import ListingCluster, ListingDeduplicator
+from src.analysis.scam import ScamScore, ScamScorer
+from src.models.listing import Listing
+from src.utils import timing, tracing
+
+
+logger = logging.getLogger(__name__)
+
+
+def _filter_by_price(listings: List[Listing], max_price: float) -> List[Listing]:
+    """
+    Filtra annunci per prezzo massimo.
+
+    Args:
+        listings: Lista annunci
+        max_price: Prezzo massimo
+
+    Returns:
+        Lista filtrata
+    """
+    filtered = []
+    for listing in listings:
+        if listing.price is not None:
+            if listing.price <= max_price:
+                filtered.append(listing)
+        else:
+            # Include annunci senza prezzo (es. "Gratis", "Contattami")
+            filtered.append(listing)
+
+    return filtered
+
+
+def _filter_clusters_by_price(clusters: List[ListingCluster], max_price: float) -> List[ListingCluster]:
+    """
+    Filtra per prezzo massimo gli annunci di ogni gruppo di duplicati.
+
+    Il rappresentante resta l'annuncio più economico rimasto; i gruppi
+    senza annunci entro il prezzo vengono scartati.
+
+    Args:
+        clusters: Gruppi di duplicati
+        max_price: Prezzo massimo
+
+    Returns:
+        Gruppi filtrati
+    """
+    filtered = []
+    for cluster in clusters:
+        listings = _filter_by_price(cluster.listings, max_price)
+        if listings:
+            filtered.append(ListingCluster(cluster_id=cluster.cluster_id, listings=listings))
+    return filtered
+
+
+def _sort_key(listing: Listing):
+    """Ordinamento dei risultati: prima per piattaforma, poi per prezzo."""
+    return (listing.source, listing.price if listing.price else float('inf'))
+
+
+@lru_cache(maxsize=1)
+def get_deduplicator() -> ListingDeduplicator:
+    """
+    Restituisce il deduplicatore configurato (le funzioni hash sono calcolate una volta).
+
+    Returns:
+        ListingDeduplicator instance
+    """
+    return ListingDeduplicator(
+        num_perm=settings.DEDUP_NUM_PERM,
+        bands=settings.DEDUP_BANDS,
+        threshold=settings.DEDUP_THRESHOLD,
+        price_tolerance=settings.DEDUP_PRICE_TOLERANCE,
+        max_photo_share=settings.DEDUP_MAX_PHOTO_SHARE
+    )
+
+
+@lru_cache(maxsize=1)
+def get_scam_scorer() -> ScamScorer:
+    """
+    Restituisce lo scorer del rischio truffa (gli automi sono compilati una volta).
+
+    Returns:
+        ScamScorer instance
+    """
+    return ScamScorer()
+
+
+def _convert_listing_to_response(
+    listing: Listing,
+    cluster: Optional[ListingCluster] = None,
+    scam: Optional[ScamScore] = None
+) -> ListingResponse:
+    """
+    Converte Listing model in ListingResponse.
+
+    Args:
+        listing: Listing object
+        cluster: Gruppo di duplicati di cui il listing è rappresentante (opzionale)
+        scam: Punteggio di rischio truffa (opzionale)
+
+    Returns:
+        ListingResponse object
+    """
+    duplicates = cluster.duplicates if cluster else []
+
+    return ListingResponse(
+        listing_id=listing.listing_id,
+        title=listing.title,
+        price=listing.price,
+        price_text=listing.price_text,
+        description=listing.description,
+        link=listing.link,
+        photos=listing.photos,
+        location=listing.location,
+        category=listing.category,
+        posted_date=listing.posted_date,
+        seller_name=listing.seller_name,
+        seller_type=listing.seller_type,
+        source=listing.source,
+        condition=listing.condition,
+        shipping=listing.shipping,
+        scraped_at=listing.scraped_at,
+        cluster_id=cluster.cluster_id if cluster else None,
+        duplicate_count=len(duplicates),
+        duplicate_links=[dup.link for dup in duplicates if dup.link],
+        duplicate_ids=[dup.listing_id for dup in duplicates if dup.listing_id],
+        scam_score=scam.score if scam else None,
+        risk_level=scam.risk_level if scam else None,
+        risk_reasons=scam.reasons if scam else []
+    )
+
+
+class SearchService:
+    """Esegue ricerche sulle piattaforme e salva i risultati in cache."""
+
+    def __init__(self, cache: CacheService):
+        """
+        Inizializza il servizio di ricerca.
+
+        Args:
+            cache: Servizio cache su cui salvare i risultati
+        """
+        self.cache = cache
+        self.price_stats = PriceStatsService(cache.redis)
+
+    @staticmethod
+    def get_cache_params(request: SearchRequest) -> Dict:
+        """
+        Estrae i parametri normalizzati che identificano una ricerca in cache.
+
+        La query viene portata in minuscolo: le piattaforme non distinguono
+        maiuscole e minuscole, quindi "iPhone 13" e "iphone 13" condividono
+        la stessa chiave.
+
+        Args:
+            request: Richiesta di ricerca (o ricerca salvata con gli stessi campi)
+
+        Returns:
+            Dict con i parametri della chiave cache
+        """
+        params = {
+            "query": request.query.lower(),
+            "categoria": request.categoria.value if request.categoria else None,
+            "prezzo_max": request.prezzo_max,
+            "regione": request.regione,
+            "platform": request.platform.value
+        }
+
+        # Le opzioni non di default hanno una chiave separata; le ricerche
+        # con le opzioni di default mantengono la chiave originale
+        if getattr(request, 'details', False):
+            params["details"] = True
+        if not getattr(request, 'dedup', True):
+            params["dedup"] = False
+
+        return params
+
+    def execute(self, request: SearchRequest) -> Dict:
+        """
+        Esegue lo scraping, filtra, ordina e salva i risultati in cache.
+
+        Args:
+            request: Richiesta di ricerca
+
+        Returns:
+            Dict con i dati della SearchResponse
+        """
+        start_time = time.time()
+        all_listings = []
+
+        logger.info("Esecuzione scraping su platform=%s...", request.platform)
+
+        # Determina su quali piattaforme cercare
+        if request.platform == PlatformEnum.ALL:
+            platforms_to_search = [PlatformEnum.SUBITO, PlatformEnum.EBAY]
+        else:
+            platforms_to_search = [request.platform]
+
+        # Esegui ricerca su ogni piattaforma
+        for platform in platforms_to_search:
+            logger.info("Scraping %s...", platform.value)
+
+            scraper = create_scraper(platform)
+
+            try:
+                with tracing.span('scraper.search', platform=platform.value) as scrape_span:
+                    if platform == PlatformEnum.SUBITO:
+                        # Subito.it - usa categoria e regione
+                        platform_listings = scraper.search(
+                            query=request.query,
+                            category=request.categoria.value if request.categoria else None,
+                            region=request.regione,
+                            max_pages=request.max_pages
+                        )
+                    else:  # eBay
+                        # eBay - ignora regione (non supportata)
+                        platform_listings = scraper.search(
+                            query=request.query,
+                            max_pages=request.max_pages
+                        )
+                    scrape_span.set_attribute('listings', len(platform_listings))
+
+                all_listings.extend(platform_listings)
+                logger.info("Trovati %s annunci su %s", len(platform_listings), platform.value)
+
+            finally:
+                scraper.close()
+
+        logger.info("Totale annunci trovati: %s", len(all_listings))
+
+        with timing.span('filter'):
+            # Raggruppa i duplicati (ripubblicazioni, stesso articolo su più
+            # piattaforme) prima del filtro di prezzo: statistiche di prezzo
+            # e rischio truffa usano un annuncio per articolo
+            clusters = get_deduplicator().cluster(all_listings)
+            population = [c.representative for c in clusters]
+
+        # Statistiche di prezzo: il riferimento per il rischio truffa è letto
+        # prima di aggiungere i prezzi di questo scraping (filtro escluso)
+        categoria = request.categoria.value if request.categoria else None
+        with timing.span('price_stats'):
+            price_reference = self.price_stats.get_reference(request.query, categoria)
+            self.price_stats.record(
+                request.query,
+                categoria,
+                [listing.price for listing in population],
+                item_ids=[c.cluster_id for c in clusters]
+            )
+
+        with timing.span('filter'):
+            # Filtra per prezzo se richiesto
+            if request.prezzo_max is not None:
+                original_count = len(all_listings)
+                all_listings = _filter_by_price(all_listings, request.prezzo_max)
+                clusters = _filter_clusters_by_price(clusters, request.prezzo_max)
+                logger.info(
+                    "Filtrati per prezzo: %s -> %s annunci", original_count, len(all_listings)
+                )
+
+            # Ordina risultati: prima per piattaforma, poi per prezzo
+            all_listings.sort(key=_sort_key)
+
+            # In risposta solo un annuncio per gruppo (salvo dedup=false)
+            if request.dedup:
+                clusters.sort(key=lambda c: _sort_key(c.representative))
+            else:
+                clusters = None
+
+        results = [c.representative for c in clusters] if clusters is not None else all_listings
+        duplicates_removed = len(all_listings) - len(results)
+        if duplicates_removed:
+            logger.info("Deduplicazione: %s -> %s annunci", len(all_listings), len(results))
+
+        # Dettagli: quelli già in cache si applicano sempre (un solo MGET),
+        # le pagine mancanti si scaricano solo se richiesto
+        with timing.span('enrich'):
+            if request.details:
+                to_enrich = results[:settings.ENRICH_MAX_LISTINGS]
+                enrich_listings(to_enrich, cache=self.cache)
+                if len(results) > len(to_enrich):
+                    apply_cached_details(results[len(to_enrich):], self.cache)
+            elif self.cache.enabled:
+                apply_cached_details(results, self.cache)
+
+        # Rischio truffa: prezzi confrontati con lo storico della ricerca o,
+        # se ancora insufficiente, con gli annunci trovati (uno per articolo,
+        # così un annuncio ripubblicato non sposta la mediana)
+        with timing.span('score'):
+            scores = get_scam_scorer().score_batch(
+                results, population=population, reference=price_reference
+            )
+
+        # Converti in response model
+        with timing.span('convert'):
+            if clusters is not None:
+                listing_responses = [
+                    _convert_listing_to_response(c.representative, c, scam)
+                    for c, scam in zip(clusters, scores)
+                ]
+            else:
+                listing_responses = [
+                    _convert_listing_to_response(listing, scam=scam)
+                    for listing, scam in zip(all_listings, scores)
+                ]
+            results_data = [resp.dict() for resp in listing_responses]
+
+        # Prepara risposta
+        response_data = {
+            "search_id": str(uuid.uuid4()),
+            "query": request.query,
+            "categoria": categoria,
+            "total_results": len(listing_responses),
+            "duplicates_removed": duplicates_removed,
+            "results": results_data,
+            "cached": False,
+            "scraped_at": datetime.now(),
+            "execution_time_ms": (time.time() - start_time) * 1000,
+            "platform": request.platform.value
+        }
+
+        with timing.span('cache_write'):
+            # Salva in cache con platform nella chiave
+            self.cache.set_search_results(
+                results=response_data,
+                **self.get_cache_params(request)
+            )
+
+            # Salva anche i singoli listing in cache, duplicati inclusi (una sola pipeline)
+            self.cache.set_listings({
+                listing.listing_id: listing.to_dict()
+                for listing in all_listings
+                if listing.listing_id
+            })
+
+        return response_data
@@ -0,0 +1,463 @@
+"""
+Corpus di pagine HTML per benchmark e test offline.
+
+Le pagine sono in benchmarks/fixtures/<piattaforma>/ con un indice
+(index.json) che riporta tipo di pagina e numero di annunci attesi, così
+i benchmark verificano anche che i parser estraggano tutto.
+
+Il corpus incluso è SINTETICO: ogni pagina ha "source": "synthetic"
+nell'indice e la suite lo riporta nei risultati. Non contiene pagine reali
+perché è stato generato senza accesso di rete ai siti, e perché le pagine
+reali contengono dati dei venditori (nomi, telefoni, email) e sono
+soggette ai termini d'uso dei siti: vanno registrate, ripulite con
+sanitize_page() e riviste a mano prima di essere aggiunte al repository.
+
+Le pagine sintetiche riproducono i selettori usati dagli scraper e un
+peso simile a quello reale (script inline di riempimento al posto di JS
+e JSON dei siti), ma non la loro struttura effettiva: i valori assoluti
+dei benchmark sono indicativi e vanno confrontati solo tra esecuzioni
+sullo stesso corpus. Con accesso alla rete ``record`` sostituisce il
+corpus con pagine reali ripulite ("source": "recorded").
+
+Nei link eBay l'host è il segnaposto {base_url}: load_page() lo sostituisce
+con l'URL reale o con quello del server mock.
+
+Uso:
+    python benchmarks/corpus.py synthesize
+    python benchmarks/corpus.py record --query "iphone 13" --pages 2 --details 3
+"""
+
+import argparse
+import html
+import json
+import random
+import re
+import sys
+from datetime import date
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# Aggiungi parent directory al path per importare i moduli
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
+PLATFORMS = ("subito", "ebay")
+
+BASE_URL_PLACEHOLDER = "{base_url}"
+
+DEFAULT_BASE_URLS = {
+    "subito": "https://www.subito.it",
+    "ebay": "https://www.ebay.it"
+}
+
+_PRODUCTS = [
+    ("iPhone 13 128GB", 420), ("iPhone 12 Pro 256GB", 480), ("Samsung Galaxy S22", 390),
+    ("PlayStation 5 Digital", 380), ("Nintendo Switch OLED", 260), ("MacBook Air M1", 650),
+    ("iPad 9a generazione", 230), ("AirPods Pro 2", 160), ("Bicicletta da corsa Bianchi", 700),
+    ("Divano 3 posti in tessuto", 250), ("Lavatrice Bosch 8kg", 220), ("Canon EOS 250D", 410),
+    ("Monitor LG 27 pollici 4K", 190), ("Xbox Series S", 200), ("Apple Watch Series 7", 240),
+    ("Fender Stratocaster Player", 620), ("Tavolo allungabile legno", 150), ("GoPro Hero 10", 230)
+]
+_ADJECTIVES = ["come nuovo", "ottime condizioni", "usato poco", "con scatola", "garanzia", "perfetto"]
+_CITIES = [
+    ("Roma", "RM"), ("Milano", "MI"), ("Napoli", "NA"), ("Torino", "TO"), ("Bologna", "BO"),
+    ("Firenze", "FI"), ("Bari", "BA"), ("Palermo", "PA"), ("Verona", "VR"), ("Padova", "PD")
+]
+_SELLERS = ["Marco", "Giulia", "Luca", "Francesca", "Alessandro", "Chiara", "Negozio Usato Pro"]
+
+
+# Dati personali rimossi dalle pagine registrate
+_EMAIL_RE = re.compile(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}")
+_PHONE_RE = re.compile(r"(?<![\w/.=:'\"-])(?:\+39[\s.-]?)?3\d{2}[\s.-]?\d{3}[\s.-]?\d{3,4}(?![\w/.-])")
+
+
+# ---------------------------------------------------------------------------
+# Caricamento
+# ---------------------------------------------------------------------------
+
+def load_index(fixtures_dir: Path = FIXTURES_DIR) -> Dict[str, List[Dict]]:
+    """
+    Legge l'indice del corpus.
+
+    Returns:
+        Dict piattaforma -> lista di pagine (file, kind, page, listings)
+    """
+    return json.loads((fixtures_dir / "index.json").read_text(encoding="utf-8"))
+
+
+def load_page(
+    platform: str,
+    filename: str,
+    base_url: Optional[str] = None,
+    fixtures_dir: Path = FIXTURES_DIR
+) -> str:
+    """
+    Legge una pagina del corpus sostituendo il segnaposto dell'host.
+
+    Args:
+        platform: "subito" o "ebay"
+        filename: Nome del file nell'indice
+        base_url: Host da usare nei link (default: sito reale)
+        fixtures_dir: Directory del corpus
+
+    Returns:
+        HTML della pagina
+    """
+    text = (fixtures_dir / platform / filename).read_text(encoding="utf-8")
+    return text.replace(BASE_URL_PLACEHOLDER, base_url or DEFAULT_BASE_URLS[platform])
+
+
+def corpus_source(index: Dict[str, List[Dict]]) -> str:
+    """
+    Provenienza del corpus.
+
+    Args:
+        index: Indice del corpus (vedi load_index)
+
+    Returns:
+        "synthetic", "recorded" o "mixed"
+    """
+    sources = {page.get("source", "synthetic") for pages in index.values() for page in pages}
+    return sources.pop() if len(sources) == 1 else "mixed"
+
+
+def sanitize_page(page_html: str, base_url: str) -> str:
+    """
+    Prepara una pagina registrata per il repository.
+
+    Sostituisce l'host con il segnaposto e rimuove email e numeri di
+    telefono. Nomi dei venditori e testi liberi restano: le pagine vanno
+    comunque riviste prima del commit.
+
+    Args:
+        page_html: HTML scaricato
+        base_url: Host del sito
+
+    Returns:
+        HTML ripulito
+    """
+    page_html = page_html.replace(base_url, BASE_URL_PLACEHOLDER)
+    page_html = _EMAIL_RE.sub("utente@example.com", page_html)
+    return _PHONE_RE.sub("000 000 0000", page_html)
+
+
+def load_corpus(base_url: Optional[Dict[str, str]] = None) -> Dict[str, List[Dict]]:
+    """
+    Carica tutte le pagine del corpus in memoria.
+
+    Args:
+        base_url: Host per piattaforma da usare nei link (opzionale)
+
+    Returns:
+        Dict piattaforma -> pagine con campo "html"
+    """
+    corpus = {}
+    for platform, pages in load_index().items():
+        corpus[platform] = [
+            {**page, "html": load_page(platform, page["file"], (base_url or {}).get(platform))}
+            for page in pages
+        ]
+    return corpus
+
+
+# ---------------------------------------------------------------------------
+# Corpus sintetico
+# ---------------------------------------------------------------------------
+
+def _fake_item(rng: random.Random, index: int) -> Dict:
+    name, base_price = rng.choice(_PRODUCTS)
+    city, province = rng.choice(_CITIES)
+    price = max(5, round(base_price * rng.uniform(0.6, 1.3)))
+    return {
+        "id": str(480_000_000 + rng.randrange(10_000_000)),
+        "title": f"{name} {rng.choice(_ADJECTIVES)}",
+        "price": price,
+        "city": city,
+        "province": province,
+        "image": f"{rng.getrandbits(64):016x}",
+        "seller": rng.choice(_SELLERS),
+        "index": index
+    }
+
+
+def _filler_scripts(rng: random.Random, kilobytes: int) -> str:
+    """Script inline di riempimento (le pagine reali sono in gran parte JS e JSON)."""
+    chunks = []
+    for i in range(kilobytes):
+        payload = "".join(rng.choice("abcdefghijklmnopqrstuvwxyz0123456789") for _ in range(900))
+        chunks.append(f'<script>window.__chunk_{i}="{payload}";</script>')
+    return "\n".join(chunks)
+
+
+def _subito_search_page(rng: random.Random, page: int, per_page: int = 25) -> (str, int):
+    items = [_fake_item(rng, i) for i in range(per_page)]
+    cards = []
+    for item in items:
+        slug = item["title"].lower().replace(" ", "-")
+        cards.append(f"""
+<div class="SmallCard-module_card__3hfzu items__item item-card" data-id="{item['id']}">
+  <a href="/telefonia/{html.escape(slug)}-{item['city'].lower()}-{item['id']}.htm" class="SmallCard-module_link__hOkzY">
+    <div class="SmallCard-module_picture-group__asLo2">
+      <img src="https://images.sbito.it/api/v1/sbt-ads-images-pro/images/{item['image']}?rule=card-mobile-new-small-1x-auto" alt="{html.escape(item['title'])}" loading="lazy">
+    </div>
+    <div class="SmallCard-module_item-info__jCDEd">
+      <h2 class="ItemTitle-module_item-title__VuKDo">{html.escape(item['title'])}</h2>
+      <p class="index-module_price__N7M2x SmallCard-module_price__yERv7">{item['price']} €</p>
+      <div class="PostingTimeAndPlace-module_date-location__1Owkg">
+        <span class="index-module_town__2H3jy">{item['city']}</span>
+        <span class="index-module_city__cAmYa">({item['province']})</span>
+        <span class="index-module_date__Fmf-4">Oggi alle {rng.randrange(7, 23)}:{rng.randrange(60):02d}</span>
+      </div>
+    </div>
+  </a>
+</div>""")
+
+    next_data = json.dumps({"props": {"pageProps": {"ads": [
+        {"urn": f"id:ad:{item['id']}", "subject": item["title"], "price": item["price"]}
+        for item in items
+    ]}}})
+
+    page_html = f"""<!DOCTYPE html>
+<html lang="it"><head><meta charset="utf-8">
+<title>Annunci in tutta Italia - Subito</title>
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<link rel="stylesheet" href="https://assets.subito.it/static/css/main.css">
+{_filler_scripts(rng, 40)}
+</head><body>
+<header><nav>{''.join(f'<a href="/annunci-italia/vendita/categoria-{i}/">Categoria {i}</a>' for i in range(30))}</nav></header>
+<main><section class="ListingContainer"><div class="jsx-items-container">{''.join(cards)}
+</div></section>
+<nav class="pagination"><a href="?o={page * 25}">Pagina successiva</a></nav></main>
+<footer>{''.join(f'<a href="/info/{i}">Link {i}</a>' for i in range(20))}</footer>
+<script id="__NEXT_DATA__" type="application/json">{next_data}</script>
+</body></html>"""
+    return page_html, len(items)
+
+
+def _subito_detail_page(rng: random.Random) -> str:
+    item = _fake_item(rng, 0)
+    description = " ".join(
+        f"{item['title']} in vendita, {rng.choice(_ADJECTIVES)}." for _ in range(12)
+    )
+    photos = "".join(
+        f'<img src="https://images.sbito.it/api/v1/sbt-ads-images-pro/images/{rng.getrandbits(64):016x}?rule=gallery-desktop-1x-auto">'
+        for _ in range(rng.randrange(3, 9))
+    )
+    return f"""<!DOCTYPE html>
+<html lang="it"><head><meta charset="utf-8"><title>{html.escape(item['title'])} - Subito</title>
+{_filler_scripts(rng, 25)}
+</head><body>
+<nav><a class="breadcrumb-category" href="/annunci-italia/vendita/telefonia/">Telefonia</a></nav>
+<main>
+<div class="Carousel_gallery__images">{photos}</div>
+<h1 class="AdInfo_ad-info__title">{html.escape(item['title'])}</h1>
+<p class="AdInfo_ad-info__price">{item['price']} €</p>
+<span class="index-module_insertion-date">Pubblicato il {rng.randrange(1, 28)} ottobre alle 10:{rng.randrange(60):02d}</span>
+<div class="AdDescription_description__154FP">{html.escape(description)}</div>
+<div class="UserDetails_seller-name">{item['seller']}</div>
+</main></body></html>"""
+
+
+def _ebay_search_page(rng: random.Random, page: int, per_page: int = 60) -> (str, int):
+    items = [_fake_item(rng, i) for i in range(per_page)]
+    rows = [
+        # Primo elemento segnaposto, presente anche nelle pagine reali
+        '<li class="s-item"><div class="s-item__wrapper"><div class="s-item__title">'
+        '<span role="heading">Shop on eBay</span></div></div></li>'
+    ]
+    for item in items:
+        rows.append(f"""
+<li class="s-item s-item__pl-on-bottom" id="item{item['id'][-6:]}">
+  <div class="s-item__wrapper clearfix">
+    <div class="s-item__image-section"><div class="s-item__image">
+      <img class="s-item__image-img" src="https://i.ebayimg.com/thumbs/images/g/{item['image']}/s-l225.webp" alt="{html.escape(item['title'])}">
+    </div></div>
+    <div class="s-item__info clearfix">
+      <a class="s-item__link" href="{BASE_URL_PLACEHOLDER}/itm/{item['id']}?hash=item{item['image'][:10]}&amp;_trkparms=ispr%3D1">
+        <div class="s-item__title"><span role="heading" aria-level="3">{html.escape(item['title'])}</span></div>
+      </a>
+      <div class="s-item__subtitle"><span class="SECONDARY_INFO">{rng.choice(['Usato', 'Nuovo', 'Ricondizionato'])}</span></div>
+      <div class="s-item__details clearfix">
+        <div class="s-item__detail"><span class="s-item__price">EUR {item['price']},{rng.randrange(100):02d}</span></div>
+        <div class="s-item__detail"><span class="s-item__shipping s-item__logisticsCost">+EUR {rng.randrange(5, 15)},90 di spedizione</span></div>
+        <div class="s-item__detail"><span class="s-item__location s-item__itemLocation">da {item['city']}, Italia</span></div>
+      </div>
+    </div>
+  </div>
+</li>""")
+
+    page_html = f"""<!DOCTYPE html>
+<html lang="it"><head><meta charset="utf-8"><title>iphone in vendita | eBay</title>
+{_filler_scripts(rng, 60)}
+</head><body>
+<header id="gh"><nav>{''.join(f'<a href="{BASE_URL_PLACEHOLDER}/b/cat-{i}">Categoria {i}</a>' for i in range(40))}</nav></header>
+<div id="srp-river-results"><ul class="srp-results srp-list clearfix">{''.join(rows)}
+</ul></div>
+<nav class="pagination"><a class="pagination__next" href="{BASE_URL_PLACEHOLDER}/sch/i.html?_pgn={page + 1}">Avanti</a></nav>
+<footer id="glbfooter">{''.join(f'<a href="{BASE_URL_PLACEHOLDER}/help/{i}">Aiuto {i}</a>' for i in range(30))}</footer>
+</body></html>"""
+    return page_html, len(items)
+
+
+def _ebay_detail_page(rng: random.Random) -> str:
+    item = _fake_item(rng, 0)
+    description = " ".join(
+        f"{item['title']}, {rng.choice(_ADJECTIVES)}, spedizione rapida." for _ in range(10)
+    )
+    photos = "".join(
+        f'<div class="ux-image-carousel-item"><img src="https://i.ebayimg.com/images/g/{rng.getrandbits(64):016x}/s-l1600.jpg"></div>'
+        for _ in range(rng.randrange(3, 10))
+    )
+    return f"""<!DOCTYPE html>
+<html lang="it"><head><meta charset="utf-8"><title>{html.escape(item['title'])} | eBay</title>
+{_filler_scripts(rng, 50)}
+</head><body>
+<nav aria-label="breadcrumb"><ul>
+<li><a href="{BASE_URL_PLACEHOLDER}/b/Telefonia/15032">Telefonia fissa e mobile</a></li>
+<li><a href="{BASE_URL_PLACEHOLDER}/b/Cellulari-e-smartphone/9355">Cellulari e smartphone</a></li>
+</ul></nav>
+<div class="ux-image-carousel">{photos}</div>
+<h1 class="x-item-title__mainTitle"><span>{html.escape(item['title'])}</span></h1>
+<div class="x-price-primary"><span>EUR {item['price']},00</span></div>
+<div class="x-sellercard-atf"><span class="mbg-nw">{item['seller'].lower()}_shop</span></div>
+<div data-testid="x-item-description">{html.escape(description)}</div>
+</body></html>"""
+
+
+def synthesize(dest: Path = FIXTURES_DIR, search_pages: int = 2, detail_pages: int = 3, seed: int = 42):
+    """
+    Genera il corpus sintetico (deterministico dato il seed).
+
+    Args:
+        dest: Directory di destinazione
+        search_pages: Pagine di risultati per piattaforma
+        detail_pages: Pagine di dettaglio per piattaforma
+        seed: Seed del generatore
+    """
+    rng = random.Random(seed)
+    index: Dict[str, List[Dict]] = {}
+
+    builders = {
+        "subito": (_subito_search_page, _subito_detail_page),
+        "ebay": (_ebay_search_page, _ebay_detail_page)
+    }
+
+    for platform, (search_builder, detail_builder) in builders.items():
+        platform_dir = dest / platform
+        platform_dir.mkdir(parents=True, exist_ok=True)
+        pages = []
+
+        for page in range(1, search_pages + 1):
+            page_html, count = search_builder(rng, page)
+            filename = f"search_{page}.html"
+            (platform_dir / filename).write_text(page_html, encoding="utf-8")
+            pages.append({
+                "file": filename, "kind": "search", "page": page, "listings": count, "source": "synthetic"
+            })
+
+        for number in range(1, detail_pages + 1):
+            filename = f"detail_{number}.html"
+            (platform_dir / filename).write_text(detail_builder(rng), encoding="utf-8")
+            pages.append({
+                "file": filename, "kind": "detail", "page": number, "listings": 1, "source": "synthetic"
+            })
+
+        index[platform] = pages
+
+    (dest / "index.json").write_text(json.dumps(index, indent=2) + "\n", encoding="utf-8")
+    print(f"Corpus sintetico generato in {dest}")
+
+
+# ---------------------------------------------------------------------------
+# Registrazione dai siti reali
+# ---------------------------------------------------------------------------
+
+def record(query: str, dest: Path = FIXTURES_DIR, search_pages: int = 2, detail_pages: int = 3):
+    """
+    Registra pagine reali dai siti (richiede accesso alla rete).
+
+    Rispetta il rate limiting degli scraper: può richiedere alcuni minuti.
+    Le pagine sono ripulite con sanitize_page(); controllarle prima di
+    aggiungerle al repository.
+
+    Args:
+        query: Query di ricerca
+        dest: Directory di destinazione
+        search_pages: Pagine di risultati per piattaforma
+        detail_pages: Pagine di dettaglio per piattaforma
+    """
+    from src.scraper.ebay_scraper import EbayScraper
+    from src.scraper.subito_scraper import SubitoScraper
+
+    index: Dict[str, List[Dict]] = {}
+    provenance = {"source": "recorded", "query": query, "recorded_on": date.today().isoformat()}
+
+    for platform, scraper_class in (("subito", SubitoScraper), ("ebay", EbayScraper)):
+        platform_dir = dest / platform
+        platform_dir.mkdir(parents=True, exist_ok=True)
+        pages = []
+
+        with scraper_class() as scraper:
+            if platform == "subito":
+                search_url = f"{scraper.base_url}/annunci-italia/vendita/usato/?q={query.replace(' ', '+')}"
+            else:
+                search_url = f"{scraper.base_url}/sch/i.html?_nkw={query.replace(' ', '+')}&LH_BIN=1"
+
+            links = []
+            for page in range(1, search_pages + 1):
+                response = scraper.fetch_page(scraper._build_page_url(search_url, page))
+                if response is None:
+                    print(f"{platform}: pagina {page} non scaricata, interrotto")
+                    break
+
+                filename = f"search_{page}.html"
+                (platform_dir / filename).write_text(
+                    sanitize_page(response.text, scraper.base_url), encoding="utf-8"
+                )
+
+                listings = scraper.parse_listings_page(response.text, response.url)
+                links.extend(listing.link for listing in listings if listing.link)
+                pages.append({
+                    "file": filename, "kind": "search", "page": page, "listings": len(listings), **provenance
+                })
+
+            for number, link in enumerate(links[:detail_pages], start=1):
+                response = scraper.fetch_page(link)
+                if response is None:
+                    continue
+                filename = f"detail_{number}.html"
+                (platform_dir / filename).write_text(
+                    sanitize_page(response.text, scraper.base_url), encoding="utf-8"
+                )
+                pages.append({"file": filename, "kind": "detail", "page": number, "listings": 1, **provenance})
+
+        index[platform] = pages
+
+    (dest / "index.json").write_text(json.dumps(index, indent=2) + "\n", encoding="utf-8")
+    print(f"Corpus registrato in {dest}: controllare le pagine prima del commit")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gestione del corpus HTML per i benchmark")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    synth = subparsers.add_parser("synthesize", help="Genera il corpus sintetico")
+    synth.add_argument("--seed", type=int, default=42)
+
+    rec = subparsers.add_parser("record", help="Registra pagine reali ripulite (rete richiesta)")
+    rec.add_argument("--query", default="iphone 13")
+    rec.add_argument("--pages", type=int, default=2)
+    rec.add_argument("--details", type=int, default=3)
+
+    args = parser.parse_args()
+
+    if args.command == "synthesize":
+        synthesize(seed=args.seed)
+    else:
+        record(args.query, search_pages=args.pages, detail_pages=args.details)
+
+
+if __name__ == "__main__":
+    main()
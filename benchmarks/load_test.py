@@ -0,0 +1,256 @@
+"""
+Test di carico della ricerca contro il server mock dei marketplace.
+
+Avvia il server mock (benchmarks/mock_marketplace.py) e l'API (api.server),
+con gli scraper puntati al server mock, poi invia ricerche con la
+concorrenza indicata e riporta:
+- throughput dell'API (ricerche/s) e percentili di latenza
+- status delle risposte dell'API
+- richieste in uscita verso i siti, per pagina e status (403/429 iniettati)
+
+Con --api-url e --mock-url si usano invece un'API e un server mock già
+avviati (es. l'API in produzione configurata con SCRAPER_*_BASE_URL).
+
+Uso:
+    python benchmarks/load_test.py --workers 2 --concurrency 16 --requests 200 \\
+        --platform all --max-pages 2 --latency-ms 150 --error-429 0.02
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# Aggiungi parent directory al path per importare i moduli
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent))
+
+import httpx
+
+import mock_marketplace
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    """Percentile (nearest rank) di una lista già ordinata."""
+    if not values:
+        return 0.0
+    index = min(len(values) - 1, max(0, int(round(fraction * len(values))) - 1))
+    return values[index]
+
+
+def start_api(mock_url: str, port: int, workers: int, scraper_delay: float) -> subprocess.Popen:
+    """
+    Avvia l'API (api.server) in un processo separato.
+
+    Args:
+        mock_url: URL del server mock
+        port: Porta dell'API
+        workers: Worker dell'API (con più worker lo stato è condiviso in Redis)
+        scraper_delay: Ritardo tra le richieste dello scraper (secondi)
+
+    Returns:
+        Processo dell'API
+    """
+    workdir = tempfile.mkdtemp(prefix="loadtest-")
+    env = dict(
+        os.environ,
+        SCRAPER_SUBITO_BASE_URL=mock_url,
+        SCRAPER_EBAY_BASE_URL=mock_url,
+        SCRAPER_MIN_DELAY=str(scraper_delay),
+        SCRAPER_MAX_DELAY=str(scraper_delay),
+        SCRAPER_REQUESTS_PER_SECOND="100000" if scraper_delay == 0 else str(1 / scraper_delay),
+        RATE_LIMIT_REQUESTS="1000000",
+        SCHEDULER_ENABLED="False",
+        CACHE_WARMER_ENABLED="False",
+        LOG_LEVEL="WARNING",
+        SCHEDULER_DB_PATH=os.path.join(workdir, "scheduler.json"),
+        REPORTS_SQLITE_PATH=os.path.join(workdir, "reports.db"),
+        REPORTS_JOURNAL_DIR=workdir
+    )
+
+    log_path = os.path.join(workdir, "api.log")
+    print(f"Log dell'API: {log_path}")
+
+    return subprocess.Popen(
+        [
+            sys.executable, "-m", "api.server",
+            "--host", "127.0.0.1", "--port", str(port), "--workers", str(workers)
+        ],
+        cwd=workdir,
+        env=dict(env, PYTHONPATH=str(Path(__file__).parent.parent)),
+        stdout=open(log_path, "w"),
+        stderr=subprocess.STDOUT
+    )
+
+
+def wait_for(url: str, timeout: float = 30.0):
+    """Attende che l'URL risponda."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(url, timeout=1.0).status_code < 500:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"{url} non risponde dopo {timeout:.0f}s")
+
+
+async def run_load(
+    api_url: str,
+    requests: int,
+    concurrency: int,
+    payload: Dict,
+    distinct_queries: int,
+    timeout: float
+) -> Dict:
+    """
+    Invia le ricerche e misura le risposte.
+
+    Args:
+        api_url: URL base dell'API
+        requests: Ricerche totali
+        concurrency: Ricerche contemporanee
+        payload: Corpo della richiesta (senza query)
+        distinct_queries: Query diverse (le ripetute possono arrivare dalla cache)
+        timeout: Timeout di ogni ricerca in secondi
+
+    Returns:
+        Dict con latenze, status e durata
+    """
+    latencies: List[float] = []
+    statuses: Counter = Counter()
+    next_request = iter(range(requests))
+    run_id = int(time.time())
+
+    async with httpx.AsyncClient(base_url=api_url, timeout=timeout) as client:
+
+        async def worker():
+            for number in next_request:
+                body = dict(payload, query=f"loadtest {run_id} {number % distinct_queries}")
+                started = time.perf_counter()
+                try:
+                    response = await client.post("/api/v1/search", json=body)
+                    statuses[str(response.status_code)] += 1
+                except httpx.HTTPError as e:
+                    statuses[type(e).__name__] += 1
+                latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        duration = time.perf_counter() - started
+
+    return {"latencies": sorted(latencies), "statuses": statuses, "duration": duration}
+
+
+def report(result: Dict, outbound: Dict, args: argparse.Namespace) -> Dict:
+    """Stampa e restituisce il riepilogo del test."""
+    latencies = result["latencies"]
+    completed = len(latencies)
+    successful = int(result["statuses"].get("200", 0))
+
+    summary = {
+        "workers": args.workers,
+        "concurrency": args.concurrency,
+        "requests": completed,
+        "duration_seconds": round(result["duration"], 2),
+        "throughput_rps": round(completed / result["duration"], 2),
+        "latency_ms": {
+            "p50": round(percentile(latencies, 0.50) * 1000, 1),
+            "p90": round(percentile(latencies, 0.90) * 1000, 1),
+            "p95": round(percentile(latencies, 0.95) * 1000, 1),
+            "p99": round(percentile(latencies, 0.99) * 1000, 1),
+            "max": round(latencies[-1] * 1000, 1) if latencies else 0.0,
+            "mean": round(statistics.mean(latencies) * 1000, 1) if latencies else 0.0
+        },
+        "api_status": dict(result["statuses"]),
+        "outbound_requests": outbound["requests"],
+        "outbound_per_search": round(outbound["requests"] / successful, 2) if successful else None,
+        "outbound_by_page": outbound["by_page"]
+    }
+
+    print(f"\nRicerche: {completed} in {summary['duration_seconds']}s "
+          f"({summary['throughput_rps']} ricerche/s, {args.workers} worker, concorrenza {args.concurrency})")
+    print("Latenza (ms): " + "  ".join(f"{name} {value}" for name, value in summary["latency_ms"].items()))
+    print(f"Status API: {summary['api_status']}")
+    print(f"Richieste in uscita: {summary['outbound_requests']} "
+          f"({summary['outbound_per_search']} per ricerca riuscita)")
+    for page, count in outbound["by_page"].items():
+        print(f"  {page:<22}{count:>8}")
+
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Test di carico della ricerca contro il server mock")
+    parser.add_argument("--api-url", help="API già avviata (default: avvia api.server)")
+    parser.add_argument("--mock-url", help="Server mock già avviato (default: avviato in questo processo)")
+    parser.add_argument("--api-port", type=int, default=8811)
+    parser.add_argument("--workers", type=int, default=1, help="Worker dell'API avviata")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--distinct-queries", type=int, default=None, help="Query diverse (default: tutte)")
+    parser.add_argument("--platform", default="all", choices=["subito", "ebay", "all"])
+    parser.add_argument("--search-pages", type=int, default=1, help="max_pages di ogni ricerca")
+    parser.add_argument("--details", action="store_true", help="Ricerche con details=true")
+    parser.add_argument("--scraper-delay", type=float, default=0.0, help="Ritardo dello scraper tra richieste")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--json", help="Salva il riepilogo in questo file")
+    mock_marketplace.add_options_arguments(parser)
+    args = parser.parse_args()
+
+    mock = None
+    if args.mock_url:
+        mock_url = args.mock_url.rstrip("/")
+    else:
+        mock = mock_marketplace.start_in_thread(options=mock_marketplace.options_from_args(args))
+        mock_url = mock["base_url"]
+        print(f"Server mock su {mock_url}")
+
+    api_process: Optional[subprocess.Popen] = None
+    if args.api_url:
+        api_url = args.api_url.rstrip("/")
+    else:
+        api_process = start_api(mock_url, args.api_port, args.workers, args.scraper_delay)
+        api_url = f"http://127.0.0.1:{args.api_port}"
+
+    try:
+        wait_for(f"{api_url}/health")
+        httpx.post(f"{mock_url}/__reset")
+
+        payload = {
+            "platform": args.platform,
+            "max_pages": args.search_pages,
+            "details": args.details
+        }
+        result = asyncio.run(run_load(
+            api_url,
+            args.requests,
+            args.concurrency,
+            payload,
+            args.distinct_queries or args.requests,
+            args.timeout
+        ))
+        outbound = httpx.get(f"{mock_url}/__stats").json()
+
+        summary = report(result, outbound, args)
+        if args.json:
+            Path(args.json).write_text(json.dumps(summary, indent=2) + "\n", encoding="utf-8")
+    finally:
+        if api_process is not None:
+            api_process.terminate()
+            api_process.wait(timeout=30)
+        if mock is not None:
+            mock["server"].should_exit = True
+
+
+if __name__ == "__main__":
+    main()
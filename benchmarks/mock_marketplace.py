@@ -0,0 +1,247 @@
+"""
+Server mock di Subito.it ed eBay.it per test di carico.
+
+Serve le pagine del corpus (benchmarks/fixtures) con latenza, profondità
+della paginazione ed errori configurabili, così l'intera pipeline di
+ricerca si può provare senza contattare i siti reali. Le due piattaforme
+usano path diversi e condividono lo stesso server:
+
+- /annunci-italia...  ricerche Subito (paginazione ?o=offset)
+- /sch/...            ricerche eBay (paginazione ?_pgn=pagina)
+- /itm/<id>           dettaglio eBay
+- ogni altro path     dettaglio Subito
+
+Endpoint di controllo:
+- GET  /__stats   richieste servite per piattaforma, tipo di pagina e status
+- POST /__reset   azzera le statistiche
+
+Per puntare l'API al server mock:
+    SCRAPER_SUBITO_BASE_URL=http://127.0.0.1:8900
+    SCRAPER_EBAY_BASE_URL=http://127.0.0.1:8900
+
+Uso:
+    python benchmarks/mock_marketplace.py [--port 8900] [--latency-ms 150] [--jitter-ms 50]
+        [--max-pages 3] [--error-403 0.01] [--error-429 0.02] [--retry-after 2]
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional
+
+# Aggiungi parent directory al path per importare i moduli
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent))
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import HTMLResponse, JSONResponse
+from starlette.routing import Route
+
+import corpus
+
+
+EMPTY_PAGE = "<!DOCTYPE html><html><body><main><p>Nessun risultato</p></main></body></html>"
+
+
+@dataclass
+class MarketplaceOptions:
+    """Comportamento del server mock."""
+
+    latency_ms: float = 0.0  # Latenza media di ogni risposta
+    jitter_ms: float = 0.0  # Variazione casuale (uniforme, +/-) della latenza
+    max_pages: int = 5  # Pagine di risultati per ricerca, le successive sono vuote
+    error_403: float = 0.0  # Frazione di risposte 403
+    error_429: float = 0.0  # Frazione di risposte 429
+    retry_after: Optional[float] = 1.0  # Header Retry-After delle risposte 429 (None = assente)
+    seed: Optional[int] = None
+
+
+class MockMarketplace:
+    """
+    Applicazione ASGI che simula le due piattaforme.
+
+    Le pagine di risultati ruotano sulle pagine del corpus; le statistiche
+    contano ogni richiesta ricevuta, incluse quelle rifiutate con 403/429.
+    """
+
+    def __init__(self, base_url: str, options: Optional[MarketplaceOptions] = None):
+        """
+        Inizializza il server.
+
+        Args:
+            base_url: URL pubblico del server (usato nei link delle pagine eBay)
+            options: Comportamento del server
+        """
+        self.options = options or MarketplaceOptions()
+        self.rng = random.Random(self.options.seed)
+        self.stats: Counter = Counter()
+        self.started = time.monotonic()
+
+        pages = corpus.load_corpus({"subito": base_url, "ebay": base_url})
+        self.search_pages = {
+            platform: [page["html"] for page in platform_pages if page["kind"] == "search"]
+            for platform, platform_pages in pages.items()
+        }
+        self.detail_pages = {
+            platform: [page["html"] for page in platform_pages if page["kind"] == "detail"]
+            for platform, platform_pages in pages.items()
+        }
+
+        self.app = Starlette(routes=[
+            Route("/__stats", self.get_stats, methods=["GET"]),
+            Route("/__reset", self.reset_stats, methods=["POST"]),
+            Route("/annunci-italia{path:path}", self.subito_search),
+            Route("/sch/{path:path}", self.ebay_search),
+            Route("/itm/{item_id}", self.ebay_detail),
+            Route("/{path:path}", self.subito_detail)
+        ])
+
+    async def __call__(self, scope, receive, send):
+        await self.app(scope, receive, send)
+
+    async def _respond(self, platform: str, kind: str, html: str) -> HTMLResponse:
+        """Applica latenza ed errori e restituisce la pagina."""
+        options = self.options
+
+        delay = options.latency_ms + self.rng.uniform(-options.jitter_ms, options.jitter_ms)
+        if delay > 0:
+            await asyncio.sleep(delay / 1000)
+
+        roll = self.rng.random()
+        if roll < options.error_403:
+            status, headers = 403, {}
+            html = "<html><body><h1>Accesso negato</h1></body></html>"
+        elif roll < options.error_403 + options.error_429:
+            status = 429
+            headers = {"Retry-After": f"{options.retry_after:g}"} if options.retry_after is not None else {}
+            html = "<html><body><h1>Troppe richieste</h1></body></html>"
+        else:
+            status, headers = 200, {}
+
+        self.stats[f"{platform}.{kind}.{status}"] += 1
+        return HTMLResponse(html, status_code=status, headers=headers)
+
+    def _search_page(self, platform: str, page: int) -> str:
+        if page >= self.options.max_pages:
+            return EMPTY_PAGE
+        pages = self.search_pages[platform]
+        return pages[page % len(pages)]
+
+    def _detail_page(self, platform: str, path: str) -> str:
+        pages = self.detail_pages[platform]
+        return pages[sum(path.encode()) % len(pages)]
+
+    async def subito_search(self, request: Request) -> HTMLResponse:
+        page = int(request.query_params.get("o", "0") or 0) // 25
+        return await self._respond("subito", "search", self._search_page("subito", page))
+
+    async def ebay_search(self, request: Request) -> HTMLResponse:
+        page = int(request.query_params.get("_pgn", "1") or 1) - 1
+        return await self._respond("ebay", "search", self._search_page("ebay", page))
+
+    async def ebay_detail(self, request: Request) -> HTMLResponse:
+        return await self._respond("ebay", "detail", self._detail_page("ebay", request.url.path))
+
+    async def subito_detail(self, request: Request) -> HTMLResponse:
+        return await self._respond("subito", "detail", self._detail_page("subito", request.url.path))
+
+    async def get_stats(self, request: Request) -> JSONResponse:
+        return JSONResponse({
+            "uptime_seconds": round(time.monotonic() - self.started, 1),
+            "requests": sum(self.stats.values()),
+            "by_page": dict(sorted(self.stats.items()))
+        })
+
+    async def reset_stats(self, request: Request) -> JSONResponse:
+        self.stats.clear()
+        self.started = time.monotonic()
+        return JSONResponse({"reset": True})
+
+
+def start_in_thread(
+    port: int = 0,
+    options: Optional[MarketplaceOptions] = None,
+    host: str = "127.0.0.1"
+) -> Dict:
+    """
+    Avvia il server mock in un thread del processo corrente.
+
+    Args:
+        port: Porta (0 = porta libera)
+        options: Comportamento del server
+        host: Indirizzo di ascolto
+
+    Returns:
+        Dict con base_url, marketplace e server (server.should_exit = True per fermarlo)
+    """
+    import socket
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    base_url = f"http://{host}:{sock.getsockname()[1]}"
+
+    marketplace = MockMarketplace(base_url, options)
+    server = uvicorn.Server(uvicorn.Config(marketplace, log_level="warning", access_log=False))
+
+    thread = threading.Thread(
+        target=server.run, kwargs={"sockets": [sock]}, name="mock-marketplace", daemon=True
+    )
+    thread.start()
+
+    while not server.started:
+        time.sleep(0.01)
+
+    return {"base_url": base_url, "marketplace": marketplace, "server": server, "thread": thread}
+
+
+def add_options_arguments(parser: argparse.ArgumentParser):
+    """Aggiunge al parser le opzioni di MarketplaceOptions."""
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Latenza media delle risposte")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="Variazione casuale della latenza")
+    parser.add_argument("--max-pages", type=int, default=5, help="Pagine di risultati per ricerca")
+    parser.add_argument("--error-403", type=float, default=0.0, help="Frazione di risposte 403")
+    parser.add_argument("--error-429", type=float, default=0.0, help="Frazione di risposte 429")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After delle 429 (negativo = assente)")
+    parser.add_argument("--seed", type=int, default=None)
+
+
+def options_from_args(args: argparse.Namespace) -> MarketplaceOptions:
+    """Crea MarketplaceOptions dagli argomenti di add_options_arguments."""
+    return MarketplaceOptions(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        max_pages=args.max_pages,
+        error_403=args.error_403,
+        error_429=args.error_429,
+        retry_after=args.retry_after if args.retry_after >= 0 else None,
+        seed=args.seed
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Server mock di Subito.it ed eBay.it")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    add_options_arguments(parser)
+    args = parser.parse_args()
+
+    base_url = f"http://{args.host}:{args.port}"
+    marketplace = MockMarketplace(base_url, options_from_args(args))
+
+    print(f"Server mock su {base_url}")
+    print(f"  SCRAPER_SUBITO_BASE_URL={base_url}")
+    print(f"  SCRAPER_EBAY_BASE_URL={base_url}")
+    uvicorn.run(marketplace, host=args.host, port=args.port, log_level="warning", access_log=False)
+
+
+if __name__ == "__main__":
+    main()
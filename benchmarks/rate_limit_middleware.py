@@ -0,0 +1,125 @@
+"""
+Benchmark del middleware di rate limiting.
+
+Confronta la latenza per richiesta su una route /api/v1/* con:
+- nessun middleware
+- il middleware precedente basato su BaseHTTPMiddleware (stessa logica)
+- RateLimitMiddleware (ASGI puro)
+
+Le richieste sono eseguite chiamando direttamente l'app ASGI, senza rete,
+così il tempo misurato è quello di routing e middleware.
+
+Uso:
+    python benchmarks/rate_limit_middleware.py [--requests 20000]
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Aggiungi parent directory al path per importare i moduli
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from fastapi import FastAPI
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from api.middleware.rate_limit import RateLimitMiddleware
+from api.services.rate_limit import GCRALimiter
+
+
+class LegacyRateLimitMiddleware(BaseHTTPMiddleware):
+    """Stessa logica di RateLimitMiddleware con BaseHTTPMiddleware (riferimento)."""
+
+    def __init__(self, app, requests: int, period: int):
+        super().__init__(app)
+        self.requests = requests
+        self.limiter = GCRALimiter(requests, period)
+
+    async def dispatch(self, request, call_next):
+        if request.url.path in ["/health", "/docs", "/redoc", "/openapi.json"]:
+            return await call_next(request)
+
+        forwarded = request.headers.get("X-Forwarded-For")
+        client_ip = forwarded.split(",")[0].strip() if forwarded else request.client.host
+        result = await self.limiter.hit(client_ip)
+
+        response = await call_next(request)
+        response.headers["X-RateLimit-Limit"] = str(self.requests)
+        response.headers["X-RateLimit-Remaining"] = str(result.remaining)
+        response.headers["X-RateLimit-Reset"] = str(int(time.time() + result.reset_after))
+        return response
+
+
+def build_app(middleware=None) -> FastAPI:
+    """Crea un'app minimale con una route /api/v1/*."""
+    app = FastAPI()
+
+    @app.get("/api/v1/ping")
+    async def ping():
+        return {"status": "ok"}
+
+    if middleware is not None:
+        # Limite alto: si misura il costo del controllo, non il rifiuto
+        app.add_middleware(middleware, requests=10**9, period=60)
+
+    return app
+
+
+async def run(app, requests: int) -> list:
+    """Esegue le richieste e restituisce le latenze in microsecondi."""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/api/v1/ping",
+        "raw_path": b"/api/v1/ping",
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 50000),
+        "server": ("bench", 80),
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    latencies = []
+    for i in range(requests):
+        request_scope = dict(scope, client=(f"10.0.{i % 256}.{i % 100}", 50000))
+        start = time.perf_counter()
+        await app(request_scope, receive, send)
+        latencies.append((time.perf_counter() - start) * 1e6)
+    return latencies
+
+
+def main():
+    """Esegue il benchmark e stampa i risultati."""
+    parser = argparse.ArgumentParser(description="Benchmark rate limiting")
+    parser.add_argument("--requests", type=int, default=20000)
+    args = parser.parse_args()
+
+    variants = [
+        ("nessun middleware", build_app()),
+        ("BaseHTTPMiddleware", build_app(LegacyRateLimitMiddleware)),
+        ("ASGI puro", build_app(RateLimitMiddleware)),
+    ]
+
+    print(f"{'variante':<22}{'p50 (µs)':>10}{'p99 (µs)':>10}{'media (µs)':>12}")
+    for name, app in variants:
+        asyncio.run(run(app, 500))  # warm-up
+        latencies = sorted(asyncio.run(run(app, args.requests)))
+        p50 = latencies[len(latencies) // 2]
+        p99 = latencies[int(len(latencies) * 0.99)]
+        print(f"{name:<22}{p50:>10.1f}{p99:>10.1f}{statistics.mean(latencies):>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,418 @@
+"""
+Suite di benchmark offline su pagine HTML registrate.
+
+Misura, senza accedere ai siti reali:
+- parsing: pagine/s e annunci/s per piattaforma e backend del parser
+  (html.parser, lxml, html5lib se installati), pagine di risultati e di dettaglio
+- serializzazione degli annunci (Listing.to_dict, JSON, ListingResponse)
+- codec della cache (json, più orjson se installato)
+- end-to-end: POST /api/v1/search contro il server mock dei marketplace
+  (benchmarks/mock_marketplace.py), con ritardi dello scraper a 0
+
+Con --save i risultati sono aggiunti a benchmarks/results/history.jsonl
+insieme al commit corrente; con --compare si confrontano con l'ultima
+esecuzione di un altro commit e si esce con codice 1 se un benchmark
+rallenta oltre la soglia.
+
+Uso:
+    python benchmarks/suite.py [--quick] [--only parse,e2e] [--save] [--compare [--threshold 0.1]]
+"""
+
+import argparse
+import json
+import os
+import platform as platform_module
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+# Aggiungi parent directory al path per importare i moduli
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent))
+
+import corpus
+import mock_marketplace
+from src.config.settings import ScraperConfig
+from src.models.listing import Listing
+from src.scraper.ebay_scraper import EbayScraper
+from src.scraper.subito_scraper import SubitoScraper
+
+
+RESULTS_FILE = Path(__file__).parent / "results" / "history.jsonl"
+
+SCRAPERS = {"subito": SubitoScraper, "ebay": EbayScraper}
+
+PARSER_BACKENDS = ("html.parser", "lxml", "html5lib")
+
+
+def measure(func: Callable[[], int], min_time: float, repeat: int) -> float:
+    """
+    Misura la velocità di una funzione (migliore di più serie).
+
+    Args:
+        func: Funzione da misurare, restituisce le unità elaborate per chiamata
+        min_time: Durata minima di ogni serie in secondi
+        repeat: Numero di serie
+
+    Returns:
+        Unità al secondo della serie più veloce
+    """
+    func()  # warm-up
+    best = 0.0
+    for _ in range(repeat):
+        units = 0
+        started = time.perf_counter()
+        while True:
+            units += func()
+            elapsed = time.perf_counter() - started
+            if elapsed >= min_time:
+                break
+        best = max(best, units / elapsed)
+    return best
+
+
+def available_backends() -> List[str]:
+    """Backend del parser installati."""
+    from bs4 import BeautifulSoup, FeatureNotFound
+
+    backends = []
+    for backend in PARSER_BACKENDS:
+        try:
+            BeautifulSoup("<p></p>", backend)
+        except FeatureNotFound:
+            continue
+        backends.append(backend)
+    return backends
+
+
+def _scraper(platform: str, backend: str = "html.parser"):
+    return SCRAPERS[platform](ScraperConfig(parser=backend))
+
+
+# ---------------------------------------------------------------------------
+# Benchmark
+# ---------------------------------------------------------------------------
+
+def bench_parse(pages: Dict[str, List[Dict]], min_time: float, repeat: int) -> Dict[str, Dict]:
+    """Parsing delle pagine di risultati e di dettaglio per backend."""
+    results = {}
+
+    for backend in available_backends():
+        for platform, platform_pages in pages.items():
+            scraper = _scraper(platform, backend)
+            search_pages = [page for page in platform_pages if page["kind"] == "search"]
+            detail_pages = [page for page in platform_pages if page["kind"] == "detail"]
+
+            # Il benchmark vale solo se il parser estrae tutti gli annunci
+            for page in search_pages:
+                found = len(scraper.parse_listings_page(page["html"], page["file"]))
+                if found != page["listings"]:
+                    raise RuntimeError(
+                        f"{platform}/{page['file']} con {backend}: "
+                        f"{found} annunci invece di {page['listings']}"
+                    )
+
+            def parse_search():
+                for page in search_pages:
+                    scraper.parse_listings_page(page["html"], page["file"])
+                return len(search_pages)
+
+            def parse_details():
+                for page in detail_pages:
+                    scraper._extract_listing_details(
+                        scraper.parse_html(page["html"]), Listing(title="benchmark")
+                    )
+                return len(detail_pages)
+
+            listings_per_page = statistics.mean(page["listings"] for page in search_pages)
+            pages_per_second = measure(parse_search, min_time, repeat)
+
+            results[f"parse.search.{platform}.{backend}"] = {
+                "value": pages_per_second, "unit": "pages/s"
+            }
+            results[f"parse.listings.{platform}.{backend}"] = {
+                "value": pages_per_second * listings_per_page, "unit": "listings/s"
+            }
+            results[f"parse.detail.{platform}.{backend}"] = {
+                "value": measure(parse_details, min_time, repeat), "unit": "pages/s"
+            }
+
+    return results
+
+
+def _corpus_listings(pages: Dict[str, List[Dict]]) -> List[Listing]:
+    listings = []
+    for platform, platform_pages in pages.items():
+        scraper = _scraper(platform)
+        for page in platform_pages:
+            if page["kind"] == "search":
+                listings.extend(scraper.parse_listings_page(page["html"], page["file"]))
+    return listings
+
+
+def bench_serialization(pages: Dict[str, List[Dict]], min_time: float, repeat: int) -> Dict[str, Dict]:
+    """Conversione degli annunci nei formati usati da API e cache."""
+    from api.services.search import _convert_listing_to_response
+
+    listings = _corpus_listings(pages)
+    count = len(listings)
+
+    def to_dict():
+        for listing in listings:
+            listing.to_dict()
+        return count
+
+    def to_json():
+        json.dumps([listing.to_dict() for listing in listings], ensure_ascii=False)
+        return count
+
+    def to_response():
+        for listing in listings:
+            _convert_listing_to_response(listing).model_dump(mode="json")
+        return count
+
+    return {
+        "serialize.to_dict": {"value": measure(to_dict, min_time, repeat), "unit": "listings/s"},
+        "serialize.json": {"value": measure(to_json, min_time, repeat), "unit": "listings/s"},
+        "serialize.response": {"value": measure(to_response, min_time, repeat), "unit": "listings/s"}
+    }
+
+
+def bench_cache_codec(pages: Dict[str, List[Dict]], min_time: float, repeat: int) -> Dict[str, Dict]:
+    """Codifica e decodifica di un risultato di ricerca come salvato in cache."""
+    from api.services.search import _convert_listing_to_response
+
+    listings = _corpus_listings(pages)
+    payload = {
+        "query": "benchmark",
+        "platform": "all",
+        "total_results": len(listings),
+        "results": [_convert_listing_to_response(listing).model_dump(mode="json") for listing in listings]
+    }
+
+    codecs = {"json": (lambda value: json.dumps(value, default=str), json.loads)}
+    try:
+        import orjson
+        codecs["orjson"] = (lambda value: orjson.dumps(value, default=str), orjson.loads)
+    except ImportError:
+        pass
+
+    results = {}
+    for name, (encode, decode) in codecs.items():
+        encoded = encode(payload)
+
+        def encode_payload():
+            encode(payload)
+            return 1
+
+        def decode_payload():
+            decode(encoded)
+            return 1
+
+        results[f"cache.encode.{name}"] = {"value": measure(encode_payload, min_time, repeat), "unit": "ops/s"}
+        results[f"cache.decode.{name}"] = {"value": measure(decode_payload, min_time, repeat), "unit": "ops/s"}
+        results[f"cache.size.{name}"] = {"value": len(encoded), "unit": "bytes"}
+
+    return results
+
+
+def bench_e2e(min_time: float, repeat: int) -> Dict[str, Dict]:
+    """POST /api/v1/search contro il server mock, senza cache."""
+    mock = mock_marketplace.start_in_thread()
+    workdir = tempfile.mkdtemp(prefix="bench-")
+
+    overrides = {
+        "SCRAPER_SUBITO_BASE_URL": mock["base_url"],
+        "SCRAPER_EBAY_BASE_URL": mock["base_url"],
+        "SCRAPER_MIN_DELAY": "0",
+        "SCRAPER_MAX_DELAY": "0",
+        "SCRAPER_REQUESTS_PER_SECOND": "100000",
+        "RATE_LIMIT_REQUESTS": "1000000",
+        "REDIS_HOST": "127.0.0.1",
+        "REDIS_PORT": "1",  # Cache disattivata: ogni ricerca scarica le pagine
+        "SCHEDULER_ENABLED": "False",
+        "CACHE_WARMER_ENABLED": "False",
+        "METRICS_ENABLED": "False",
+        "SCHEDULER_DB_PATH": os.path.join(workdir, "scheduler.json"),
+        "REPORTS_SQLITE_PATH": os.path.join(workdir, "reports.db"),
+        "REPORTS_JOURNAL_DIR": workdir
+    }
+    os.environ.update(overrides)
+
+    import logging
+    from fastapi.testclient import TestClient
+    from api.main import app
+
+    logging.disable(logging.WARNING)
+    results = {}
+
+    try:
+        with TestClient(app) as client:
+            counter = iter(range(10**9))
+
+            def search(platform: str, max_pages: int, details: bool = False):
+                def run():
+                    response = client.post("/api/v1/search", json={
+                        "query": f"benchmark {next(counter)}",
+                        "platform": platform,
+                        "max_pages": max_pages,
+                        "details": details,
+                        "dedup": False
+                    })
+                    if response.status_code != 200:
+                        raise RuntimeError(f"Ricerca fallita: {response.status_code} {response.text[:200]}")
+                    return 1
+                return run
+
+            cases = {
+                "e2e.search.subito.1page": search("subito", 1),
+                "e2e.search.all.2pages": search("all", 2),
+                "e2e.search.subito.details": search("subito", 1, details=True)
+            }
+            for name, run in cases.items():
+                results[name] = {"value": measure(run, min_time, repeat), "unit": "searches/s"}
+    finally:
+        logging.disable(logging.NOTSET)
+        mock["server"].should_exit = True
+
+    return results
+
+
+BENCHMARKS = {
+    "parse": bench_parse,
+    "serialize": bench_serialization,
+    "cache": bench_cache_codec
+}
+
+
+# ---------------------------------------------------------------------------
+# Storico dei risultati
+# ---------------------------------------------------------------------------
+
+def current_commit() -> Optional[str]:
+    """Commit corrente (con suffisso -dirty se ci sono modifiche)."""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+        dirty = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"], capture_output=True, text=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return f"{commit}-dirty" if dirty else commit
+
+
+def load_history(path: Path = RESULTS_FILE) -> List[Dict]:
+    """Esecuzioni salvate, dalla più vecchia."""
+    if not path.exists():
+        return []
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines() if line.strip()]
+
+
+def save_run(run: Dict, path: Path = RESULTS_FILE):
+    """Aggiunge un'esecuzione allo storico."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(run) + "\n")
+
+
+def compare(run: Dict, baseline: Dict, threshold: float) -> List[str]:
+    """
+    Confronta due esecuzioni.
+
+    Args:
+        run: Esecuzione corrente
+        baseline: Esecuzione di riferimento
+        threshold: Rallentamento relativo tollerato (0.1 = 10%)
+
+    Returns:
+        Nomi dei benchmark peggiorati oltre la soglia
+    """
+    print(f"\nConfronto con {baseline['commit']} ({baseline['date']})")
+    print(f"{'benchmark':<40}{'prima':>14}{'dopo':>14}{'variazione':>12}")
+
+    regressions = []
+    for name, result in run["results"].items():
+        before = baseline["results"].get(name)
+        if before is None or result["unit"] == "bytes" or not before["value"]:
+            continue
+
+        change = result["value"] / before["value"] - 1
+        marker = ""
+        if change < -threshold:
+            regressions.append(name)
+            marker = "  <-- regressione"
+        print(f"{name:<40}{before['value']:>14.1f}{result['value']:>14.1f}{change:>+11.1%}{marker}")
+
+    return regressions
+
+
+def main():
+    """Esegue la suite e stampa i risultati."""
+    parser = argparse.ArgumentParser(description="Benchmark offline di parsing, serializzazione e ricerca")
+    parser.add_argument("--only", help="Gruppi da eseguire: parse,serialize,cache,e2e")
+    parser.add_argument("--quick", action="store_true", help="Serie brevi (per CI)")
+    parser.add_argument("--save", action="store_true", help="Salva i risultati nello storico")
+    parser.add_argument("--compare", action="store_true", help="Confronta con l'ultima esecuzione di un altro commit")
+    parser.add_argument("--baseline", help="Commit di riferimento per --compare")
+    parser.add_argument("--threshold", type=float, default=0.1, help="Rallentamento tollerato (default 0.1)")
+    args = parser.parse_args()
+
+    groups = args.only.split(",") if args.only else [*BENCHMARKS, "e2e"]
+    min_time, repeat = (0.2, 2) if args.quick else (1.0, 5)
+
+    pages = corpus.load_corpus()
+    source = corpus.corpus_source(corpus.load_index())
+    if source != "recorded":
+        print(f"Corpus {source}: valori assoluti indicativi, confrontabili solo sullo stesso corpus")
+    results: Dict[str, Dict] = {}
+
+    for group in groups:
+        print(f"Esecuzione benchmark '{group}'...", flush=True)
+        if group == "e2e":
+            results.update(bench_e2e(min_time, repeat))
+        else:
+            results.update(BENCHMARKS[group](pages, min_time, repeat))
+
+    print(f"\n{'benchmark':<40}{'valore':>14}  unità")
+    for name, result in results.items():
+        print(f"{name:<40}{result['value']:>14.1f}  {result['unit']}")
+
+    run = {
+        "commit": current_commit(),
+        "date": datetime.now().isoformat(timespec="seconds"),
+        "python": platform_module.python_version(),
+        "machine": platform_module.node(),
+        "corpus": source,
+        "results": results
+    }
+
+    exit_code = 0
+    if args.compare:
+        history = [
+            entry for entry in load_history()
+            if entry["commit"] != run["commit"]
+            and entry.get("corpus", "synthetic") == source
+            and (not args.baseline or entry["commit"].startswith(args.baseline))
+        ]
+        if history:
+            if compare(run, history[-1], args.threshold):
+                exit_code = 1
+        else:
+            print("\nNessuna esecuzione di riferimento nello storico")
+
+    if args.save:
+        save_run(run)
+        print(f"\nRisultati salvati in {RESULTS_FILE}")
+
+    sys.exit(exit_code)
+
+
+if __name__ == "__main__":
+    main()
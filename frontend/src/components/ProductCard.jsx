@@ -7,8 +7,14 @@ export default function ProductCard({ listing }) {
   const [showModal, setShowModal] = useState(false);
   const [imageError, setImageError] = useState(false);
 
-  // Calcola score truffa
-  const scamData = calculateScamScore(listing);
+  // Score truffa: quello calcolato dall'API se presente, altrimenti in locale
+  const scamData = listing.scam_score != null
+    ? {
+        score: listing.scam_score,
+        reasons: listing.risk_reasons || [],
+        riskLevel: listing.risk_level,
+      }
+    : calculateScamScore(listing);
 
   // Placeholder image se non ci sono foto o errore
   const imageUrl = !imageError && listing.photos && listing.photos.length > 0
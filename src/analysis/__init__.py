@@ -0,0 +1,15 @@
+"""Analisi degli annunci: deduplicazione, rischio truffa e statistiche."""
+
+from .dedup import ListingCluster, ListingDeduplicator, normalize_title
+from .price_sketch import PriceSketch
+from .scam import PriceStats, ScamScore, ScamScorer
+
+__all__ = [
+    'ListingCluster',
+    'ListingDeduplicator',
+    'normalize_title',
+    'PriceSketch',
+    'PriceStats',
+    'ScamScore',
+    'ScamScorer'
+]
@@ -0,0 +1,393 @@
+"""Deduplicazione cross-piattaforma degli annunci (MinHash + LSH)."""
+
+import hashlib
+import random
+import re
+import unicodedata
+import zlib
+from collections import defaultdict
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from urllib.parse import urlparse
+import logging
+
+from ..models.listing import Listing
+
+
+logger = logging.getLogger(__name__)
+
+# Primo di Mersenne 2^61 - 1 per la famiglia di hash (a * x + b) mod p
+_MERSENNE_PRIME = (1 << 61) - 1
+
+# Parole che non distinguono un articolo da un altro
+_STOPWORDS = {
+    'vendo', 'vendesi', 'cedo', 'scambio', 'usato', 'usata', 'nuovo', 'nuova',
+    'ottimo', 'ottima', 'ottime', 'perfetto', 'perfetta', 'stato', 'condizioni',
+    'come', 'di', 'da', 'del', 'della', 'con', 'per', 'in', 'il', 'la', 'e',
+    'a', 'the', 'and', 'with', 'for'
+}
+
+_NON_ALNUM = re.compile(r'[^a-z0-9]+')
+_DIGITS = re.compile(r'\d+')
+# Suffissi dimensione delle immagini eBay (es. s-l225.jpg, s-l1600.jpg)
+_EBAY_IMAGE_SIZE = re.compile(r's-l\d+')
+
+
+def normalize_title(title: str) -> str:
+    """
+    Normalizza un titolo per il confronto.
+
+    Minuscolo, senza accenti né punteggiatura, senza parole non
+    significative (es. "vendo", "usato").
+
+    Args:
+        title: Titolo originale
+
+    Returns:
+        Titolo normalizzato
+    """
+    text = unicodedata.normalize('NFKD', title or '')
+    text = text.encode('ascii', 'ignore').decode('ascii').lower()
+    tokens = [tok for tok in _NON_ALNUM.split(text) if tok and tok not in _STOPWORDS]
+    return ' '.join(tokens)
+
+
+def title_shingles(title: str, size: int = 3) -> Set[str]:
+    """
+    Calcola gli shingle di caratteri di un titolo normalizzato.
+
+    Args:
+        title: Titolo originale
+        size: Lunghezza degli shingle
+
+    Returns:
+        Insieme di shingle
+    """
+    text = normalize_title(title)
+    if len(text) <= size:
+        return {text} if text else set()
+    return {text[i:i + size] for i in range(len(text) - size + 1)}
+
+
+def title_numbers(title: str) -> frozenset:
+    """
+    Numeri presenti in un titolo normalizzato (modello, capacità, anno).
+
+    Args:
+        title: Titolo originale
+
+    Returns:
+        Insieme dei numeri (es. "Galaxy S21 128GB" -> {"21", "128"})
+    """
+    return frozenset(_DIGITS.findall(normalize_title(title)))
+
+
+def numbers_compatible(a: frozenset, b: frozenset) -> bool:
+    """
+    Verifica che due titoli non indichino modelli diversi.
+
+    Titoli quasi uguali come "Galaxy S21" e "Galaxy A52" hanno molti
+    trigrammi in comune: i numeri di uno devono essere contenuti
+    nell'altro (un titolo può ometterne alcuni, es. la capacità).
+    """
+    return a <= b or b <= a
+
+
+def photo_fingerprint(url: str) -> Optional[str]:
+    """
+    Calcola l'impronta di un URL immagine, indipendente da dimensione e parametri.
+
+    Args:
+        url: URL della foto
+
+    Returns:
+        Impronta dell'immagine o None se l'URL non è valido
+    """
+    if not url:
+        return None
+
+    parsed = urlparse(url)
+    if not parsed.netloc:
+        return None
+
+    path = _EBAY_IMAGE_SIZE.sub('s-l', parsed.path.lower())
+    return f"{parsed.netloc.lower()}{path}"
+
+
+def prices_compatible(a: Optional[float], b: Optional[float], tolerance: float) -> bool:
+    """
+    Verifica se due prezzi sono compatibili con lo stesso articolo.
+
+    Args:
+        a: Primo prezzo (None se sconosciuto)
+        b: Secondo prezzo (None se sconosciuto)
+        tolerance: Differenza relativa massima
+
+    Returns:
+        True se uno dei prezzi è sconosciuto o la differenza è entro la tolleranza
+    """
+    if a is None or b is None:
+        return True
+    return abs(a - b) <= tolerance * max(a, b, 1.0)
+
+
+def listing_key(listing: Listing) -> str:
+    """Chiave univoca di un annuncio tra le piattaforme."""
+    return f"{listing.source}:{listing.listing_id or listing.link or listing.title}"
+
+
+@dataclass
+class ListingCluster:
+    """Gruppo di annunci che rappresentano lo stesso articolo."""
+
+    cluster_id: str
+    listings: List[Listing] = field(default_factory=list)  # Rappresentante per primo
+
+    @property
+    def representative(self) -> Listing:
+        """Annuncio mostrato per il gruppo."""
+        return self.listings[0]
+
+    @property
+    def duplicates(self) -> List[Listing]:
+        """Annunci duplicati del rappresentante."""
+        return self.listings[1:]
+
+    @property
+    def size(self) -> int:
+        """Numero di annunci nel gruppo."""
+        return len(self.listings)
+
+
+class _UnionFind:
+    """
+    Union-find con compressione dei cammini.
+
+    Per ogni gruppo conserva anche l'intervallo dei prezzi noti, così un
+    merge può essere rifiutato se l'intero gruppo risultante non è
+    compatibile (complete linkage sul prezzo).
+    """
+
+    def __init__(self, prices: List[Optional[float]]):
+        self.parent = list(range(len(prices)))
+        self.min_price = list(prices)
+        self.max_price = list(prices)
+
+    def find(self, i: int) -> int:
+        root = i
+        while self.parent[root] != root:
+            root = self.parent[root]
+        while self.parent[i] != root:
+            self.parent[i], i = root, self.parent[i]
+        return root
+
+    def union(self, a: int, b: int) -> bool:
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a == root_b:
+            return False
+        root, other = min(root_a, root_b), max(root_a, root_b)
+        self.parent[other] = root
+        if self.min_price[other] is not None:
+            if self.min_price[root] is None:
+                self.min_price[root] = self.min_price[other]
+                self.max_price[root] = self.max_price[other]
+            else:
+                self.min_price[root] = min(self.min_price[root], self.min_price[other])
+                self.max_price[root] = max(self.max_price[root], self.max_price[other])
+        return True
+
+    def prices_compatible(self, root_a: int, root_b: int, tolerance: float) -> bool:
+        """True se tutti i prezzi dei due gruppi sono entro la tolleranza tra loro."""
+        if self.min_price[root_a] is None or self.min_price[root_b] is None:
+            return True
+        return prices_compatible(
+            min(self.min_price[root_a], self.min_price[root_b]),
+            max(self.max_price[root_a], self.max_price[root_b]),
+            tolerance
+        )
+
+
+class ListingDeduplicator:
+    """
+    Raggruppa annunci quasi duplicati in tempo circa lineare.
+
+    Ogni titolo viene ridotto a una firma MinHash; il Locality Sensitive
+    Hashing divide la firma in bande e confronta solo gli annunci che
+    condividono almeno una banda, evitando il confronto di tutte le coppie.
+    In ogni bucket un annuncio è confrontato solo con i primi annunci dei
+    gruppi già presenti (al massimo ``max_bucket_reps``), quindi anche
+    migliaia di titoli identici costano un confronto ciascuno.
+
+    Due gruppi vengono uniti solo se la similarità supera la soglia (e i
+    numeri dei titoli sono compatibili) sia tra i due annunci sia tra i
+    primi annunci dei gruppi, e se tutti i prezzi
+    del gruppo risultante sono entro la tolleranza: una catena di coppie
+    simili non unisce articoli diversi. Gli annunci con la stessa foto
+    vengono uniti con il solo controllo sul prezzo.
+    """
+
+    def __init__(
+        self,
+        num_perm: int = 64,
+        bands: int = 16,
+        threshold: float = 0.6,
+        price_tolerance: float = 0.15,
+        max_photo_share: int = 5,
+        seed: int = 1,
+        cache_size: int = 65536,
+        max_bucket_reps: int = 8
+    ):
+        """
+        Inizializza il deduplicatore.
+
+        Args:
+            num_perm: Numero di funzioni hash della firma MinHash
+            bands: Numero di bande LSH (deve dividere num_perm)
+            threshold: Similarità Jaccard minima tra titoli
+            price_tolerance: Differenza relativa massima tra i prezzi
+            max_photo_share: Oltre questo numero di annunci una foto è
+                considerata generica (stock o placeholder) e ignorata
+            seed: Seme delle funzioni hash (firme stabili tra processi)
+            cache_size: Shingle di cui conservare i valori hash
+            max_bucket_reps: Gruppi confrontati al massimo per bucket LSH
+        """
+        if num_perm % bands != 0:
+            raise ValueError("num_perm deve essere multiplo di bands")
+
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        self.price_tolerance = price_tolerance
+        self.max_photo_share = max_photo_share
+        self.max_bucket_reps = max_bucket_reps
+
+        rng = random.Random(seed)
+        self._perms = [
+            (rng.randrange(1, _MERSENNE_PRIME), rng.randrange(0, _MERSENNE_PRIME))
+            for _ in range(num_perm)
+        ]
+        # I trigrammi si ripetono molto tra titoli: i loro num_perm valori
+        # hash vengono calcolati una volta sola
+        self._shingle_hashes = lru_cache(maxsize=cache_size)(self._hash_shingle)
+
+    def _hash_shingle(self, shingle: str) -> Tuple[int, ...]:
+        """Valori delle num_perm funzioni hash per uno shingle."""
+        # crc32 è stabile tra processi, a differenza di hash()
+        h = zlib.crc32(shingle.encode('utf-8'))
+        return tuple([(a * h + b) % _MERSENNE_PRIME for a, b in self._perms])
+
+    def signature(self, shingles: Iterable[str]) -> Tuple[int, ...]:
+        """
+        Calcola la firma MinHash di un insieme di shingle.
+
+        Args:
+            shingles: Shingle del titolo
+
+        Returns:
+            Firma di num_perm interi (vuota se non ci sono shingle)
+        """
+        vectors = [self._shingle_hashes(s) for s in shingles]
+        if not vectors:
+            return ()
+
+        # Minimo per funzione hash su tutti gli shingle
+        return tuple(map(min, zip(*vectors)))
+
+    @staticmethod
+    def similarity(sig_a: Tuple[int, ...], sig_b: Tuple[int, ...]) -> float:
+        """Stima la similarità Jaccard da due firme MinHash."""
+        if not sig_a or not sig_b:
+            return 0.0
+        return sum(1 for x, y in zip(sig_a, sig_b) if x == y) / len(sig_a)
+
+    def cluster(self, listings: List[Listing]) -> List[ListingCluster]:
+        """
+        Raggruppa gli annunci duplicati.
+
+        Args:
+            listings: Annunci da raggruppare (l'ordine viene preservato)
+
+        Returns:
+            Gruppi nell'ordine del primo annuncio di ciascuno
+        """
+        n = len(listings)
+        if n == 0:
+            return []
+
+        signatures = [self.signature(title_shingles(listing.title)) for listing in listings]
+        numbers = [title_numbers(listing.title) for listing in listings]
+        uf = _UnionFind([listing.price for listing in listings])
+
+        def similar(i: int, j: int) -> bool:
+            # Sia la coppia sia i primi annunci dei due gruppi (i root)
+            return all(
+                numbers_compatible(numbers[a], numbers[b])
+                and self.similarity(signatures[a], signatures[b]) >= self.threshold
+                for a, b in {(i, j), (uf.find(i), uf.find(j))}
+            )
+
+        # 1. LSH: stesse bande -> candidati, confrontati con i gruppi del bucket
+        buckets: Dict[Tuple, List[int]] = defaultdict(list)
+        for i, sig in enumerate(signatures):
+            if not sig:
+                continue
+            for band in range(self.bands):
+                start = band * self.rows
+                reps = buckets[(band, sig[start:start + self.rows])]
+                for j in reps:
+                    root_i, root_j = uf.find(i), uf.find(j)
+                    if root_i == root_j:
+                        break
+                    if uf.prices_compatible(root_i, root_j, self.price_tolerance) and similar(i, j):
+                        uf.union(i, j)
+                        break
+                else:
+                    if len(reps) < self.max_bucket_reps:
+                        reps.append(i)
+
+        # 2. Foto identiche (escluse quelle condivise da troppi annunci)
+        photos: Dict[str, Set[int]] = defaultdict(set)
+        for i, listing in enumerate(listings):
+            for url in listing.photos or []:
+                fingerprint = photo_fingerprint(url)
+                if fingerprint:
+                    photos[fingerprint].add(i)
+
+        for members in photos.values():
+            if 1 < len(members) <= self.max_photo_share:
+                first, *others = sorted(members)
+                for j in others:
+                    if uf.prices_compatible(uf.find(first), uf.find(j), self.price_tolerance):
+                        uf.union(first, j)
+
+        # 3. Gruppi e rappresentanti
+        groups: Dict[int, List[int]] = defaultdict(list)
+        for i in range(n):
+            groups[uf.find(i)].append(i)
+
+        clusters = []
+        for root in sorted(groups):
+            members = [listings[i] for i in groups[root]]
+            members.sort(key=self._representative_key)
+            cluster_id = hashlib.blake2b(
+                min(listing_key(listing) for listing in members).encode('utf-8'),
+                digest_size=6
+            ).hexdigest()
+            clusters.append(ListingCluster(cluster_id=cluster_id, listings=members))
+
+        duplicates = n - len(clusters)
+        if duplicates:
+            logger.debug("Deduplicazione: %s annunci -> %s gruppi", n, len(clusters))
+
+        return clusters
+
+    @staticmethod
+    def _representative_key(listing: Listing):
+        """Ordine dei membri: prima il prezzo più basso, poi più foto e dettagli."""
+        return (
+            listing.price if listing.price is not None else float('inf'),
+            -len(listing.photos or []),
+            listing.description is None
+        )
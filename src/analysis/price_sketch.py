@@ -0,0 +1,127 @@
+"""Sketch di quantili a memoria limitata per le statistiche di prezzo (DDSketch)."""
+
+import math
+from typing import Dict, Iterable, List, Mapping, Optional
+
+
+class PriceSketch:
+    """
+    Stima i quantili di una distribuzione di prezzi senza conservarli.
+
+    Ogni prezzo incrementa il contatore del bucket logaritmico
+    ceil(log_gamma(prezzo)), con gamma = (1 + a) / (1 - a): qualunque
+    quantile stimato ha errore relativo al più ``a``. I prezzi sono
+    limitati a [min_value, max_value], quindi i bucket possibili sono
+    finiti (circa 520 con a = 0.02) e un aggiornamento costa O(1).
+    I bucket sono semplici contatori: due sketch con gli stessi
+    parametri si uniscono sommandoli (anche in Redis con HINCRBY).
+    """
+
+    def __init__(
+        self,
+        relative_accuracy: float = 0.02,
+        min_value: float = 0.01,
+        max_value: float = 10_000_000.0
+    ):
+        """
+        Inizializza lo sketch.
+
+        Args:
+            relative_accuracy: Errore relativo massimo dei quantili
+            min_value: Prezzo minimo distinguibile
+            max_value: Prezzo massimo distinguibile
+        """
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("relative_accuracy deve essere tra 0 e 1")
+
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.min_value = min_value
+        self.max_value = max_value
+        self.bins: Dict[int, int] = {}
+        self.count = 0
+
+    def bucket(self, value: float) -> int:
+        """
+        Calcola il bucket di un prezzo.
+
+        Args:
+            value: Prezzo (positivo)
+
+        Returns:
+            Indice del bucket
+        """
+        value = min(max(value, self.min_value), self.max_value)
+        return math.ceil(math.log(value) / self._log_gamma)
+
+    def value(self, index: int) -> float:
+        """Prezzo rappresentativo di un bucket (errore relativo <= relative_accuracy)."""
+        return 2 * self.gamma ** index / (self.gamma + 1)
+
+    def add(self, value: float, count: int = 1):
+        """
+        Aggiunge un prezzo.
+
+        Args:
+            value: Prezzo (i valori non positivi sono ignorati)
+            count: Numero di occorrenze
+        """
+        if value is None or value <= 0:
+            return
+        index = self.bucket(value)
+        self.bins[index] = self.bins.get(index, 0) + count
+        self.count += count
+
+    def merge_bins(self, bins: Mapping[int, int]):
+        """
+        Somma i bucket di un altro sketch con gli stessi parametri.
+
+        Args:
+            bins: Dict indice bucket -> contatore
+        """
+        for index, count in bins.items():
+            index, count = int(index), int(count)
+            self.bins[index] = self.bins.get(index, 0) + count
+            self.count += count
+
+    def quantiles(self, qs: Iterable[float]) -> List[Optional[float]]:
+        """
+        Stima più quantili con una sola scansione dei bucket.
+
+        Args:
+            qs: Quantili richiesti (tra 0 e 1)
+
+        Returns:
+            Prezzi stimati, None se lo sketch è vuoto
+        """
+        qs = list(qs)
+        if self.count == 0:
+            return [None] * len(qs)
+
+        order = sorted(range(len(qs)), key=lambda i: qs[i])
+        results: List[Optional[float]] = [None] * len(qs)
+        indices = sorted(self.bins)
+
+        position = 0
+        cumulative = self.bins[indices[0]]
+        for i in order:
+            rank = min(max(qs[i], 0.0), 1.0) * (self.count - 1)
+            while cumulative <= rank and position < len(indices) - 1:
+                position += 1
+                cumulative += self.bins[indices[position]]
+            results[i] = self.value(indices[position])
+
+        return results
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Stima un quantile.
+
+        Args:
+            q: Quantile (tra 0 e 1)
+
+        Returns:
+            Prezzo stimato, None se lo sketch è vuoto
+        """
+        return self.quantiles([q])[0]
@@ -0,0 +1,350 @@
+"""Punteggio di rischio truffa degli annunci (porting di frontend/src/utils/scamDetector.js)."""
+
+import re
+from collections import defaultdict
+from dataclasses import dataclass, field
+from statistics import median
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import logging
+
+from ..models.listing import Listing
+
+
+logger = logging.getLogger(__name__)
+
+# Soglie del livello di rischio
+HIGH_RISK_SCORE = 70
+MEDIUM_RISK_SCORE = 40
+
+# Prodotti costosi: (keyword, prezzo minimo normale, peso)
+_EXPENSIVE_KEYWORDS = (
+    ('iphone', 300, 30),
+    ('macbook', 600, 30),
+    ('playstation 5', 350, 30),
+    ('ps5', 350, 30),
+    ('samsung s23', 400, 25),
+    ('rolex', 2000, 40),
+    ('louis vuitton', 500, 35),
+)
+
+# Parole nel titolo: (parole, punteggio, motivo); punteggio negativo = segnale positivo
+_TITLE_KEYWORDS = (
+    (('nuovo', 'sigillato', 'scontato'), 10, 'Promesse troppo allettanti'),
+    (('urgente', 'affare'), 8, 'Senso di urgenza sospetto'),
+    (('originale', '100% originale'), 5, 'Enfasi eccessiva su originalità'),
+    (('garanzia', 'scontrino'), -5, None),
+)
+
+# Red flag nella descrizione, in ordine di priorità: (pattern, punteggio, motivo)
+_DESCRIPTION_RED_FLAGS = (
+    (r'pagament[oi] antic', 35, 'Richiesta pagamento anticipato'),
+    (r'western union|moneygram|ricarica', 40, 'Metodo di pagamento non tracciabile'),
+    (r'spedizion[ei] grat', 10, 'Spedizione gratuita per oggetto costoso'),
+    (r'whatsapp|telegram', 15, 'Richiesta di contatto esterno alla piattaforma'),
+    (r'no perditempo|solo interessat', 8, 'Tono aggressivo'),
+)
+
+_STOCK_PHOTO = re.compile(r'placeholder|stock|default')
+_GENERIC_LOCATION = re.compile(r'italia|everywhere')
+_SUSPICIOUS_SELLER = re.compile(r'^(?:user\d+|account\d+|[a-z]{20,})$', re.IGNORECASE)
+
+# Prezzo anomalo rispetto agli altri annunci della stessa categoria:
+# z-score robusto 0.6745 * (prezzo - mediana) / MAD
+_MAD_SCALE = 0.6745
+_ANOMALY_STRONG_Z = 3.5
+_ANOMALY_STRONG_SCORE = 25
+_ANOMALY_Z = 2.5
+_ANOMALY_SCORE = 12
+
+
+class KeywordAutomaton:
+    """
+    Cerca più pattern in un testo con una sola espressione compilata.
+
+    I pattern sono unificati in un'unica alternativa dentro un lookahead,
+    quindi una sola scansione del testo trova anche le occorrenze
+    sovrapposte; ogni occorrenza viene ricondotta al pattern di origine.
+    """
+
+    def __init__(self, patterns: Sequence[str], literal: bool = True):
+        """
+        Compila l'automa.
+
+        Args:
+            patterns: Pattern da cercare (in minuscolo)
+            literal: Se True i pattern sono stringhe letterali, altrimenti regex
+        """
+        self._patterns = list(patterns)
+        alternatives = [
+            f"(?P<p{i}>{re.escape(p) if literal else p})"
+            for i, p in enumerate(self._patterns)
+        ]
+        self._regex = re.compile(f"(?=(?:{'|'.join(alternatives)}))")
+
+    def find(self, text: str) -> List[int]:
+        """
+        Trova i pattern presenti nel testo.
+
+        Args:
+            text: Testo in minuscolo
+
+        Returns:
+            Indici dei pattern trovati, in ordine crescente
+        """
+        found = set()
+        for match in self._regex.finditer(text):
+            found.add(int(match.lastgroup[1:]))
+        return sorted(found)
+
+
+@dataclass
+class ScamScore:
+    """Punteggio di rischio di un annuncio."""
+
+    score: float
+    risk_level: str
+    reasons: List[str] = field(default_factory=list)
+
+
+@dataclass
+class PriceStats:
+    """Prezzo tipico di un gruppo di annunci: mediana e MAD."""
+
+    median: float
+    mad: float
+
+
+class ScamScorer:
+    """
+    Calcola il rischio truffa di un intero batch di annunci.
+
+    Usa gli stessi segnali del frontend (prezzo, titolo, descrizione, foto,
+    località, venditore). In più il prezzo viene confrontato con le
+    statistiche storiche della ricerca, se disponibili, o con mediana e MAD
+    degli annunci della stessa categoria nel batch: le statistiche sono
+    calcolate una volta per categoria e ogni annuncio costa un confronto.
+    Le parole chiave di titolo e descrizione sono cercate con un solo
+    automa precompilato per campo.
+    """
+
+    def __init__(self, min_group_size: int = 5):
+        """
+        Inizializza lo scorer.
+
+        Args:
+            min_group_size: Annunci con prezzo necessari per usare mediana e MAD
+        """
+        self.min_group_size = min_group_size
+
+        # Titolo: prodotti costosi e parole sospette nello stesso automa
+        self._title_words = [kw for kw, _, _ in _EXPENSIVE_KEYWORDS]
+        self._expensive_count = len(self._title_words)
+        self._title_rules: List[int] = []
+        for rule, (words, _, _) in enumerate(_TITLE_KEYWORDS):
+            for word in words:
+                self._title_words.append(word)
+                self._title_rules.append(rule)
+        self._title_automaton = KeywordAutomaton(self._title_words)
+
+        self._description_automaton = KeywordAutomaton(
+            [pattern for pattern, _, _ in _DESCRIPTION_RED_FLAGS],
+            literal=False
+        )
+
+    @staticmethod
+    def _category_key(listing: Listing) -> Optional[str]:
+        """Gruppo per le statistiche di prezzo (None = annunci senza categoria)."""
+        return listing.category.lower() if listing.category else None
+
+    def price_stats(self, listings: Iterable[Listing]) -> Dict[Optional[str], PriceStats]:
+        """
+        Calcola mediana e MAD dei prezzi per categoria.
+
+        Args:
+            listings: Annunci di riferimento
+
+        Returns:
+            Dict categoria -> statistiche (solo categorie con abbastanza prezzi)
+        """
+        groups: Dict[Optional[str], List[float]] = defaultdict(list)
+        for listing in listings:
+            if listing.price:
+                groups[self._category_key(listing)].append(listing.price)
+
+        stats = {}
+        for key, prices in groups.items():
+            if len(prices) < self.min_group_size:
+                continue
+            center = median(prices)
+            mad = median([abs(p - center) for p in prices])
+            if mad > 0:
+                stats[key] = PriceStats(median=center, mad=mad)
+
+        return stats
+
+    def score_batch(
+        self,
+        listings: Sequence[Listing],
+        population: Optional[Iterable[Listing]] = None,
+        reference: Optional[PriceStats] = None
+    ) -> List[ScamScore]:
+        """
+        Calcola il punteggio di rischio di un batch di annunci.
+
+        Args:
+            listings: Annunci da valutare
+            population: Annunci su cui calcolare le statistiche di prezzo
+                (default: gli stessi annunci)
+            reference: Statistiche storiche della ricerca, usate al posto di
+                quelle del batch (opzionale)
+
+        Returns:
+            Punteggi nello stesso ordine degli annunci
+        """
+        if reference is not None:
+            stats = {}
+        else:
+            stats = self.price_stats(listings if population is None else population)
+        return [self._score(listing, stats, reference) for listing in listings]
+
+    def score(self, listing: Listing) -> ScamScore:
+        """
+        Calcola il punteggio di un singolo annuncio (senza statistiche di batch).
+
+        Args:
+            listing: Annuncio da valutare
+
+        Returns:
+            ScamScore
+        """
+        return self._score(listing, {})
+
+    def _score(
+        self,
+        listing: Listing,
+        stats: Dict[Optional[str], PriceStats],
+        reference: Optional[PriceStats] = None
+    ) -> ScamScore:
+        """Somma i segnali di un annuncio."""
+        title = (listing.title or '').lower()
+        title_matches = self._title_automaton.find(title)
+
+        signals = []
+        if listing.price:
+            signals.append(self._price_risk(listing, title_matches, stats, reference))
+        signals.append(self._title_risk(title_matches))
+        if listing.description:
+            signals.append(self._description_risk(listing.description))
+        if listing.photos is not None:
+            signals.append(self._photos_risk(listing.photos))
+        if listing.location:
+            signals.append(self._location_risk(listing.location))
+        if listing.seller_name:
+            signals.append(self._seller_risk(listing.seller_name))
+
+        total = sum(points for points, _ in signals)
+        reasons = [reason for _, reason in signals if reason]
+
+        if total >= HIGH_RISK_SCORE:
+            risk_level = 'high'
+        elif total >= MEDIUM_RISK_SCORE:
+            risk_level = 'medium'
+        else:
+            risk_level = 'low'
+
+        return ScamScore(
+            score=round(min(100.0, max(0.0, float(total))), 1),
+            risk_level=risk_level,
+            reasons=reasons
+        )
+
+    def _price_risk(
+        self,
+        listing: Listing,
+        title_matches: List[int],
+        stats: Dict[Optional[str], PriceStats],
+        reference: Optional[PriceStats] = None
+    ) -> Tuple[float, Optional[str]]:
+        """Prezzo troppo basso per il prodotto o per la categoria."""
+        price = listing.price
+
+        for index in title_matches:
+            if index >= self._expensive_count:
+                break
+            keyword, normal_min, weight = _EXPENSIVE_KEYWORDS[index]
+            if price < normal_min * 0.3:
+                return weight, f"Prezzo sospettosamente basso per {keyword} (€{price:g})"
+            if price < normal_min * 0.5:
+                return weight * 0.6, f"Prezzo molto conveniente per {keyword}, verifica autenticità"
+
+        if price == 1:
+            return 25, 'Prezzo simbolico (€1), contatta venditore per prezzo reale'
+
+        group = reference or stats.get(self._category_key(listing))
+        if group is not None:
+            z = _MAD_SCALE * (price - group.median) / group.mad
+            if z <= -_ANOMALY_STRONG_Z:
+                return _ANOMALY_STRONG_SCORE, (
+                    f"Prezzo molto inferiore agli annunci simili (mediana €{group.median:g})"
+                )
+            if z <= -_ANOMALY_Z:
+                return _ANOMALY_SCORE, (
+                    f"Prezzo inferiore agli annunci simili (mediana €{group.median:g})"
+                )
+
+        if price >= 500 and price % 100 == 0:
+            return 5, 'Prezzo molto tondo per prodotto costoso'
+
+        return 0, None
+
+    def _title_risk(self, title_matches: List[int]) -> Tuple[float, Optional[str]]:
+        """Parole chiave sospette (o rassicuranti) nel titolo."""
+        best_score, best_reason = 0, None
+        for index in title_matches:
+            if index < self._expensive_count:
+                continue
+            _, points, reason = _TITLE_KEYWORDS[self._title_rules[index - self._expensive_count]]
+            if abs(points) > abs(best_score):
+                best_score, best_reason = points, reason
+        return best_score, best_reason
+
+    def _description_risk(self, description: str) -> Tuple[float, Optional[str]]:
+        """Descrizione troppo breve o con red flag."""
+        if len(description) < 20:
+            return 15, 'Descrizione molto breve o assente'
+
+        matches = self._description_automaton.find(description.lower())
+        if matches:
+            _, points, reason = _DESCRIPTION_RED_FLAGS[matches[0]]
+            return points, reason
+
+        return 0, None
+
+    @staticmethod
+    def _photos_risk(photos: List[str]) -> Tuple[float, Optional[str]]:
+        """Foto assenti, singole o di stock."""
+        if not photos:
+            return 20, 'Nessuna foto disponibile'
+        if len(photos) == 1:
+            return 10, 'Solo una foto disponibile'
+        if any(_STOCK_PHOTO.search(photo.lower()) for photo in photos):
+            return 15, 'Foto potrebbero essere stock/scaricate'
+        return 0, None
+
+    @staticmethod
+    def _location_risk(location: str) -> Tuple[float, Optional[str]]:
+        """Località mancante o troppo generica."""
+        if len(location) < 3:
+            return 10, 'Località non specificata'
+        if _GENERIC_LOCATION.search(location.lower()):
+            return 12, 'Località troppo generica'
+        return 0, None
+
+    @staticmethod
+    def _seller_risk(seller_name: str) -> Tuple[float, Optional[str]]:
+        """Nome venditore mancante o generato."""
+        if len(seller_name) < 3:
+            return 8, 'Nome venditore non specificato'
+        if _SUSPICIOUS_SELLER.match(seller_name):
+            return 12, 'Nome venditore sospetto'
+        return 0, None
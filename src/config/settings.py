@@ -18,6 +18,10 @@ class ScraperConfig:
     retry_delay: float = 5.0  # Delay tra retry (secondi)
     backoff_factor: float = 2.0  # Moltiplicatore per exponential backoff
 
+    # Circuit breaker per host
+    circuit_failure_threshold: int = 5  # Download falliti consecutivi che aprono il circuito
+    circuit_recovery_timeout: float = 60.0  # Secondi prima della richiesta di prova
+
     # Timeout
     request_timeout: int = 30  # Timeout richieste HTTP (secondi)
 
@@ -87,8 +91,9 @@ class ScraperConfig:
     log_level: str = 'INFO'  # DEBUG, INFO, WARNING, ERROR
     log_file: str = 'scraper.log'
 
-    # Subito.it specifico
+    # URL base dei siti (sovrascrivibili per benchmark e server mock)
     subito_base_url: str = 'https://www.subito.it'
+    ebay_base_url: str = 'https://www.ebay.it'
 
     def __post_init__(self):
         """Validazione configurazione."""
@@ -4,14 +4,18 @@ import requests
 import random
 import time
 from abc import ABC, abstractmethod
+from email.utils import parsedate_to_datetime
 from typing import List, Optional, Dict
 from bs4 import BeautifulSoup
 import logging
 from pathlib import Path
+from urllib.parse import urlparse
 
 from ..config.settings import ScraperConfig
 from ..models.listing import Listing
-from ..utils.rate_limiter import RateLimiter
+from ..utils import metrics, timing, tracing
+from ..utils.circuit_breaker import CircuitBreaker, get_host_circuit_breaker
+from ..utils.rate_limiter import RateLimiter, get_host_rate_limiter
 
 
 logger = logging.getLogger(__name__)
@@ -28,11 +32,6 @@ class BaseScraper(ABC):
             config: Configurazione dello scraper
         """
         self.config = config or ScraperConfig()
-        self.rate_limiter = RateLimiter(
-            requests_per_second=self.config.requests_per_second,
-            min_delay=self.config.min_delay,
-            max_delay=self.config.max_delay
-        )
         self.session = self._create_session()
 
         # Statistiche
@@ -43,18 +42,51 @@ class BaseScraper(ABC):
             'listings_found': 0
         }
 
-        logger.info(f"{self.__class__.__name__} inizializzato")
+        logger.info("%s inizializzato", self.__class__.__name__)
 
     def _create_session(self) -> requests.Session:
         """Crea una sessione requests con headers appropriati."""
         session = requests.Session()
         session.headers.update(self.config.default_headers)
 
-        # Abilita gestione automatica dei cookies
-        session.cookies.set_policy(None)  # Accetta tutti i cookies
+        # I cookies sono gestiti automaticamente dal jar della sessione
+        # (policy di default: set_policy(None) fa fallire ogni risposta)
 
         return session
 
+    def get_rate_limiter(self, url: str) -> RateLimiter:
+        """
+        Restituisce il rate limiter condiviso per l'host della URL.
+
+        Args:
+            url: URL da richiedere
+
+        Returns:
+            RateLimiter dell'host
+        """
+        return get_host_rate_limiter(
+            urlparse(url).netloc,
+            requests_per_second=self.config.requests_per_second,
+            min_delay=self.config.min_delay,
+            max_delay=self.config.max_delay
+        )
+
+    def get_circuit_breaker(self, url: str) -> CircuitBreaker:
+        """
+        Restituisce il circuit breaker condiviso per l'host della URL.
+
+        Args:
+            url: URL da richiedere
+
+        Returns:
+            CircuitBreaker dell'host
+        """
+        return get_host_circuit_breaker(
+            urlparse(url).netloc,
+            failure_threshold=self.config.circuit_failure_threshold,
+            recovery_timeout=self.config.circuit_recovery_timeout
+        )
+
     def _get_random_user_agent(self) -> str:
         """Restituisce un User-Agent casuale."""
         return random.choice(self.config.user_agents)
@@ -76,8 +108,54 @@ class BaseScraper(ABC):
         Returns:
             Response object o None se fallisce
         """
-        # Applica rate limiting
-        self.rate_limiter.wait()
+        host = urlparse(url).netloc
+
+        with tracing.span('scraper.fetch_page', **{
+            'http.method': method, 'http.url': url, 'server.address': host
+        }) as fetch_span:
+            # Host in errore: fallisce subito, senza attese né retry
+            breaker = self.get_circuit_breaker(url)
+            if not breaker.allow():
+                logger.warning("Circuit breaker aperto per %s: richiesta saltata (%s)", host, url)
+                metrics.CIRCUIT_REJECTIONS.labels(host).inc()
+                fetch_span.set_attribute('circuit.open', True)
+                self.stats['failed'] += 1
+                return None
+
+            try:
+                return self._fetch_with_retries(url, method, host, fetch_span, **kwargs)
+            except BaseException:
+                # Errore imprevisto (es. rate limiter): senza esito registrato
+                # la richiesta di prova resterebbe in corso e il circuito bloccato
+                breaker.record_failure()
+                raise
+
+    def _fetch_with_retries(
+        self,
+        url: str,
+        method: str,
+        host: str,
+        fetch_span,
+        **kwargs
+    ) -> Optional[requests.Response]:
+        """
+        Esegue fetch_page: rate limiting, tentativi e backoff.
+
+        Args:
+            url: URL da richiedere
+            method: Metodo HTTP
+            host: Host della URL
+            fetch_span: Span di tracing della richiesta
+            **kwargs: Argomenti aggiuntivi per requests
+
+        Returns:
+            Response object o None se fallisce
+        """
+        # Applica rate limiting (budget condiviso per host)
+        waited = self.get_rate_limiter(url).wait()
+        metrics.RATE_LIMIT_WAIT_SECONDS.labels(host).observe(waited)
+        timing.record('ratelimit', waited)
+        fetch_span.add_event('rate_limit.wait', {'wait_seconds': waited})
 
         # Imposta User-Agent casuale
         headers = kwargs.pop('headers', {})
@@ -85,75 +163,139 @@ class BaseScraper(ABC):
 
         retries = 0
         last_exception = None
+        # 404 e simili non indicano un problema dell'host
+        host_error = False
 
         while retries <= self.config.max_retries:
             try:
                 self.stats['requests'] += 1
 
-                logger.debug(f"Richiesta {method} a: {url} (tentativo {retries + 1})")
-
-                response = self.session.request(
-                    method=method,
-                    url=url,
-                    headers=headers,
-                    timeout=self.config.request_timeout,
-                    **kwargs
-                )
+                logger.debug("Richiesta %s a: %s (tentativo %s)", method, url, retries + 1)
+
+                started = time.perf_counter()
+                with tracing.span('http.attempt', **{
+                    'http.method': method, 'server.address': host, 'attempt': retries + 1
+                }) as attempt_span:
+                    response = self.session.request(
+                        method=method,
+                        url=url,
+                        headers=headers,
+                        timeout=self.config.request_timeout,
+                        **kwargs
+                    )
+                    attempt_span.set_attribute('http.status_code', response.status_code)
+                elapsed = time.perf_counter() - started
+                metrics.FETCH_SECONDS.labels(host, str(response.status_code)).observe(elapsed)
+                timing.record('fetch', elapsed)
 
                 response.raise_for_status()
 
                 self.stats['successful'] += 1
-                logger.debug(f"Richiesta riuscita: {url} (status: {response.status_code})")
+                self.get_circuit_breaker(url).record_success()
+                logger.debug("Richiesta riuscita: %s (status: %s)", url, response.status_code)
 
                 return response
 
             except requests.exceptions.HTTPError as e:
                 last_exception = e
-                status_code = e.response.status_code if e.response else None
+                # Response è falsy per gli status di errore: confronto esplicito con None
+                status_code = e.response.status_code if e.response is not None else None
+                host_error = status_code is None or status_code in (403, 429) or status_code >= 500
 
                 # Gestione speciale per codici di blocco
                 if status_code in [403, 429, 503]:
                     logger.warning(
-                        f"Rilevato possibile blocco (HTTP {status_code}) per {url}. "
-                        f"Attesa più lunga prima del retry..."
+                        "Rilevato possibile blocco (HTTP %s) per %s. Attesa più lunga prima del retry...",
+                        status_code, url
                     )
-                    # Attesa più lunga per blocchi (30-60 secondi)
-                    wait_time = random.uniform(30.0, 60.0)
+                    # Attesa indicata dal sito (Retry-After) o più lunga per blocchi (30-60 secondi)
+                    wait_time = self._retry_after(e.response)
+                    if wait_time is None:
+                        wait_time = random.uniform(30.0, 60.0)
+                    reason = 'blocked'
                 else:
                     # Exponential backoff normale
                     wait_time = self.config.retry_delay * (self.config.backoff_factor ** retries)
+                    reason = 'http'
 
                 retries += 1
 
                 if retries <= self.config.max_retries:
+                    metrics.FETCH_RETRIES.labels(host, reason).inc()
+                    metrics.BACKOFF_SECONDS.labels(host).inc(wait_time)
+                    timing.record('backoff', wait_time)
+                    fetch_span.add_event('retry.backoff', {'wait_seconds': wait_time, 'attempt': retries})
                     logger.warning(
-                        f"Errore richiesta {url}: HTTP {status_code}. "
-                        f"Retry {retries}/{self.config.max_retries} tra {wait_time:.1f}s"
+                        "Errore richiesta %s: HTTP %s. Retry %s/%s tra %.1fs",
+                        url, status_code, retries, self.config.max_retries, wait_time
                     )
                     time.sleep(wait_time)
                 else:
-                    logger.error(f"Richiesta fallita dopo {self.config.max_retries} retry: {url}")
-                    logger.error(f"Errore: HTTP {status_code} - {str(e)}")
+                    logger.error("Richiesta fallita dopo %s retry: %s", self.config.max_retries, url)
+                    logger.error("Errore: HTTP %s - %s", status_code, e)
 
             except requests.exceptions.RequestException as e:
                 last_exception = e
+                host_error = True
                 retries += 1
+                elapsed = time.perf_counter() - started
+                metrics.FETCH_SECONDS.labels(host, 'error').observe(elapsed)
+                timing.record('fetch', elapsed)
 
                 if retries <= self.config.max_retries:
                     # Exponential backoff
                     wait_time = self.config.retry_delay * (self.config.backoff_factor ** (retries - 1))
+                    metrics.FETCH_RETRIES.labels(host, 'network').inc()
+                    metrics.BACKOFF_SECONDS.labels(host).inc(wait_time)
+                    timing.record('backoff', wait_time)
+                    fetch_span.add_event('retry.backoff', {'wait_seconds': wait_time, 'attempt': retries})
                     logger.warning(
-                        f"Errore richiesta {url}: {str(e)}. "
-                        f"Retry {retries}/{self.config.max_retries} tra {wait_time}s"
+                        "Errore richiesta %s: %s. Retry %s/%s tra %ss",
+                        url, e, retries, self.config.max_retries, wait_time
                     )
                     time.sleep(wait_time)
                 else:
-                    logger.error(f"Richiesta fallita dopo {self.config.max_retries} retry: {url}")
-                    logger.error(f"Errore: {str(e)}")
+                    logger.error("Richiesta fallita dopo %s retry: %s", self.config.max_retries, url)
+                    logger.error("Errore: %s", e)
 
         self.stats['failed'] += 1
+        fetch_span.set_attribute('fetch.failed', True)
+
+        breaker = self.get_circuit_breaker(url)
+        if host_error:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+
         return None
 
+    @staticmethod
+    def _retry_after(response: requests.Response, max_wait: float = 300.0) -> Optional[float]:
+        """
+        Legge l'header Retry-After (secondi o data HTTP).
+
+        Args:
+            response: Risposta di errore
+            max_wait: Attesa massima accettata in secondi
+
+        Returns:
+            Secondi di attesa, o None se l'header manca o non è valido
+        """
+        value = response.headers.get('Retry-After')
+        if not value:
+            return None
+
+        try:
+            seconds = float(value)
+        except ValueError:
+            try:
+                retry_at = parsedate_to_datetime(value)
+            except (TypeError, ValueError):
+                return None
+            seconds = retry_at.timestamp() - time.time()
+
+        return min(max(seconds, 0.0), max_wait)
+
     def parse_html(self, html: str) -> BeautifulSoup:
         """
         Parse HTML con BeautifulSoup.
@@ -164,7 +306,32 @@ class BaseScraper(ABC):
         Returns:
             Oggetto BeautifulSoup
         """
-        return BeautifulSoup(html, self.config.parser)
+        with timing.span('parse'):
+            return BeautifulSoup(html, self.config.parser)
+
+    def parse_listings_page(self, html: str, url: str) -> List[Listing]:
+        """
+        Parse di una pagina di risultati con metriche di tempo e annunci.
+
+        Args:
+            html: HTML della pagina
+            url: URL della pagina (per l'etichetta host)
+
+        Returns:
+            Lista di Listing estratti
+        """
+        host = urlparse(url).netloc
+        started = time.perf_counter()
+
+        with tracing.span('scraper.parse', **{'server.address': host}) as parse_span:
+            soup = self.parse_html(html)
+            with timing.span('extract'):
+                listings = self._extract_listings_from_page(soup)
+            parse_span.set_attribute('listings', len(listings))
+
+        metrics.PARSE_SECONDS.labels(host).observe(time.perf_counter() - started)
+        metrics.LISTINGS_PER_PAGE.labels(host).observe(len(listings))
+        return listings
 
     def save_html(self, html: str, filename: str):
         """
@@ -182,7 +349,7 @@ class BaseScraper(ABC):
 
         filepath = output_dir / filename
         filepath.write_text(html, encoding='utf-8')
-        logger.debug(f"HTML salvato: {filepath}")
+        logger.debug("HTML salvato: %s", filepath)
 
     @abstractmethod
     def scrape_listings(self, url: str, max_pages: int = 1) -> List[Listing]:
@@ -19,7 +19,7 @@ class EbayScraper(BaseScraper):
     def __init__(self, config: Optional[ScraperConfig] = None):
         """Inizializza lo scraper per eBay.it."""
         super().__init__(config)
-        self.base_url = 'https://www.ebay.it'
+        self.base_url = self.config.ebay_base_url
 
     def scrape_listings(self, url: str, max_pages: int = 1) -> List[Listing]:
         """
@@ -35,7 +35,7 @@ class EbayScraper(BaseScraper):
         all_listings = []
 
         for page in range(1, max_pages + 1):
-            logger.info(f"Scraping eBay pagina {page}/{max_pages}")
+            logger.info("Scraping eBay pagina %s/%s", page, max_pages)
 
             # Costruisci URL con paginazione
             page_url = self._build_page_url(url, page)
@@ -44,28 +44,25 @@ class EbayScraper(BaseScraper):
             response = self.fetch_page(page_url)
 
             if not response:
-                logger.error(f"Impossibile recuperare la pagina {page}")
+                logger.error("Impossibile recuperare la pagina %s", page)
                 break
 
             # Salva HTML se configurato
             self.save_html(response.text, f"ebay_page_{page}.html")
 
-            # Parse HTML
-            soup = self.parse_html(response.text)
-
-            # Estrai annunci
-            listings = self._extract_listings_from_page(soup)
+            # Parse HTML ed estrai annunci
+            listings = self.parse_listings_page(response.text, page_url)
 
             if not listings:
-                logger.warning(f"Nessun annuncio trovato nella pagina {page}")
+                logger.warning("Nessun annuncio trovato nella pagina %s", page)
                 break
 
             all_listings.extend(listings)
             self.stats['listings_found'] += len(listings)
 
-            logger.info(f"Trovati {len(listings)} annunci eBay nella pagina {page}")
+            logger.info("Trovati %s annunci eBay nella pagina %s", len(listings), page)
 
-        logger.info(f"Totale annunci eBay trovati: {len(all_listings)}")
+        logger.info("Totale annunci eBay trovati: %s", len(all_listings))
         return all_listings
 
     def scrape_listing_details(self, listing: Listing) -> Listing:
@@ -82,12 +79,12 @@ class EbayScraper(BaseScraper):
             logger.warning("Listing senza link, impossibile estrarre dettagli")
             return listing
 
-        logger.debug(f"Estrazione dettagli eBay per: {listing.link}")
+        logger.debug("Estrazione dettagli eBay per: %s", listing.link)
 
         response = self.fetch_page(listing.link)
 
         if not response:
-            logger.error(f"Impossibile recuperare dettagli per: {listing.link}")
+            logger.error("Impossibile recuperare dettagli per: %s", listing.link)
             return listing
 
         soup = self.parse_html(response.text)
@@ -139,7 +136,7 @@ class EbayScraper(BaseScraper):
             # Prova 3: Cerca all items
             items = soup.find_all('div', attrs={'data-view': 'mi:1686|iid:1'})
 
-        logger.debug(f"Trovati {len(items)} potenziali annunci eBay")
+        logger.debug("Trovati %s potenziali annunci eBay", len(items))
 
         for item in items:
             try:
@@ -147,7 +144,7 @@ class EbayScraper(BaseScraper):
                 if listing and listing.is_valid():
                     listings.append(listing)
             except Exception as e:
-                logger.debug(f"Errore estrazione annuncio eBay: {e}")
+                logger.debug("Errore estrazione annuncio eBay: %s", e)
                 continue
 
         return listings
@@ -248,6 +245,7 @@ class EbayScraper(BaseScraper):
             photos=photos,
             location=location,
             listing_id=listing_id,
+            source="ebay",
             # Campi aggiuntivi (possono essere None)
             condition=condition,
             shipping=shipping_info
@@ -351,6 +349,6 @@ class EbayScraper(BaseScraper):
         if params:
             search_url += "?" + "&".join(params)
 
-        logger.info(f"Ricerca eBay: '{query}' categoria: {category or 'tutte'}")
+        logger.info("Ricerca eBay: '%s' categoria: %s", query, category or 'tutte')
 
         return self.scrape_listings(search_url, max_pages=max_pages)
@@ -35,7 +35,7 @@ class SubitoScraper(BaseScraper):
         all_listings = []
 
         for page in range(1, max_pages + 1):
-            logger.info(f"Scraping pagina {page}/{max_pages}: {url}")
+            logger.info("Scraping pagina %s/%s: %s", page, max_pages, url)
 
             # Costruisci URL con paginazione
             page_url = self._build_page_url(url, page)
@@ -44,28 +44,25 @@ class SubitoScraper(BaseScraper):
             response = self.fetch_page(page_url)
 
             if not response:
-                logger.error(f"Impossibile recuperare la pagina {page}")
+                logger.error("Impossibile recuperare la pagina %s", page)
                 break
 
             # Salva HTML se configurato
             self.save_html(response.text, f"subito_page_{page}.html")
 
-            # Parse HTML
-            soup = self.parse_html(response.text)
-
-            # Estrai annunci
-            listings = self._extract_listings_from_page(soup)
+            # Parse HTML ed estrai annunci
+            listings = self.parse_listings_page(response.text, page_url)
 
             if not listings:
-                logger.warning(f"Nessun annuncio trovato nella pagina {page}")
+                logger.warning("Nessun annuncio trovato nella pagina %s", page)
                 break
 
             all_listings.extend(listings)
             self.stats['listings_found'] += len(listings)
 
-            logger.info(f"Trovati {len(listings)} annunci nella pagina {page}")
+            logger.info("Trovati %s annunci nella pagina %s", len(listings), page)
 
-        logger.info(f"Totale annunci trovati: {len(all_listings)}")
+        logger.info("Totale annunci trovati: %s", len(all_listings))
         return all_listings
 
     def scrape_listing_details(self, listing: Listing) -> Listing:
@@ -82,12 +79,12 @@ class SubitoScraper(BaseScraper):
             logger.warning("Listing senza link, impossibile estrarre dettagli")
             return listing
 
-        logger.debug(f"Estrazione dettagli per: {listing.link}")
+        logger.debug("Estrazione dettagli per: %s", listing.link)
 
         response = self.fetch_page(listing.link)
 
         if not response:
-            logger.error(f"Impossibile recuperare dettagli per: {listing.link}")
+            logger.error("Impossibile recuperare dettagli per: %s", listing.link)
             return listing
 
         soup = self.parse_html(response.text)
@@ -142,7 +139,7 @@ class SubitoScraper(BaseScraper):
             # Prova 3: Cerca link che sembrano annunci
             items = soup.find_all('a', href=re.compile(r'/\w+/\w+/.*\.htm'))
 
-        logger.debug(f"Trovati {len(items)} potenziali annunci")
+        logger.debug("Trovati %s potenziali annunci", len(items))
 
         for item in items:
             try:
@@ -150,7 +147,7 @@ class SubitoScraper(BaseScraper):
                 if listing and listing.is_valid():
                     listings.append(listing)
             except Exception as e:
-                logger.debug(f"Errore estrazione annuncio: {e}")
+                logger.debug("Errore estrazione annuncio: %s", e)
                 continue
 
         return listings
@@ -324,6 +321,6 @@ class SubitoScraper(BaseScraper):
         if query:
             search_url += f"{separator}q={query.replace(' ', '+')}"
 
-        logger.info(f"Ricerca: '{query}' in categoria: {category or 'tutte'}")
+        logger.info("Ricerca: '%s' in categoria: %s", query, category or 'tutte')
 
         return self.scrape_listings(search_url, max_pages=max_pages)
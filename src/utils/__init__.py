@@ -1,6 +1,10 @@
 """Utilità per il sistema di scraping."""
 
-from .rate_limiter import RateLimiter
+from .rate_limiter import RateLimiter, RedisRateLimiter, TokenBucket, get_host_rate_limiter, use_shared_backend
+from .circuit_breaker import CircuitBreaker, get_host_circuit_breaker
 from .logger import setup_logger
 
-__all__ = ['RateLimiter', 'setup_logger']
+__all__ = [
+    'RateLimiter', 'RedisRateLimiter', 'TokenBucket', 'get_host_rate_limiter', 'use_shared_backend',
+    'CircuitBreaker', 'get_host_circuit_breaker', 'setup_logger'
+]
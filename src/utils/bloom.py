@@ -0,0 +1,59 @@
+"""Bloom filter per test di appartenenza compatti."""
+
+import hashlib
+import math
+from typing import Iterable
+
+
+class BloomFilter:
+    """
+    Insieme probabilistico: nessun falso negativo, falsi positivi rari.
+
+    Usa m bit e k funzioni hash ottenute per double hashing da un solo
+    digest blake2b (h1 + i * h2), dimensionati per ``capacity`` elementi
+    con probabilità di falso positivo ``error_rate``.
+    """
+
+    def __init__(self, capacity: int = 1024, error_rate: float = 0.01):
+        """
+        Inizializza il filtro.
+
+        Args:
+            capacity: Numero di elementi previsto
+            error_rate: Probabilità di falso positivo alla capacità prevista
+        """
+        if not 0 < error_rate < 1:
+            raise ValueError("error_rate deve essere tra 0 e 1")
+
+        self.capacity = max(1, capacity)
+        self.error_rate = error_rate
+        self.num_bits = max(8, math.ceil(-self.capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.num_hashes = max(1, round(self.num_bits / self.capacity * math.log(2)))
+        self._bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item: str) -> Iterable[int]:
+        """Posizioni dei bit di un elemento."""
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def add(self, item: str):
+        """
+        Aggiunge un elemento.
+
+        Args:
+            item: Elemento da aggiungere
+        """
+        for pos in self._positions(item):
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(self._bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+    def is_full(self) -> bool:
+        """True se gli elementi aggiunti superano la capacità prevista."""
+        return self.count > self.capacity
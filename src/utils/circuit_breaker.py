@@ -0,0 +1,151 @@
+"""Circuit breaker per host di destinazione."""
+
+import time
+from threading import Lock
+from typing import Dict, Optional
+import logging
+
+
+logger = logging.getLogger(__name__)
+
+# Registry globale dei circuit breaker per host, come per i rate limiter:
+# tutti gli scraper del processo vedono lo stesso stato del sito
+_host_breakers: Dict[str, 'CircuitBreaker'] = {}
+_host_breakers_lock = Lock()
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker a tre stati (closed, open, half_open).
+
+    Dopo failure_threshold download falliti consecutivi il circuito si
+    apre e le richieste verso l'host falliscono subito, senza attese del
+    rate limiter né retry. Trascorso recovery_timeout passa una sola
+    richiesta di prova (half_open): se riesce il circuito si chiude,
+    altrimenti resta aperto per un altro intervallo.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold: int = 5, recovery_timeout: float = 60.0):
+        """
+        Inizializza il circuit breaker.
+
+        Args:
+            failure_threshold: Fallimenti consecutivi che aprono il circuito
+            recovery_timeout: Secondi prima della richiesta di prova
+        """
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.rejected = 0
+        self._probe_in_flight = False
+        self._lock = Lock()
+
+    def allow(self) -> bool:
+        """
+        Verifica se una richiesta può partire.
+
+        Returns:
+            False se il circuito è aperto (o una prova è già in corso)
+        """
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.recovery_timeout:
+                self.state = self.HALF_OPEN
+                self._probe_in_flight = False
+
+            if self.state == self.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+
+            self.rejected += 1
+            return False
+
+    def record_success(self):
+        """Registra un download riuscito (chiude il circuito)."""
+        with self._lock:
+            if self.state != self.CLOSED:
+                logger.info("Circuit breaker chiuso dopo richiesta di prova riuscita")
+            self.state = self.CLOSED
+            self.failures = 0
+            self.opened_at = None
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        """Registra un download fallito (può aprire il circuito)."""
+        with self._lock:
+            self.failures += 1
+            self._probe_in_flight = False
+
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    logger.warning(
+                        "Circuit breaker aperto dopo %s fallimenti consecutivi (riprova tra %ss)",
+                        self.failures, self.recovery_timeout
+                    )
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+    def snapshot(self) -> Dict:
+        """
+        Stato corrente del circuito.
+
+        Returns:
+            Dict con state, failures, rejected e retry_in (secondi alla prova)
+        """
+        with self._lock:
+            state = self.state
+            retry_in = None
+            if state == self.OPEN:
+                retry_in = round(max(0.0, self.recovery_timeout - (time.monotonic() - self.opened_at)), 1)
+                # Intervallo trascorso: la prossima richiesta è quella di prova
+                if retry_in == 0:
+                    state, retry_in = self.HALF_OPEN, None
+
+            return {
+                'state': state,
+                'failures': self.failures,
+                'rejected': self.rejected,
+                'retry_in': retry_in
+            }
+
+
+def get_host_circuit_breaker(
+    host: str,
+    failure_threshold: int = 5,
+    recovery_timeout: float = 60.0
+) -> CircuitBreaker:
+    """
+    Restituisce il circuit breaker condiviso per un host.
+
+    Args:
+        host: Hostname di destinazione (es. 'www.subito.it')
+        failure_threshold: Fallimenti consecutivi che aprono il circuito
+        recovery_timeout: Secondi prima della richiesta di prova
+
+    Returns:
+        CircuitBreaker condiviso per l'host
+    """
+    host = host.lower()
+
+    with _host_breakers_lock:
+        breaker = _host_breakers.get(host)
+        if breaker is None:
+            breaker = CircuitBreaker(failure_threshold, recovery_timeout)
+            _host_breakers[host] = breaker
+
+        return breaker
+
+
+def get_circuit_breakers() -> Dict[str, CircuitBreaker]:
+    """Circuit breaker creati finora, per host."""
+    with _host_breakers_lock:
+        return dict(_host_breakers)
@@ -1,16 +1,206 @@
 """Configurazione logging per il sistema."""
 
+import atexit
+import copy
+import json
 import logging
+import logging.handlers
+import queue
 import sys
+import threading
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import Optional
+from typing import Dict, List, Optional, Sequence
+
+
+# Attributi standard di LogRecord: tutto il resto arriva da extra={...}
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+# Listener attivi (configure_logging), fermati da stop_logging
+_listeners: List[logging.handlers.QueueListener] = []
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Formatta ogni record come un oggetto JSON su una riga.
+
+    Oltre a timestamp, livello, logger e messaggio include i campi passati
+    con extra={...} e l'eventuale traceback.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        """Serializza il record in JSON."""
+        entry = {
+            'ts': datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'module': record.module,
+            'line': record.lineno,
+            'thread': record.threadName
+        }
+
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith('_'):
+                entry[key] = value
+
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exception'] = record.exc_text
+        if record.stack_info:
+            entry['stack'] = self.formatStack(record.stack_info)
+
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Campionamento dei messaggi ripetitivi per modulo.
+
+    Le frequenze sono indicate per prefisso del nome del logger (vince il
+    prefisso più lungo, es. {"src.scraper": 0.1}). Per ogni coppia logger e
+    template del messaggio passa la prima occorrenza e poi una ogni 1/rate:
+    i messaggi con formattazione lazy ("Pagina %s", pagina) condividono il
+    template anche con argomenti diversi. ERROR e CRITICAL non sono mai
+    campionati; i record campionati riportano sample_rate.
+    """
+
+    # Oltre questo numero di template i contatori vengono azzerati
+    MAX_KEYS = 10000
+
+    def __init__(self, rates: Dict[str, float]):
+        """
+        Inizializza il filtro.
+
+        Args:
+            rates: Prefisso del logger -> frazione di messaggi da conservare (0-1)
+        """
+        super().__init__()
+        self.rates = sorted(rates.items(), key=lambda item: len(item[0]), reverse=True)
+        self._counts: Dict[tuple, int] = {}
+        self._lock = threading.Lock()
+
+    def _rate_for(self, name: str) -> float:
+        for prefix, rate in self.rates:
+            if name == prefix or name.startswith(prefix + '.') or not prefix:
+                return rate
+        return 1.0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        """True se il record va emesso."""
+        if record.levelno >= logging.ERROR:
+            return True
+
+        rate = self._rate_for(record.name)
+        if rate >= 1.0:
+            return True
+        if rate <= 0.0:
+            return False
+
+        key = (record.name, record.msg)
+        with self._lock:
+            if len(self._counts) >= self.MAX_KEYS:
+                self._counts.clear()
+            count = self._counts.get(key, 0)
+            self._counts[key] = count + 1
+
+        if count % max(1, round(1 / rate)):
+            return False
+
+        record.sample_rate = rate
+        return True
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler che conserva il traceback separato dal messaggio.
+
+    Il messaggio viene composto nel thread chiamante (gli argomenti
+    potrebbero cambiare prima della scrittura), la formattazione completa
+    avviene nel listener.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            record.exc_text = record.exc_text or logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def _build_formatter(json_format: bool) -> logging.Formatter:
+    if json_format:
+        return JsonFormatter()
+    return logging.Formatter(
+        '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        datefmt='%Y-%m-%d %H:%M:%S'
+    )
+
+
+def _build_file_handler(
+    log_file: str,
+    rotation: Optional[str],
+    max_bytes: int,
+    backup_count: int,
+    when: str
+) -> logging.Handler:
+    """FileHandler con rotazione per dimensione ("size"), per tempo ("time") o senza."""
+    log_path = Path(log_file)
+    log_path.parent.mkdir(parents=True, exist_ok=True)
+
+    if rotation == 'size':
+        return logging.handlers.RotatingFileHandler(
+            log_file, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8'
+        )
+    if rotation == 'time':
+        return logging.handlers.TimedRotatingFileHandler(
+            log_file, when=when, backupCount=backup_count, encoding='utf-8'
+        )
+    return logging.FileHandler(log_file, encoding='utf-8')
+
+
+def _build_handlers(
+    level: int,
+    log_file: Optional[str],
+    log_to_console: bool,
+    json_format: bool,
+    rotation: Optional[str],
+    max_bytes: int,
+    backup_count: int,
+    when: str
+) -> List[logging.Handler]:
+    formatter = _build_formatter(json_format)
+    handlers = []
+
+    # Console handler
+    if log_to_console:
+        handlers.append(logging.StreamHandler(sys.stdout))
+
+    # File handler
+    if log_file:
+        handlers.append(_build_file_handler(log_file, rotation, max_bytes, backup_count, when))
+
+    for handler in handlers:
+        handler.setLevel(level)
+        handler.setFormatter(formatter)
+
+    return handlers
 
 
 def setup_logger(
     name: str = 'scraper',
     level: str = 'INFO',
     log_file: Optional[str] = None,
-    log_to_console: bool = True
+    log_to_console: bool = True,
+    json_format: bool = False,
+    rotation: Optional[str] = None,
+    max_bytes: int = 10 * 1024 * 1024,
+    backup_count: int = 5,
+    when: str = 'midnight'
 ) -> logging.Logger:
     """
     Configura e restituisce un logger.
@@ -20,6 +210,11 @@ def setup_logger(
         level: Livello di logging (DEBUG, INFO, WARNING, ERROR, CRITICAL)
         log_file: Path del file di log (opzionale)
         log_to_console: Se True, logga anche su console
+        json_format: Se True, un oggetto JSON per riga
+        rotation: Rotazione del file: "size", "time" o None
+        max_bytes: Dimensione massima del file con rotation="size"
+        backup_count: File ruotati conservati
+        when: Intervallo di rotazione con rotation="time" (es. "midnight", "H")
 
     Returns:
         Logger configurato
@@ -33,27 +228,83 @@ def setup_logger(
     # Rimuovi handlers esistenti per evitare duplicati
     logger.handlers.clear()
 
-    # Formato log
-    formatter = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S'
+    for handler in _build_handlers(
+        numeric_level, log_file, log_to_console, json_format, rotation, max_bytes, backup_count, when
+    ):
+        logger.addHandler(handler)
+
+    return logger
+
+
+def configure_logging(
+    names: Sequence[str],
+    level: str = 'INFO',
+    log_file: Optional[str] = None,
+    log_to_console: bool = True,
+    json_format: bool = False,
+    rotation: Optional[str] = 'size',
+    max_bytes: int = 10 * 1024 * 1024,
+    backup_count: int = 5,
+    when: str = 'midnight',
+    sampling: Optional[Dict[str, float]] = None
+) -> logging.handlers.QueueListener:
+    """
+    Configura logging asincrono per uno o più logger.
+
+    I logger indicati scrivono solo su una coda in memoria (QueueHandler);
+    un thread (QueueListener) formatta i record e li scrive su console e
+    file, così le richieste non attendono l'I/O dei log. Tutti i logger
+    condividono gli stessi handler (un solo file, una sola rotazione).
+
+    Args:
+        names: Logger da configurare (es. ("api", "src"))
+        level: Livello di logging
+        log_file: Path del file di log (opzionale)
+        log_to_console: Se True, logga anche su console
+        json_format: Se True, un oggetto JSON per riga
+        rotation: Rotazione del file: "size", "time" o None
+        max_bytes: Dimensione massima del file con rotation="size"
+        backup_count: File ruotati conservati
+        when: Intervallo di rotazione con rotation="time"
+        sampling: Prefisso del logger -> frazione di messaggi conservati (vedi SamplingFilter)
+
+    Returns:
+        QueueListener avviato
+    """
+    numeric_level = getattr(logging, level.upper(), logging.INFO)
+
+    handlers = _build_handlers(
+        numeric_level, log_file, log_to_console, json_format, rotation, max_bytes, backup_count, when
     )
 
-    # Console handler
-    if log_to_console:
-        console_handler = logging.StreamHandler(sys.stdout)
-        console_handler.setLevel(numeric_level)
-        console_handler.setFormatter(formatter)
-        logger.addHandler(console_handler)
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    queue_handler = _QueueHandler(log_queue)
+    queue_handler.setLevel(numeric_level)
+    if sampling:
+        # Filtro sul lato produttore: i record scartati non entrano in coda
+        queue_handler.addFilter(SamplingFilter(sampling))
 
-    # File handler
-    if log_file:
-        log_path = Path(log_file)
-        log_path.parent.mkdir(parents=True, exist_ok=True)
+    for name in names:
+        logger = logging.getLogger(name)
+        logger.setLevel(numeric_level)
+        logger.handlers.clear()
+        logger.addHandler(queue_handler)
+        logger.propagate = False
 
-        file_handler = logging.FileHandler(log_file, encoding='utf-8')
-        file_handler.setLevel(numeric_level)
-        file_handler.setFormatter(formatter)
-        logger.addHandler(file_handler)
+    listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    _listeners.append(listener)
 
-    return logger
+    return listener
+
+
+def stop_logging():
+    """Svuota le code e ferma i listener avviati da configure_logging."""
+    while _listeners:
+        listener = _listeners.pop()
+        listener.stop()
+        for handler in listener.handlers:
+            handler.close()
+
+
+atexit.register(stop_logging)
@@ -0,0 +1,155 @@
+"""Metriche Prometheus di scraping, cache e API."""
+
+import logging
+import os
+from typing import Optional, Tuple
+
+try:
+    from prometheus_client import (
+        CONTENT_TYPE_LATEST,
+        CollectorRegistry,
+        Counter,
+        Histogram,
+        generate_latest,
+        multiprocess
+    )
+except ImportError:  # prometheus_client non installato: metriche disattivate
+    CONTENT_TYPE_LATEST = "text/plain; version=0.0.4; charset=utf-8"
+    CollectorRegistry = Counter = Histogram = generate_latest = multiprocess = None
+
+
+logger = logging.getLogger(__name__)
+
+METRICS_AVAILABLE = Counter is not None
+
+# Directory condivisa dai worker (modalità multiprocess di prometheus_client):
+# va impostata prima di importare questo modulo, vedi api/server.py
+MULTIPROC_DIR_ENV = "PROMETHEUS_MULTIPROC_DIR"
+
+# Latenze brevi (cache, parsing) e lunghe (download, attese del rate limiter)
+_FAST_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+_SLOW_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 30.0, 60.0)
+_LISTINGS_BUCKETS = (0, 1, 5, 10, 20, 30, 40, 50, 75, 100)
+
+
+class _NoopMetric:
+    """Metrica vuota usata quando prometheus_client non è disponibile."""
+
+    def labels(self, *args, **kwargs) -> '_NoopMetric':
+        return self
+
+    def observe(self, value: float):
+        pass
+
+    def inc(self, amount: float = 1):
+        pass
+
+
+def _histogram(name: str, documentation: str, labels: Tuple[str, ...], buckets: Tuple[float, ...]):
+    if not METRICS_AVAILABLE:
+        return _NoopMetric()
+    return Histogram(name, documentation, labels, buckets=buckets, registry=REGISTRY)
+
+
+def _counter(name: str, documentation: str, labels: Tuple[str, ...]):
+    if not METRICS_AVAILABLE:
+        return _NoopMetric()
+    return Counter(name, documentation, labels, registry=REGISTRY)
+
+
+# Registry dedicato: espone solo le metriche dell'applicazione
+REGISTRY: Optional['CollectorRegistry'] = CollectorRegistry() if METRICS_AVAILABLE else None
+
+# Scraping
+FETCH_SECONDS = _histogram(
+    "scraper_fetch_seconds",
+    "Durata di ogni tentativo di download per host e status HTTP",
+    ("host", "status"),
+    _SLOW_BUCKETS
+)
+PARSE_SECONDS = _histogram(
+    "scraper_parse_seconds",
+    "Tempo di parsing ed estrazione di una pagina di risultati",
+    ("host",),
+    _FAST_BUCKETS
+)
+LISTINGS_PER_PAGE = _histogram(
+    "scraper_listings_per_page",
+    "Annunci estratti da ogni pagina di risultati",
+    ("host",),
+    _LISTINGS_BUCKETS
+)
+RATE_LIMIT_WAIT_SECONDS = _histogram(
+    "scraper_rate_limit_wait_seconds",
+    "Attesa imposta dal rate limiter per host prima di ogni download",
+    ("host",),
+    _SLOW_BUCKETS
+)
+FETCH_RETRIES = _counter(
+    "scraper_retries_total",
+    "Retry dei download per host e motivo (blocked, http, network)",
+    ("host", "reason")
+)
+BACKOFF_SECONDS = _counter(
+    "scraper_backoff_seconds_total",
+    "Secondi di attesa per backoff tra i retry",
+    ("host",)
+)
+
+CIRCUIT_REJECTIONS = _counter(
+    "scraper_circuit_rejections_total",
+    "Download saltati per circuit breaker aperto, per host",
+    ("host",)
+)
+
+SEARCH_PHASE_SECONDS = _histogram(
+    "search_phase_seconds",
+    "Tempo per fase delle ricerche (ratelimit, fetch, parse, filter, ...)",
+    ("phase",),
+    _FAST_BUCKETS + _SLOW_BUCKETS[5:]
+)
+
+# Cache
+CACHE_REQUESTS = _counter(
+    "cache_requests_total",
+    "Letture dalla cache per namespace ed esito (hit, miss, error)",
+    ("namespace", "result")
+)
+
+# API
+API_REQUEST_SECONDS = _histogram(
+    "api_request_seconds",
+    "Durata delle richieste API per metodo, route e status",
+    ("method", "route", "status"),
+    _SLOW_BUCKETS
+)
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    """
+    Serializza le metriche nel formato testuale di Prometheus.
+
+    Con più worker le metriche sono la somma dei file scritti da tutti i
+    processi, indipendentemente da quale worker serve la richiesta.
+
+    Returns:
+        Tupla (contenuto, content type)
+    """
+    if not METRICS_AVAILABLE:
+        return b"", CONTENT_TYPE_LATEST
+    if os.environ.get(MULTIPROC_DIR_ENV):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
+
+
+def mark_process_dead(pid: int):
+    """
+    Rimuove i dati "live" di un worker terminato (modalità multiprocess).
+
+    Args:
+        pid: PID del worker
+    """
+    if METRICS_AVAILABLE and os.environ.get(MULTIPROC_DIR_ENV):
+        multiprocess.mark_process_dead(pid)
@@ -3,12 +3,34 @@
 import time
 import random
 from threading import Lock
-from typing import Optional
+from typing import Dict, Optional
 import logging
 
 
 logger = logging.getLogger(__name__)
 
+# Registry globale dei rate limiter per host: tutti gli scraper (API,
+# scheduler, script) condividono lo stesso budget verso lo stesso sito
+_host_limiters: Dict[str, 'RateLimiter'] = {}
+_host_limiters_lock = Lock()
+
+# Client Redis per limiter condivisi tra processi (vedi use_shared_backend)
+_shared_redis = None
+
+# Prenota il prossimo slot dell'host: almeno ``delay`` secondi dopo lo slot
+# precedente, assegnato a qualunque processo
+_RESERVE_SCRIPT = """
+local now = tonumber(ARGV[1])
+local delay = tonumber(ARGV[2])
+local last = tonumber(redis.call('GET', KEYS[1]))
+local slot = now
+if last and last + delay > now then
+    slot = last + delay
+end
+redis.call('SET', KEYS[1], tostring(slot), 'PX', math.ceil((slot - now + delay) * 1000) + 1)
+return tostring(slot - now)
+"""
+
 
 class RateLimiter:
     """Gestisce il rate limiting delle richieste HTTP."""
@@ -37,45 +59,44 @@ class RateLimiter:
         self.base_delay = 1.0 / requests_per_second if requests_per_second > 0 else min_delay
 
         logger.info(
-            f"RateLimiter inizializzato: {requests_per_second} req/s, "
-            f"delay: {min_delay}-{max_delay}s"
+            "RateLimiter inizializzato: %s req/s, delay: %s-%ss",
+            requests_per_second, min_delay, max_delay
         )
 
     def wait(self) -> float:
         """
         Attende il tempo necessario prima della prossima richiesta.
 
+        Il lock protegge solo la prenotazione dello slot (come lo script
+        di RedisRateLimiter): i thread in coda per lo stesso host dormono
+        in parallelo, ognuno fino al proprio slot, e non tengono il lock
+        durante l'attesa.
+
         Returns:
             Il tempo atteso in secondi
         """
         with self._lock:
             current_time = time.time()
+            slot = current_time
 
             if self.last_request_time is not None:
-                # Calcola quanto tempo è passato dall'ultima richiesta
-                elapsed = current_time - self.last_request_time
-
                 # Calcola delay casuale tra min e max
                 delay = random.uniform(self.min_delay, self.max_delay)
 
                 # Assicurati di rispettare anche il base_delay
                 required_delay = max(delay, self.base_delay)
 
-                # Se non è passato abbastanza tempo, aspetta
-                if elapsed < required_delay:
-                    sleep_time = required_delay - elapsed
-                    logger.debug(f"Rate limiting: attendo {sleep_time:.2f}s")
-                    time.sleep(sleep_time)
-                    actual_wait = sleep_time
-                else:
-                    actual_wait = 0.0
-            else:
-                actual_wait = 0.0
+                # Slot successivo all'ultimo prenotato (anche se nel futuro)
+                slot = max(current_time, self.last_request_time + required_delay)
+
+            self.last_request_time = slot
 
-            # Aggiorna il timestamp dell'ultima richiesta
-            self.last_request_time = time.time()
+        actual_wait = slot - current_time
+        if actual_wait > 0:
+            logger.debug("Rate limiting: attendo %.2fs", actual_wait)
+            time.sleep(actual_wait)
 
-            return actual_wait
+        return actual_wait
 
     def reset(self):
         """Resetta il rate limiter."""
@@ -91,3 +112,185 @@ class RateLimiter:
     def __exit__(self, exc_type, exc_val, exc_tb):
         """Context manager exit."""
         pass
+
+
+class RedisRateLimiter(RateLimiter):
+    """
+    Rate limiter per host con stato in Redis, condiviso tra processi.
+
+    Ogni chiamata a wait() prenota in modo atomico il prossimo slot
+    dell'host e attende fino a quell'istante: i worker dell'API si
+    dividono lo stesso budget verso il sito invece di moltiplicarlo.
+    Se Redis non risponde si usa lo stato in memoria del processo.
+    """
+
+    KEY_PREFIX = "hostlimit"
+
+    def __init__(
+        self,
+        redis_client,
+        host: str,
+        requests_per_second: float = 0.5,
+        min_delay: float = 2.0,
+        max_delay: float = 5.0
+    ):
+        """
+        Inizializza il rate limiter.
+
+        Args:
+            redis_client: Client Redis (sincrono)
+            host: Hostname di destinazione
+            requests_per_second: Numero massimo di richieste al secondo
+            min_delay: Delay minimo tra richieste (secondi)
+            max_delay: Delay massimo tra richieste (secondi)
+        """
+        super().__init__(requests_per_second, min_delay, max_delay)
+        self.redis = redis_client
+        self.key = f"{self.KEY_PREFIX}:{host}"
+        self._script = redis_client.register_script(_RESERVE_SCRIPT)
+
+    def wait(self) -> float:
+        """
+        Attende lo slot prenotato per la prossima richiesta.
+
+        Returns:
+            Il tempo atteso in secondi
+        """
+        required_delay = max(random.uniform(self.min_delay, self.max_delay), self.base_delay)
+
+        try:
+            # Tempo reale (non monotonic): deve essere confrontabile tra processi
+            sleep_time = float(self._script(keys=[self.key], args=[time.time(), required_delay]))
+        except Exception as e:
+            logger.warning("Rate limit per host Redis non disponibile, uso memoria locale: %s", e)
+            return super().wait()
+
+        if sleep_time > 0:
+            logger.debug("Rate limiting: attendo %.2fs", sleep_time)
+            time.sleep(sleep_time)
+        self.last_request_time = time.time()
+        return sleep_time
+
+    def reset(self):
+        """Resetta il rate limiter (anche lo stato condiviso)."""
+        super().reset()
+        try:
+            self.redis.delete(self.key)
+        except Exception as e:
+            logger.error("Errore reset rate limit per host Redis: %s", e)
+
+
+class TokenBucket:
+    """Token bucket non bloccante per budget di richieste condivisi."""
+
+    def __init__(self, rate: float, capacity: float):
+        """
+        Inizializza il token bucket.
+
+        Args:
+            rate: Token aggiunti al secondo
+            capacity: Numero massimo di token accumulabili
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.last_refill = time.monotonic()
+        self._lock = Lock()
+
+    def _refill(self):
+        """Aggiunge i token maturati dall'ultimo aggiornamento."""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * self.rate)
+        self.last_refill = now
+
+    def try_consume(self, tokens: float = 1.0) -> bool:
+        """
+        Consuma token se disponibili, senza attendere.
+
+        Args:
+            tokens: Numero di token da consumare
+
+        Returns:
+            True se i token sono stati consumati
+        """
+        with self._lock:
+            self._refill()
+            if self.tokens >= tokens:
+                self.tokens -= tokens
+                return True
+            return False
+
+    def available(self) -> float:
+        """
+        Restituisce i token attualmente disponibili.
+
+        Returns:
+            Numero di token disponibili
+        """
+        with self._lock:
+            self._refill()
+            return self.tokens
+
+
+def use_shared_backend(redis_client):
+    """
+    Condivide i rate limiter per host tra processi tramite Redis.
+
+    Da chiamare all'avvio, prima delle richieste: i limiter creati in
+    seguito da get_host_rate_limiter sono RedisRateLimiter.
+
+    Args:
+        redis_client: Client Redis sincrono (None = limiter in memoria)
+    """
+    global _shared_redis
+
+    with _host_limiters_lock:
+        _shared_redis = redis_client
+        _host_limiters.clear()
+
+
+def get_host_rate_limiter(
+    host: str,
+    requests_per_second: float = 0.5,
+    min_delay: float = 2.0,
+    max_delay: float = 5.0
+) -> RateLimiter:
+    """
+    Restituisce il rate limiter condiviso per un host.
+
+    Il limiter viene creato alla prima richiesta con i parametri forniti;
+    le chiamate successive per lo stesso host riusano la stessa istanza.
+    Dopo use_shared_backend il limiter è condiviso anche tra processi.
+
+    Args:
+        host: Hostname di destinazione (es. 'www.subito.it')
+        requests_per_second: Numero massimo di richieste al secondo
+        min_delay: Delay minimo tra richieste (secondi)
+        max_delay: Delay massimo tra richieste (secondi)
+
+    Returns:
+        RateLimiter condiviso per l'host
+    """
+    host = host.lower()
+
+    with _host_limiters_lock:
+        limiter = _host_limiters.get(host)
+        if limiter is None:
+            if _shared_redis is not None:
+                limiter = RedisRateLimiter(
+                    _shared_redis,
+                    host,
+                    requests_per_second=requests_per_second,
+                    min_delay=min_delay,
+                    max_delay=max_delay
+                )
+            else:
+                limiter = RateLimiter(
+                    requests_per_second=requests_per_second,
+                    min_delay=min_delay,
+                    max_delay=max_delay
+                )
+            _host_limiters[host] = limiter
+            logger.debug("RateLimiter creato per host: %s", host)
+
+        return limiter
@@ -0,0 +1,129 @@
+"""Tempi per fase di una richiesta (Server-Timing)."""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from threading import Lock
+from typing import Dict, Iterator, Optional
+
+
+# Timings della richiesta corrente: ogni task asyncio ha il proprio contesto,
+# i thread di lavoro lo ricevono con contextvars.copy_context()
+_current: ContextVar[Optional['RequestTimings']] = ContextVar('request_timings', default=None)
+
+
+class RequestTimings:
+    """
+    Somma dei tempi per fase di una singola richiesta.
+
+    Le fasi sono identificate da un nome (es. "fetch", "parse") e si
+    accumulano: dieci download producono un'unica voce "fetch". Le fasi
+    eseguite in thread concorrenti sommano il tempo di ogni thread.
+    """
+
+    def __init__(self):
+        """Inizializza i tempi partendo da ora."""
+        self.started = time.perf_counter()
+        self.phases: Dict[str, float] = {}
+        self._lock = Lock()
+
+    def add(self, name: str, seconds: float):
+        """
+        Aggiunge tempo a una fase.
+
+        Args:
+            name: Nome della fase
+            seconds: Durata in secondi
+        """
+        with self._lock:
+            self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def total(self) -> float:
+        """Secondi trascorsi dall'inizio della richiesta."""
+        return time.perf_counter() - self.started
+
+    def as_dict(self) -> Dict[str, float]:
+        """
+        Tempi per fase in millisecondi, più il totale.
+
+        Returns:
+            Dict fase -> millisecondi
+        """
+        with self._lock:
+            timings = {name: round(seconds * 1000, 2) for name, seconds in self.phases.items()}
+        timings["total"] = round(self.total() * 1000, 2)
+        return timings
+
+    def server_timing(self) -> str:
+        """
+        Valore dell'header Server-Timing.
+
+        Returns:
+            Es. "ratelimit;dur=2012.5, fetch;dur=341.2, total;dur=2410.8"
+        """
+        return ", ".join(f"{name};dur={ms:.1f}" for name, ms in self.as_dict().items())
+
+    def observe(self, histogram):
+        """
+        Registra ogni fase in un istogramma con etichetta "phase".
+
+        Args:
+            histogram: Istogramma Prometheus (o metrica vuota)
+        """
+        with self._lock:
+            phases = list(self.phases.items())
+        for name, seconds in phases:
+            histogram.labels(name).observe(seconds)
+        histogram.labels("total").observe(self.total())
+
+
+def start_timings() -> RequestTimings:
+    """
+    Attiva la raccolta dei tempi per il contesto corrente.
+
+    Returns:
+        RequestTimings della richiesta
+    """
+    timings = RequestTimings()
+    _current.set(timings)
+    return timings
+
+
+def get_timings() -> Optional[RequestTimings]:
+    """Tempi della richiesta corrente (None se la raccolta non è attiva)."""
+    return _current.get()
+
+
+def record(name: str, seconds: float):
+    """
+    Aggiunge una durata già misurata alla fase indicata.
+
+    Args:
+        name: Nome della fase
+        seconds: Durata in secondi
+    """
+    timings = _current.get()
+    if timings is not None:
+        timings.add(name, seconds)
+
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    """
+    Misura il blocco e lo aggiunge alla fase indicata.
+
+    Senza raccolta attiva (es. scraper usati da CLI) non misura nulla.
+
+    Args:
+        name: Nome della fase
+    """
+    timings = _current.get()
+    if timings is None:
+        yield
+        return
+
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(name, time.perf_counter() - started)
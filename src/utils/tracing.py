@@ -0,0 +1,130 @@
+"""Tracing OpenTelemetry opzionale di API, cache e scraper."""
+
+import logging
+from pathlib import Path
+from typing import Any, Optional
+
+try:
+    from opentelemetry import trace
+except ImportError:  # opentelemetry non installato: tracing disattivato
+    trace = None
+
+
+logger = logging.getLogger(__name__)
+
+# Tracer attivo (None = tracing disattivato, ogni span è un no-op)
+_tracer = None
+_provider = None
+_trace_file = None
+
+
+class _NoopSpan:
+    """Span vuoto: usato quando il tracing è disattivato."""
+
+    def __enter__(self) -> '_NoopSpan':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        return False
+
+    def set_attribute(self, key: str, value: Any):
+        pass
+
+    def add_event(self, name: str, attributes: Optional[dict] = None):
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+def configure_tracing(
+    service_name: str,
+    exporter: str = "otlp",
+    otlp_endpoint: Optional[str] = None,
+    file_path: Optional[str] = None
+) -> bool:
+    """
+    Attiva il tracing con l'esportatore indicato.
+
+    Args:
+        service_name: Nome del servizio negli span
+        exporter: "otlp" (collector OTLP/HTTP), "console" o "file" (JSON, uno span per riga)
+        otlp_endpoint: Endpoint OTLP/HTTP (es. http://localhost:4318/v1/traces)
+        file_path: File degli span per l'esportatore "file"
+
+    Returns:
+        True se il tracing è attivo
+    """
+    global _tracer, _provider, _trace_file
+
+    if trace is None:
+        logger.warning("Tracing non attivato: opentelemetry-sdk non installato")
+        return False
+
+    try:
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter
+
+        if exporter == "otlp":
+            from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+            span_exporter = OTLPSpanExporter(endpoint=otlp_endpoint) if otlp_endpoint else OTLPSpanExporter()
+        elif exporter == "file":
+            path = Path(file_path or "traces.jsonl")
+            path.parent.mkdir(parents=True, exist_ok=True)
+            _trace_file = open(path, "a", encoding="utf-8")
+            span_exporter = ConsoleSpanExporter(
+                out=_trace_file,
+                formatter=lambda span: span.to_json(indent=None) + "\n"
+            )
+        else:
+            span_exporter = ConsoleSpanExporter()
+    except ImportError as e:
+        logger.warning("Tracing non attivato: esportatore '%s' non disponibile (%s)", exporter, e)
+        return False
+
+    _provider = TracerProvider(resource=Resource.create({"service.name": service_name}))
+    _provider.add_span_processor(BatchSpanProcessor(span_exporter))
+    _tracer = _provider.get_tracer(__name__)
+
+    logger.info("Tracing OpenTelemetry attivo (esportatore: %s)", exporter)
+    return True
+
+
+def shutdown_tracing():
+    """Esporta gli span in sospeso e disattiva il tracing."""
+    global _tracer, _provider, _trace_file
+
+    if _provider is not None:
+        _provider.shutdown()
+    if _trace_file is not None:
+        _trace_file.close()
+
+    _tracer = _provider = _trace_file = None
+
+
+def is_enabled() -> bool:
+    """True se il tracing è attivo."""
+    return _tracer is not None
+
+
+def span(name: str, **attributes: Any):
+    """
+    Apre uno span figlio di quello corrente.
+
+    Con il tracing disattivato restituisce uno span vuoto condiviso,
+    senza allocazioni. Gli attributi None vengono ignorati.
+
+    Args:
+        name: Nome dello span
+        **attributes: Attributi iniziali
+
+    Returns:
+        Context manager che restituisce lo span
+    """
+    if _tracer is None:
+        return _NOOP_SPAN
+    return _tracer.start_as_current_span(
+        name,
+        attributes={key: value for key, value in attributes.items() if value is not None}
+    )
@@ -0,0 +1 @@
+"""Test dell'API e dello scraper."""
@@ -0,0 +1,25 @@
+"""Configurazione comune dei test."""
+
+import os
+import tempfile
+
+# Prima di importare api.*: niente file di log né job in background, e
+# Redis su una porta chiusa (i test che lo usano passano un client fakeredis)
+os.environ.setdefault("LOG_FILE", "")
+os.environ.setdefault("SCHEDULER_ENABLED", "False")
+os.environ.setdefault("CACHE_WARMER_ENABLED", "False")
+os.environ.setdefault("REDIS_HOST", "127.0.0.1")
+os.environ.setdefault("REDIS_PORT", "1")
+# Servizi globali creati all'import dei router: archivi fuori dal repository
+_DATA_DIR = tempfile.mkdtemp(prefix="api-tests-")
+os.environ.setdefault("REPORTS_SQLITE_PATH", os.path.join(_DATA_DIR, "reports.db"))
+os.environ.setdefault("REPORTS_JOURNAL_DIR", os.path.join(_DATA_DIR, "reports_journal"))
+os.environ.setdefault("REPORTS_DB_PATH", os.path.join(_DATA_DIR, "reports.json"))
+
+import pytest
+
+
+@pytest.fixture
+def anyio_backend() -> str:
+    """Test asincroni (pytest.mark.anyio) solo su asyncio, come uvicorn."""
+    return "asyncio"
@@ -0,0 +1,101 @@
+"""Test del client Redis asincrono (pool, backoff di riconnessione)."""
+
+import fakeredis
+import pytest
+import redis.asyncio as aioredis
+
+from api.core import dependencies
+from api.core.config import settings
+from api.services.cache import AsyncCacheService, CacheService
+
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture(autouse=True)
+def fresh_state(monkeypatch):
+    """Stato globale del client asincrono isolato per ogni test."""
+    monkeypatch.setattr(dependencies, "_async_redis_client", None)
+    monkeypatch.setattr(dependencies, "_async_redis_lock", None)
+    monkeypatch.setattr(dependencies, "_async_redis_backoff", dependencies._ReconnectBackoff())
+
+
+def test_backoff_grows_and_is_capped(monkeypatch):
+    monkeypatch.setattr(dependencies.random, "uniform", lambda a, b: 1.0)
+    backoff = dependencies._ReconnectBackoff()
+
+    delays = [backoff.failed() for _ in range(12)]
+
+    assert delays[0] == settings.REDIS_RECONNECT_BASE_DELAY
+    assert delays[1] == 2 * delays[0]
+    assert max(delays) == settings.REDIS_RECONNECT_MAX_DELAY
+    assert backoff.down and not backoff.ready()
+
+    backoff.reset()
+    assert not backoff.down and backoff.ready()
+
+
+async def test_unreachable_redis_not_retried_during_backoff(monkeypatch):
+    pings = []
+
+    async def failing_ping(client):
+        pings.append(client)
+        dependencies._async_redis_backoff.failed()
+        return False
+
+    monkeypatch.setattr(dependencies, "_ping_async_redis", failing_ping)
+
+    assert await dependencies.get_async_redis_client() is None
+    assert await dependencies.get_async_redis_client() is None
+    assert len(pings) == 1
+
+    # Trascorsa l'attesa si ritenta con lo stesso pool
+    dependencies._async_redis_backoff.retry_at = 0.0
+    assert await dependencies.get_async_redis_client() is None
+    assert len(pings) == 2 and pings[0] is pings[1]
+
+
+async def test_pool_is_shared_and_bounded(monkeypatch):
+    async def ok_ping(client):
+        return True
+
+    monkeypatch.setattr(dependencies, "_ping_async_redis", ok_ping)
+
+    first = await dependencies.get_async_redis_client()
+    second = await dependencies.get_async_redis_client()
+
+    pool = first.connection_pool
+    assert first is second
+    assert isinstance(pool, aioredis.BlockingConnectionPool)
+    assert pool.max_connections == settings.REDIS_MAX_CONNECTIONS
+    await first.aclose()
+
+
+async def test_connection_error_disables_cache_until_retry():
+    server = fakeredis.FakeServer()
+    server.connected = False
+    cache = AsyncCacheService(fakeredis.FakeAsyncRedis(server=server))
+
+    assert await cache.get_listing("1") is None
+
+    backoff = dependencies._async_redis_backoff
+    assert backoff.down and not backoff.ready()
+    failures = backoff.failures
+    dependencies.mark_async_redis_unavailable(ConnectionError("di nuovo"))
+    assert backoff.failures == failures  # Già segnato: l'attesa non si allunga
+
+
+async def test_async_cache_shares_keys_with_sync_cache():
+    server = fakeredis.FakeServer()
+    sync_cache = CacheService(fakeredis.FakeRedis(server=server, decode_responses=True))
+    async_cache = AsyncCacheService(fakeredis.FakeAsyncRedis(server=server, decode_responses=True))
+
+    # Sorelle, non sottoclassi: chi si aspetta CacheService non riceve coroutine
+    assert not isinstance(async_cache, CacheService)
+
+    sync_cache.set_search_results({"total_results": 1}, query="bici", platform="all")
+    sync_cache.set_listings({"1": {"title": "Bici", "link": "https://www.subito.it/1.htm"}})
+
+    assert await async_cache.get_search_results(query="bici", platform="all") == {"total_results": 1}
+    assert await async_cache.get_listings(["1", "2"]) == {"1": {"title": "Bici", "link": "https://www.subito.it/1.htm"}}
+    assert (await async_cache.get_listing_index("1"))["link"] == "https://www.subito.it/1.htm"
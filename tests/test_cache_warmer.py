@@ -0,0 +1,97 @@
+"""Test del pre-riscaldamento della cache dalle ricerche popolari."""
+
+import time
+
+import fakeredis
+import pytest
+
+from api.core.config import settings
+from api.services.popularity import WARMER_LOCK_KEY, CacheWarmer
+from src.utils.rate_limiter import TokenBucket
+
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def redis_client() -> fakeredis.FakeRedis:
+    return fakeredis.FakeRedis(decode_responses=True)
+
+
+@pytest.fixture
+def warmer(redis_client, monkeypatch) -> CacheWarmer:
+    """Warmer con budget ampio e riscaldamento che registra le query."""
+    warmer = CacheWarmer(redis_client)
+    warmer.budget = TokenBucket(rate=0, capacity=100)
+    warmer.warmed = []
+    monkeypatch.setattr(warmer, "_warm", lambda params: warmer.warmed.append(params["query"]) or 1)
+    return warmer
+
+
+def _popular(warmer: CacheWarmer, query: str, hits: int, ttl: int = None, max_pages: int = 1):
+    key = f"search:{query}"
+    for _ in range(hits):
+        warmer.popularity.record(key, {"query": query, "platform": "subito"}, max_pages)
+    if ttl is not None:
+        warmer.redis.set(key, "[]", ex=ttl)
+
+
+async def test_warms_popular_keys_about_to_expire(warmer):
+    _popular(warmer, "expiring", 5, ttl=settings.CACHE_WARMER_LEAD_TIME // 2)
+    _popular(warmer, "missing", 5)
+    _popular(warmer, "fresh", 5, ttl=settings.CACHE_WARMER_LEAD_TIME * 10)
+    _popular(warmer, "rare", 1)  # Sotto CACHE_WARMER_MIN_SCORE
+
+    assert await warmer.run_once() == 2
+    assert sorted(warmer.warmed) == ["expiring", "missing"]
+
+
+async def test_budget_limits_outbound_requests(warmer):
+    warmer.budget = TokenBucket(rate=0, capacity=3)
+    _popular(warmer, "cheap", 6)
+    _popular(warmer, "expensive", 5, max_pages=5)
+
+    await warmer.run_once()
+
+    assert warmer.warmed == ["cheap"]
+    assert warmer.stats["skipped_budget"] == 1
+
+
+async def test_default_budget_fits_the_costliest_search(redis_client, monkeypatch):
+    warmer = CacheWarmer(redis_client)
+    warmer.warmed = []
+    monkeypatch.setattr(warmer, "_warm", lambda params: warmer.warmed.append(params["query"]) or 1)
+    for _ in range(5):
+        warmer.popularity.record(
+            "search:drone", {"query": "drone", "platform": "all", "details": True}, max_pages=5
+        )
+
+    assert await warmer.run_once() == 1
+    assert warmer.warmed == ["drone"]
+
+
+def test_details_count_detail_page_downloads():
+    plain = {"platform": "all", "max_pages": 2}
+
+    assert CacheWarmer._estimate_cost(plain) == 4
+    assert CacheWarmer._estimate_cost({**plain, "details": True}) == 4 + settings.ENRICH_MAX_LISTINGS
+
+
+async def test_one_cycle_per_interval_across_workers(warmer, redis_client, monkeypatch):
+    _popular(warmer, "ps5", 5)
+    other = CacheWarmer(redis_client)
+    monkeypatch.setattr(other, "_warm", lambda params: pytest.fail("due cicli nello stesso intervallo"))
+
+    assert await warmer.run_once() == 1
+    assert await other.run_once() == 0
+    assert redis_client.ttl(WARMER_LOCK_KEY) > 0
+
+
+def test_token_bucket_refills_up_to_capacity():
+    bucket = TokenBucket(rate=1000, capacity=2)
+
+    assert bucket.try_consume(2)
+    assert not bucket.try_consume(2)
+    time.sleep(0.01)
+    assert bucket.try_consume(2)
+    assert bucket.available() <= 2
@@ -0,0 +1,79 @@
+"""Test del circuit breaker per host."""
+
+import time
+
+import pytest
+
+from src.config.settings import ScraperConfig
+from src.scraper.subito_scraper import SubitoScraper
+from src.utils.circuit_breaker import CircuitBreaker
+
+
+def test_opens_after_consecutive_failures():
+    breaker = CircuitBreaker(failure_threshold=3, recovery_timeout=60)
+
+    for _ in range(2):
+        breaker.record_failure()
+    assert breaker.allow()
+
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+    assert breaker.snapshot()["rejected"] == 1
+
+
+def test_success_resets_failures():
+    breaker = CircuitBreaker(failure_threshold=2)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_half_open_allows_single_probe():
+    breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=0.01)
+    breaker.record_failure()
+    time.sleep(0.02)
+
+    assert breaker.snapshot()["state"] == CircuitBreaker.HALF_OPEN
+    assert breaker.allow()
+    assert not breaker.allow()  # Prova già in corso
+
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.allow()
+
+
+def test_failed_probe_reopens():
+    breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=0.01)
+    breaker.record_failure()
+    time.sleep(0.02)
+
+    assert breaker.allow()
+    breaker.record_failure()
+
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+
+
+class _BrokenLimiter:
+    def wait(self) -> float:
+        raise RuntimeError("Redis non raggiungibile")
+
+
+def test_unexpected_error_during_probe_releases_it(monkeypatch):
+    url = "https://probe.example.test/annunci"
+    scraper = SubitoScraper(ScraperConfig(circuit_failure_threshold=1, circuit_recovery_timeout=0.01))
+    breaker = scraper.get_circuit_breaker(url)
+    breaker.record_failure()
+    time.sleep(0.02)
+    monkeypatch.setattr(scraper, "get_rate_limiter", lambda url: _BrokenLimiter())
+
+    with pytest.raises(RuntimeError):
+        scraper.fetch_page(url)
+
+    # La prova fallita riapre il circuito invece di restare in corso
+    assert breaker.state == CircuitBreaker.OPEN
+    time.sleep(0.02)
+    assert breaker.allow()
@@ -0,0 +1,52 @@
+"""Test del corpus HTML dei benchmark (benchmarks/corpus.py)."""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "benchmarks"))
+
+import corpus  # noqa: E402
+
+
+def test_checked_in_corpus_is_labelled():
+    index = corpus.load_index()
+
+    assert set(index) == set(corpus.PLATFORMS)
+    assert corpus.corpus_source(index) == "synthetic"
+    for platform, pages in index.items():
+        for page in pages:
+            assert (corpus.FIXTURES_DIR / platform / page["file"]).exists()
+
+
+def test_corpus_source_mixed():
+    index = {"subito": [{"source": "recorded"}], "ebay": [{"source": "synthetic"}]}
+    assert corpus.corpus_source(index) == "mixed"
+
+
+@pytest.mark.parametrize("platform", corpus.PLATFORMS)
+def test_parsers_extract_expected_listings(platform):
+    from src.scraper.ebay_scraper import EbayScraper
+    from src.scraper.subito_scraper import SubitoScraper
+
+    scraper = (SubitoScraper if platform == "subito" else EbayScraper)()
+    for page in corpus.load_index()[platform]:
+        if page["kind"] != "search":
+            continue
+        html = corpus.load_page(platform, page["file"])
+        listings = scraper.parse_listings_page(html, corpus.DEFAULT_BASE_URLS[platform])
+        assert len(listings) == page["listings"]
+
+
+def test_sanitize_page_removes_contacts():
+    page = (
+        '<a href="https://www.subito.it/telefonia/iphone-312345678.htm" data-id="3123456789">'
+        "Scrivi a mario.rossi@gmail.com o chiama il 333 123 4567 (+39 347-1234567)</a>"
+    )
+
+    clean = corpus.sanitize_page(page, "https://www.subito.it")
+
+    assert "mario.rossi" not in clean and "333 123 4567" not in clean and "347-1234567" not in clean
+    assert '{base_url}/telefonia/iphone-312345678.htm' in clean
+    assert 'data-id="3123456789"' in clean
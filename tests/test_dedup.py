@@ -0,0 +1,154 @@
+"""Test della deduplicazione cross-piattaforma (MinHash + LSH)."""
+
+import time
+
+import pytest
+
+from src.analysis.dedup import ListingDeduplicator, normalize_title, prices_compatible
+from src.models.listing import Listing
+
+
+@pytest.fixture(scope="module")
+def dedup() -> ListingDeduplicator:
+    return ListingDeduplicator(threshold=0.6, price_tolerance=0.15)
+
+
+def _listing(title: str, price, listing_id: str, source: str = "subito", photos=None) -> Listing:
+    return Listing(
+        title=title,
+        price=price,
+        listing_id=listing_id,
+        source=source,
+        link=f"https://www.{source}.it/annuncio-{listing_id}.htm",
+        photos=photos or []
+    )
+
+
+def test_normalize_title_drops_noise():
+    assert normalize_title("VENDO iPhone 13, ottime condizioni!") == "iphone 13"
+
+
+def test_prices_compatible():
+    assert prices_compatible(500, 540, 0.15)
+    assert not prices_compatible(460, 580, 0.15)
+    assert prices_compatible(None, 580, 0.15)
+
+
+def test_cross_platform_duplicates_grouped(dedup):
+    listings = [
+        _listing("iPhone 13 128GB Nero", 500, "1", "subito"),
+        _listing("Vendo iPhone 13 128 GB nero", 510, "2", "ebay"),
+        _listing("Bicicletta da corsa Bianchi", 800, "3", "subito")
+    ]
+
+    clusters = dedup.cluster(listings)
+
+    assert sorted(c.size for c in clusters) == [1, 2]
+
+
+def test_price_chain_not_merged(dedup):
+    # Ogni coppia consecutiva è entro il 15%, 460 e 580 no
+    listings = [
+        _listing("iPhone 13 128GB", 460, "a", "subito"),
+        _listing("iPhone 13 128GB", 540, "b", "ebay"),
+        _listing("iPhone 13 128GB", 580, "c", "subito")
+    ]
+
+    for cluster in dedup.cluster(listings):
+        prices = [listing.price for listing in cluster.listings]
+        assert prices_compatible(min(prices), max(prices), 0.15)
+
+
+def test_distinct_items_not_collapsed(dedup):
+    models = [
+        "iPhone 11 64GB", "iPhone 12 mini", "iPhone 13 Pro Max", "Samsung Galaxy S21",
+        "Samsung Galaxy A52", "Xiaomi Redmi Note 10", "Google Pixel 6", "OnePlus 9 Pro",
+        "Nintendo Switch OLED", "PlayStation 5 digital", "Xbox Series S", "iPad Air 4",
+        "MacBook Air M1", "Kindle Paperwhite", "Apple Watch SE", "AirPods Pro",
+        "Bose QC35", "Sony WH-1000XM4", "Canon EOS 250D", "Nikon D3500", "GoPro Hero 9"
+    ]
+    listings = [
+        _listing(title, 100 + 10 * i, str(i), photos=[f"https://img.subito.it/{i}.jpg"])
+        for i, title in enumerate(models)
+    ]
+
+    assert len(dedup.cluster(listings)) == len(listings)
+
+
+def test_title_chain_checked_against_representative(dedup):
+    # Titoli che si sovrappongono a catena ma con estremi diversi
+    listings = [
+        _listing("lego star wars millennium falcon 75192", 700, "1"),
+        _listing("lego star wars millennium falcon", 700, "2"),
+        _listing("lego star wars", 700, "3"),
+    ]
+    clusters = dedup.cluster(listings)
+    for cluster in clusters:
+        titles = [c.title for c in cluster.listings]
+        assert not ("lego star wars" in titles and "lego star wars millennium falcon 75192" in titles)
+
+
+def test_same_photo_merged_only_with_compatible_price(dedup):
+    photo = ["https://img.subito.it/images/abc123.jpg"]
+    listings = [
+        _listing("Divano tre posti", 300, "1", photos=photo),
+        _listing("Sofa grigio", 310, "2", "ebay", photos=photo),
+        _listing("Poltrona", 30, "3", photos=photo)
+    ]
+
+    sizes = sorted(c.size for c in dedup.cluster(listings))
+
+    assert sizes == [1, 2]
+
+
+def test_representative_is_cheapest(dedup):
+    listings = [
+        _listing("Nintendo Switch OLED bianca", 300, "1"),
+        _listing("Nintendo Switch OLED bianca", 290, "2", "ebay")
+    ]
+
+    (cluster,) = dedup.cluster(listings)
+
+    assert cluster.representative.listing_id == "2"
+    assert [d.listing_id for d in cluster.duplicates] == ["1"]
+
+
+def test_identical_titles_scale_linearly(dedup):
+    listings = [_listing("iPhone 13 128GB blu", 500, str(i)) for i in range(2000)]
+
+    started = time.perf_counter()
+    clusters = dedup.cluster(listings)
+    elapsed = time.perf_counter() - started
+
+    assert len(clusters) == 1
+    assert elapsed < 2.0
+
+
+def test_reported_count_propagates_from_duplicates(tmp_path):
+    from api.services.reports import ReportService
+
+    service = ReportService(
+        db_path=str(tmp_path / "reports.db"),
+        legacy_json_path=str(tmp_path / "none.json"),
+        backend="sqlite"
+    )
+    service.create_report("dup-1", "https://www.ebay.it/itm/dup-1", "scam")
+    service.create_report("dup-1", "https://www.ebay.it/itm/dup-1", "fake")
+    service.create_report("other", "https://www.subito.it/other.htm", "scam")
+
+    listings = service.annotate_listings([
+        {
+            "listing_id": "rep-1",
+            "link": "https://www.subito.it/rep-1.htm",
+            "duplicate_ids": ["dup-1"],
+            "duplicate_links": ["https://www.ebay.it/itm/dup-1"]
+        },
+        {
+            "listing_id": "rep-2",
+            "link": "https://www.subito.it/rep-2.htm",
+            "duplicate_links": ["https://www.subito.it/other.htm"]
+        },
+        {"listing_id": "rep-3", "link": "https://www.subito.it/rep-3.htm"}
+    ])
+
+    assert [listing["reported_count"] for listing in listings] == [2, 1, 0]
@@ -0,0 +1,111 @@
+"""Test del download su richiesta dei dettagli di un annuncio."""
+
+import asyncio
+import copy
+import time
+
+import fakeredis
+import pytest
+
+from api.core.config import settings
+from api.services.cache import AsyncCacheService
+from api.services.enrichment import DETAILS_MARKER, ListingDetailFetcher, has_details
+
+
+pytestmark = pytest.mark.anyio
+
+LINK = "https://www.subito.it/telefonia/iphone-13-milano-123.htm"
+
+
+@pytest.fixture
+def cache() -> AsyncCacheService:
+    return AsyncCacheService(fakeredis.FakeAsyncRedis(decode_responses=True))
+
+
+@pytest.fixture
+def fetcher(monkeypatch) -> ListingDetailFetcher:
+    """Fetcher con download finto (lento, per sovrapporre le richieste)."""
+    fetcher = ListingDetailFetcher()
+    fetcher.downloads = []
+
+    def fake_fetch(listing):
+        fetcher.downloads.append(listing.link)
+        time.sleep(0.05)
+        if listing.listing_id == "broken":
+            return None
+        detailed = copy.deepcopy(listing)
+        detailed.description = "Come nuovo, con scatola"
+        detailed.metadata[DETAILS_MARKER] = "2026-01-01T00:00:00"
+        return detailed
+
+    monkeypatch.setattr(fetcher, "_fetch_sync", fake_fetch)
+    return fetcher
+
+
+async def _seen_in_search(cache: AsyncCacheService, listing_id: str):
+    """Listing visto in una ricerca e poi scaduto: resta solo l'indice."""
+    await cache.set_listings({listing_id: {"title": "iPhone 13", "link": LINK, "source": "subito"}})
+    await cache.delete(f"listing:{listing_id}")
+
+
+async def test_unknown_listing_not_fetched(fetcher, cache):
+    assert await fetcher.get("never-seen", cache) is None
+    assert fetcher.downloads == []
+
+
+async def test_expired_listing_fetched_from_index(fetcher, cache):
+    await _seen_in_search(cache, "123")
+
+    listing = await fetcher.get("123", cache)
+
+    assert listing["description"] == "Come nuovo, con scatola"
+    assert fetcher.downloads == [LINK]
+    assert has_details(await cache.get_listing("123"))
+
+
+async def test_cached_details_served_without_download(fetcher, cache):
+    await _seen_in_search(cache, "123")
+    await fetcher.get("123", cache)
+
+    assert (await fetcher.get("123", cache))["description"] == "Come nuovo, con scatola"
+    assert len(fetcher.downloads) == 1
+
+
+async def test_concurrent_requests_share_one_download(fetcher, cache):
+    await _seen_in_search(cache, "123")
+
+    results = await asyncio.gather(*(fetcher.get("123", cache) for _ in range(5)))
+
+    assert len(fetcher.downloads) == 1
+    assert all(result["description"] == "Come nuovo, con scatola" for result in results)
+    assert fetcher.stats["deduplicated"] == 4
+    assert fetcher.get_stats()["inflight"] == 0
+
+
+async def test_cached_summary_served_without_download(fetcher, cache):
+    await cache.set_listings({"123": {"title": "iPhone 13", "link": LINK, "source": "subito"}})
+
+    listing = await fetcher.get("123", cache)
+
+    assert listing["title"] == "iPhone 13" and not has_details(listing)
+    assert fetcher.downloads == []
+
+
+async def test_failed_download_returns_base_data(fetcher, cache):
+    await _seen_in_search(cache, "broken")
+
+    listing = await fetcher.get("broken", cache)
+
+    assert listing["title"] == "iPhone 13" and listing["link"] == LINK
+    assert fetcher.stats["failed"] == 1
+
+
+async def test_failed_download_cached_briefly(fetcher, cache):
+    await _seen_in_search(cache, "broken")
+
+    await fetcher.get("broken", cache)
+    retry = await fetcher.get("broken", cache)
+
+    assert retry["link"] == LINK
+    assert fetcher.downloads == [LINK]
+    assert 0 < await cache.redis.ttl("listing:broken") <= settings.ENRICH_FAILURE_TTL
@@ -0,0 +1,94 @@
+"""Test dell'arricchimento concorrente con le pagine di dettaglio."""
+
+import copy
+import threading
+import time
+
+import fakeredis
+import pytest
+
+from api.services import enrichment
+from api.services.cache import CacheService
+from api.services.enrichment import DETAILS_MARKER, enrich_listings, has_details
+from src.models.listing import Listing
+from src.utils.rate_limiter import RateLimiter
+
+
+def _listing(listing_id: str, link: bool = True) -> Listing:
+    return Listing(
+        title=f"Annuncio {listing_id}",
+        listing_id=listing_id,
+        link=f"https://www.subito.it/{listing_id}.htm" if link else None
+    )
+
+
+@pytest.fixture
+def fetched(monkeypatch):
+    """Sostituisce il download: ID scaricati; "bad" fallisce."""
+    calls = []
+
+    def fake_fetch(pool, listing):
+        calls.append(listing.listing_id)
+        if listing.listing_id == "bad":
+            return None
+        detailed = copy.deepcopy(listing)
+        detailed.description = f"Descrizione {listing.listing_id}"
+        detailed.metadata[DETAILS_MARKER] = "2026-01-01T00:00:00"
+        return detailed
+
+    monkeypatch.setattr(enrichment, "_fetch_details", fake_fetch)
+    return calls
+
+
+def test_enriches_in_place(fetched):
+    listings = [_listing("1"), _listing("bad"), _listing("nolink", link=False)]
+
+    result = enrich_listings(listings, concurrency=2)
+
+    assert result == listings
+    assert listings[0].description == "Descrizione 1"
+    assert listings[1].description is None
+    assert sorted(fetched) == ["1", "bad"]
+
+
+def test_cached_details_not_refetched(fetched):
+    cache = CacheService(fakeredis.FakeRedis(decode_responses=True))
+    first = [_listing("1"), _listing("2")]
+    enrich_listings(first, cache=cache)
+    fetched.clear()
+
+    again = [_listing("1"), _listing("2"), _listing("3")]
+    enrich_listings(again, cache=cache)
+
+    assert fetched == ["3"]
+    assert again[0].description == "Descrizione 1"
+    assert has_details(cache.get_listings(["3"])["3"])
+
+
+def test_unknown_fields_rejected():
+    with pytest.raises(ValueError):
+        enrich_listings([_listing("1")], fields=["description", "prezzo"])
+
+
+def test_rate_limiter_slots_spaced_without_holding_lock():
+    limiter = RateLimiter(requests_per_second=100, min_delay=0.1, max_delay=0.1)
+    waits = []
+
+    def worker():
+        waits.append(limiter.wait())
+
+    threads = [threading.Thread(target=worker) for _ in range(3)]
+    started = time.monotonic()
+    for thread in threads:
+        thread.start()
+        time.sleep(0.01)
+
+    # Mentre i thread dormono il lock è libero
+    assert limiter._lock.acquire(timeout=0.05)
+    limiter._lock.release()
+
+    for thread in threads:
+        thread.join()
+
+    assert sorted(round(w, 1) for w in waits) == [0.0, 0.1, 0.2]
+    assert time.monotonic() - started < 0.35
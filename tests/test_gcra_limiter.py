@@ -0,0 +1,105 @@
+"""Test del rate limiter GCRA (in memoria e condiviso in Redis)."""
+
+import fakeredis
+import pytest
+
+from api.services import rate_limit
+from api.services.rate_limit import RATE_LIMIT_KEY_PREFIX, GCRALimiter, RedisGCRALimiter
+
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def redis_client():
+    client = fakeredis.FakeAsyncRedis()
+    yield client
+    await client.aclose()
+
+
+def _redis_limiter(client, requests: int = 5, period: float = 60) -> RedisGCRALimiter:
+    async def get_client():
+        return client
+    return RedisGCRALimiter(get_client, requests, period)
+
+
+async def test_burst_then_reject():
+    limiter = GCRALimiter(5, 60)
+
+    results = [await limiter.hit("a") for _ in range(6)]
+
+    assert all(r.allowed for r in results[:5])
+    assert [r.remaining for r in results[:5]] == [4, 3, 2, 1, 0]
+    assert not results[5].allowed
+    assert 0 < results[5].retry_after <= 12  # Una unità ogni 60/5 secondi
+
+
+async def test_clients_are_independent_and_budgets_apply():
+    limiter = GCRALimiter(2, 60, budgets={"vip": 4})
+
+    assert all([(await limiter.hit("vip")).allowed for _ in range(4)])
+    assert not (await limiter.hit("vip")).allowed
+    assert (await limiter.hit("other")).allowed
+
+
+async def test_refund_and_clear():
+    limiter = GCRALimiter(2, 60)
+    await limiter.hit("a", 2)
+    assert not (await limiter.hit("a")).allowed
+
+    await limiter.refund("a", 1)
+    assert (await limiter.hit("a")).allowed
+
+    await limiter.clear("a")
+    assert limiter.tracked_clients() == 0
+
+
+async def test_full_budget_request_not_rejected_by_rounding(monkeypatch):
+    # Con questo orologio (now + 60) - 60 > now
+    monkeypatch.setattr(rate_limit.time, "monotonic", lambda: 4087.502)
+    limiter = GCRALimiter(2, 60)
+
+    assert (await limiter.hit("a", 2)).allowed
+    assert not (await limiter.hit("a")).allowed
+
+
+async def test_redis_state_shared_between_workers(redis_client):
+    # Due limiter (due worker) sullo stesso Redis
+    first, second = _redis_limiter(redis_client), _redis_limiter(redis_client)
+
+    for _ in range(3):
+        assert (await first.hit("10.0.0.1")).allowed
+    results = [await second.hit("10.0.0.1") for _ in range(3)]
+
+    assert [r.allowed for r in results] == [True, True, False]
+    assert await redis_client.pttl(f"{RATE_LIMIT_KEY_PREFIX}:10.0.0.1") > 0
+    assert first.tracked_clients() == second.tracked_clients() == 0
+
+
+async def test_redis_refund_and_clear(redis_client):
+    limiter = _redis_limiter(redis_client, requests=2)
+    await limiter.hit("a", 2)
+    await limiter.refund("a", 2)
+    assert (await limiter.hit("a", 2)).allowed
+
+    await limiter.clear()
+    assert await redis_client.exists(f"{RATE_LIMIT_KEY_PREFIX}:a") == 0
+
+
+async def test_falls_back_to_memory_without_redis():
+    async def no_client():
+        return None
+    limiter = RedisGCRALimiter(no_client, 1, 60)
+
+    assert (await limiter.hit("a")).allowed
+    assert not (await limiter.hit("a")).allowed
+    assert limiter.tracked_clients() == 1
+
+
+async def test_falls_back_to_memory_on_redis_errors():
+    server = fakeredis.FakeServer()
+    server.connected = False
+    limiter = _redis_limiter(fakeredis.FakeAsyncRedis(server=server), requests=1)
+
+    assert (await limiter.hit("a")).allowed
+    assert not (await limiter.hit("a")).allowed
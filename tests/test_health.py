@@ -0,0 +1,100 @@
+"""Test delle probe di liveness e readiness."""
+
+import fakeredis
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from api.core.config import settings
+from api.routers.health import router as health_router
+from api.services import health
+from api.services.health import HealthService
+from src.utils.circuit_breaker import CircuitBreaker
+
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def redis_client(monkeypatch):
+    """Redis raggiungibile (None per simularne l'assenza)."""
+    state = {"client": fakeredis.FakeAsyncRedis()}
+
+    async def get_client():
+        return state["client"]
+
+    monkeypatch.setattr(health, "get_async_redis_client", get_client)
+    monkeypatch.setattr(health, "get_circuit_breakers", lambda: {})
+    monkeypatch.setattr(settings, "HEALTH_CACHE_SECONDS", 0)
+    return state
+
+
+@pytest.fixture
+def service(monkeypatch) -> HealthService:
+    service = HealthService()
+    monkeypatch.setattr(health, "_health_service", service)
+    return service
+
+
+async def test_ready_when_all_checks_pass(redis_client, service):
+    result = await service.readiness()
+
+    assert result["status"] == "ready" and result["ready"]
+    assert result["checks"]["redis"]["status"] == "ok"
+    assert result["checks"]["queue"] == {"status": "ok", "depth": 0, "enabled": False}
+
+
+async def test_missing_redis_degrades_unless_required(redis_client, service, monkeypatch):
+    redis_client["client"] = None
+    assert (await service.readiness())["status"] == "degraded"
+
+    monkeypatch.setattr(settings, "HEALTH_REQUIRE_REDIS", True)
+    result = await service.readiness()
+    assert result["status"] == "not_ready"
+    assert result["checks"]["redis"]["error"] == "Redis non disponibile"
+
+
+async def test_open_circuit_only_degrades(redis_client, service, monkeypatch):
+    breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=60)
+    breaker.record_failure()
+    monkeypatch.setattr(health, "get_circuit_breakers", lambda: {"www.subito.it": breaker})
+
+    result = await service.readiness()
+
+    assert result["status"] == "degraded" and result["ready"]
+    assert result["checks"]["circuit_breakers"]["open"] == ["www.subito.it"]
+
+
+async def test_saturated_worker_not_ready(redis_client, service):
+    for _ in range(settings.HEALTH_MAX_INFLIGHT):
+        service.request_started()
+    assert (await service.readiness())["checks"]["saturation"]["status"] == "fail"
+
+    service.request_finished()
+    service.loop_lag_max = settings.HEALTH_MAX_LOOP_LAG_MS / 1000 * 2
+    assert not (await service.readiness())["ready"]
+
+
+async def test_result_reused_between_probes(redis_client, service, monkeypatch):
+    monkeypatch.setattr(settings, "HEALTH_CACHE_SECONDS", 60)
+
+    first = await service.readiness()
+    redis_client["client"] = None
+    second = await service.readiness()
+
+    assert not first["cached"] and second["cached"]
+    assert second["status"] == "ready"
+
+
+async def test_endpoints_split_liveness_and_readiness(redis_client, service):
+    app = FastAPI()
+    app.include_router(health_router)
+    for _ in range(settings.HEALTH_MAX_INFLIGHT):
+        service.request_started()
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        live = await client.get("/health/live")
+        ready = await client.get("/health/ready")
+
+    assert live.status_code == 200 and live.json()["status"] == "alive"
+    assert ready.status_code == 503 and ready.json()["status"] == "not_ready"
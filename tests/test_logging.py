@@ -0,0 +1,89 @@
+"""Test della pipeline di logging (coda, JSON, campionamento, rotazione)."""
+
+import json
+import logging
+
+import pytest
+
+from src.utils.logger import JsonFormatter, SamplingFilter, configure_logging, stop_logging
+
+
+def _record(name: str, msg: str, level: int = logging.INFO, args=(), **extra) -> logging.LogRecord:
+    record = logging.LogRecord(name, level, __file__, 1, msg, args, None)
+    record.__dict__.update(extra)
+    return record
+
+
+@pytest.fixture
+def log_file(tmp_path):
+    yield tmp_path / "api.log"
+    stop_logging()
+
+
+def _lines(path):
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+def test_json_formatter_includes_extra_fields():
+    record = _record("api.search", "Ricerca %s", args=("bici",), request_id="abc", duration_ms=12.5)
+
+    entry = json.loads(JsonFormatter().format(record))
+
+    assert entry["message"] == "Ricerca bici"
+    assert entry["logger"] == "api.search" and entry["level"] == "INFO"
+    assert entry["request_id"] == "abc" and entry["duration_ms"] == 12.5
+
+
+def test_sampling_by_prefix_and_template():
+    sampler = SamplingFilter({"src.scraper": 0.1, "src": 0.5})
+
+    passed = [
+        sampler.filter(_record("src.scraper.subito", "Pagina %s", args=(page,)))
+        for page in range(30)
+    ]
+    other = [sampler.filter(_record("src.utils", "Attesa %s", args=(i,))) for i in range(10)]
+
+    assert sum(passed) == 3 and passed[0]
+    assert sum(other) == 5
+    assert sampler.filter(_record("api.main", "Avvio"))
+
+
+def test_errors_never_sampled():
+    sampler = SamplingFilter({"": 0.0})
+
+    assert not sampler.filter(_record("src.scraper", "Pagina"))
+    assert all(sampler.filter(_record("src.scraper", "Errore", logging.ERROR)) for _ in range(5))
+
+
+def test_queue_pipeline_writes_json(log_file):
+    configure_logging(("tests.pipeline",), log_file=str(log_file), log_to_console=False, json_format=True)
+    logger = logging.getLogger("tests.pipeline")
+
+    listing = {"price": 100}
+    logger.info("Listing %s", listing, extra={"listing_id": "1"})
+    listing["price"] = 5  # Il messaggio è composto al momento della chiamata
+    try:
+        raise ValueError("pagina non valida")
+    except ValueError:
+        logger.exception("Errore parsing")
+    stop_logging()
+
+    info, error = _lines(log_file)
+    assert info["message"] == "Listing {'price': 100}" and info["listing_id"] == "1"
+    assert error["level"] == "ERROR" and "ValueError: pagina non valida" in error["exception"]
+
+
+def test_size_rotation(log_file):
+    configure_logging(
+        ("tests.rotation",), log_file=str(log_file), log_to_console=False,
+        rotation="size", max_bytes=500, backup_count=2
+    )
+    logger = logging.getLogger("tests.rotation")
+
+    for i in range(100):
+        logger.info("Messaggio di prova numero %s", i)
+    stop_logging()
+
+    rotated = sorted(p.name for p in log_file.parent.iterdir())
+    assert rotated == ["api.log", "api.log.1", "api.log.2"]
+    assert all(p.stat().st_size <= 500 for p in log_file.parent.iterdir())
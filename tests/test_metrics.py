@@ -0,0 +1,70 @@
+"""Test delle metriche Prometheus."""
+
+import fakeredis
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from api.middleware.metrics import MetricsMiddleware
+from api.routers.health import router as health_router
+from api.services.cache import CacheService
+from src.utils import metrics
+
+
+pytestmark = pytest.mark.skipif(not metrics.METRICS_AVAILABLE, reason="prometheus_client non installato")
+
+
+def _sample(name: str, **labels) -> float:
+    return metrics.REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+@pytest.fixture
+def app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/items/{item_id}")
+    async def get_item(item_id: str):
+        return {"item_id": item_id}
+
+    app.include_router(health_router)
+    app.add_middleware(MetricsMiddleware)
+    return app
+
+
+async def _get(app: FastAPI, *paths: str):
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        return [await client.get(path) for path in paths]
+
+
+@pytest.mark.anyio
+async def test_requests_labelled_by_route_template(app):
+    labels = dict(method="GET", route="/items/{item_id}", status="200")
+    before = _sample("api_request_seconds_count", **labels)
+    unmatched = _sample("api_request_seconds_count", method="GET", route="unmatched", status="404")
+
+    await _get(app, "/items/1", "/items/2", "/missing")
+
+    assert _sample("api_request_seconds_count", **labels) == before + 2
+    assert _sample("api_request_seconds_count", method="GET", route="unmatched", status="404") == unmatched + 1
+
+
+@pytest.mark.anyio
+async def test_metrics_endpoint_exposes_registry(app):
+    (response,) = await _get(app, "/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert "# TYPE api_request_seconds histogram" in response.text
+
+
+def test_cache_hits_and_misses_counted():
+    cache = CacheService(fakeredis.FakeRedis(decode_responses=True))
+    cache.set_listing("1", {"title": "Bici"})
+    hits = _sample("cache_requests_total", namespace="listing", result="hit")
+    misses = _sample("cache_requests_total", namespace="listing", result="miss")
+
+    cache.get_listing("1")
+    cache.get_listings(["1", "2", "3"])
+
+    assert _sample("cache_requests_total", namespace="listing", result="hit") == hits + 2
+    assert _sample("cache_requests_total", namespace="listing", result="miss") == misses + 2
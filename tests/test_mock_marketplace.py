@@ -0,0 +1,101 @@
+"""Test del server mock dei marketplace (benchmarks/mock_marketplace.py)."""
+
+import sys
+from email.utils import format_datetime
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "benchmarks"))
+
+from mock_marketplace import EMPTY_PAGE, MarketplaceOptions, MockMarketplace, start_in_thread  # noqa: E402
+from src.config.settings import ScraperConfig  # noqa: E402
+from src.scraper.base_scraper import BaseScraper  # noqa: E402
+from src.scraper.subito_scraper import SubitoScraper  # noqa: E402
+
+
+BASE_URL = "http://mock.test"
+
+
+async def _get(marketplace: MockMarketplace, *paths: str):
+    transport = httpx.ASGITransport(app=marketplace)
+    async with httpx.AsyncClient(transport=transport, base_url=BASE_URL) as client:
+        return [await client.get(path) for path in paths]
+
+
+@pytest.mark.anyio
+async def test_pages_until_max_pages_then_empty():
+    marketplace = MockMarketplace(BASE_URL, MarketplaceOptions(max_pages=2))
+
+    first, second, third, ebay = await _get(
+        marketplace,
+        "/annunci-italia?q=bici",
+        "/annunci-italia?q=bici&o=25",
+        "/annunci-italia?q=bici&o=50",
+        "/sch/i.html?_nkw=bici&_pgn=3"
+    )
+
+    assert first.status_code == second.status_code == 200
+    assert first.text != EMPTY_PAGE and second.text != EMPTY_PAGE
+    assert third.text == ebay.text == EMPTY_PAGE
+    assert marketplace.stats == {"subito.search.200": 3, "ebay.search.200": 1}
+
+
+@pytest.mark.anyio
+async def test_injected_rate_limit_errors():
+    marketplace = MockMarketplace(BASE_URL, MarketplaceOptions(error_429=1.0, retry_after=2, seed=1))
+
+    (response,) = await _get(marketplace, "/itm/123")
+
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "2"
+    assert marketplace.stats == {"ebay.detail.429": 1}
+
+
+@pytest.mark.anyio
+async def test_stats_and_reset_endpoints():
+    marketplace = MockMarketplace(BASE_URL)
+    transport = httpx.ASGITransport(app=marketplace)
+
+    async with httpx.AsyncClient(transport=transport, base_url=BASE_URL) as client:
+        await client.get("/telefonia/iphone-123.htm")
+        stats = (await client.get("/__stats")).json()
+        await client.post("/__reset")
+        after_reset = (await client.get("/__stats")).json()
+
+    assert stats["by_page"] == {"subito.detail.200": 1}
+    assert after_reset["requests"] == 0
+
+
+def test_retry_after_header_parsing():
+    def response(value):
+        return SimpleNamespace(headers={"Retry-After": value} if value is not None else {})
+
+    in_ten_seconds = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=10), usegmt=True)
+
+    assert BaseScraper._retry_after(response("3")) == 3.0
+    assert 8 <= BaseScraper._retry_after(response(in_ten_seconds)) <= 10
+    assert BaseScraper._retry_after(response("3600")) == 300.0
+    assert BaseScraper._retry_after(response("domani")) is None
+    assert BaseScraper._retry_after(response(None)) is None
+
+
+def test_scraper_searches_against_mock():
+    mock = start_in_thread(options=MarketplaceOptions(max_pages=2))
+    config = ScraperConfig(
+        requests_per_second=1000, min_delay=0, max_delay=0, subito_base_url=mock["base_url"]
+    )
+    scraper = SubitoScraper(config)
+    try:
+        listings = scraper.search("bici", max_pages=3)
+    finally:
+        scraper.close()
+        mock["server"].should_exit = True
+        mock["thread"].join(5)
+
+    assert listings
+    assert all(listing.link.startswith(mock["base_url"]) for listing in listings)
+    assert mock["marketplace"].stats["subito.search.200"] >= 2
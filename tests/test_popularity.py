@@ -0,0 +1,64 @@
+"""Test della popolarità delle ricerche (contatori decaduti in Redis)."""
+
+import fakeredis
+import pytest
+
+from api.services.popularity import (
+    AsyncQueryPopularityService,
+    QueryPopularityService,
+    get_async_popularity_service
+)
+
+
+@pytest.fixture
+def server() -> fakeredis.FakeServer:
+    return fakeredis.FakeServer()
+
+
+def test_top_orders_by_frequency(server):
+    service = QueryPopularityService(fakeredis.FakeRedis(server=server, decode_responses=True))
+    for key, hits in (("search:a", 3), ("search:b", 1), ("search:c", 2)):
+        for _ in range(hits):
+            assert service.record(key, {"query": key[-1]}, max_pages=2)
+
+    top = service.top(2)
+
+    assert [key for key, _, _ in top] == ["search:a", "search:c"]
+    assert top[0][1] == pytest.approx(3, rel=0.01)
+    assert top[0][2] == {"query": "a", "max_pages": 2}
+
+
+def test_trim_keeps_most_popular(server):
+    service = QueryPopularityService(fakeredis.FakeRedis(server=server, decode_responses=True))
+    for i in range(5):
+        for _ in range(i + 1):
+            service.record(f"search:{i}", {"query": str(i)})
+
+    assert service.trim(2) == 3
+    assert [key for key, _, _ in service.top(10)] == ["search:4", "search:3"]
+
+
+def test_disabled_without_redis():
+    service = QueryPopularityService(None)
+    assert not service.record("search:a", {})
+    assert service.top(5) == []
+
+
+@pytest.mark.anyio
+async def test_async_record_shares_keys_and_script(server):
+    client = fakeredis.FakeAsyncRedis(server=server, decode_responses=True)
+    service = get_async_popularity_service(client)
+
+    assert isinstance(service, AsyncQueryPopularityService)
+    assert get_async_popularity_service(client) is service  # Script registrato una volta
+    assert await service.record("search:a", {"query": "a"})
+    assert await service.record("search:a", {"query": "a"})
+
+    sync = QueryPopularityService(fakeredis.FakeRedis(server=server, decode_responses=True))
+    assert sync.top(1)[0][1] == pytest.approx(2, rel=0.01)
+    await client.aclose()
+
+
+@pytest.mark.anyio
+async def test_async_disabled_without_redis():
+    assert not await get_async_popularity_service(None).record("search:a", {})
@@ -0,0 +1,52 @@
+"""Test dello sketch di quantili dei prezzi."""
+
+import random
+
+import pytest
+
+from src.analysis.price_sketch import PriceSketch
+
+
+def _exact_quantile(values, q):
+    ordered = sorted(values)
+    return ordered[round(q * (len(ordered) - 1))]
+
+
+def test_quantiles_within_relative_accuracy():
+    rng = random.Random(7)
+    prices = [rng.lognormvariate(5, 1.2) for _ in range(20000)]
+    sketch = PriceSketch(relative_accuracy=0.02)
+    for price in prices:
+        sketch.add(price)
+
+    qs = [0.01, 0.1, 0.25, 0.5, 0.75, 0.9, 0.99]
+    for q, estimate in zip(qs, sketch.quantiles(qs)):
+        assert estimate == pytest.approx(_exact_quantile(prices, q), rel=0.021)
+    assert len(sketch.bins) < 600
+
+
+def test_merged_sketches_match_single_sketch():
+    whole, first, second = PriceSketch(), PriceSketch(), PriceSketch()
+    for i, price in enumerate(range(1, 2001)):
+        whole.add(price)
+        (first if i % 2 else second).add(price)
+
+    first.merge_bins({str(k): str(v) for k, v in second.bins.items()})  # Come letti da Redis
+
+    assert first.count == whole.count
+    assert first.quantiles([0.1, 0.5, 0.9]) == whole.quantiles([0.1, 0.5, 0.9])
+
+
+def test_invalid_and_extreme_values():
+    sketch = PriceSketch()
+    assert sketch.quantile(0.5) is None
+
+    for value in (None, 0, -5):
+        sketch.add(value)
+    assert sketch.count == 0
+
+    sketch.add(1e12)
+    assert sketch.quantile(1.0) == pytest.approx(sketch.max_value, rel=0.02)
+
+    with pytest.raises(ValueError):
+        PriceSketch(relative_accuracy=1.5)
@@ -0,0 +1,67 @@
+"""Test delle statistiche di prezzo (sketch giornalieri in Redis)."""
+
+import fakeredis
+import pytest
+
+from api.services.price_stats import AsyncPriceStatsService, PriceStatsService
+
+
+@pytest.fixture
+def server() -> fakeredis.FakeServer:
+    return fakeredis.FakeServer()
+
+
+@pytest.fixture
+def service(server) -> PriceStatsService:
+    return PriceStatsService(fakeredis.FakeRedis(server=server, decode_responses=True))
+
+
+def test_stats_key_normalizes_query():
+    assert PriceStatsService.stats_key("  Vendo iPhone 13! ", "telefonia") == "iphone 13|telefonia"
+    assert PriceStatsService.stats_key("iphone 13") == "iphone 13|all"
+
+
+def test_record_and_summary(service):
+    prices = [100, 200, 300, 400, 500, None, 0]
+
+    assert service.record("iphone 13", None, prices) == 5
+    summary = service.get_summary("iphone 13")
+
+    assert summary["count"] == 5
+    assert summary["quantiles"]["p50"] == pytest.approx(300, rel=0.02)
+    assert service.get_summary("ipad")["count"] == 0
+
+
+def test_items_counted_once_per_day(service):
+    assert service.record("ps5", None, [400, 450], item_ids=["a", "b"]) == 2
+    # Stessa ricerca riscaricata: solo l'articolo nuovo viene contato
+    assert service.record("ps5", None, [400, 450, 500], item_ids=["a", "b", "c"]) == 1
+    assert service.record("ps5", None, [None, 0], item_ids=["d", "e"]) == 0
+
+    assert service.get_summary("ps5")["count"] == 3
+
+
+def test_reference_needs_enough_prices(service):
+    service.record("switch", None, [250])
+    assert service.get_reference("switch") is None
+
+    service.record("switch", None, [200 + i for i in range(50)])
+    reference = service.get_reference("switch")
+    assert reference is not None and 200 <= reference.median <= 250
+
+
+def test_disabled_without_redis():
+    service = PriceStatsService(None)
+    assert service.record("iphone", None, [100]) == 0
+    assert service.get_summary("iphone")["count"] == 0
+
+
+@pytest.mark.anyio
+async def test_async_summary_matches_sync(server, service):
+    service.record("iphone 13", "telefonia", [100, 150, 200, 250])
+    client = fakeredis.FakeAsyncRedis(server=server, decode_responses=True)
+
+    summary = await AsyncPriceStatsService(client).get_summary("iphone 13", "telefonia")
+
+    assert summary == service.get_summary("iphone 13", "telefonia")
+    await client.aclose()
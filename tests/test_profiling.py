@@ -0,0 +1,99 @@
+"""Test del profiler a campionamento e dei profili delle richieste lente."""
+
+import threading
+import time
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from api.core.config import settings
+from api.middleware.profiling import SlowRequestProfilerMiddleware
+from api.routers.admin import router as admin_router
+from api.services import profiling
+from api.services.profiling import ProfilerBusyError, SamplingProfiler, SlowRequestLog
+
+
+def _busy_loop(stop: threading.Event):
+    while not stop.is_set():
+        sum(range(1000))
+
+
+@pytest.fixture
+def busy_thread():
+    stop = threading.Event()
+    thread = threading.Thread(target=_busy_loop, args=(stop,), name="busy-worker")
+    thread.start()
+    yield thread
+    stop.set()
+    thread.join()
+
+
+def test_samples_other_threads(busy_thread):
+    profiler = SamplingProfiler(interval=0.005)
+
+    counts = profiler.profile(0.2)
+
+    busy = [stack for stack in counts if stack.startswith("busy-worker;") and "_busy_loop (test_profiling.py:" in stack]
+    assert busy and sum(counts[stack] for stack in busy) >= 5
+    line = profiler.collapse(counts).splitlines()[0]
+    assert line.rsplit(" ", 1)[1].isdigit()
+
+
+def test_one_profile_at_a_time(tmp_path):
+    profiler = SamplingProfiler(interval=0.005)
+    running = threading.Thread(target=profiler.profile, args=(0.2,))
+    running.start()
+    time.sleep(0.05)
+
+    with pytest.raises(ProfilerBusyError):
+        profiler.profile(0.1)
+    assert profiler.profile_to_file(0.1, str(tmp_path)) is None
+
+    running.join()
+    assert not profiler.is_running()
+    assert profiler.profile_to_file(0.05, str(tmp_path)).suffix == ".folded"
+
+
+def test_slow_request_log_keeps_only_slow_requests():
+    log = SlowRequestLog(threshold_ms=100, keep=2)
+
+    for path, duration in (("/fast", 5), ("/slow-1", 150), ("/slow-2", 200), ("/slow-3", 300)):
+        profile = log.try_start()
+        assert log.try_start() is None  # Un solo cProfile attivo
+        log.finish(profile, "GET", path, duration)
+
+    entries = log.list()
+    assert [e["path"] for e in entries] == ["/slow-3", "/slow-2"]
+    assert "stats" not in entries[0]
+    assert "cumulative" in log.get(entries[0]["profile_id"])["stats"]
+
+
+@pytest.mark.anyio
+async def test_admin_endpoints(monkeypatch):
+    monkeypatch.setattr(profiling, "_slow_request_log", SlowRequestLog(threshold_ms=0))
+    app = FastAPI()
+
+    @app.get("/work")
+    async def work():
+        return sum(range(1000))
+
+    app.include_router(admin_router)
+    app.add_middleware(SlowRequestProfilerMiddleware)
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        monkeypatch.setattr(settings, "ADMIN_TOKEN", "")
+        assert (await client.get("/admin/slow-requests")).json()["detail"]["error"] == "AdminDisabled"
+
+        monkeypatch.setattr(settings, "ADMIN_TOKEN", "secret")
+        assert (await client.get("/admin/slow-requests", headers={"X-Admin-Token": "wrong"})).status_code == 403
+
+        await client.get("/work")
+        headers = {"X-Admin-Token": "secret"}
+        profiles = (await client.get("/admin/slow-requests", headers=headers)).json()["profiles"]
+        (work,) = [p for p in profiles if p["path"] == "/work"]
+        detail = await client.get(f"/admin/slow-requests/{work['profile_id']}", headers=headers)
+        too_long = await client.get("/admin/profile", params={"seconds": settings.PROFILER_MAX_SECONDS + 1}, headers=headers)
+
+    assert detail.text.startswith("# GET /work")
+    assert too_long.status_code == 400
@@ -0,0 +1,130 @@
+"""Test del rate limiting pesato sul costo delle ricerche."""
+
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from api.core.config import settings
+from api.core.dependencies import get_async_redis_client
+from api.middleware.rate_limit import RateLimitMiddleware
+from api.routers import search as search_router
+from api.services.scheduler import SearchScheduler
+from api.services.rate_limit import (
+    GCRALimiter,
+    charge_request,
+    estimate_search_cost,
+    refund_request
+)
+
+
+pytestmark = pytest.mark.anyio
+
+
+def _request(limiter: GCRALimiter, client: str = "10.0.0.1") -> SimpleNamespace:
+    """Request minimale con lo stato impostato dal middleware."""
+    return SimpleNamespace(state=SimpleNamespace(rate_limiter=limiter, rate_limit_client=client))
+
+
+@pytest.fixture
+def limiter() -> GCRALimiter:
+    return GCRALimiter(settings.RATE_LIMIT_REQUESTS, settings.RATE_LIMIT_PERIOD)
+
+
+def test_simple_search_costs_one_unit():
+    assert estimate_search_cost(platforms=1, max_pages=1) == 1.0
+
+
+def test_cost_grows_with_pages_and_details():
+    base = estimate_search_cost(platforms=2, max_pages=3)
+    assert base == 6 * settings.RATE_LIMIT_COST_PER_PAGE
+    assert estimate_search_cost(platforms=2, max_pages=3, details=True) > base
+
+
+async def test_details_search_admitted_on_fresh_client(limiter):
+    cost = estimate_search_cost(platforms=1, max_pages=1, details=True)
+    assert cost > limiter.limit_for("10.0.0.1")  # Più dell'intero budget
+
+    assert (await limiter.hit("10.0.0.1")).allowed  # Unità del middleware
+    quota = await charge_request(_request(limiter), cost)
+
+    assert quota is not None and quota.allowed
+    assert quota.remaining == 0
+
+
+async def test_charge_rejected_when_budget_used(limiter):
+    client = "10.0.0.2"
+    for _ in range(settings.RATE_LIMIT_REQUESTS - 1):
+        assert (await limiter.hit(client)).allowed
+
+    quota = await charge_request(_request(limiter, client), 3)
+
+    assert quota is not None and not quota.allowed
+    assert quota.retry_after > 0
+
+
+async def test_refund_returns_capped_cost(limiter):
+    client = "10.0.0.3"
+    request = _request(limiter, client)
+    cost = estimate_search_cost(platforms=2, max_pages=5, details=True)
+
+    assert (await limiter.hit(client)).allowed
+    assert (await charge_request(request, cost)).allowed
+    await refund_request(request, cost)
+
+    # Restituito tutto il costo aggiuntivo: resta solo l'unità del middleware
+    assert (await limiter.hit(client, settings.RATE_LIMIT_REQUESTS - 1)).allowed
+
+
+async def test_no_charge_without_rate_limiting():
+    request = SimpleNamespace(state=SimpleNamespace())
+    assert await charge_request(request, 10) is None
+    await refund_request(request, 10)
+
+
+@pytest.fixture
+async def client(tmp_path, monkeypatch):
+    """App con middleware e router di ricerca, senza Redis."""
+    scheduler = SearchScheduler(str(tmp_path / "saved.json"))
+    monkeypatch.setattr(search_router, "get_scheduler", lambda: scheduler)
+
+    app = FastAPI()
+    app.include_router(search_router.router)
+    app.add_middleware(RateLimitMiddleware, requests=10, period=60)
+    app.dependency_overrides[get_async_redis_client] = lambda: None
+
+    @app.get("/ping")
+    async def ping():
+        return {}
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
+
+
+async def test_search_quota_429_matches_middleware(client):
+    for _ in range(2):
+        await client.get("/ping")
+
+    # Costo 10 (tutto il budget): oltre le 8 unità rimaste
+    response = await client.post("/api/v1/search", json={"query": "drone", "platform": "all", "max_pages": 5})
+
+    assert response.status_code == 429
+    assert set(response.json()) == {"error", "message", "retry_after", "limit", "period"}
+    assert response.json()["period"] == 60
+    assert response.headers["Retry-After"] == str(response.json()["retry_after"])
+    assert response.headers.get_list("X-RateLimit-Limit") == ["10"]
+    assert response.headers["X-RateLimit-Remaining"] == "0"
+
+
+async def test_failed_scraping_refunds_cost(client, monkeypatch):
+    def fail(request):
+        raise RuntimeError("sito non raggiungibile")
+    monkeypatch.setattr(search_router, "_execute_search", fail)
+
+    response = await client.post("/api/v1/search", json={"query": "drone", "platform": "all", "max_pages": 3})
+    assert response.status_code == 500
+
+    # Resta addebitata solo l'unità del middleware
+    assert (await client.get("/ping")).headers["X-RateLimit-Remaining"] == "8"
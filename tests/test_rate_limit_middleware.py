@@ -0,0 +1,69 @@
+"""Test del middleware ASGI di rate limiting."""
+
+import httpx
+import pytest
+from fastapi import FastAPI, Request
+
+from api.middleware.rate_limit import RateLimitMiddleware
+
+
+pytestmark = pytest.mark.anyio
+
+
+def _app(requests: int = 2) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/api/v1/ping")
+    async def ping(request: Request):
+        return {"client": request.state.rate_limit_client}
+
+    @app.get("/health")
+    async def health():
+        return {"status": "ok"}
+
+    app.add_middleware(RateLimitMiddleware, requests=requests, period=60)
+    return app
+
+
+@pytest.fixture
+async def client():
+    transport = httpx.ASGITransport(app=_app())
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
+
+
+async def test_headers_on_allowed_requests(client):
+    response = await client.get("/api/v1/ping", headers={"X-Forwarded-For": "1.2.3.4, 10.0.0.1"})
+
+    assert response.status_code == 200
+    assert response.json() == {"client": "1.2.3.4"}
+    assert response.headers["X-RateLimit-Limit"] == "2"
+    assert response.headers["X-RateLimit-Remaining"] == "1"
+    assert int(response.headers["X-RateLimit-Reset"]) > 0
+
+
+async def test_rejects_with_retry_after(client):
+    for _ in range(2):
+        assert (await client.get("/api/v1/ping")).status_code == 200
+
+    response = await client.get("/api/v1/ping")
+
+    assert response.status_code == 429
+    assert 0 < int(response.headers["Retry-After"]) <= 30
+    assert response.headers["X-RateLimit-Remaining"] == "0"
+    body = response.json()
+    assert body["error"] == "RateLimitExceeded"
+    assert body["retry_after"] == int(response.headers["Retry-After"])
+
+    # Un altro IP ha il proprio limite
+    other = await client.get("/api/v1/ping", headers={"X-Forwarded-For": "5.6.7.8"})
+    assert other.status_code == 200
+
+
+async def test_exempt_paths_not_limited(client):
+    for _ in range(5):
+        response = await client.get("/health")
+        assert response.status_code == 200
+        assert "X-RateLimit-Limit" not in response.headers
+
+    assert (await client.get("/api/v1/ping")).status_code == 200
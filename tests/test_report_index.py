@@ -0,0 +1,66 @@
+"""Test degli indici in memoria delle segnalazioni."""
+
+from api.services.report_store import ReportIndex
+
+
+def _add(index: ReportIndex, report_id: str, created_at: str, status: str = "received", listing_id: str = "1"):
+    index.add({
+        "report_id": report_id,
+        "listing_id": listing_id,
+        "listing_url": None,
+        "status": status,
+        "created_at": created_at
+    })
+
+
+def test_counts_follow_status_changes():
+    index = ReportIndex()
+    _add(index, "a", "2026-01-01")
+    _add(index, "b", "2026-01-02")
+
+    index.set_status("a", "reviewed")
+    index.set_status("b", "reviewed")
+    index.set_status("missing", "reviewed")
+
+    assert index.counts() == {"reviewed": 2}
+    assert len(index) == 2 and "a" in index
+
+
+def test_readding_report_updates_status():
+    index = ReportIndex()
+    _add(index, "a", "2026-01-01")
+    _add(index, "a", "2026-01-01", status="resolved")
+
+    assert len(index) == 1
+    assert index.counts() == {"resolved": 1}
+
+
+def test_pages_newest_first_with_late_inserts():
+    index = ReportIndex()
+    for report_id, created_at in (("b", "2026-01-02"), ("d", "2026-01-04"), ("a", "2026-01-01"), ("c", "2026-01-03")):
+        _add(index, report_id, created_at)
+
+    assert index.page(None, 10) == (["d", "c", "b", "a"], None)
+    assert index.page(None, 2) == (["d", "c"], ("2026-01-03", "c"))
+
+
+def test_status_page_excludes_other_statuses():
+    index = ReportIndex()
+    _add(index, "a", "2026-01-01")
+    _add(index, "b", "2026-01-02")
+    _add(index, "c", "2026-01-03")
+    index.set_status("b", "reviewed")
+
+    assert index.page("received", 10)[0] == ["c", "a"]
+    assert index.page("reviewed", 10)[0] == ["b"]
+    assert index.page("resolved", 10) == ([], None)
+
+
+def test_reports_grouped_by_listing():
+    index = ReportIndex()
+    _add(index, "a", "2026-01-01", listing_id="1")
+    _add(index, "b", "2026-01-02", listing_id="2")
+    _add(index, "c", "2026-01-03", listing_id="1")
+
+    assert index.by_listing("1") == ["a", "c"]
+    assert index.by_listing("3") == []
@@ -0,0 +1,84 @@
+"""Test della paginazione a cursore di GET /api/v1/reports."""
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from api.routers import reports as reports_router
+from api.services.reports import ReportService
+
+
+@pytest.fixture(params=["sqlite", "journal"])
+def service(request, tmp_path) -> ReportService:
+    service = ReportService(
+        db_path=str(tmp_path / "reports"),
+        legacy_json_path=str(tmp_path / "none.json"),
+        backend=request.param
+    )
+    for i in range(7):
+        report = service.create_report(f"listing-{i}", f"https://www.subito.it/{i}.htm", "scam")
+        if i % 2:
+            service.update_report_status(report["report_id"], "reviewed")
+    return service
+
+
+def _walk(service: ReportService, status=None, limit=3):
+    """Tutte le pagine seguendo i cursori."""
+    pages = []
+    cursor = None
+    while True:
+        reports, cursor = service.get_reports_page(status=status, limit=limit, cursor=cursor)
+        pages.append([r["listing_id"] for r in reports])
+        if cursor is None:
+            return pages
+
+
+def test_cursor_round_trip():
+    key = ("2026-01-01T10:00:00.123456", "rep_abc")
+    cursor = ReportService.encode_cursor(key)
+
+    assert "=" not in cursor
+    assert ReportService.decode_cursor(cursor) == key
+
+
+@pytest.mark.parametrize("cursor", ["%%%", "bm90LWpzb24", "WzEsMl0", "WyJhIl0"])
+def test_invalid_cursor_rejected(cursor):
+    with pytest.raises(ValueError):
+        ReportService.decode_cursor(cursor)
+
+
+def test_pages_cover_all_reports_once(service):
+    pages = _walk(service)
+
+    assert [len(page) for page in pages] == [3, 3, 1]
+    assert sum(pages, []) == [f"listing-{i}" for i in reversed(range(7))]
+
+
+def test_status_pages(service):
+    assert sum(_walk(service, status="reviewed", limit=2), []) == ["listing-5", "listing-3", "listing-1"]
+
+
+def test_new_reports_do_not_shift_later_pages(service):
+    first, cursor = service.get_reports_page(limit=3)
+    service.create_report("listing-new", "https://www.subito.it/new.htm", "scam")
+
+    second, _ = service.get_reports_page(limit=3, cursor=cursor)
+
+    assert [r["listing_id"] for r in second] == ["listing-3", "listing-2", "listing-1"]
+
+
+@pytest.mark.anyio
+async def test_endpoint_next_cursor_header_and_bad_cursor(service, monkeypatch):
+    monkeypatch.setattr(reports_router, "report_service", service)
+    app = FastAPI()
+    app.include_router(reports_router.router)
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        first = await client.get("/api/v1/reports", params={"limit": 4})
+        second = await client.get("/api/v1/reports", params={"limit": 4, "cursor": first.headers["X-Next-Cursor"]})
+        invalid = await client.get("/api/v1/reports", params={"cursor": "%%%"})
+
+    assert len(first.json()) == 4
+    assert len(second.json()) == 3 and "X-Next-Cursor" not in second.headers
+    assert invalid.status_code == 400
+    assert invalid.json()["detail"]["error"] == "InvalidCursor"
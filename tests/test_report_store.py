@@ -0,0 +1,148 @@
+"""Test degli archivi delle segnalazioni."""
+
+import json
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from api.services.report_store import JournalReportStore
+from api.services.reports import ReportService
+
+
+def _sqlite_service(tmp_path, legacy: str = "none.json") -> ReportService:
+    return ReportService(
+        db_path=str(tmp_path / "reports.db"),
+        legacy_json_path=str(tmp_path / legacy),
+        backend="sqlite"
+    )
+
+
+def _report(
+    report_id: str,
+    listing_id: str = "123",
+    created_at: str = "2026-01-01T10:00:00",
+    status: str = "received"
+) -> dict:
+    return {
+        "report_id": report_id,
+        "listing_id": listing_id,
+        "listing_url": f"https://www.subito.it/{listing_id}.htm",
+        "reason": "scam",
+        "reporter_email": None,
+        "additional_info": None,
+        "status": status,
+        "created_at": created_at,
+        "updated_at": created_at
+    }
+
+
+def test_sqlite_create_and_read(tmp_path):
+    service = _sqlite_service(tmp_path)
+    report = service.create_report("123", "https://www.subito.it/123.htm", "scam", "a@example.com")
+    service.create_report("456", "https://www.subito.it/456.htm", "fake")
+
+    assert service.get_report(report["report_id"]) == report
+    assert service.get_report("rep_missing") is None
+    assert [r["report_id"] for r in service.get_reports_by_listing("123")] == [report["report_id"]]
+
+    updated = service.update_report_status(report["report_id"], "reviewed")
+    assert updated["status"] == "reviewed"
+    assert service.update_report_status("rep_missing", "reviewed") is None
+    assert service.get_stats() == {"total": 2, "by_status": {"received": 1, "reviewed": 1}}
+
+
+def test_sqlite_uses_indexes(tmp_path):
+    _sqlite_service(tmp_path)
+    conn = sqlite3.connect(str(tmp_path / "reports.db"))
+
+    plan = " ".join(
+        row[-1] for row in conn.execute(
+            "EXPLAIN QUERY PLAN SELECT * FROM reports WHERE listing_id = ?", ("123",)
+        )
+    )
+
+    assert "idx_reports_listing" in plan
+
+
+def test_legacy_json_imported_once(tmp_path):
+    legacy = tmp_path / "reports.json"
+    legacy.write_text(json.dumps([
+        _report("rep_old1", "1", "2025-01-01T10:00:00"),
+        _report("rep_old2", "2", "2025-01-02T10:00:00", status="resolved")
+    ]))
+
+    service = _sqlite_service(tmp_path, "reports.json")
+    service.update_report_status("rep_old1", "reviewed")
+
+    # Il file JSON non viene reimportato sopra le modifiche
+    reopened = _sqlite_service(tmp_path, "reports.json")
+    assert reopened.get_report("rep_old1")["status"] == "reviewed"
+    assert reopened.get_stats()["total"] == 2
+
+
+def test_sqlite_sees_writes_from_other_workers(tmp_path):
+    first = _sqlite_service(tmp_path)
+    second = _sqlite_service(tmp_path)
+    assert second.get_stats()["total"] == 0
+
+    report = first.create_report("123", "https://www.subito.it/123.htm", "scam")
+    first.update_report_status(report["report_id"], "reviewed")
+
+    assert second.get_stats()["by_status"] == {"reviewed": 1}
+    assert second.get_reported_counts([("123", None)]) == [1]
+
+
+def test_unknown_backend_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        ReportService(db_path=str(tmp_path / "x"), backend="mongo")
+
+
+def test_journal_survives_restart_and_torn_write(tmp_path):
+    store = JournalReportStore(str(tmp_path), fsync=False)
+    store.insert(_report("rep_1"))
+    store.update_status("rep_1", "reviewed", "2026-01-02T10:00:00")
+
+    # Scrittura interrotta da un crash a metà riga
+    with open(store.journal_path, "ab") as f:
+        f.write(b'{"op":"create","report":{"report_id":"rep_')
+
+    reopened = JournalReportStore(str(tmp_path), fsync=False)
+    assert reopened.get("rep_1")["status"] == "reviewed"
+    assert reopened.count_by_status() == {"reviewed": 1}
+
+    reopened.insert(_report("rep_2"))
+    assert JournalReportStore(str(tmp_path), fsync=False).get("rep_2") is not None
+
+
+def test_journal_compaction_keeps_reports(tmp_path):
+    store = JournalReportStore(str(tmp_path), fsync=False, compact_bytes=2048)
+    other = JournalReportStore(str(tmp_path), fsync=False, compact_bytes=2048)
+    for i in range(20):
+        store.insert(_report(f"rep_{i:02d}", created_at=f"2026-01-01T10:00:{i:02d}"))
+
+    assert store.stats["compactions"] >= 1
+    assert store.journal_path.stat().st_size < 2048
+
+    # Un altro worker ricarica lo snapshot dopo la compattazione
+    assert other.count_by_status() == {"received": 20}
+    reports, _ = other.page(None, 100)
+    assert [r["report_id"] for r in reports] == [f"rep_{i:02d}" for i in reversed(range(20))]
+
+
+def test_journal_group_commit(tmp_path):
+    store = JournalReportStore(str(tmp_path), fsync=True)
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lambda i: store.insert(_report(f"rep_{i}")), range(40)))
+
+    assert store.count_by_status() == {"received": 40}
+    assert 1 <= store.stats["fsyncs"] <= store.stats["appends"]
+
+
+def test_journal_backend_through_service(tmp_path):
+    service = ReportService(db_path=str(tmp_path / "journal"), legacy_json_path="", backend="journal")
+    report = service.create_report("123", "https://www.subito.it/123.htm", "scam")
+
+    assert service.get_reports_by_listing("123") == [report]
+    assert service.get_reported_counts([("123", None), ("999", None)]) == [1, 0]
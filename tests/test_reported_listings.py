@@ -0,0 +1,50 @@
+"""Test del filtro degli annunci segnalati (bloom filter + contatori)."""
+
+import pytest
+
+from api.services.report_store import ReportedListings, normalize_listing_url
+from src.utils.bloom import BloomFilter
+
+
+def test_bloom_no_false_negatives_and_few_false_positives():
+    bloom = BloomFilter(capacity=5000, error_rate=0.01)
+    for i in range(5000):
+        bloom.add(f"id:{i}")
+
+    assert all(f"id:{i}" in bloom for i in range(5000))
+    false_positives = sum(f"other:{i}" in bloom for i in range(20000))
+    assert false_positives / 20000 < 0.02
+
+
+def test_bloom_rejects_invalid_error_rate():
+    with pytest.raises(ValueError):
+        BloomFilter(error_rate=0)
+
+
+def test_normalize_listing_url():
+    assert normalize_listing_url("https://WWW.Subito.it/annuncio-1.htm/?utm=x#foto") == "subito.it/annuncio-1.htm"
+    assert normalize_listing_url("http://subito.it/annuncio-1.htm") == "subito.it/annuncio-1.htm"
+    assert normalize_listing_url("annuncio-1") is None
+    assert normalize_listing_url(None) is None
+
+
+def test_counts_by_id_or_url():
+    reported = ReportedListings()
+    reported.add("1", "https://www.subito.it/1.htm")
+    reported.add("1", None)
+    reported.add(None, "https://subito.it/2.htm?from=search")
+
+    assert reported.count("1") == 2
+    assert reported.count(None, "https://www.subito.it/1.htm") == 1
+    assert reported.count("2", "https://www.subito.it/2.htm") == 1
+    assert reported.count("3", "https://www.subito.it/3.htm") == 0
+
+
+def test_filter_grows_past_capacity():
+    reported = ReportedListings(capacity=16)
+    for i in range(1000):
+        reported.add(str(i), None)
+
+    assert all(reported.count(str(i)) == 1 for i in range(1000))
+    assert reported._bloom.capacity >= 1000
+    assert reported.count("never-reported") == 0
@@ -0,0 +1,91 @@
+"""Test del punteggio di rischio truffa."""
+
+import time
+
+import pytest
+
+from src.analysis.scam import KeywordAutomaton, PriceStats, ScamScorer
+from src.models.listing import Listing
+
+
+PHOTOS = ["https://img.subito.it/1.jpg", "https://img.subito.it/2.jpg"]
+
+
+@pytest.fixture(scope="module")
+def scorer() -> ScamScorer:
+    return ScamScorer()
+
+
+def _listing(title: str, price, description: str = None, category: str = "Biciclette", **kwargs) -> Listing:
+    defaults = dict(
+        description=description or "Usata pochissimo, ritiro a mano o spedizione tracciata",
+        photos=PHOTOS,
+        location="Milano",
+        seller_name="Marco"
+    )
+    defaults.update(kwargs)
+    return Listing(title=title, price=price, category=category, **defaults)
+
+
+def test_automaton_finds_overlapping_patterns():
+    automaton = KeywordAutomaton(["originale", "100% originale", "ale"])
+
+    assert automaton.find("borsa 100% originale") == [0, 1, 2]
+    assert automaton.find("nessuna corrispondenza") == []
+
+
+def test_clean_listing_is_low_risk(scorer):
+    result = scorer.score(_listing("Bici da corsa Bianchi con scontrino", 650))
+
+    assert result.risk_level == "low"
+    assert result.score == 0
+
+
+def test_classic_scam_is_high_risk(scorer):
+    result = scorer.score(_listing(
+        "iPhone 14 Pro nuovo sigillato",
+        60,
+        description="Pagamento anticipato con ricarica, scrivimi su whatsapp",
+        photos=[],
+        location="Italia",
+        seller_name="user12345"
+    ))
+
+    assert result.risk_level == "high"
+    assert "Prezzo sospettosamente basso per iphone (€60)" in result.reasons
+    assert "Richiesta pagamento anticipato" in result.reasons
+
+
+def test_batch_flags_price_outlier_in_category(scorer):
+    listings = [_listing(f"Bici da corsa {i}", price) for i, price in enumerate([600, 620, 640, 580, 610, 650])]
+    listings.append(_listing("Bici da corsa carbonio", 90))
+    listings.append(_listing("Casco bici", 90, category="Accessori"))
+
+    scores = scorer.score_batch(listings)
+
+    assert scores[6].score > scores[0].score
+    assert any("mediana €610" in reason for reason in scores[6].reasons)
+    # Altra categoria (senza abbastanza annunci): nessun confronto
+    assert not any("mediana" in reason for reason in scores[7].reasons)
+
+
+def test_reference_stats_override_batch(scorer):
+    listings = [_listing("Bici da corsa", 100), _listing("Bici da corsa", 110)]
+
+    scores = scorer.score_batch(listings, reference=PriceStats(median=600, mad=30))
+
+    assert all("Prezzo molto inferiore agli annunci simili (mediana €600)" in s.reasons for s in scores)
+
+
+def test_batch_scoring_is_fast(scorer):
+    listings = [
+        _listing(f"iPhone {i % 15} 128GB", 200 + (i * 37) % 600, category=f"cat{i % 5}")
+        for i in range(500)
+    ]
+
+    started = time.perf_counter()
+    scores = scorer.score_batch(listings)
+    elapsed = time.perf_counter() - started
+
+    assert len(scores) == 500
+    assert elapsed < 0.5
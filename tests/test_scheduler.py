@@ -0,0 +1,146 @@
+"""Test dello scheduler delle ricerche salvate."""
+
+import json
+
+import pytest
+
+from api.core.config import settings
+from api.services.scheduler import SearchScheduler
+
+
+@pytest.fixture
+def db_path(tmp_path) -> str:
+    return str(tmp_path / "saved_searches.json")
+
+
+def _add(scheduler: SearchScheduler, query: str, cache_key: str = None):
+    return scheduler.add(query=query, cache_key=cache_key or f"search:{query}")
+
+
+def test_saved_searches_persist(db_path):
+    scheduler = SearchScheduler(db_path)
+    saved = _add(scheduler, "iphone 13")
+    scheduler.record_hit("search:iphone 13")
+    assert scheduler.save()
+
+    reloaded = SearchScheduler(db_path)
+
+    assert reloaded.get(saved.search_id).query == "iphone 13"
+    assert reloaded.get(saved.search_id).hits == 1
+
+
+def test_remove(db_path):
+    scheduler = SearchScheduler(db_path)
+    saved = _add(scheduler, "ps5")
+
+    assert scheduler.remove(saved.search_id)
+    assert not scheduler.remove(saved.search_id)
+    scheduler.save()
+    assert json.loads(open(db_path).read()) == []
+
+
+def test_popular_search_runs_first(db_path):
+    scheduler = SearchScheduler(db_path)
+    quiet = _add(scheduler, "bici")
+    popular = _add(scheduler, "switch")
+    for _ in range(20):
+        scheduler.record_hit(popular.cache_key)
+    # Stessa età per entrambe: conta solo la popolarità
+    quiet.created_at = popular.created_at
+
+    assert [s.search_id for s in scheduler.list_searches()] == [popular.search_id, quiet.search_id]
+
+
+@pytest.mark.anyio
+async def test_run_once_reschedules(db_path):
+    ran = []
+    scheduler = SearchScheduler(db_path, runner=lambda saved: ran.append(saved.query) or 7)
+    saved = _add(scheduler, "kindle")
+
+    assert (await scheduler.run_once()).search_id == saved.search_id
+    assert await scheduler.run_once() is None  # Rischedulata tra interval_seconds
+
+    assert ran == ["kindle"]
+    assert saved.runs == 1 and saved.last_result_count == 7
+    assert saved.next_run_at >= saved.last_run_at + saved.interval_seconds
+
+
+@pytest.mark.anyio
+async def test_failed_run_backs_off(db_path):
+    def failing(saved):
+        raise RuntimeError("sito non raggiungibile")
+
+    scheduler = SearchScheduler(db_path, runner=failing)
+    saved = _add(scheduler, "gopro")
+
+    await scheduler.run_once()
+
+    assert saved.failures == 1
+    assert saved.next_run_at >= saved.last_run_at + 2 * saved.interval_seconds
+
+
+def test_shared_workers_see_each_other(db_path):
+    first = SearchScheduler(db_path, shared=True)
+    second = SearchScheduler(db_path, shared=True)
+
+    saved = _add(first, "macbook")
+
+    assert second.get(saved.search_id) is not None
+    assert second.remove(saved.search_id)
+    assert first.get(saved.search_id) is None
+
+
+def test_shared_hits_buffered_until_sync(db_path, monkeypatch):
+    first = SearchScheduler(db_path, shared=True)
+    saved = _add(first, "airpods")
+    second = SearchScheduler(db_path, shared=True)
+
+    # Il percorso delle richieste non legge il file
+    monkeypatch.setattr(second, "_reload_if_changed", lambda: pytest.fail("reload su record_hit"))
+    for _ in range(3):
+        second.record_hit(saved.cache_key)
+    second.record_hit("search:altro")
+    monkeypatch.undo()
+
+    assert first.get(saved.search_id).hits == 0
+    assert second.sync()
+    assert first.get(saved.search_id).hits == 3
+
+
+def test_shared_hit_buffer_bounded(db_path, monkeypatch):
+    monkeypatch.setattr(settings, "SCHEDULER_MAX_SEARCHES", 3)
+    scheduler = SearchScheduler(db_path, shared=True)
+    saved = _add(scheduler, "kindle")
+
+    for i in range(10):
+        scheduler.record_hit(f"search:adhoc {i}")
+    scheduler.record_hit(saved.cache_key)
+
+    # Le ricerche ad hoc si fermano al limite, quelle salvate no
+    assert len(scheduler._pending_hits) == 4
+    assert scheduler.sync()
+    assert scheduler.get(saved.search_id).hits == 1
+
+
+@pytest.mark.anyio
+async def test_removed_search_not_run(db_path):
+    ran = []
+    scheduler = SearchScheduler(db_path, runner=lambda saved: ran.append(saved.query) or 0)
+    saved = _add(scheduler, "drone")
+    scheduler.remove(saved.search_id)
+
+    # La voce rimasta negli heap è obsoleta e viene scartata
+    assert await scheduler.run_once() is None
+    assert ran == []
+
+
+def test_scrapers_share_host_budget():
+    from src.scraper.ebay_scraper import EbayScraper
+    from src.scraper.subito_scraper import SubitoScraper
+
+    first, second = SubitoScraper(), SubitoScraper()
+    limiter = first.get_rate_limiter("https://www.subito.it/annunci-italia/vendita/usato/?q=bici")
+
+    # Un solo budget per host, da qualunque scraper e pagina
+    assert second.get_rate_limiter("https://WWW.SUBITO.IT/altro.htm") is limiter
+    assert EbayScraper().get_rate_limiter("https://www.ebay.it/sch/i.html") is not limiter
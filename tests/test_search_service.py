@@ -0,0 +1,87 @@
+"""Test del servizio di ricerca (scraping simulato)."""
+
+import fakeredis
+import pytest
+
+from api.models.requests import SearchRequest
+from api.services import search
+from api.services.cache import CacheService
+from api.services.search import SearchService
+from src.models.listing import Listing
+
+
+BIKES = [
+    ("Bianchi Sprint 2021", 600),
+    ("Pinarello Paris telaio alluminio", 620),
+    ("Cannondale CAAD13 Shimano 105", 640),
+    ("Specialized Allez Sport", 580),
+    ("Giant TCR Advanced", 650),
+]
+
+
+def _listing(title: str, price: float, listing_id: str) -> Listing:
+    return Listing(
+        title=title,
+        price=price,
+        listing_id=listing_id,
+        source="subito",
+        link=f"https://www.subito.it/biciclette/{listing_id}.htm",
+        category="Biciclette",
+        description="Usata pochissimo, ritiro a mano o spedizione tracciata",
+        photos=[f"https://img.subito.it/{listing_id}.jpg"],
+        location="Milano",
+        seller_name="Marco"
+    )
+
+
+class _FakeScraper:
+    """Scraper che restituisce sempre gli stessi annunci."""
+
+    def __init__(self, listings):
+        self.listings = listings
+
+    def search(self, query, max_pages=1, **kwargs):
+        return list(self.listings)
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def listings(monkeypatch):
+    """Biciclette diverse più una offerta a €90 ripubblicata sei volte."""
+    listings = [_listing(title, price, f"bike-{i}") for i, (title, price) in enumerate(BIKES)]
+    listings += [_listing("Bici corsa carbonio Cervelo", 90, f"repost-{i}") for i in range(6)]
+    monkeypatch.setattr(search, "create_scraper", lambda platform: _FakeScraper(listings))
+    return listings
+
+
+def _execute(**params) -> dict:
+    return SearchService(CacheService(None)).execute(SearchRequest(query="bici da corsa", **params))
+
+
+def test_reposts_do_not_hide_price_outlier(listings):
+    response = _execute()
+
+    assert response["total_results"] == 6
+    assert response["duplicates_removed"] == 5
+    cheap = next(r for r in response["results"] if r["price"] == 90)
+    assert any("mediana €610" in reason for reason in cheap["risk_reasons"])
+
+
+def test_price_filter_keeps_groups_within_budget(listings):
+    response = _execute(prezzo_max=600)
+
+    assert sorted(r["price"] for r in response["results"]) == [90, 580, 600]
+    assert response["duplicates_removed"] == 5
+
+
+def test_price_stats_count_each_item_once(listings):
+    service = SearchService(CacheService(fakeredis.FakeRedis(decode_responses=True)))
+    request = SearchRequest(query="bici da corsa", prezzo_max=600)
+
+    service.execute(request)
+    service.execute(request)  # Riscraping (warmer, ricerca salvata)
+
+    # Un prezzo per gruppo di duplicati, filtro di prezzo escluso
+    assert service.price_stats.get_summary("bici da corsa")["count"] == 6
@@ -0,0 +1,47 @@
+"""Test dell'avvio multi-worker (api.server, api.core.workers)."""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from api.core.config import settings
+from api.core.workers import WORKER_ID_ENV, is_primary_worker, worker_log_file
+from api.server import resolve_workers
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def test_resolve_workers():
+    assert resolve_workers(3) == 3
+    assert resolve_workers(0) == (os.cpu_count() or 1)
+
+
+def test_worker_log_file(monkeypatch):
+    monkeypatch.setattr(settings, "SERVER_WORKERS", 4)
+    monkeypatch.setenv(WORKER_ID_ENV, "2")
+
+    assert worker_log_file("logs/api.log") == str(Path("logs/api.2.log"))
+    assert not is_primary_worker()
+
+    monkeypatch.setattr(settings, "SERVER_WORKERS", 1)
+    assert worker_log_file("logs/api.log") == "logs/api.log"
+
+
+def test_preload_does_not_import_app(tmp_path):
+    env = {
+        **os.environ,
+        "LOG_FILE": str(tmp_path / "api.log"),
+        "REPORTS_BACKEND": "sqlite",
+        "REPORTS_SQLITE_PATH": str(tmp_path / "reports.db"),
+        "REPORTS_DB_PATH": str(tmp_path / "reports.json")
+    }
+    code = "import sys; from api.server import _preload; _preload(); print('api.main' in sys.modules)"
+
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=ROOT, env=env, capture_output=True, text=True, check=True
+    )
+
+    assert result.stdout.strip() == "False"
+    assert (tmp_path / "reports.db").exists()
+    assert not (tmp_path / "api.log").exists()
@@ -0,0 +1,93 @@
+"""Test dello stato condiviso tra worker (rate limit per host, download dei dettagli)."""
+
+import asyncio
+import copy
+import threading
+import time
+
+import fakeredis
+import pytest
+
+from api.services import enrichment
+from api.services.cache import AsyncCacheService
+from api.services.enrichment import DETAILS_MARKER, ListingDetailFetcher
+from src.utils import rate_limiter
+from src.utils.rate_limiter import RateLimiter, RedisRateLimiter, get_host_rate_limiter, use_shared_backend
+
+
+def _redis_limiter(client, delay: float = 0.05) -> RedisRateLimiter:
+    return RedisRateLimiter(client, "www.subito.it", requests_per_second=1000, min_delay=delay, max_delay=delay)
+
+
+def test_workers_share_one_host_budget():
+    server = fakeredis.FakeServer()
+    # Due worker: client e limiter distinti, stesso Redis
+    workers = [_redis_limiter(fakeredis.FakeRedis(server=server)) for _ in range(2)]
+    waits = []
+
+    threads = [
+        threading.Thread(target=lambda limiter=limiter: waits.append(limiter.wait()))
+        for limiter in workers + workers
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(waits) == pytest.approx([0.0, 0.05, 0.1, 0.15], abs=0.01)
+
+
+def test_redis_errors_fall_back_to_local_state():
+    server = fakeredis.FakeServer()
+    limiter = _redis_limiter(fakeredis.FakeRedis(server=server), delay=0.02)
+    server.connected = False
+
+    started = time.monotonic()
+    limiter.wait()
+    limiter.wait()
+
+    assert 0.015 <= time.monotonic() - started < 0.5
+
+
+def test_use_shared_backend_switches_new_limiters(monkeypatch):
+    monkeypatch.setattr(rate_limiter, "_host_limiters", {})
+    monkeypatch.setattr(rate_limiter, "_shared_redis", None)
+
+    local = get_host_rate_limiter("www.ebay.it")
+    use_shared_backend(fakeredis.FakeRedis())
+    shared = get_host_rate_limiter("www.ebay.it")
+
+    assert type(local) is RateLimiter
+    assert isinstance(shared, RedisRateLimiter) and shared.key == "hostlimit:www.ebay.it"
+
+
+@pytest.mark.anyio
+async def test_detail_download_single_flight_across_workers(monkeypatch):
+    monkeypatch.setattr(enrichment, "is_multi_worker", lambda: True)
+    monkeypatch.setattr(ListingDetailFetcher, "POLL_INTERVAL", 0.01)
+    server = fakeredis.FakeServer()
+    downloads = []
+
+    def fake_fetch(listing):
+        downloads.append(listing.listing_id)
+        time.sleep(0.1)
+        detailed = copy.deepcopy(listing)
+        detailed.description = "Dettagli"
+        detailed.metadata[DETAILS_MARKER] = "2026-01-01T00:00:00"
+        return detailed
+
+    workers = []
+    for _ in range(2):
+        fetcher = ListingDetailFetcher()
+        monkeypatch.setattr(fetcher, "_fetch_sync", fake_fetch)
+        workers.append((fetcher, AsyncCacheService(fakeredis.FakeAsyncRedis(server=server, decode_responses=True))))
+
+    cache = workers[0][1]
+    await cache.set_listings({"42": {"title": "Bici", "link": "https://www.subito.it/42.htm"}})
+    await cache.delete("listing:42")
+
+    results = await asyncio.gather(*(fetcher.get("42", worker_cache) for fetcher, worker_cache in workers))
+
+    assert downloads == ["42"]
+    assert [result["description"] for result in results] == ["Dettagli", "Dettagli"]
+    assert sum(fetcher.stats["deduplicated"] for fetcher, _ in workers) == 1
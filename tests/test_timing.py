@@ -0,0 +1,85 @@
+"""Test dei tempi per fase delle richieste (Server-Timing)."""
+
+import asyncio
+import contextvars
+import re
+import threading
+import time
+
+import pytest
+
+from src.utils import timing
+
+
+def _in_fresh_context(func):
+    """Esegue func in un contesto senza raccolta attiva."""
+    return contextvars.Context().run(func)
+
+
+def test_phases_accumulate():
+    def run():
+        timings = timing.start_timings()
+        for _ in range(3):
+            with timing.span("fetch"):
+                time.sleep(0.01)
+        timing.record("parse", 0.005)
+        return timings.as_dict()
+
+    phases = _in_fresh_context(run)
+
+    assert phases["fetch"] >= 30
+    assert phases["parse"] == 5.0
+    assert phases["total"] >= phases["fetch"]
+
+
+def test_span_without_collection_is_noop():
+    def run():
+        with timing.span("fetch"):
+            pass
+        timing.record("parse", 1.0)
+        return timing.get_timings()
+
+    assert _in_fresh_context(run) is None
+
+
+def test_server_timing_header_format():
+    timings = timing.RequestTimings()
+    timings.add("ratelimit", 0.0125)
+    timings.add("cache_read", 0.0004)
+
+    header = timings.server_timing()
+
+    assert re.fullmatch(r"ratelimit;dur=12\.5, cache_read;dur=0\.4, total;dur=\d+\.\d", header)
+
+
+def test_worker_threads_add_to_request():
+    def run():
+        timings = timing.start_timings()
+
+        def worker():
+            with timing.span("fetch"):
+                time.sleep(0.01)
+
+        threads = [threading.Thread(target=contextvars.copy_context().run, args=(worker,)) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return timings.phases["fetch"]
+
+    # Thread concorrenti: si somma il tempo di ognuno
+    assert _in_fresh_context(run) >= 0.04
+
+
+@pytest.mark.anyio
+async def test_concurrent_requests_kept_apart():
+    async def request(delay: float):
+        timings = timing.start_timings()
+        await asyncio.to_thread(lambda: timing.record("fetch", delay))
+        await asyncio.sleep(0)
+        return timings.phases
+
+    first, second = await asyncio.gather(request(1.0), request(2.0))
+
+    assert first == {"fetch": 1.0}
+    assert second == {"fetch": 2.0}
@@ -0,0 +1,47 @@
+"""Test del tracing OpenTelemetry opzionale."""
+
+import json
+
+import pytest
+
+from src.utils import tracing
+
+
+@pytest.fixture(autouse=True)
+def _disable_tracing():
+    yield
+    tracing.shutdown_tracing()
+
+
+def test_disabled_span_is_shared_noop():
+    assert not tracing.is_enabled()
+
+    with tracing.span("cache.get", namespace="search") as first:
+        first.set_attribute("cache.hit", True)
+        first.add_event("retry")
+    second = tracing.span("scraper.fetch_page")
+
+    assert second is first
+
+
+def test_configure_without_sdk_keeps_tracing_off(monkeypatch):
+    monkeypatch.setattr(tracing, "trace", None)
+
+    assert not tracing.configure_tracing("test", exporter="console")
+    assert not tracing.is_enabled()
+
+
+def test_file_exporter_writes_nested_spans(tmp_path):
+    pytest.importorskip("opentelemetry.sdk")
+    path = tmp_path / "traces.jsonl"
+
+    assert tracing.configure_tracing("test", exporter="file", file_path=str(path))
+    with tracing.span("api.search", query="bici", categoria=None):
+        with tracing.span("cache.get") as child:
+            child.set_attribute("cache.hit", False)
+    tracing.shutdown_tracing()
+
+    spans = {span["name"]: span for span in map(json.loads, path.read_text().splitlines())}
+    assert spans["cache.get"]["parent_id"] == spans["api.search"]["context"]["span_id"]
+    assert spans["api.search"]["attributes"] == {"query": "bici"}
+    assert spans["cache.get"]["attributes"] == {"cache.hit": False}